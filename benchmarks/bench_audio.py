@@ -0,0 +1,342 @@
+"""Benchmark concurrent audio pipelines against local media, fully offline.
+
+Run from the repository root on a machine with FFmpeg, libopus, and the
+bot's requirements installed (the Docker image has all of them):
+
+    python -m benchmarks.bench_audio
+    python -m benchmarks.bench_audio --streams 1,16,64,128 --seconds 30
+    python -m benchmarks.bench_audio --pipelines current,ffmpeg_opus --media song.webm
+    docker run --rm -v "$PWD/benchmarks:/app/benchmarks" discord-music-bot \\
+        python -m benchmarks.bench_audio
+
+Each stream runs on its own thread with the same pacing as discord.py's
+``AudioPlayer``: read a frame, Opus-encode it unless the source already is
+Opus, encrypt it like a voice packet, then sleep until the next 20 ms slot.
+Media is served from a loopback HTTP server so FFmpeg runs with the same
+reconnect options as it does for YouTube stream URLs. Reported per
+configuration: CPU per stream (bot process and FFmpeg children), frame
+delivery jitter, missed 20 ms deadlines, and a streams-per-core estimate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import discord
+import nacl.bindings
+
+from benchmarks.bench_service import percentile
+from music_audio import YTDLSource, create_ffmpeg_source, ffmpeg_options
+
+FRAME_SECONDS = 0.02
+
+
+@dataclass
+class Pipeline:
+    """How one stream turns a URL into packets."""
+
+    name: str
+    description: str
+    open_source: object
+    encode: bool
+
+
+def open_current(url: str):
+    """The bot's path: ``create_ffmpeg_source`` inside ``YTDLSource``."""
+    return YTDLSource(create_ffmpeg_source(url), data={"title": url})
+
+
+def open_pcm(url: str):
+    """FFmpeg PCM without the volume transformer."""
+    return create_ffmpeg_source(url)
+
+
+def open_ffmpeg_opus(url: str):
+    """FFmpeg encodes Opus itself, so Python only forwards packets."""
+    return discord.FFmpegOpusAudio(url, **ffmpeg_options)
+
+
+PIPELINES = {
+    pipeline.name: pipeline
+    for pipeline in (
+        Pipeline(
+            "current",
+            "FFmpegPCMAudio + PCMVolumeTransformer + Opus encode",
+            open_current,
+            True,
+        ),
+        Pipeline("pcm", "FFmpegPCMAudio + Opus encode", open_pcm, True),
+        Pipeline("ffmpeg_opus", "FFmpegOpusAudio passthrough", open_ffmpeg_opus, False),
+    )
+}
+
+
+@dataclass
+class StreamStats:
+    """Pacing measurements for one stream."""
+
+    frames: int = 0
+    missed: int = 0
+    intervals: list[float] = field(default_factory=list)
+    lateness: list[float] = field(default_factory=list)
+    ended_early: bool = False
+
+
+@dataclass
+class Result:  # pylint: disable=too-many-instance-attributes
+    """One pipeline at one stream count."""
+
+    pipeline: str
+    streams: int
+    frames: int
+    cpu_pct_per_stream: float
+    bot_cpu_pct_per_stream: float
+    ffmpeg_cpu_pct_per_stream: float
+    jitter_p50_ms: float
+    jitter_p99_ms: float
+    late_p99_ms: float
+    missed_pct: float
+    streams_per_core: float
+    ended_early: int
+
+
+def play_stream(source, *, encode: bool, seconds: float, start: threading.Event):
+    """Pace one source like discord.py's ``AudioPlayer`` and time each send."""
+    stats = StreamStats()
+    encoder = discord.opus.Encoder() if encode else None
+    key = os.urandom(32)
+    header = bytearray(12)
+    start.wait()
+
+    started = time.perf_counter()
+    previous = started
+    while stats.frames * FRAME_SECONDS < seconds:
+        data = source.read()
+        if not data:
+            stats.ended_early = True
+            break
+        if encoder is not None:
+            data = encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+        nonce = stats.frames.to_bytes(24, "big")
+        nacl.bindings.crypto_aead_xchacha20poly1305_ietf_encrypt(
+            data, bytes(header), nonce, key
+        )
+
+        sent = time.perf_counter()
+        due = started + FRAME_SECONDS * stats.frames
+        stats.lateness.append(max(0.0, sent - due))
+        if sent - due > FRAME_SECONDS:
+            stats.missed += 1
+        if stats.frames:
+            stats.intervals.append(abs(sent - previous - FRAME_SECONDS))
+        previous = sent
+        stats.frames += 1
+
+        next_time = started + FRAME_SECONDS * stats.frames
+        time.sleep(max(0.0, next_time - time.perf_counter()))
+    return stats
+
+
+def cpu_seconds() -> tuple[float, float]:
+    """Return (this process, reaped children) user+system CPU seconds."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def run_configuration(  # pylint: disable=too-many-locals
+    pipeline: Pipeline, streams: int, url: str, seconds: float
+) -> Result:
+    """Run ``streams`` concurrent copies of one pipeline."""
+    sources = [pipeline.open_source(url) for _ in range(streams)]
+    start = threading.Event()
+    results: list[StreamStats | None] = [None] * streams
+
+    def worker(index: int):
+        results[index] = play_stream(
+            sources[index], encode=pipeline.encode, seconds=seconds, start=start
+        )
+
+    threads = [
+        threading.Thread(target=worker, args=(index,), name=f"stream-{index}")
+        for index in range(streams)
+    ]
+    for thread in threads:
+        thread.start()
+
+    own_before, children_before = cpu_seconds()
+    started = time.perf_counter()
+    start.set()
+    for thread in threads:
+        thread.join()
+    for source in sources:
+        source.cleanup()
+    elapsed = time.perf_counter() - started
+    own_after, children_after = cpu_seconds()
+
+    stats = [stream for stream in results if stream is not None]
+    frames = sum(stream.frames for stream in stats)
+    intervals = [value for stream in stats for value in stream.intervals]
+    lateness = [value for stream in stats for value in stream.lateness]
+    stream_seconds = streams * elapsed
+    bot_cpu = (own_after - own_before) / stream_seconds
+    ffmpeg_cpu = (children_after - children_before) / stream_seconds
+    total_cpu = bot_cpu + ffmpeg_cpu
+    return Result(
+        pipeline=pipeline.name,
+        streams=streams,
+        frames=frames,
+        cpu_pct_per_stream=100 * total_cpu,
+        bot_cpu_pct_per_stream=100 * bot_cpu,
+        ffmpeg_cpu_pct_per_stream=100 * ffmpeg_cpu,
+        jitter_p50_ms=percentile(intervals, 0.5) * 1000,
+        jitter_p99_ms=percentile(intervals, 0.99) * 1000,
+        late_p99_ms=percentile(lateness, 0.99) * 1000,
+        missed_pct=100 * sum(stream.missed for stream in stats) / max(1, frames),
+        streams_per_core=1 / total_cpu if total_cpu else float("inf"),
+        ended_early=sum(stream.ended_early for stream in stats),
+    )
+
+
+def generate_media(directory: str, seconds: float) -> str:
+    """Write a pink-noise Opus/WebM file, close to a YouTube audio stream."""
+    path = os.path.join(directory, "bench.webm")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"anoisesrc=color=pink:amplitude=0.3:duration={seconds}",
+            "-ac",
+            "2",
+            "-ar",
+            "48000",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            "128k",
+            path,
+        ],
+        check=True,
+    )
+    return path
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request."""
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Stay quiet."""
+
+
+def serve_directory(directory: str) -> ThreadingHTTPServer:
+    """Serve a directory on a loopback port from a daemon thread."""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_requirements():
+    """Exit with a clear message when FFmpeg or libopus is missing."""
+    if shutil.which("ffmpeg") is None:
+        sys.exit("ffmpeg was not found on PATH.")
+    try:
+        discord.opus.Encoder()
+    except discord.opus.OpusNotLoaded:
+        sys.exit("libopus could not be loaded.")
+
+
+COLUMNS = (
+    ("pipeline", "pipeline", "{:>12}"),
+    ("streams", "streams", "{:>7}"),
+    ("cpu_pct_per_stream", "cpu%/st", "{:>8.2f}"),
+    ("bot_cpu_pct_per_stream", "bot%", "{:>6.2f}"),
+    ("ffmpeg_cpu_pct_per_stream", "ffmpeg%", "{:>7.2f}"),
+    ("jitter_p50_ms", "jit50", "{:>6.2f}"),
+    ("jitter_p99_ms", "jit99", "{:>6.2f}"),
+    ("late_p99_ms", "late99", "{:>7.2f}"),
+    ("missed_pct", "missed%", "{:>7.2f}"),
+    ("streams_per_core", "st/core", "{:>7.1f}"),
+)
+
+
+def format_row(result: Result) -> str:
+    """Render one result as a table row."""
+    row = asdict(result)
+    return " ".join(fmt.format(row[name]) for name, _, fmt in COLUMNS)
+
+
+def parse_list(value: str) -> list[str]:
+    """Parse a comma-separated option."""
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=parse_list, default="1,8,32,64")
+    parser.add_argument(
+        "--pipelines", type=parse_list, default=",".join(PIPELINES.keys())
+    )
+    parser.add_argument("--seconds", type=float, default=15.0)
+    parser.add_argument("--media", help="local audio file (default: generated)")
+    parser.add_argument("--json", help="also write results to this file")
+    options = parser.parse_args(argv)
+    unknown = set(options.pipelines) - set(PIPELINES)
+    if unknown:
+        parser.error(f"unknown pipelines: {', '.join(sorted(unknown))}")
+    options.streams = [int(count) for count in options.streams]
+    return options
+
+
+def main(argv=None) -> int:
+    """Run every pipeline at every stream count and print a table."""
+    options = parse_args(argv)
+    check_requirements()
+    with tempfile.TemporaryDirectory() as directory:
+        media = options.media or generate_media(directory, options.seconds + 10)
+        media = os.path.abspath(media)
+        server = serve_directory(os.path.dirname(media))
+        url = f"http://127.0.0.1:{server.server_port}/{os.path.basename(media)}"
+
+        print(" ".join(f"{label:>{len(fmt.format(0))}}" for _, label, fmt in COLUMNS))
+        results = []
+        try:
+            for name in options.pipelines:
+                for streams in options.streams:
+                    result = run_configuration(
+                        PIPELINES[name], streams, url, options.seconds
+                    )
+                    results.append(result)
+                    print(format_row(result), flush=True)
+        finally:
+            server.shutdown()
+
+    if any(result.ended_early for result in results):
+        print("Some streams ran out of media early; use a longer --media file.")
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as results_file:
+            json.dump([asdict(result) for result in results], results_file, indent=2)
+            results_file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
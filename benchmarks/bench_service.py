@@ -0,0 +1,339 @@
+"""Benchmark MusicService against fake yt-dlp, FFmpeg, and voice clients.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_service
+    python -m benchmarks.bench_service --update-baseline
+    python -m benchmarks.bench_service --extract-median 0.2 --failure-rate 0.1
+
+Each scenario drives the real service code; only extraction, FFmpeg and
+the Discord voice layer are faked. Results are compared against
+``benchmarks/baseline_service.json`` and the exit status is 1 when any
+metric regressed by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from benchmarks.fakes import (
+    FakeClient,
+    FakeExtractor,
+    LatencyProfile,
+    fake_ffmpeg_source,
+    make_interaction,
+)
+from music_service import MusicService
+from music_state import MusicState
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline_service.json")
+
+
+def percentile(values: list[float], quantile: float) -> float:
+    """Return the nearest-rank percentile, or NaN for no values."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    index = max(0, math.ceil(quantile * len(ordered)) - 1)
+    return ordered[index]
+
+
+@contextmanager
+def fake_backends(extractor: FakeExtractor):
+    """Route extraction and FFmpeg through the fakes."""
+    with patch("music_service.extract_info_async", new=extractor), patch(
+        "music_audio.extract_info_async", new=extractor
+    ), patch("music_audio.create_ffmpeg_source", new=fake_ffmpeg_source):
+        yield
+
+
+def make_service(loop, *, guilds: int = 1, track_seconds: float = 0.02):
+    """Build a service with fake guilds that already have a voice client."""
+    client = FakeClient(loop)
+    state = MusicState(max_queue_size=100000)
+    for guild_id in range(1, guilds + 1):
+        client.add_guild(guild_id, track_seconds=track_seconds)
+    return client, state, MusicService(client, state)
+
+
+async def stop_background_work(client, state):
+    """Cancel loaders and stop fake playback timers after a scenario."""
+    for guild_id, guild in client.guilds.items():
+        state.stop_playlist_loading(guild_id)
+        if guild.voice_client is not None:
+            guild.voice_client.stop()
+    await asyncio.sleep(0)
+
+
+async def bench_time_to_first_audio(runs: int) -> dict:
+    """Time /play from request to ``voice_client.play`` on idle guilds."""
+    loop = asyncio.get_running_loop()
+    client, state, service = make_service(loop, guilds=runs, track_seconds=3600)
+    samples = []
+    for guild_id, guild in client.guilds.items():
+        interaction = make_interaction(guild, user_id=guild_id * 10)
+        started = time.perf_counter()
+        await service.handle_music_request(
+            interaction, f"https://www.youtube.com/watch?v=first{guild_id}"
+        )
+        if guild.voice_client.play_times:
+            samples.append(guild.voice_client.play_times[0] - started)
+    await stop_background_work(client, state)
+    return {
+        "time_to_first_audio_p50_ms": percentile(samples, 0.5) * 1000,
+        "time_to_first_audio_p95_ms": percentile(samples, 0.95) * 1000,
+    }
+
+
+async def bench_inter_track_gap(tracks: int) -> dict:
+    """Play a queue of lazy tracks and time the silence between them."""
+    loop = asyncio.get_running_loop()
+    client, state, service = make_service(loop, guilds=1, track_seconds=0.01)
+    voice_client = client.guilds[1].voice_client
+    generation = state.begin_playlist_loading(1)
+    await service.enqueue_playlist_entries(
+        1, FakeExtractor.playlist(tracks), loader_generation=generation
+    )
+    state.finish_playlist_loading(1, generation)
+
+    await service.play_next(1, 1)
+    deadline = time.perf_counter() + 30 + tracks
+    while voice_client.disconnects == 0 and time.perf_counter() < deadline:
+        await asyncio.sleep(0.005)
+
+    gaps = [
+        started - finished
+        for finished, started in zip(
+            voice_client.finish_times, voice_client.play_times[1:]
+        )
+    ]
+    await stop_background_work(client, state)
+    return {
+        "inter_track_gap_p50_ms": percentile(gaps, 0.5) * 1000,
+        "inter_track_gap_p95_ms": percentile(gaps, 0.95) * 1000,
+        "tracks_played": len(voice_client.play_times),
+    }
+
+
+async def bench_playlist_load(entries: int) -> dict:
+    """Measure how fast playlist entries become queued lazy players."""
+    loop = asyncio.get_running_loop()
+    client, state, service = make_service(loop)
+    generation = state.begin_playlist_loading(1)
+    started = time.perf_counter()
+    queued, _ = await service.enqueue_playlist_entries(
+        1, FakeExtractor.playlist(entries), loader_generation=generation
+    )
+    elapsed = time.perf_counter() - started
+    await stop_background_work(client, state)
+    return {"playlist_load_entries_per_s": queued / elapsed if elapsed else math.inf}
+
+
+async def bench_next_ready_player(tracks: int, extractor: FakeExtractor) -> dict:
+    """Time resolving lazy players the way playback does."""
+    loop = asyncio.get_running_loop()
+    client, state, service = make_service(loop)
+    generation = state.begin_playlist_loading(1)
+    await service.enqueue_playlist_entries(
+        1, FakeExtractor.playlist(tracks), loader_generation=generation
+    )
+    samples = []
+    calls_before = extractor.calls
+    while state.get_queue(1):
+        started = time.perf_counter()
+        await service.get_next_ready_player(1)
+        samples.append(time.perf_counter() - started)
+    await stop_background_work(client, state)
+    return {
+        "next_ready_player_p50_ms": percentile(samples, 0.5) * 1000,
+        "next_ready_player_p95_ms": percentile(samples, 0.95) * 1000,
+        "next_ready_player_extractions": extractor.calls - calls_before,
+    }
+
+
+async def bench_voice_state_updates(events: int) -> dict:
+    """Measure throughput of voice-state events while listeners remain."""
+    loop = asyncio.get_running_loop()
+    client, state, service = make_service(loop, guilds=10)
+    guilds = list(client.guilds.values())
+    updates = []
+    for index in range(events):
+        guild = guilds[index % len(guilds)]
+        member = SimpleNamespace(id=10**9 + index, bot=False, guild=guild)
+        channel = guild.voice_client.channel
+        updates.append(
+            (
+                member,
+                SimpleNamespace(channel=channel),
+                SimpleNamespace(channel=None),
+            )
+        )
+
+    started = time.perf_counter()
+    for member, before, after in updates:
+        await service.on_voice_state_update(member, before, after)
+    elapsed = time.perf_counter() - started
+    await stop_background_work(client, state)
+    return {"voice_state_events_per_s": events / elapsed if elapsed else math.inf}
+
+
+# name: (scenario, size option, whether it inspects the fake extractor)
+SCENARIOS = {
+    "time_to_first_audio": (bench_time_to_first_audio, "runs", False),
+    "inter_track_gap": (bench_inter_track_gap, "tracks", False),
+    "playlist_load": (bench_playlist_load, "entries", False),
+    "next_ready_player": (bench_next_ready_player, "tracks", True),
+    "voice_state_updates": (bench_voice_state_updates, "events", False),
+}
+
+
+def better(metric: str, first: float, second: float) -> float:
+    """Return the better of two samples of one metric."""
+    if math.isnan(first):
+        return second
+    if math.isnan(second):
+        return first
+    return max(first, second) if higher_is_better(metric) else min(first, second)
+
+
+async def run_scenario(scenario, size: int, extractor: FakeExtractor, wants_extractor):
+    """Run one scenario with extraction patched to ``extractor``."""
+    with fake_backends(extractor):
+        if wants_extractor:
+            return await scenario(size, extractor)
+        return await scenario(size)
+
+
+async def run_suite(options) -> dict:
+    """Run every scenario ``repeat`` times keeping the best value per metric,
+    then once more under tracemalloc for allocations."""
+    profile = LatencyProfile(
+        median=options.extract_median,
+        sigma=options.extract_sigma,
+        failure_rate=options.failure_rate,
+    )
+    sizes = {
+        "runs": options.runs,
+        "tracks": options.tracks,
+        "entries": options.entries,
+        "events": options.events,
+    }
+    results: dict[str, float] = {}
+    for name, (scenario, size_name, wants_extractor) in SCENARIOS.items():
+        size = sizes[size_name]
+        for _ in range(options.repeat):
+            extractor = FakeExtractor(profile=profile, seed=options.seed)
+            sample = await run_scenario(scenario, size, extractor, wants_extractor)
+            for metric, value in sample.items():
+                results[metric] = better(metric, results.get(metric, math.nan), value)
+
+        extractor = FakeExtractor(profile=profile, seed=options.seed)
+        tracemalloc.start()
+        try:
+            await run_scenario(scenario, size, extractor, wants_extractor)
+            results[f"{name}_peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+        finally:
+            tracemalloc.stop()
+    return results
+
+
+def higher_is_better(metric: str) -> bool:
+    """Return True for throughput metrics."""
+    return metric.endswith("_per_s")
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float,
+    throughput_tolerance: float | None = None,
+) -> list[str]:
+    """Return a description of every metric that regressed past tolerance.
+
+    Throughput metrics swing by half between identical runs, so they are
+    held to ``throughput_tolerance`` when given instead.
+    """
+    regressions = []
+    for metric, expected in baseline.items():
+        actual = results.get(metric)
+        if actual is None or math.isnan(actual) or not expected:
+            continue
+        if metric in ("tracks_played", "next_ready_player_extractions"):
+            continue
+
+        change = (actual - expected) / expected
+        allowed = tolerance
+        if higher_is_better(metric) and throughput_tolerance is not None:
+            allowed = throughput_tolerance
+        worse = -change if higher_is_better(metric) else change
+        if worse > allowed:
+            regressions.append(
+                f"{metric}: {expected:.2f} -> {actual:.2f} ({change:+.0%})"
+            )
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--tracks", type=int, default=30)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--extract-median", type=float, default=0.02)
+    parser.add_argument("--extract-sigma", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--throughput-tolerance", type=float, default=0.6)
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Run the suite, print results, and compare or update the baseline."""
+    options = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    logging.disable(logging.INFO)
+    results = asyncio.run(run_suite(options))
+    for metric, value in results.items():
+        print(f"{metric:>40}: {value:,.2f}")
+
+    if options.update_baseline:
+        with open(options.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"Baseline written to {options.baseline}")
+        return 0
+
+    if not os.path.exists(options.baseline):
+        print("No baseline yet; run with --update-baseline to record one.")
+        return 0
+
+    with open(options.baseline, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare(
+        results, baseline, options.tolerance, options.throughput_tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {options.tolerance:.0%} of the baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
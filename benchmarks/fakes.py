@@ -0,0 +1,400 @@
+"""Offline stand-ins for yt-dlp, FFmpeg, and Discord voice used by benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+import discord  # pylint: disable=wrong-import-position
+
+
+@dataclass
+class LatencyProfile:
+    """Log-normal latency with a median, a spread, and a failure rate."""
+
+    median: float = 0.05
+    sigma: float = 0.5
+    failure_rate: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        return self.median * rng.lognormvariate(0, self.sigma)
+
+
+@dataclass
+class FakeExtractor:
+    """Async replacement for ``extract_info_async`` with a latency profile."""
+
+    profile: LatencyProfile = field(default_factory=LatencyProfile)
+    seed: int = 0
+    playlist_size: int = 50
+    calls: int = 0
+
+    def __post_init__(self):
+        self.rng = random.Random(self.seed)
+
+    @staticmethod
+    def video(index: int | str) -> dict:
+        """Return a single-video extraction result."""
+        return {
+            "id": f"video{index}",
+            "title": f"Track {index}",
+            "url": f"https://stream.invalid/{index}",
+            "webpage_url": f"https://www.youtube.com/watch?v=video{index}",
+            "duration": 180,
+            "http_headers": {"User-Agent": "bench"},
+            "thumbnails": [
+                {"url": f"https://img.invalid/{index}/{size}"} for size in range(8)
+            ],
+        }
+
+    async def __call__(self, url: str, *, priority: int = 0, **overrides) -> dict:
+        del priority
+        self.calls += 1
+        await asyncio.sleep(self.profile.sample(self.rng))
+        if self.rng.random() < self.profile.failure_rate:
+            raise RuntimeError(f"fake extraction failure for {url}")
+
+        if overrides.get("extract_flat"):
+            if "list=" not in url:
+                return self.video(url.rsplit("=", 1)[-1])
+            return {"entries": self.playlist(self.playlist_size)}
+        return self.video(url.rsplit("=", 1)[-1])
+
+    @staticmethod
+    def playlist(size: int) -> list[dict]:
+        """Return flat playlist entries like ``extract_flat="in_playlist"``."""
+        return [
+            {
+                "id": f"video{index}",
+                "title": f"Track {index}",
+                "url": f"https://www.youtube.com/watch?v=video{index}",
+            }
+            for index in range(size)
+        ]
+
+
+class FakeSource:
+    """Stand-in for ``discord.FFmpegPCMAudio`` that never spawns a process."""
+
+    def __init__(self, stream_url: str, *args, **kwargs):
+        del args, kwargs
+        self.stream_url = stream_url
+
+    def cleanup(self):
+        """Match the audio source interface."""
+
+
+def fake_ffmpeg_source(stream_url: str, http_headers: dict | None = None) -> FakeSource:
+    """Replacement for ``create_ffmpeg_source``."""
+    del http_headers
+    return FakeSource(stream_url)
+
+
+FRAME_SECONDS = 0.02
+SILENT_FRAME = bytes(3840)
+
+
+class FakeYoutubeDL:
+    """Blocking ``yt_dlp.YoutubeDL`` stand-in that sleeps in the worker thread.
+
+    Patched in place of ``youtube_dl.YoutubeDL`` so the real scheduler,
+    breaker, and caches in ``music_audio`` all take part.
+    """
+
+    profile = LatencyProfile()
+    playlist_size = 25
+    rng = random.Random(0)
+    lock = threading.Lock()
+    calls = 0
+
+    def __init__(self, options: dict):
+        self.options = options
+
+    @classmethod
+    def configure(cls, profile: LatencyProfile, *, seed: int = 0):
+        """Set the latency profile shared by every instance."""
+        cls.profile = profile
+        cls.rng = random.Random(seed)
+        cls.calls = 0
+
+    def extract_info(self, url: str, download: bool = False) -> dict:
+        """Sleep for one sampled latency, then return fake metadata."""
+        del download
+        with self.lock:
+            FakeYoutubeDL.calls += 1
+            latency = self.profile.sample(self.rng)
+            failed = self.rng.random() < self.profile.failure_rate
+        time.sleep(latency)
+        if failed:
+            raise RuntimeError(f"fake extraction failure for {url}")
+        if "list=" in url:
+            return {"entries": FakeExtractor.playlist(self.playlist_size)}
+        return FakeExtractor.video(url.rsplit("=", 1)[-1])
+
+
+class FrameSource:
+    """PCM source that yields silent 20 ms frames for a fixed duration."""
+
+    def __init__(self, stream_url: str, seconds: float):
+        self.stream_url = stream_url
+        self.remaining = max(1, round(seconds / FRAME_SECONDS))
+
+    def read(self) -> bytes:
+        """Return the next frame, or ``b""`` once the track has ended."""
+        if self.remaining <= 0:
+            return b""
+        self.remaining -= 1
+        return SILENT_FRAME
+
+    @staticmethod
+    def is_opus() -> bool:
+        """Frames are raw PCM, like FFmpegPCMAudio."""
+        return False
+
+    def cleanup(self):
+        """End the track."""
+        self.remaining = 0
+
+
+def frame_source_factory(seconds: float):
+    """Return a ``create_ffmpeg_source`` replacement producing ``FrameSource``."""
+
+    def create(stream_url: str, http_headers: dict | None = None) -> FrameSource:
+        del http_headers
+        return FrameSource(stream_url, seconds)
+
+    return create
+
+
+class FakeVoiceChannel(discord.VoiceChannel):
+    """Voice channel with a mutable member list."""
+
+    def __init__(self, guild, members=()):
+        super().__init__()
+        self.guild = guild
+        self.members = list(members)
+
+
+class FakeVoiceClient:
+    """Voice client that 'plays' each track for a fixed time on a thread.
+
+    Like discord.py's audio player, the ``after`` callback runs on a
+    non-loop thread once the track finishes, which is what drives
+    ``play_next()`` through ``run_coroutine_threadsafe``.
+    """
+
+    def __init__(self, channel, *, track_seconds: float = 0.02):
+        self.channel = channel
+        self.track_seconds = track_seconds
+        self.playing = False
+        self.play_times: list[float] = []
+        self.finish_times: list[float] = []
+        self.disconnects = 0
+        self.guild = None
+        self.timer: threading.Timer | None = None
+
+    def is_playing(self) -> bool:
+        """Return True while a track is 'playing'."""
+        return self.playing
+
+    def is_connected(self) -> bool:
+        """Return True until disconnected."""
+        return self.guild is not None and self.guild.voice_client is self
+
+    def play(self, source, *, after=None):
+        """Start a track and schedule its completion on a worker thread."""
+        del source
+        self.playing = True
+        self.play_times.append(time.perf_counter())
+
+        def finish():
+            self.playing = False
+            self.finish_times.append(time.perf_counter())
+            if after is not None:
+                after(None)
+
+        self.timer = threading.Timer(self.track_seconds, finish)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def stop(self):
+        """Stop the current track without firing its ``after`` callback."""
+        if self.timer is not None:
+            self.timer.cancel()
+        self.playing = False
+
+    async def move_to(self, channel):
+        """Switch to another voice channel."""
+        self.channel = channel
+
+    async def disconnect(self, *, force: bool = False):
+        """Detach from the guild."""
+        del force
+        self.disconnects += 1
+        if self.guild is not None:
+            self.guild.voice_client = None
+
+
+class FramedVoiceClient(FakeVoiceClient):
+    """Voice client whose player thread reads one frame every 20 ms.
+
+    Mirrors discord.py's ``AudioPlayer``: one thread per playing guild that
+    paces reads against a running deadline, and calls ``after`` when the
+    source runs dry or ``stop()`` is called. Frames read after their
+    deadline has already passed are counted in ``late_frames``.
+    """
+
+    def __init__(self, channel, *, track_seconds: float = 0.02):
+        super().__init__(channel, track_seconds=track_seconds)
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.frames = 0
+        self.late_frames = 0
+        self.closed = False
+
+    def play(self, source, *, after=None):
+        """Start a player thread for ``source``."""
+        self.playing = True
+        self.play_times.append(time.perf_counter())
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run,
+            args=(source, after, self.stop_event),
+            name=f"fake-voice-{self.guild.id if self.guild else 0}",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def run(self, source, after, stop_event: threading.Event):
+        """Read frames in real time until the source ends or is stopped."""
+        read = source.read if hasattr(source, "read") else source.original.read
+        deadline = time.perf_counter()
+        while not stop_event.is_set() and read():
+            self.frames += 1
+            deadline += FRAME_SECONDS
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                stop_event.wait(delay)
+            else:
+                self.late_frames += 1
+
+        self.playing = False
+        self.finish_times.append(time.perf_counter())
+        if after is not None and not self.closed:
+            after(None)
+
+    def stop(self):
+        """Stop the current track; ``after`` still runs, as in discord.py."""
+        self.stop_event.set()
+
+    async def disconnect(self, *, force: bool = False):
+        """Stop the player thread and detach from the guild."""
+        self.stop_event.set()
+        await super().disconnect(force=force)
+
+    def close(self):
+        """Stop playback without letting ``after`` queue more work."""
+        self.closed = True
+        self.stop_event.set()
+
+
+class FakeClient:
+    """Just enough of ``discord.Client`` for ``MusicService``."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.user = SimpleNamespace(id=1, bot=True)
+        self.guilds: dict[int, SimpleNamespace] = {}
+        self.voice_clients: list[FakeVoiceClient] = []
+
+    def get_guild(self, guild_id: int):
+        """Return a fake guild."""
+        return self.guilds.get(guild_id)
+
+    @staticmethod
+    def get_channel(channel_id: int):
+        """Text channels are not resolved in benchmarks."""
+        del channel_id
+
+    def add_guild(self, guild_id: int, *, track_seconds: float = 0.02):
+        """Create a guild with the bot and one listener in a voice channel."""
+        guild = SimpleNamespace(id=guild_id, voice_client=None)
+        listener = SimpleNamespace(id=guild_id * 10, bot=False)
+        channel = FakeVoiceChannel(guild, [self.user, listener])
+        voice_client = FakeVoiceClient(channel, track_seconds=track_seconds)
+        voice_client.guild = guild
+        guild.voice_client = voice_client
+        self.guilds[guild_id] = guild
+        self.voice_clients.append(voice_client)
+        return guild
+
+
+class FakeTextChannel:
+    """Text channel that records sent messages."""
+
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.messages: list[str] = []
+
+    async def send(self, message: str):
+        """Record a message."""
+        self.messages.append(message)
+
+
+class FakeResponse:
+    """Interaction response that records whether it was used."""
+
+    def __init__(self):
+        self.done = False
+        self.messages: list[str] = []
+
+    def is_done(self) -> bool:
+        """Return True once deferred or answered."""
+        return self.done
+
+    async def defer(self, *, ephemeral: bool = False):
+        """Mark the interaction deferred."""
+        del ephemeral
+        self.done = True
+
+    async def send_message(self, message: str, *, ephemeral: bool = False):
+        """Record a direct response."""
+        del ephemeral
+        self.done = True
+        self.messages.append(message)
+
+
+class FakeFollowup:
+    """Interaction followup that records messages."""
+
+    def __init__(self):
+        self.messages: list[str] = []
+
+    async def send(self, message: str, *, ephemeral: bool = False):
+        """Record a followup."""
+        del ephemeral
+        self.messages.append(message)
+
+
+def make_interaction(guild, user_id: int, *, channel_id: int | None = None):
+    """Build a slash-command interaction for one user in one guild."""
+    voice_client = guild.voice_client
+    voice_channel = voice_client.channel if voice_client is not None else None
+    return SimpleNamespace(
+        guild=guild,
+        channel=FakeTextChannel(channel_id or guild.id),
+        user=SimpleNamespace(
+            id=user_id, bot=False, voice=SimpleNamespace(channel=voice_channel)
+        ),
+        response=FakeResponse(),
+        followup=FakeFollowup(),
+    )
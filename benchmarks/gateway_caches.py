@@ -0,0 +1,266 @@
+"""Measure what discord.py's own caches cost under each client profile.
+
+The load harness's fake gateway bypasses discord.py's connection state, so
+it cannot show what the client itself keeps in memory. This feeds synthetic
+gateway payloads straight into a real client's parsers instead: guilds with
+channels, roles, emojis and voice members, then a stream of messages.
+Needs the real discord.py (the test stubs have no caches to fill):
+
+    python -m benchmarks.gateway_caches --client-profile default --guilds 5000
+    python -m benchmarks.gateway_caches --client-profile lean --guilds 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import itertools
+import sys
+from unittest.mock import patch
+
+import discord
+
+from music_client import CLIENT_PROFILES, client_options
+from music_memory import read_rss_bytes
+
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+
+
+def user_payload(user_id: int, *, bot: bool = False) -> dict:
+    """Return a gateway user object."""
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id}",
+        "global_name": None,
+        "discriminator": "0",
+        "avatar": None,
+        "bot": bot,
+    }
+
+
+def member_payload(user_id: int, *, bot: bool = False) -> dict:
+    """Return a gateway guild member object."""
+    return {
+        "user": user_payload(user_id, bot=bot),
+        "roles": [],
+        "joined_at": TIMESTAMP,
+        "deaf": False,
+        "mute": False,
+        "flags": 0,
+    }
+
+
+def guild_payload(  # pylint: disable=too-many-arguments
+    guild_id: int,
+    *,
+    bot_user_id: int,
+    text_channels: int,
+    roles: int,
+    emojis: int,
+    voice_members: int,
+    member_count: int,
+) -> dict:
+    """Return a GUILD_CREATE payload shaped like a non-privileged bot's.
+
+    Without the members intent Discord only sends the bot itself and the
+    members currently in voice, however large the guild is.
+    """
+    base = guild_id * 100_000
+    voice_channel_id = base + 1
+    listener_ids = [base + 50_000 + index for index in range(voice_members)]
+    channels = [
+        {
+            "id": str(voice_channel_id),
+            "type": 2,
+            "name": "Music",
+            "position": 0,
+            "permission_overwrites": [],
+            "bitrate": 64000,
+            "user_limit": 0,
+        }
+    ] + [
+        {
+            "id": str(base + 10 + index),
+            "type": 0,
+            "name": f"text-{index}",
+            "position": index + 1,
+            "permission_overwrites": [],
+            "topic": "Synthetic text channel",
+            "nsfw": False,
+        }
+        for index in range(text_channels)
+    ]
+    return {
+        "id": str(guild_id),
+        "name": f"guild-{guild_id}",
+        "owner_id": str(listener_ids[0] if listener_ids else bot_user_id),
+        "icon": None,
+        "features": [],
+        "large": member_count > 250,
+        "member_count": member_count,
+        "roles": [
+            {
+                "id": str(guild_id if index == 0 else base + 1000 + index),
+                "name": "@everyone" if index == 0 else f"role-{index}",
+                "permissions": "0",
+                "position": index,
+                "color": 0,
+                "hoist": False,
+                "managed": False,
+                "mentionable": False,
+            }
+            for index in range(roles)
+        ],
+        "emojis": [
+            {
+                "id": str(base + 2000 + index),
+                "name": f"emoji_{index}",
+                "roles": [],
+                "require_colons": True,
+                "managed": False,
+                "animated": False,
+                "available": True,
+            }
+            for index in range(emojis)
+        ],
+        "channels": channels,
+        "threads": [],
+        "stickers": [],
+        "stage_instances": [],
+        "guild_scheduled_events": [],
+        "presences": [],
+        "members": [member_payload(bot_user_id, bot=True)]
+        + [member_payload(user_id) for user_id in listener_ids],
+        "voice_states": [
+            {
+                "user_id": str(user_id),
+                "channel_id": str(voice_channel_id),
+                "session_id": f"session-{user_id}",
+                "deaf": False,
+                "mute": False,
+                "self_deaf": False,
+                "self_mute": False,
+                "self_video": False,
+                "suppress": False,
+            }
+            for user_id in listener_ids
+        ],
+    }
+
+
+def message_payload(message_id: int, guild_id: int, *, content: str) -> dict:
+    """Return a MESSAGE_CREATE payload in the guild's first text channel."""
+    author_id = guild_id * 100_000 + 90_000 + message_id % 500
+    member = member_payload(author_id)
+    del member["user"]
+    return {
+        "id": str(message_id),
+        "channel_id": str(guild_id * 100_000 + 10),
+        "guild_id": str(guild_id),
+        "author": user_payload(author_id),
+        "member": member,
+        "content": content,
+        "timestamp": TIMESTAMP,
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+        "flags": 0,
+    }
+
+
+def fill_gateway_caches(
+    client, *, guilds: int, messages: int, bot_user_id: int = 1
+) -> dict | None:
+    """Feed ``guilds`` GUILD_CREATEs and ``messages`` MESSAGE_CREATEs to ``client``.
+
+    Messages are only sent when the client's intents subscribe to them, and
+    carry content only with the message content intent, as on the real
+    gateway. Returns the cache sizes and the RSS growth, or None when
+    ``client`` is not a real discord.py client.
+    """
+    state = getattr(client, "_connection", None)  # pylint: disable=protected-access
+    if state is None or not hasattr(state, "_add_guild_from_data"):
+        return None
+
+    gc.collect()
+    before = read_rss_bytes() or 0
+    with patch.object(state, "dispatch", lambda *args, **kwargs: None):
+        sent = feed_payloads(state, client.intents, guilds, messages, bot_user_id)
+    gc.collect()
+    after = read_rss_bytes() or 0
+    return {
+        "guilds": len(client.guilds),
+        "members": sum(len(guild.members) for guild in client.guilds),
+        "emojis": len(client.emojis),
+        "messages_sent": sent,
+        "messages_cached": len(client.cached_messages),
+        "rss_mib": (after - before) / 1048576,
+    }
+
+
+def feed_payloads(state, intents, guilds: int, messages: int, bot_user_id: int) -> int:
+    """Parse the synthetic payloads and return how many messages were sent."""
+    # pylint: disable=protected-access
+    for guild_id in range(1, guilds + 1):
+        state._add_guild_from_data(
+            guild_payload(
+                guild_id,
+                bot_user_id=bot_user_id,
+                text_channels=10,
+                roles=20,
+                emojis=30,
+                voice_members=3,
+                member_count=2000,
+            )
+        )
+    if not intents.guild_messages or not guilds:
+        return 0
+    content = "x" * 120 if intents.message_content else ""
+    message_ids = itertools.count(10**9)
+    for index in range(messages):
+        state.parse_message_create(
+            message_payload(next(message_ids), 1 + index % guilds, content=content)
+        )
+    return messages
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--client-profile", choices=CLIENT_PROFILES, default="lean")
+    parser.add_argument("--guilds", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=20000)
+    return parser.parse_args(argv)
+
+
+async def measure(options) -> dict | None:
+    """Build a client for the profile and fill its caches."""
+    client = discord.Client(**client_options(options.client_profile))
+    return fill_gateway_caches(client, guilds=options.guilds, messages=options.messages)
+
+
+def main(argv=None) -> int:
+    """Print the cache sizes and RSS growth for one profile."""
+    options = parse_args(argv)
+    caches = asyncio.run(measure(options))
+    if caches is None:
+        print("The Discord test stubs are loaded; install discord.py to measure.")
+        return 1
+    print(
+        f"{options.client_profile}: {caches['guilds']} guilds, "
+        f"{caches['members']} members, {caches['emojis']} emojis, "
+        f"{caches['messages_cached']}/{caches['messages_sent']} messages cached, "
+        f"+{caches['rss_mib']:.1f} MiB RSS"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,571 @@
+"""Ramp thousands of synthetic guilds through the real ``main.py`` handlers.
+
+Run from the repository root:
+
+    python -m benchmarks.load_harness
+    python -m benchmarks.load_harness --ramp 250,1000,2500,5000 --stage-seconds 20
+
+``main.py`` is imported offline with the Discord stubs from ``tests/``; a
+fake gateway then plays the part of ``discord.Client``. Guilds, listeners,
+and voice-state events are synthetic, yt-dlp is replaced by a blocking fake
+that runs in the real extraction executor, and every playing guild has a
+voice client whose player thread consumes 20 ms PCM frames in real time.
+Each stage reports command latency, event-loop lag, late audio frames,
+threads, CPU, and RSS, and the ramp stops once latency collapses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from benchmarks.bench_service import percentile
+from benchmarks.fakes import (
+    FakeFollowup,
+    FakeResponse,
+    FakeTextChannel,
+    FakeVoiceChannel,
+    FakeYoutubeDL,
+    FramedVoiceClient,
+    LatencyProfile,
+    frame_source_factory,
+)
+from music_memory import read_rss_bytes
+
+import discord  # isort: skip  # pylint: disable=wrong-import-order
+
+BOT_USER_ID = 1
+BUSY_PREFIX = "The bot is busy right now"
+
+
+def import_bot():
+    """Import ``main.py`` without a token, network, or report files."""
+    if "main" in sys.modules:
+        return sys.modules["main"]
+
+    environment = {
+        "DISCORD_TOKEN": "offline-load-test",
+        "LOOP_REPORT_FILE": "",
+        "METRICS_PORT": "0",
+        "WARMUP_TOP_K": "0",
+    }
+    with patch.dict(os.environ, environment), patch.object(
+        discord.Client, "run", lambda self, token: None
+    ):
+        import main as bot_main  # pylint: disable=import-outside-toplevel
+    return bot_main
+
+
+def command_callback(command):
+    """Return the coroutine behind a slash command, stubbed or real."""
+    return getattr(command, "callback", command)
+
+
+class GatewayVoiceChannel(FakeVoiceChannel):
+    """Voice channel whose ``connect()`` goes through the fake gateway."""
+
+    def __init__(self, gateway: FakeGateway, guild):
+        super().__init__(guild)
+        self.gateway = gateway
+
+    async def connect(self):
+        """Join the channel with a real-time voice client."""
+        return await self.gateway.connect_voice(self)
+
+
+class GatewayVoiceClient(FramedVoiceClient):
+    """Framed voice client that reports its own disconnect to the gateway."""
+
+    def __init__(self, gateway: FakeGateway, channel, *, track_seconds: float):
+        super().__init__(channel, track_seconds=track_seconds)
+        self.gateway = gateway
+
+    async def move_to(self, channel):
+        """Move the bot member between channels."""
+        self.gateway.move_member(self.gateway.user, self.channel, channel)
+        await super().move_to(channel)
+
+    async def disconnect(self, *, force: bool = False):
+        """Leave voice and deliver the bot's own voice-state update."""
+        await super().disconnect(force=force)
+        self.gateway.spawn(
+            self.gateway.voice_state_update(self.gateway.user, self.channel, None)
+        )
+
+
+@dataclass
+class Stage:  # pylint: disable=too-many-instance-attributes
+    """Measurements collected while one guild count was being served."""
+
+    guilds: int
+    streams: int = 0
+    commands: int = 0
+    failed_commands: int = 0
+    busy_refusals: int = 0
+    voice_events: int = 0
+    command_p50_ms: float = 0.0
+    command_p95_ms: float = 0.0
+    command_p99_ms: float = 0.0
+    play_p95_ms: float = 0.0
+    loop_lag_p50_ms: float = 0.0
+    loop_lag_p99_ms: float = 0.0
+    loop_lag_max_ms: float = 0.0
+    late_frame_pct: float = 0.0
+    threads: int = 0
+    cpu_pct: float = 0.0
+    rss_mib: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=dict, repr=False)
+    lags: list[float] = field(default_factory=list, repr=False)
+
+    def summarize(self):
+        """Fill in the percentile fields from the raw samples."""
+        every = [sample for samples in self.latencies.values() for sample in samples]
+        self.commands = len(every)
+        self.command_p50_ms = percentile(every, 0.5) * 1000
+        self.command_p95_ms = percentile(every, 0.95) * 1000
+        self.command_p99_ms = percentile(every, 0.99) * 1000
+        self.play_p95_ms = percentile(self.latencies.get("/play", []), 0.95) * 1000
+        self.loop_lag_p50_ms = percentile(self.lags, 0.5) * 1000
+        self.loop_lag_p99_ms = percentile(self.lags, 0.99) * 1000
+        self.loop_lag_max_ms = max(self.lags, default=0.0) * 1000
+
+    def as_row(self) -> dict:
+        """Return the reported fields without raw samples."""
+        row = asdict(self)
+        del row["latencies"], row["lags"]
+        return row
+
+
+class FakeGateway:  # pylint: disable=too-many-instance-attributes
+    """Stands in for ``discord.Client`` and the gateway that feeds it.
+
+    It owns the synthetic guilds, creates voice clients when the bot joins
+    a channel, and delivers voice-state updates to ``main.py`` the way
+    discord.py's dispatcher would.
+    """
+
+    def __init__(self, loop, bot, *, track_seconds: float):
+        self.loop = loop
+        self.bot = bot
+        self.track_seconds = track_seconds
+        self.user = SimpleNamespace(id=BOT_USER_ID, bot=True, name="load-bot")
+        self.guilds: dict[int, SimpleNamespace] = {}
+        self.text_channels: dict[int, FakeTextChannel] = {}
+        self.created_voice_clients: list[GatewayVoiceClient] = []
+        self.tasks: set[asyncio.Task] = set()
+        self.voice_events = 0
+        self.next_member_id = 10**6
+
+    @property
+    def voice_clients(self) -> list[GatewayVoiceClient]:
+        """Connected voice clients, like ``discord.Client.voice_clients``."""
+        return [
+            guild.voice_client
+            for guild in self.guilds.values()
+            if guild.voice_client is not None
+        ]
+
+    def get_guild(self, guild_id: int):
+        """Return a synthetic guild."""
+        return self.guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int):
+        """Return a synthetic text channel."""
+        return self.text_channels.get(channel_id)
+
+    def spawn(self, coroutine) -> asyncio.Task:
+        """Run a coroutine as a tracked background task."""
+        task = self.loop.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def add_guild(self, guild_id: int):
+        """Create a guild with one voice and one text channel."""
+        guild = SimpleNamespace(id=guild_id, voice_client=None)
+        guild.voice_channel = GatewayVoiceChannel(self, guild)
+        guild.text_channel = FakeTextChannel(guild_id)
+        self.text_channels[guild_id] = guild.text_channel
+        self.guilds[guild_id] = guild
+        return guild
+
+    def new_member(self, guild):
+        """Create a human member of a guild who is not in voice yet."""
+        self.next_member_id += 1
+        return SimpleNamespace(
+            id=self.next_member_id,
+            bot=False,
+            guild=guild,
+            voice=SimpleNamespace(channel=None),
+        )
+
+    @staticmethod
+    def move_member(member, before, after):
+        """Update channel member lists for a voice move."""
+        if before is not None and member in before.members:
+            before.members.remove(member)
+        if after is not None and member not in after.members:
+            after.members.append(member)
+
+    async def voice_state_update(self, member, before, after):
+        """Apply a voice move and dispatch ``on_voice_state_update``."""
+        self.move_member(member, before, after)
+        if hasattr(member, "voice"):
+            member.voice.channel = after
+        self.voice_events += 1
+        await self.bot.on_voice_state_update(
+            member, SimpleNamespace(channel=before), SimpleNamespace(channel=after)
+        )
+
+    async def connect_voice(self, channel) -> GatewayVoiceClient:
+        """Connect the bot to a voice channel."""
+        guild = channel.guild
+        voice_client = GatewayVoiceClient(
+            self, channel, track_seconds=self.track_seconds
+        )
+        voice_client.guild = guild
+        guild.voice_client = voice_client
+        self.created_voice_clients.append(voice_client)
+        self.move_member(self.user, None, channel)
+        return voice_client
+
+    @staticmethod
+    def interaction(guild, member):
+        """Build a slash-command interaction from a member."""
+        return SimpleNamespace(
+            guild=guild,
+            channel=guild.text_channel,
+            user=member,
+            response=FakeResponse(),
+            followup=FakeFollowup(),
+        )
+
+    def frame_totals(self) -> tuple[int, int]:
+        """Return (frames, late frames) read by every voice client so far."""
+        frames = late = 0
+        for voice_client in self.created_voice_clients:
+            frames += voice_client.frames
+            late += voice_client.late_frames
+        return frames, late
+
+    async def close(self):
+        """Stop every player thread and cancel outstanding tasks.
+
+        Guilds are detached first so an in-flight ``play_next`` finds no
+        voice client, and player threads are joined off the loop because
+        their ``after`` callbacks wait on it.
+        """
+        for guild in self.guilds.values():
+            guild.voice_client = None
+        for voice_client in self.created_voice_clients:
+            voice_client.close()
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await asyncio.to_thread(self.join_players, 5.0)
+
+    def join_players(self, timeout: float):
+        """Wait up to ``timeout`` seconds in total for player threads to exit."""
+        deadline = time.monotonic() + timeout
+        for voice_client in self.created_voice_clients:
+            if voice_client.thread is not None:
+                voice_client.thread.join(max(0.0, deadline - time.monotonic()))
+
+
+class LoadHarness:  # pylint: disable=too-many-instance-attributes
+    """Drive guild sessions, commands, and voice churn through ``main.py``."""
+
+    def __init__(self, bot, gateway: FakeGateway, options):
+        self.bot = bot
+        self.gateway = gateway
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.listeners: dict[int, list] = {}
+        self.stage: Stage | None = None
+
+    def video_url(self) -> str:
+        """Pick a video, favouring popular ones so the cache gets hits."""
+        index = int(self.rng.paretovariate(1.2)) % self.options.catalog
+        return f"https://www.youtube.com/watch?v=load{index}"
+
+    def add_url(self) -> str:
+        """Pick a video or, sometimes, a playlist."""
+        if self.rng.random() < self.options.playlist_share:
+            return f"https://www.youtube.com/playlist?list=PL{self.rng.randrange(1000)}"
+        return self.video_url()
+
+    async def run_command(self, name: str, command, guild, member, *args):
+        """Invoke one handler and record its latency in the current stage."""
+        stage = self.stage
+        interaction = self.gateway.interaction(guild, member)
+        started = time.perf_counter()
+        try:
+            await command_callback(command)(interaction, *args)
+        except Exception:  # pylint: disable=broad-except
+            stage.failed_commands += 1
+            return
+        if any(
+            message.startswith(BUSY_PREFIX) for message in interaction.response.messages
+        ):
+            stage.busy_refusals += 1
+            return
+        stage.latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+    def start_session(self, guild_id: int):
+        """Create a guild whose first listener joins voice and runs /play."""
+        guild = self.gateway.add_guild(guild_id)
+        listener = self.gateway.new_member(guild)
+        self.listeners[guild_id] = [listener]
+        self.gateway.spawn(self.join_and_play(guild, listener))
+
+    async def join_and_play(self, guild, listener):
+        """Deliver the listener's voice join, then run /play."""
+        await self.gateway.voice_state_update(listener, None, guild.voice_channel)
+        await self.run_command(
+            "/play", self.bot.play, guild, listener, self.video_url()
+        )
+
+    def random_command(self, guild_id: int):
+        """Return (name, command, args) for a weighted random command."""
+        guild = self.gateway.guilds[guild_id]
+        roll = self.rng.random()
+        if guild.voice_client is None or roll < 0.15:
+            return "/play", self.bot.play, (self.video_url(),)
+        if roll < 0.55:
+            return "/add", self.bot.add, (self.add_url(),)
+        if roll < 0.85:
+            return "/queue", self.bot.queue_list, ()
+        return "/skip", self.bot.skip, ()
+
+    def issue_command(self, guild_id: int):
+        """Start one command in a random active guild."""
+        guild = self.gateway.guilds[guild_id]
+        name, command, args = self.random_command(guild_id)
+        member = self.listeners[guild_id][0]
+        self.gateway.spawn(self.run_command(name, command, guild, member, *args))
+
+    def issue_voice_event(self, guild_id: int):
+        """A second listener joins, or an extra listener leaves."""
+        guild = self.gateway.guilds[guild_id]
+        listeners = self.listeners[guild_id]
+        if len(listeners) > 1 and self.rng.random() < 0.5:
+            member = listeners.pop()
+            self.gateway.spawn(
+                self.gateway.voice_state_update(member, guild.voice_channel, None)
+            )
+            return
+
+        member = self.gateway.new_member(guild)
+        listeners.append(member)
+        self.gateway.spawn(
+            self.gateway.voice_state_update(member, None, guild.voice_channel)
+        )
+
+    async def probe_loop_lag(self, stop_event: asyncio.Event):
+        """Record how late a short sleep wakes up, into the current stage."""
+        interval = 0.05
+        while not stop_event.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.stage.lags.append(max(0.0, time.perf_counter() - started - interval))
+
+    async def run_stage(self, guild_count: int) -> Stage:
+        """Grow to ``guild_count`` guilds and measure one stage of load."""
+        stage = Stage(guilds=guild_count)
+        self.stage = stage
+        frames_before, late_before = self.gateway.frame_totals()
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+
+        tick = 0.05
+        arrivals = list(range(len(self.gateway.guilds) + 1, guild_count + 1))
+        arrivals_per_tick = max(
+            1, math.ceil(len(arrivals) / (self.options.stage_seconds / 2 / tick))
+        )
+        command_rate = self.options.commands_per_guild_minute / 60 * tick
+        event_rate = self.options.voice_events_per_guild_minute / 60 * tick
+        command_budget = event_budget = 0.0
+        deadline = started + self.options.stage_seconds
+        while time.perf_counter() < deadline:
+            for guild_id in arrivals[:arrivals_per_tick]:
+                self.start_session(guild_id)
+            del arrivals[:arrivals_per_tick]
+            active = len(self.gateway.guilds)
+            command_budget += active * command_rate
+            event_budget += active * event_rate
+            while command_budget >= 1:
+                command_budget -= 1
+                self.issue_command(self.rng.randint(1, active))
+            while event_budget >= 1:
+                event_budget -= 1
+                self.issue_voice_event(self.rng.randint(1, active))
+                stage.voice_events += 1
+            await asyncio.sleep(tick)
+
+        elapsed = time.perf_counter() - started
+        frames, late = self.gateway.frame_totals()
+        rss = read_rss_bytes()
+        stage.summarize()
+        stage.streams = sum(
+            1
+            for voice_client in self.gateway.voice_clients
+            if voice_client.is_playing()
+        )
+        stage.late_frame_pct = (
+            100 * (late - late_before) / (frames - frames_before)
+            if frames > frames_before
+            else 0.0
+        )
+        stage.threads = threading.active_count()
+        stage.cpu_pct = 100 * (time.process_time() - cpu_before) / elapsed
+        stage.rss_mib = rss / 1048576 if rss else 0.0
+        return stage
+
+    def collapsed(self, stage: Stage) -> bool:
+        """Return True once a stage is past the latency budget."""
+        return (
+            stage.command_p95_ms > self.options.max_p95_ms
+            or stage.loop_lag_p99_ms > self.options.max_lag_ms
+        )
+
+    async def run(self) -> list[Stage]:
+        """Run every ramp stage until latency collapses."""
+        stop_event = asyncio.Event()
+        self.stage = Stage(guilds=0)
+        probe = asyncio.create_task(self.probe_loop_lag(stop_event))
+        self.bot.loop_monitor.start()
+        stages = []
+        try:
+            for guild_count in self.options.ramp:
+                stage = await self.run_stage(guild_count)
+                stages.append(stage)
+                print_row(stage)
+                if self.collapsed(stage):
+                    print(
+                        f"Latency collapsed at {guild_count} guilds "
+                        f"(p95 budget {self.options.max_p95_ms:.0f} ms, "
+                        f"loop lag budget {self.options.max_lag_ms:.0f} ms)."
+                    )
+                    break
+        finally:
+            stop_event.set()
+            await probe
+            self.bot.loop_monitor.stop()
+            await self.gateway.close()
+        return stages
+
+
+COLUMNS = (
+    ("guilds", "guilds", "{:>7}"),
+    ("streams", "streams", "{:>7}"),
+    ("commands", "cmds", "{:>6}"),
+    ("busy_refusals", "busy", "{:>5}"),
+    ("command_p50_ms", "p50ms", "{:>8.1f}"),
+    ("command_p95_ms", "p95ms", "{:>8.1f}"),
+    ("command_p99_ms", "p99ms", "{:>8.1f}"),
+    ("loop_lag_p99_ms", "lag99", "{:>7.1f}"),
+    ("loop_lag_max_ms", "lagmax", "{:>7.1f}"),
+    ("late_frame_pct", "late%", "{:>6.2f}"),
+    ("threads", "threads", "{:>7}"),
+    ("cpu_pct", "cpu%", "{:>6.1f}"),
+    ("rss_mib", "rssMiB", "{:>7.1f}"),
+)
+
+
+def print_header():
+    """Print the column headings of the stage table."""
+    print(" ".join(f"{label:>{len(fmt.format(0))}}" for _, label, fmt in COLUMNS))
+
+
+def print_row(stage: Stage):
+    """Print one stage as a table row."""
+    row = stage.as_row()
+    print(" ".join(fmt.format(row[name]) for name, _, fmt in COLUMNS), flush=True)
+
+
+async def run_harness(options) -> list[Stage]:
+    """Import the bot, swap in the fake gateway, and run the ramp."""
+    with tempfile.TemporaryDirectory() as directory:
+        bot = import_bot()
+        loop = asyncio.get_running_loop()
+        gateway = FakeGateway(loop, bot, track_seconds=options.track_seconds)
+        FakeYoutubeDL.configure(
+            LatencyProfile(
+                median=options.extract_median,
+                sigma=options.extract_sigma,
+                failure_rate=options.failure_rate,
+            ),
+            seed=options.seed,
+        )
+        with patch.object(bot, "client", gateway), patch.object(
+            bot.music_service, "client", gateway
+        ), patch.object(
+            bot.history, "path", os.path.join(directory, "history.sqlite3")
+        ), patch.object(
+            bot.loop_monitor, "report_path", None
+        ), patch(
+            "music_audio.youtube_dl.YoutubeDL", FakeYoutubeDL
+        ), patch(
+            "music_audio.create_ffmpeg_source",
+            frame_source_factory(options.track_seconds),
+        ):
+            bot.history.load()
+            try:
+                return await LoadHarness(bot, gateway, options).run()
+            finally:
+                bot.history.close()
+
+
+def parse_ramp(value: str) -> list[int]:
+    """Parse a comma-separated list of guild counts."""
+    return sorted({int(part) for part in value.split(",") if part.strip()})
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ramp", type=parse_ramp, default="50,100,250,500,1000,2000")
+    parser.add_argument("--stage-seconds", type=float, default=15.0)
+    parser.add_argument("--track-seconds", type=float, default=30.0)
+    parser.add_argument("--commands-per-guild-minute", type=float, default=2.0)
+    parser.add_argument("--voice-events-per-guild-minute", type=float, default=4.0)
+    parser.add_argument("--playlist-share", type=float, default=0.1)
+    parser.add_argument("--catalog", type=int, default=5000)
+    parser.add_argument("--extract-median", type=float, default=0.3)
+    parser.add_argument("--extract-sigma", type=float, default=0.5)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--max-p95-ms", type=float, default=5000.0)
+    parser.add_argument("--max-lag-ms", type=float, default=500.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="also write stage results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Run the ramp and print a row per stage."""
+    options = parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+    logging.disable(logging.WARNING)
+    print_header()
+    stages = asyncio.run(run_harness(options))
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as results_file:
+            json.dump([stage.as_row() for stage in stages], results_file, indent=2)
+            results_file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,51 +1,430 @@
 """Discord bot entrypoint with slash commands and startup wiring."""
 
+import asyncio
 import logging
 import os
-import random
 
 import discord
 from discord import app_commands
 from dotenv import load_dotenv
 
-from music_audio import build_queue_page_message
+from music_actor import ActorRegistry
+from music_admission import AdmissionController
+from music_audio import (
+    build_queue_page_message,
+    extraction_breaker,
+    extraction_scheduler,
+    prewarm_youtube_dl,
+)
+from music_breaker import BREAKER_STATES
+from music_bulk import BulkAdder, BulkRequestError
+from music_client import CLIENT_PROFILES, client_options
+from music_history import TrackHistory, is_url_like
+from music_loopmonitor import LoopMonitor
+from music_memory import MemoryAccountant, read_rss_bytes
+from music_metrics import MetricsServer, metrics, shard_events
+from music_nowplaying import NowPlayingPanel
+from music_outbox import Outbox
+from music_profiler import PROFILE_FORMATS, ProfilerBusyError, SamplingProfiler
 from music_service import MusicService
+from music_sessions import SessionKeeper
+from music_sharding import ShardConfig, count_by_shard
+from music_speculation import SpeculativeExtractor
+from music_startup import StartupTimer, sync_command_tree_if_changed
 from music_state import MusicState
+from music_store import MemoryStore, SQLiteStore
+from music_supervisor import TaskSupervisor, parse_limits
+from music_tracing import tracer
+from music_warmup import CacheWarmer
+
+load_dotenv()
+shards = ShardConfig.from_env()
 
 logging.basicConfig(
     level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s - %(name)s: %(message)s",
+    format=f"[%(asctime)s] %(levelname)s{shards.log_label()} - %(name)s: %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 logger = logging.getLogger(__name__)
+startup = StartupTimer()
+
 
+def get_env_number(name: str, default, cast=int):
+    """Read a numeric setting from the environment, falling back on bad values."""
+    raw_value = os.getenv(name)
+    if raw_value is None or raw_value == "":
+        return default
 
-class MyClient(discord.Client):
+    try:
+        return cast(raw_value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r, using %s.", name, raw_value, default)
+        return default
+
+
+class MyClient(discord.AutoShardedClient if shards.enabled else discord.Client):
     """Discord client that owns the slash-command tree."""
 
     def __init__(self, *args, **kwargs):
         """Initialize the Discord client and command tree."""
         super().__init__(*args, **kwargs)
         self.tree = app_commands.CommandTree(self)
+        self.stored_state: dict | None = None
 
     async def setup_hook(self):
-        """Synchronize slash commands when the client starts."""
-        await self.tree.sync(guild=None)
-
+        """Load history and saved sessions, start monitors, and sync commands."""
+        startup.mark("login")
+        await asyncio.to_thread(history.load)
+        supervisor.spawn(
+            "history_flush",
+            history.run_flusher(get_env_number("HISTORY_FLUSH_INTERVAL", 5.0, float)),
+        )
+        await asyncio.to_thread(state.store.open)
+        if state.store.durable:
+            supervisor.spawn(
+                "state_flush",
+                state.run_store_flusher(
+                    get_env_number("STATE_FLUSH_INTERVAL", 1.0, float)
+                ),
+            )
+            supervisor.spawn(
+                "session_snapshot",
+                sessions.run_session_snapshots(
+                    get_env_number("SESSION_SNAPSHOT_INTERVAL", 10.0, float)
+                ),
+            )
+            if os.getenv("SESSION_RESTORE", "1") != "0":
+                self.stored_state = await asyncio.to_thread(state.store.load)
+        loop_monitor.start()
+        if metrics_server is not None:
+            await metrics_server.start()
+        warmer.start()
+        if os.getenv("YTDLP_PREWARM", "1") != "0":
+            supervisor.spawn("prewarm", prewarm_youtube_dl())
+        startup.mark("setup_hook")
+        if shards.syncs_commands:
+            await sync_command_tree_if_changed(
+                self.tree,
+                os.getenv("COMMAND_SYNC_FILE", "command_tree.sha256"),
+                application_id=self.application_id,
+                force=os.getenv("FORCE_COMMAND_SYNC", "") == "1",
+            )
+            startup.mark("command_sync")
+
+    async def close(self):
+        """Stop background work, snapshot sessions and write pending state."""
+        await supervisor.drain()
+        await music_service.actors.close()
+        if state.store.durable:
+            sessions.snapshot_sessions()
+        state.flush_store()
+        state.store.close()
+        await asyncio.to_thread(history.close)
+        await asyncio.to_thread(tracer.close)
+        await asyncio.to_thread(loop_monitor.stop)
+        if metrics_server is not None:
+            await metrics_server.close()
+        await super().close()
+
+
+extraction_scheduler.max_concurrent = get_env_number("EXTRACTION_CONCURRENCY", 4)
+extraction_scheduler.starvation_timeout = get_env_number(
+    "EXTRACTION_STARVATION_TIMEOUT", 10.0, float
+)
 
-intents = discord.Intents.default()
-intents.message_content = True
-intents.voice_states = True
+now_playing_enabled = os.getenv("NOW_PLAYING_PANEL", "1") != "0"
+client_profile = os.getenv("CLIENT_PROFILE", "default")
+if client_profile not in CLIENT_PROFILES:
+    logger.warning("Ignoring invalid CLIENT_PROFILE=%r, using default.", client_profile)
+    client_profile = "default"
 
-client = MyClient(intents=intents)
-state = MusicState()
-music_service = MusicService(client, state)
+client = MyClient(
+    **client_options(client_profile, message_events=now_playing_enabled),
+    **shards.client_options(),
+)
+state_backend = os.getenv("STATE_BACKEND", "memory")
+if state_backend not in ("memory", "sqlite"):
+    logger.warning("Ignoring invalid STATE_BACKEND=%r, using memory.", state_backend)
+    state_backend = "memory"
+state = MusicState(
+    store=(
+        SQLiteStore(os.getenv("STATE_DB", "music_state.sqlite3"))
+        if state_backend == "sqlite"
+        else MemoryStore()
+    )
+)
+task_limits_setting = os.getenv("TASK_LIMITS", "")
+try:
+    task_limits = parse_limits(task_limits_setting) or {"playlist_load": 8}
+except ValueError as exc:
+    logger.warning("Ignoring invalid TASK_LIMITS=%r: %s", task_limits_setting, exc)
+    task_limits = {"playlist_load": 8}
+supervisor = TaskSupervisor(limits=task_limits)
+speculator = SpeculativeExtractor(supervisor=supervisor)
+history = TrackHistory(os.getenv("MUSIC_HISTORY_DB", "music_history.sqlite3"))
+loop_monitor = LoopMonitor(
+    slow_threshold=get_env_number("LOOP_SLOW_THRESHOLD", 0.25, float),
+    report_path=os.getenv("LOOP_REPORT_FILE", "loop_report.json") or None,
+    supervisor=supervisor,
+)
+admission = AdmissionController(
+    lag_sampler=loop_monitor,
+    extraction_load=extraction_scheduler.load,
+    stream_count=lambda: sum(
+        1 for voice_client in client.voice_clients if voice_client.is_playing()
+    ),
+    max_extraction_load=get_env_number("ADMISSION_MAX_EXTRACTIONS", 16),
+    max_streams=get_env_number("ADMISSION_MAX_STREAMS", 200),
+    max_loop_lag=get_env_number("ADMISSION_MAX_LOOP_LAG", 0.5, float),
+)
+memory = MemoryAccountant(
+    state, soft_cap_bytes=get_env_number("MEMORY_SOFT_CAP_MB", 0) * 1024 * 1024
+)
+if os.getenv("MEMORY_TRACEMALLOC", "") == "1":
+    memory.start_tracing()
+outbox = Outbox(
+    batch_window=get_env_number("OUTBOX_BATCH_WINDOW", 1.0, float),
+    supervisor=supervisor,
+)
+now_playing = (
+    NowPlayingPanel(
+        min_interval=get_env_number("NOW_PLAYING_EDIT_INTERVAL", 2.0, float),
+        scroll_limit=get_env_number("NOW_PLAYING_SCROLL_LIMIT", 10),
+        supervisor=supervisor,
+        outbox=outbox,
+    )
+    if now_playing_enabled
+    else None
+)
+music_service = MusicService(
+    client,
+    state,
+    speculator=speculator,
+    history=history,
+    admission=admission,
+    memory=memory,
+    outbox=outbox,
+    now_playing=now_playing,
+    actors=ActorRegistry(
+        idle_timeout=get_env_number("ACTOR_IDLE_TIMEOUT", 60.0, float)
+    ),
+    supervisor=supervisor,
+)
+sessions = SessionKeeper(music_service)
+bulk = BulkAdder(
+    music_service,
+    concurrency=get_env_number("BULK_ADD_CONCURRENCY", 4),
+    max_urls=get_env_number("BULK_ADD_MAX_URLS", 50),
+)
+metrics.gauge(
+    "musicbot_queue_depth",
+    "Tracks waiting in each guild queue.",
+    ("guild_id",),
+    collect=lambda: {
+        (guild_id,): len(queue) for guild_id, queue in state.queues.items()
+    },
+)
+metrics.gauge(
+    "musicbot_voice_sessions",
+    "Connected voice clients.",
+    collect=lambda: len(client.voice_clients),
+)
+if shards.enabled:
+    metrics.gauge(
+        "musicbot_shard_latency_seconds",
+        "Gateway heartbeat latency per shard.",
+        ("shard",),
+        collect=lambda: {
+            (shard_id,): latency for shard_id, latency in client.latencies
+        },
+    )
+    metrics.gauge(
+        "musicbot_shard_guilds",
+        "Guilds served by each shard.",
+        ("shard",),
+        collect=lambda: count_by_shard(client.guilds),
+    )
+    metrics.gauge(
+        "musicbot_shard_voice_sessions",
+        "Connected voice clients per shard.",
+        ("shard",),
+        collect=lambda: count_by_shard(
+            voice_client.guild for voice_client in client.voice_clients
+        ),
+    )
+metrics.gauge(
+    "musicbot_guild_actors",
+    "Guild playback actors that are awake.",
+    collect=lambda: len(music_service.actors.actors),
+)
+metrics.gauge(
+    "musicbot_actor_mailbox_depth",
+    "Commands waiting in guild actor mailboxes.",
+    collect=music_service.actors.mailbox_depth,
+)
+metrics.gauge(
+    "musicbot_background_tasks",
+    "Supervised background tasks by kind and whether they run or wait.",
+    ("kind", "state"),
+    collect=supervisor.inventory,
+)
+metrics.gauge(
+    "musicbot_outbox_pending",
+    "Channel notices waiting in the outbox.",
+    collect=outbox.pending,
+)
+metrics.gauge(
+    "musicbot_loading_playlists",
+    "Guilds with a background playlist load in progress.",
+    collect=lambda: sum(state.loading_playlists.values()),
+)
+metrics.gauge(
+    "musicbot_extraction_queue_depth",
+    "Extractions waiting for a slot, by priority class.",
+    ("priority",),
+    collect=lambda: {
+        (name,): count
+        for name, count in extraction_scheduler.snapshot()["queued"].items()
+    },
+)
+metrics.gauge(
+    "musicbot_extractions_running",
+    "Extractions currently holding a slot.",
+    collect=lambda: extraction_scheduler.running,
+)
+metrics.gauge(
+    "musicbot_breaker_state",
+    "Extraction circuit breaker state; the current one is 1.",
+    ("state",),
+    collect=lambda: {
+        (name,): int(extraction_breaker.snapshot()["state"] == name)
+        for name in BREAKER_STATES
+    },
+)
+metrics.gauge(
+    "musicbot_breaker_retry_after_seconds",
+    "Seconds until the open extraction breaker admits work again.",
+    collect=lambda: extraction_breaker.snapshot()["retry_after"],
+)
+metrics.gauge(
+    "musicbot_admission_rejections",
+    "Requests refused by admission control since startup, by kind.",
+    ("kind",),
+    collect=lambda: {
+        (kind,): count for kind, count in admission.snapshot()["rejected"].items()
+    },
+)
+metrics.gauge(
+    "musicbot_cache_warm_entries",
+    "Cache entries the startup warmer has processed, by outcome.",
+    ("outcome",),
+    collect=lambda: {
+        (outcome,): warmer.report()[outcome]
+        for outcome in ("warmed", "already_warm", "failed")
+    },
+)
+metrics.gauge(
+    "musicbot_cache_warm_hits",
+    "Lookups served by an entry the startup warmer filled.",
+    collect=lambda: warmer.report()["warm_hits"],
+)
+metrics.gauge(
+    "musicbot_cache_warm_hit_rate",
+    "Fraction of warmed entries that have served a lookup.",
+    collect=lambda: warmer.report()["warm_hit_rate"],
+)
+tracer.configure(
+    sample_rate=get_env_number("TRACE_SAMPLE_RATE", 1.0, float),
+    path=os.getenv("TRACE_FILE") or None,
+)
+metrics.gauge(
+    "musicbot_guild_memory_bytes",
+    "Estimated bytes of queued state for the ten largest guilds.",
+    ("guild_id",),
+    collect=lambda: {(guild_id,): size for guild_id, size, _ in memory.top_guilds()},
+)
+metrics.gauge(
+    "musicbot_queue_memory_bytes",
+    "Estimated bytes of queued state across all guilds.",
+    collect=memory.total_bytes,
+)
+metrics.gauge(
+    "musicbot_process_rss_bytes",
+    "Resident set size of the bot process.",
+    collect=lambda: read_rss_bytes() or 0,
+)
+metrics.gauge(
+    "musicbot_event_loop_lag_seconds",
+    "Smoothed event-loop lag.",
+    collect=lambda: loop_monitor.lag,
+)
+metrics.gauge(
+    "musicbot_event_loop_max_lag_seconds",
+    "Largest event-loop lag seen since startup.",
+    collect=lambda: loop_monitor.max_lag,
+)
+profiler = SamplingProfiler(os.getenv("PROFILE_DIR", "profiles"))
+owner_ids = {
+    int(owner_id)
+    for owner_id in os.getenv("BOT_OWNER_IDS", "").replace(",", " ").split()
+    if owner_id.isdigit()
+}
+metrics_port = get_env_number("METRICS_PORT", 0)
+metrics_server = (
+    MetricsServer(
+        metrics, host=os.getenv("METRICS_HOST", "127.0.0.1"), port=metrics_port
+    )
+    if metrics_port
+    else None
+)
+warmer = CacheWarmer(
+    history,
+    top_k=get_env_number("WARMUP_TOP_K", 25),
+    interval=get_env_number("WARMUP_INTERVAL", 3.0, float),
+    supervisor=supervisor,
+)
 
 
 @client.event
 async def on_ready():
-    """Log successful startup and slash-command synchronization."""
-    logger.info("Logged in as %s. Slash commands synchronized.", client.user)
+    """Log startup, then resume the sessions saved before the last restart."""
+    logger.info("Logged in as %s.", client.user)
+    startup.report("gateway")
+    if client.stored_state is not None:
+        stored, client.stored_state = client.stored_state, None
+        supervisor.spawn(
+            "session_restore",
+            sessions.restore_sessions(
+                stored, concurrency=get_env_number("RESTORE_CONCURRENCY", 4)
+            ),
+        )
+
+
+@client.event
+async def on_shard_connect(shard_id: int):
+    """Count shard connects; logs already carry the cluster label."""
+    shard_events.inc(shard_id, "connect")
+
+
+@client.event
+async def on_shard_ready(shard_id: int):
+    """Log each shard becoming ready."""
+    shard_events.inc(shard_id, "ready")
+    logger.info("Shard %s ready.", shard_id)
+
+
+@client.event
+async def on_shard_disconnect(shard_id: int):
+    """Log and count shard disconnects."""
+    shard_events.inc(shard_id, "disconnect")
+    logger.warning("Shard %s disconnected from the gateway.", shard_id)
+
+
+@client.event
+async def on_shard_resumed(shard_id: int):
+    """Log and count resumed shard sessions."""
+    shard_events.inc(shard_id, "resume")
+    logger.info("Shard %s resumed.", shard_id)
 
 
 @client.event
@@ -56,6 +435,20 @@ async def on_voice_state_update(
     await music_service.on_voice_state_update(member, before, after)
 
 
+@client.event
+async def on_message(message: discord.Message):
+    """Count messages that push the now-playing panel up the channel."""
+    if now_playing is not None and message.guild is not None:
+        now_playing.note_message(message.guild.id, message.channel.id, message.id)
+
+
+@client.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    """Forget a deleted now-playing panel so the next track posts a new one."""
+    if now_playing is not None and payload.guild_id is not None:
+        now_playing.forget_message(payload.guild_id, payload.message_id)
+
+
 @client.tree.command(name="join", description="Join the voice channel")
 @app_commands.guild_only()
 @app_commands.checks.cooldown(1, 10.0)
@@ -84,9 +477,7 @@ async def join(interaction: discord.Interaction):
 @app_commands.checks.cooldown(1, 10.0)
 async def leave(interaction: discord.Interaction):
     """Disconnect the bot from voice if it is currently connected."""
-    voice_client = interaction.guild.voice_client
-    if voice_client and voice_client.is_connected():
-        await voice_client.disconnect()
+    if music_service.controls.leave(interaction.guild):
         await interaction.response.send_message("Bot has left the voice channel!")
         return
 
@@ -95,35 +486,99 @@ async def leave(interaction: discord.Interaction):
     )
 
 
+async def url_autocomplete(
+    interaction: discord.Interaction, current: str
+) -> list[app_commands.Choice[str]]:
+    """Suggest tracks from play history, or prefetch a pasted video URL."""
+    if is_url_like(current):
+        speculator.maybe_start(interaction.user.id, current)
+        return []
+
+    return [
+        app_commands.Choice(name=record.title[:100], value=record.url)
+        for record in history.suggest(current, limit=25)
+        if len(record.url) <= 100
+    ]
+
+
+async def refuse_when_overloaded(
+    interaction: discord.Interaction, *, new_stream: bool
+) -> bool:
+    """Answer with a fast busy message instead of deferring under overload."""
+    decision = admission.check(new_stream=new_stream)
+    if decision.admitted:
+        return False
+
+    await interaction.response.send_message(decision.busy_message(), ephemeral=True)
+    return True
+
+
 @client.tree.command(
-    name="play", description="Join voice channel and play music (URL or playlist)"
+    name="play",
+    description="Join voice channel and play music (URL, playlist, or search)",
 )
 @app_commands.guild_only()
 @app_commands.checks.cooldown(1, 5.0)
+@app_commands.autocomplete(url=url_autocomplete)
+@app_commands.describe(url="YouTube URL, playlist, or search text")
 async def play(interaction: discord.Interaction, url: str):
     """Connect to voice if needed and start playback for a URL or playlist."""
-    await interaction.response.defer(ephemeral=True)
-    if not await music_service.ensure_bot_connected(interaction):
+    voice_client = interaction.guild.voice_client
+    new_stream = voice_client is None or not voice_client.is_playing()
+    if await refuse_when_overloaded(interaction, new_stream=new_stream):
         return
 
-    await music_service.handle_music_request(interaction, url)
+    with tracer.start_trace("/play", guild_id=interaction.guild.id, url=url):
+        await interaction.response.defer(ephemeral=True)
+        if not await music_service.ensure_bot_connected(interaction):
+            return
+
+        await music_service.handle_music_request(interaction, url)
 
 
 @client.tree.command(
     name="add", description="Add music to queue (bot must already be playing)"
 )
 @app_commands.guild_only()
-async def add(interaction: discord.Interaction, url: str):
-    """Add a URL or playlist to the queue without reconnecting the bot."""
-    await interaction.response.defer(ephemeral=True)
-    if interaction.guild.voice_client is None:
-        await interaction.followup.send(
-            "Bot is not in a voice channel! Use `/play` to start playing first.",
-            ephemeral=True,
-        )
+@app_commands.autocomplete(url=url_autocomplete)
+@app_commands.describe(
+    url="YouTube URL, playlist, or search text; several URLs separated by spaces",
+    file="Text file with URLs separated by spaces or newlines",
+)
+async def add(
+    interaction: discord.Interaction,
+    url: str = "",
+    file: discord.Attachment | None = None,
+):
+    """Add a URL, playlist, or a list of URLs without reconnecting the bot."""
+    if await refuse_when_overloaded(interaction, new_stream=False):
         return
 
-    await music_service.handle_music_request(interaction, url)
+    with tracer.start_trace("/add", guild_id=interaction.guild.id, url=url):
+        await interaction.response.defer(ephemeral=True)
+        if interaction.guild.voice_client is None:
+            await interaction.followup.send(
+                "Bot is not in a voice channel! Use `/play` to start playing first.",
+                ephemeral=True,
+            )
+            return
+
+        if not bulk.is_bulk(url, file):
+            if url.strip():
+                await music_service.handle_music_request(interaction, url)
+            else:
+                await interaction.followup.send(
+                    "Give a URL or search text, or attach a list of URLs.",
+                    ephemeral=True,
+                )
+            return
+
+        try:
+            urls = await bulk.collect_urls(url, file)
+        except BulkRequestError as exc:
+            await interaction.followup.send(str(exc), ephemeral=True)
+            return
+        await bulk.add_urls(interaction, urls)
 
 
 @client.tree.command(name="queue", description="Display the queue")
@@ -155,9 +610,7 @@ async def queue_list(interaction: discord.Interaction, page: int = 1):
 @app_commands.guild_only()
 async def skip(interaction: discord.Interaction):
     """Stop the current track so playback advances to the next item."""
-    voice_client = interaction.guild.voice_client
-    if voice_client and voice_client.is_playing():
-        voice_client.stop()
+    if music_service.controls.skip(interaction.guild):
         await interaction.response.send_message("Skipped!")
         return
 
@@ -170,9 +623,7 @@ async def skip(interaction: discord.Interaction):
 @app_commands.guild_only()
 async def clearqueue(interaction: discord.Interaction):
     """Clear the queue and stop any background playlist loading."""
-    guild_id = interaction.guild.id
-    state.get_queue(guild_id).clear()
-    state.stop_playlist_loading(guild_id)
+    music_service.controls.clear_queue(interaction.guild.id)
     await interaction.response.send_message("The queue has been cleared!")
 
 
@@ -190,9 +641,9 @@ async def shuffle(interaction: discord.Interaction):
         )
         return
 
-    random.shuffle(queue)
+    shuffled = music_service.controls.shuffle_queue(interaction.guild.id)
     await interaction.response.send_message(
-        f"Shuffled **{len(queue)}** songs in the queue!"
+        f"Shuffled **{shuffled}** songs in the queue!"
     )
 
 
@@ -217,17 +668,94 @@ async def remove(interaction: discord.Interaction, position: int):
         )
         return
 
-    removed_song = queue.pop(position - 1)
+    removed_song = music_service.controls.remove_from_queue(
+        interaction.guild.id, position
+    )
     await interaction.response.send_message(
         f"Removed **[{removed_song.title}]({removed_song.url})** from position {position}."
     )
 
 
-load_dotenv()
+async def is_bot_owner(interaction: discord.Interaction) -> bool:
+    """Return True for BOT_OWNER_IDS, or the application's owner or team."""
+    if not owner_ids:
+        app_info = await client.application_info()
+        if app_info.team is not None:
+            owner_ids.update(member.id for member in app_info.team.members)
+        else:
+            owner_ids.add(app_info.owner.id)
+    return interaction.user.id in owner_ids
+
+
+@client.tree.command(
+    name="profile", description="Capture a CPU profile of the bot (owner only)"
+)
+@app_commands.describe(
+    seconds="How long to sample, 1-60 seconds",
+    profile_format="collapsed (flamegraph) or speedscope",
+)
+async def capture_profile(
+    interaction: discord.Interaction,
+    seconds: int = 10,
+    profile_format: str = "collapsed",
+):
+    """Sample every bot thread for a few seconds and write a profile file."""
+    if not await is_bot_owner(interaction):
+        await interaction.response.send_message(
+            "Only the bot owner can capture profiles.", ephemeral=True
+        )
+        return
+
+    if profile_format not in PROFILE_FORMATS:
+        await interaction.response.send_message(
+            f"Unknown format. Choose one of: {', '.join(PROFILE_FORMATS)}.",
+            ephemeral=True,
+        )
+        return
+
+    if profiler.running:
+        await interaction.response.send_message(
+            "A profile capture is already running.", ephemeral=True
+        )
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    try:
+        result = await profiler.capture_async(max(1, min(seconds, 60)), profile_format)
+    except ProfilerBusyError as exc:
+        await interaction.followup.send(str(exc), ephemeral=True)
+        return
+
+    top_frames = "\n".join(f"{count:>5}  {frame}" for frame, count in result.top_frames)
+    await interaction.followup.send(
+        f"Wrote `{result.path}` ({result.samples} samples over "
+        f"{result.duration:.1f}s, {result.threads} threads).\n"
+        f"Hottest frames:\n```\n{top_frames}\n```",
+        ephemeral=True,
+    )
+
+
+@client.tree.command(
+    name="memory", description="Show memory usage by guild (owner only)"
+)
+async def memory_report(interaction: discord.Interaction):
+    """Report estimated per-guild memory and tracemalloc growth."""
+    if not await is_bot_owner(interaction):
+        await interaction.response.send_message(
+            "Only the bot owner can view memory reports.", ephemeral=True
+        )
+        return
+
+    await interaction.response.send_message(
+        f"```\n{(await memory.report())[:1900]}\n```", ephemeral=True
+    )
+
+
 token = os.getenv("DISCORD_TOKEN")
 if not token:
     logger.error("Missing DISCORD_TOKEN in environment.")
     raise RuntimeError("Missing DISCORD_TOKEN in environment.")
 
+startup.mark("configure")
 logger.info("Starting Discord bot...")
 client.run(token)
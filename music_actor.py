@@ -0,0 +1,184 @@
+"""Per-guild playback actors: one task runs each guild's commands in order."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from music_metrics import actor_events, actor_messages
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class GuildActor:
+    """The mailbox and task of one guild's actor."""
+
+    guild_id: int
+    mailbox: deque = field(default_factory=deque)
+    task: asyncio.Task | None = None
+    handling: asyncio.Task | None = None
+    wakeup: asyncio.Future | None = None
+    command: str | None = None
+
+
+class ActorRegistry:
+    """Run every command that touches a guild's queue or voice client in order.
+
+    Each guild gets an actor: a task that takes ``(command, handler)``
+    messages from its mailbox and runs them one at a time, so handlers for
+    the same guild never interleave and need no locks. Guilds still run
+    concurrently with each other. An actor whose mailbox stays empty for
+    ``idle_timeout`` seconds hibernates: its task ends and it is dropped,
+    and the next message starts a fresh one, so memory follows active
+    guilds rather than known ones.
+
+    Each handler runs in a copy of its sender's context, so it joins the
+    sender's trace rather than that of whoever woke the actor.
+    """
+
+    def __init__(self, *, idle_timeout: float = 60.0):
+        self.idle_timeout = idle_timeout
+        self.actors: dict[int, GuildActor] = {}
+
+    def tell(self, guild_id: int, command: str, handler: Callable, /, *args, **kwargs):
+        """Queue a command without waiting for it; failures are logged."""
+        message = (command, handler, args, kwargs, None, contextvars.copy_context())
+        self.post(guild_id, message)
+
+    def tell_threadsafe(
+        self, loop, guild_id: int, command: str, handler: Callable, /, *args
+    ):
+        """Queue a command from another thread, such as a voice player."""
+        message = (command, handler, args, {}, None, contextvars.copy_context())
+        loop.call_soon_threadsafe(self.post, guild_id, message)
+
+    async def ask(
+        self, guild_id: int, command: str, handler: Callable, /, *args, **kwargs
+    ):
+        """Queue a command and return its result once the actor has run it."""
+        actor = self.actors.get(guild_id)
+        if actor is not None and actor.handling is asyncio.current_task():
+            # A handler calling back into its own guild runs inline; waiting
+            # on its own mailbox would deadlock.
+            return await call(handler, args, kwargs)
+
+        future = asyncio.get_running_loop().create_future()
+        context = contextvars.copy_context()
+        self.post(guild_id, (command, handler, args, kwargs, future, context))
+        return await future
+
+    def post(self, guild_id: int, message: tuple):
+        """Deliver a message, waking the guild's actor if it hibernated."""
+        actor = self.actors.get(guild_id)
+        if actor is None:
+            actor = self.actors[guild_id] = GuildActor(guild_id)
+            # A fresh context, so the actor keeps nothing from the sender
+            # that woke it.
+            actor.task = asyncio.get_running_loop().create_task(
+                self.run(actor),
+                name=f"guild-actor-{guild_id}",
+                context=contextvars.Context(),
+            )
+            actor_events.inc("started")
+        actor.mailbox.append(message)
+        if actor.wakeup is not None and not actor.wakeup.done():
+            actor.wakeup.set_result(True)
+
+    async def run(self, actor: GuildActor):
+        """Process messages until the mailbox stays idle, then hibernate.
+
+        A burst of messages is drained without any timer; only an empty
+        mailbox arms the idle timeout.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                while actor.mailbox:
+                    await self.process(actor, actor.mailbox.popleft())
+                actor.wakeup = loop.create_future()
+                timer = loop.call_later(self.idle_timeout, expire, actor.wakeup)
+                try:
+                    woken = await actor.wakeup
+                finally:
+                    timer.cancel()
+                    actor.wakeup = None
+                if not woken and not actor.mailbox:
+                    actor_events.inc("hibernated")
+                    return
+        finally:
+            self.drop(actor)
+
+    async def process(self, actor: GuildActor, message: tuple):
+        """Run one command and hand its outcome to whoever asked."""
+        command, handler, args, kwargs, future, context = message
+        actor_messages.inc(command)
+        actor.command = command
+        try:
+            actor.handling = asyncio.get_running_loop().create_task(
+                call(handler, args, kwargs), context=context
+            )
+            result = await actor.handling
+        except asyncio.CancelledError:
+            if future is not None:
+                future.cancel()
+            raise
+        except Exception as exc:
+            if future is None:
+                logger.error(
+                    "Command %s failed in guild %s: %s",
+                    command,
+                    actor.guild_id,
+                    exc,
+                    exc_info=True,
+                )
+            elif not future.done():
+                future.set_exception(exc)
+        else:
+            if future is not None and not future.done():
+                future.set_result(result)
+        finally:
+            actor.command = None
+            actor.handling = None
+
+    def drop(self, actor: GuildActor):
+        """Forget a stopped actor and cancel the commands still queued for it."""
+        if self.actors.get(actor.guild_id) is actor:
+            del self.actors[actor.guild_id]
+        while actor.mailbox:
+            future = actor.mailbox.popleft()[4]
+            if future is not None and not future.done():
+                future.cancel()
+
+    def mailbox_depth(self) -> int:
+        """Return the number of messages waiting across all actors."""
+        return sum(len(actor.mailbox) for actor in self.actors.values())
+
+    async def close(self):
+        """Stop every actor; queued commands are cancelled."""
+        actors = list(self.actors.values())
+        for actor in actors:
+            actor.task.cancel()
+        await asyncio.gather(*(actor.task for actor in actors), return_exceptions=True)
+        for actor in actors:
+            # A task cancelled before its first step never reaches ``finally``.
+            self.drop(actor)
+
+
+def expire(wakeup: asyncio.Future):
+    """Wake an idle actor with ``False`` so it hibernates."""
+    if not wakeup.done():
+        wakeup.set_result(False)
+
+
+async def call(handler: Callable, args: tuple, kwargs: dict):
+    """Call a sync or async handler and return its result."""
+    result = handler(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
@@ -0,0 +1,153 @@
+"""Node-level admission control so overload turns a few requests away."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from music_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdmissionDecision:
+    """Whether a request may proceed and, if not, when to try again."""
+
+    admitted: bool
+    reason: str = ""
+    retry_after: float = 0.0
+
+    def busy_message(self) -> str:
+        """Return the user-facing refusal message."""
+        return (
+            "The bot is busy right now "
+            f"({self.reason}), try again in {math.ceil(self.retry_after)} s."
+        )
+
+
+class LoopLagSampler:
+    """Measure event-loop lag as the overshoot of a short periodic sleep."""
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.5,
+        smoothing: float = 0.2,
+        supervisor: TaskSupervisor | None = None,
+    ):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.supervisor = supervisor if supervisor is not None else TaskSupervisor()
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.task: asyncio.Task | None = None
+
+    def record(self, lag: float):
+        """Fold one lag sample into the smoothed value."""
+        self.lag = self.smoothing * lag + (1 - self.smoothing) * self.lag
+        self.max_lag = max(self.max_lag, lag)
+
+    async def run(self):
+        """Sample forever."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+    def start(self) -> asyncio.Task:
+        """Start sampling in the background once."""
+        if self.task is None:
+            self.task = self.supervisor.spawn("loop_lag", self.run())
+        return self.task
+
+
+class AdmissionController:  # pylint: disable=too-many-instance-attributes
+    """Refuse new work once extraction, stream, or loop capacity runs out.
+
+    ``extraction_load`` returns running plus queued extractions,
+    ``stream_count`` returns how many guilds are currently streaming audio.
+    Background work is refused at ``background_fraction`` of every limit so it
+    is always shed before any user request is.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        extraction_load=lambda: 0,
+        stream_count=lambda: 0,
+        lag_sampler: LoopLagSampler | None = None,
+        max_extraction_load: int = 16,
+        max_streams: int = 200,
+        max_loop_lag: float = 0.5,
+        background_fraction: float = 0.5,
+        base_retry_after: float = 5.0,
+    ):
+        self.extraction_load = extraction_load
+        self.stream_count = stream_count
+        self.lag_sampler = lag_sampler or LoopLagSampler()
+        self.max_extraction_load = max_extraction_load
+        self.max_streams = max_streams
+        self.max_loop_lag = max_loop_lag
+        self.background_fraction = background_fraction
+        self.base_retry_after = base_retry_after
+        self.rejected = {"interactive": 0, "background": 0}
+        self.last_rejection_log = 0.0
+
+    def retry_after(self, load: float, limit: float) -> float:
+        """Scale the suggested wait by how far over the limit we are."""
+        ratio = load / limit if limit > 0 else 1.0
+        return self.base_retry_after * max(1.0, ratio)
+
+    def check(
+        self, *, background: bool = False, new_stream: bool = False
+    ) -> AdmissionDecision:
+        """Decide whether one request may start now."""
+        scale = self.background_fraction if background else 1.0
+        checks = (
+            (self.lag_sampler.lag, self.max_loop_lag, "event loop overloaded"),
+            (self.extraction_load(), self.max_extraction_load, "too many extractions"),
+        )
+        if new_stream or background:
+            checks += ((self.stream_count(), self.max_streams, "too many streams"),)
+
+        for load, limit, reason in checks:
+            if limit > 0 and load >= limit * scale:
+                return self.reject(
+                    background, reason, self.retry_after(load, limit * scale)
+                )
+        return AdmissionDecision(True)
+
+    def reject(
+        self, background: bool, reason: str, retry_after: float
+    ) -> AdmissionDecision:
+        """Count and rate-limit-log one refusal."""
+        kind = "background" if background else "interactive"
+        self.rejected[kind] += 1
+        now = time.monotonic()
+        if now - self.last_rejection_log >= 10:
+            self.last_rejection_log = now
+            logger.warning(
+                "Admission refused %s work: %s (refused so far: %s)",
+                kind,
+                reason,
+                self.rejected,
+            )
+        return AdmissionDecision(False, reason, retry_after)
+
+    def snapshot(self) -> dict:
+        """Return current load and limits for logs and metrics."""
+        return {
+            "extraction_load": self.extraction_load(),
+            "max_extraction_load": self.max_extraction_load,
+            "streams": self.stream_count(),
+            "max_streams": self.max_streams,
+            "loop_lag": self.lag_sampler.lag,
+            "max_loop_lag": self.max_loop_lag,
+            "rejected": dict(self.rejected),
+        }
@@ -3,14 +3,52 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import importlib
 import logging
 import os
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlparse
 
 import discord
-import yt_dlp as youtube_dl
+
+from music_breaker import CLOSED, BreakerOpenError, ExtractionCircuitBreaker
+from music_cache import (
+    PERMANENT,
+    RATE_LIMITED,
+    TRANSIENT,
+    ExtractionCache,
+    NegativeCache,
+    classify_extraction_error,
+    describe_unavailable_flat_entry,
+    is_final_unavailable_error,
+)
+from music_metrics import extraction_seconds, retries
+from music_scheduler import BACKGROUND, INTERACTIVE, NEXT_UP, ExtractionScheduler
+from music_startup import LazyModule
+from music_tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+FRAME_SECONDS = 0.02
+
+
+def load_youtube_extractors(module):
+    """Build yt-dlp's extractor registry and import the YouTube extractor."""
+    try:
+        module.extractor.gen_extractor_classes()
+        importlib.import_module(f"{module.__name__}.extractor.youtube")
+    except (AttributeError, ImportError) as exc:
+        logger.debug("Skipping yt-dlp extractor preload: %s", exc)
+
+
+# yt-dlp imports hundreds of extractor modules, so it loads on the first
+# extraction (or from ``prewarm_youtube_dl``) instead of at bot startup.
+youtube_dl = LazyModule("yt_dlp", on_load=load_youtube_extractors)
+
 BASE_YTDL_FORMAT_OPTIONS = {
     "format": "bestaudio[ext=m4a]/bestaudio[acodec!=none]/bestaudio/best",
     "noplaylist": False,
@@ -33,12 +71,63 @@ YTDL_CLIENT_FALLBACKS = (
 
 COOKIE_PATHS = ("/app/cookies.txt", "cookies.txt")
 
+YOUTUBE_HOSTS = frozenset(
+    {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com"}
+)
+YOUTUBE_VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
 ytdl_format_options = dict(BASE_YTDL_FORMAT_OPTIONS)
 for cookie_path in COOKIE_PATHS:
     if os.path.exists(cookie_path):
         ytdl_format_options["cookiefile"] = cookie_path
         break
 
+CACHEABLE_OVERRIDES = frozenset({"noplaylist", "playlist_items"})
+
+extraction_cache = ExtractionCache()
+negative_cache = NegativeCache()
+extraction_breaker = ExtractionCircuitBreaker()
+extraction_scheduler = ExtractionScheduler()
+DEGRADED_RETRY_OVERRIDES = {"retries": 1, "fragment_retries": 1}
+
+
+class ExtractionError(RuntimeError):
+    """Extraction failed on every attempted client; ``category`` says why."""
+
+    def __init__(self, message: str, *, category: str = TRANSIENT):
+        super().__init__(message)
+        self.category = category
+
+
+class UnavailableVideoError(ExtractionError):
+    """The video is in the negative cache and was skipped without extracting."""
+
+
+@dataclass
+class ExtractionActivity:
+    """Count in-flight extractions by whether a user is waiting on them."""
+
+    interactive: int = 0
+    background: int = 0
+
+    @contextmanager
+    def track(self, *, background: bool = False):
+        """Count one extraction for the duration of the block."""
+        if background:
+            self.background += 1
+        else:
+            self.interactive += 1
+        try:
+            yield
+        finally:
+            if background:
+                self.background -= 1
+            else:
+                self.interactive -= 1
+
+
+extraction_activity = ExtractionActivity()
+
 ffmpeg_options = {
     "before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin",
     "options": "-vn",
@@ -79,10 +168,21 @@ def extract_info_with_fallback(url: str, **overrides):
             options["extractor_args"] = extractor_args
 
         client_label = describe_youtube_client(options.get("extractor_args"))
+        if attempts:
+            retries.inc("fallback_client")
+        started = time.perf_counter()
         try:
             logger.info("Trying yt-dlp extraction with %s: %s", client_label, url)
-            return youtube_dl.YoutubeDL(options).extract_info(url, download=False)
+            with tracer.span("extraction_attempt", client=client_label):
+                info = youtube_dl.YoutubeDL(options).extract_info(url, download=False)
+            extraction_seconds.observe(
+                time.perf_counter() - started, client_label, "success"
+            )
+            return info
         except Exception as exc:
+            extraction_seconds.observe(
+                time.perf_counter() - started, client_label, "failure"
+            )
             attempts.append((client_label, str(exc)))
             logger.warning(
                 "yt-dlp extraction failed with %s for %s: %s",
@@ -90,22 +190,163 @@ def extract_info_with_fallback(url: str, **overrides):
                 url,
                 exc,
             )
+            if is_final_unavailable_error(str(exc)):
+                break
+            if classify_extraction_error(str(exc)) == RATE_LIMITED:
+                # Every client shares our IP, so the others would be blocked too.
+                break
 
     last_client, last_error = attempts[-1]
-    raise RuntimeError(
+    raise ExtractionError(
         "yt-dlp could not extract this URL after trying multiple YouTube clients. "
-        f"Last attempt ({last_client}): {last_error}"
+        f"Last attempt ({last_client}): {last_error}",
+        category=classify_extraction_error(last_error),
     )
 
 
-async def extract_info_async(url: str, **overrides) -> dict:
-    """Run yt-dlp extraction in the executor used by the Discord bot."""
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None, lambda: extract_info_with_fallback(url, **overrides)
+def get_single_video_id(url: str, overrides: dict) -> str | None:
+    """Return the video ID when an extraction targets exactly one video."""
+    video_id = get_youtube_video_id(url)
+    if video_id is None:
+        return None
+
+    has_playlist = "list" in parse_qs(urlparse(url).query)
+    if has_playlist and not overrides.get("noplaylist"):
+        return None
+    return video_id
+
+
+def get_cacheable_video_id(url: str, overrides: dict) -> str | None:
+    """Return the cache key for single-video extractions, or None to bypass."""
+    if set(overrides) - CACHEABLE_OVERRIDES:
+        return None
+    return get_single_video_id(url, overrides)
+
+
+def raise_if_known_unavailable(video_id: str | None, *, interactive: bool = False):
+    """Fail fast for videos recorded in the negative cache.
+
+    Interactive requests only fail fast for permanent failures: a user asking
+    for a video again is worth one more try after a transient error.
+    """
+    if video_id is None:
+        return
+
+    entry = negative_cache.get(video_id)
+    if entry is None or (interactive and entry.kind != PERMANENT):
+        return
+
+    negative_cache.skips += 1
+    raise UnavailableVideoError(
+        f"Skipped known {entry.kind} failure for {video_id}: {entry.reason}",
+        category=entry.kind,
+    )
+
+
+def record_extraction_failure(video_id: str | None, exc: Exception):
+    """Store a failed single-video extraction in the negative cache."""
+    category = getattr(exc, "category", TRANSIENT)
+    if video_id is None or category not in (PERMANENT, TRANSIENT):
+        return
+
+    entry = negative_cache.record(video_id, category, str(exc))
+    logger.info(
+        "Negative-cached %s as %s for %.0fs",
+        video_id,
+        category,
+        entry.expires_at - negative_cache.clock(),
     )
 
 
+async def extract_info_async(
+    url: str, *, priority: int = INTERACTIVE, **overrides
+) -> dict:
+    """Run yt-dlp extraction in the executor used by the Discord bot.
+
+    Single-video extractions are served from ``extraction_cache`` while the
+    signed stream URL is still valid, and fail fast while the video is in
+    ``negative_cache``. Everything else must be admitted by
+    ``extraction_breaker``, which sheds ``BACKGROUND`` work first, and then
+    waits for a slot from ``extraction_scheduler`` in ``priority`` order.
+    """
+    background = priority == BACKGROUND
+    single_video_id = get_single_video_id(url, overrides)
+    raise_if_known_unavailable(single_video_id, interactive=priority == INTERACTIVE)
+
+    video_id = get_cacheable_video_id(url, overrides)
+    if video_id is not None:
+        cached = extraction_cache.get_stream(video_id)
+        if cached is not None:
+            return cached
+
+    is_probe = extraction_breaker.acquire(background=background)
+    options = dict(overrides)
+    if extraction_breaker.state != CLOSED:
+        options.update(DEGRADED_RETRY_OVERRIDES)
+
+    loop = asyncio.get_running_loop()
+    try:
+        with tracer.span("extract_info", url=url, priority=priority) as span:
+            async with extraction_scheduler.slot(priority):
+                span.set(slot_granted_at=time.time())
+                with extraction_activity.track(background=background):
+                    # Carry the current span into the worker thread.
+                    context = contextvars.copy_context()
+                    data = await loop.run_in_executor(
+                        extraction_scheduler.get_executor(),
+                        lambda: context.run(extract_info_with_fallback, url, **options),
+                    )
+    except ExtractionError as exc:
+        extraction_breaker.record_failure(exc.category)
+        record_extraction_failure(single_video_id, exc)
+        raise
+    finally:
+        extraction_breaker.release(is_probe)
+
+    extraction_breaker.record_success()
+    if single_video_id is not None:
+        negative_cache.forget(single_video_id)
+    if video_id is not None and "entries" not in data:
+        extraction_cache.store(video_id, data)
+    return data
+
+
+async def prewarm_youtube_dl():
+    """Import yt-dlp and its extractors on a worker thread."""
+    try:
+        await asyncio.to_thread(youtube_dl.load)
+    except Exception as exc:
+        logger.warning("Failed to pre-load yt-dlp: %s", exc)
+
+
+def get_youtube_video_id(url: str) -> str | None:
+    """Return the video ID of a complete YouTube video URL, or None."""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+
+    if parsed.scheme not in ("http", "https"):
+        return None
+
+    host = (parsed.hostname or "").lower()
+    if host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/", 1)[0]
+    elif host in YOUTUBE_HOSTS:
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [""])[0]
+        elif parsed.path.startswith(("/shorts/", "/live/")):
+            candidate = parsed.path.split("/")[2]
+        else:
+            return None
+    else:
+        return None
+
+    if YOUTUBE_VIDEO_ID_PATTERN.match(candidate):
+        return candidate
+    return None
+
+
 def get_first_available_entry(data: dict) -> dict:
     """Return the first playable entry when yt-dlp returns playlist-like data."""
     entries = [entry for entry in data.get("entries", []) if entry]
@@ -142,14 +383,22 @@ def build_ffmpeg_headers_option(http_headers: dict | None) -> str:
 
 
 def create_ffmpeg_source(
-    stream_url: str, http_headers: dict | None = None
+    stream_url: str, http_headers: dict | None = None, *, start_offset: float = 0.0
 ) -> discord.FFmpegPCMAudio:
-    """Create the FFmpeg audio source, forwarding yt-dlp's request headers."""
+    """Create the FFmpeg audio source, forwarding yt-dlp's request headers.
+
+    ``start_offset`` seeks into the stream, for resuming a track.
+    """
     options = dict(ffmpeg_options)
     headers_option = build_ffmpeg_headers_option(http_headers)
     if headers_option:
         options["before_options"] = f"{headers_option} {options['before_options']}"
-    return discord.FFmpegPCMAudio(stream_url, **options)
+    if start_offset > 0:
+        options["before_options"] = (
+            f"-ss {start_offset:.2f} {options['before_options']}"
+        )
+    with tracer.span("create_ffmpeg_source"):
+        return discord.FFmpegPCMAudio(stream_url, **options)
 
 
 class YTDLSource(  # pylint: disable=too-many-instance-attributes
@@ -169,10 +418,40 @@ class YTDLSource(  # pylint: disable=too-many-instance-attributes
 
         self.title = data.get("title", "Unknown Title")
         self.url = data.get("webpage_url", data.get("original_url", ""))
+        self.video_id = data.get("id")
         self._retries = 0
         self.lazy_entry = lazy_entry
         self.is_lazy = lazy_entry is not None
         self.message_sent = False
+        self.start_offset = 0.0
+        self.frames_read = 0
+
+    def read(self) -> bytes:
+        """Read one 20 ms frame and count it toward the playback position."""
+        self.frames_read += 1
+        return super().read()
+
+    @property
+    def position(self) -> float:
+        """Return seconds into the track, including a resume offset."""
+        return self.start_offset + self.frames_read * FRAME_SECONDS
+
+    def to_record(self) -> dict:
+        """Return the compact, JSON-serializable form stored for a queued track."""
+        url = get_entry_url(self.lazy_entry) if self.lazy_entry else None
+        return {"id": self.video_id, "title": self.title, "url": url or self.url}
+
+    @classmethod
+    def from_record(cls, record: dict, *, start_offset: float = 0.0):
+        """Rebuild a lazy player from a stored track record."""
+        entry = {
+            "id": record.get("id"),
+            "title": record.get("title", "Unknown Title"),
+            "webpage_url": record.get("url"),
+        }
+        player = cls(None, data=entry, lazy_entry=entry)
+        player.start_offset = start_offset
+        return player
 
     @classmethod
     async def from_url(cls, url: str):
@@ -190,7 +469,7 @@ class YTDLSource(  # pylint: disable=too-many-instance-attributes
         )
         return cls(source, data=data)
 
-    async def get_actual_source(self):
+    async def get_actual_source(self, *, priority: int = NEXT_UP):
         """If this is a lazy player, fetch the actual source now."""
         if not self.is_lazy:
             return self
@@ -200,14 +479,17 @@ class YTDLSource(  # pylint: disable=too-many-instance-attributes
             if not entry_url:
                 raise RuntimeError("No URL found in lazy entry")
 
-            data = await extract_info_async(entry_url)
+            data = await extract_info_async(entry_url, priority=priority)
+            options = {"start_offset": self.start_offset} if self.start_offset else {}
             actual_source = create_ffmpeg_source(
-                require_stream_url(data), data.get("http_headers")
+                require_stream_url(data), data.get("http_headers"), **options
             )
             self.original = actual_source
             self.source = actual_source
             self.is_lazy = False
             return self
+        except BreakerOpenError:
+            raise
         except Exception as exc:
             raise RuntimeError(f"Failed to load lazy entry: {exc}") from exc
 
@@ -254,6 +536,26 @@ def get_playlist_entries(playlist_info: dict) -> list[dict]:
     return [entry for entry in playlist_info.get("entries", []) if entry]
 
 
+def get_known_unavailable_reason(entry: dict) -> str | None:
+    """Return why a playlist entry is known to be permanently unplayable."""
+    video_id = entry.get("id")
+    flat_reason = describe_unavailable_flat_entry(entry)
+    if flat_reason is not None:
+        if video_id:
+            negative_cache.record(video_id, PERMANENT, flat_reason)
+        return flat_reason
+
+    if not video_id:
+        return None
+
+    cached = negative_cache.get(video_id)
+    if cached is None or cached.kind != PERMANENT:
+        return None
+
+    negative_cache.skips += 1
+    return cached.reason
+
+
 def get_playlist_entry_url(entry: dict) -> str | None:
     """Normalize a playlist entry into a direct YouTube watch URL when possible."""
     video_url = entry.get("url") or entry.get("webpage_url")
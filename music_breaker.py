@@ -0,0 +1,215 @@
+"""Process-wide circuit breaker for YouTube rate limiting and bot checks."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+
+from music_cache import RATE_LIMITED
+from music_metrics import breaker_shed
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+BREAKER_STATES = (CLOSED, HALF_OPEN, OPEN)
+
+
+class BreakerOpenError(RuntimeError):
+    """Extraction was refused because YouTube is currently rate limiting us."""
+
+    category = RATE_LIMITED
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            "YouTube is rate limiting the bot right now. "
+            f"Please try again in {max(1, round(retry_after))} s."
+        )
+        self.retry_after = retry_after
+
+
+class ExtractionCircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """Stop hammering YouTube once it starts returning 429s or bot checks.
+
+    Closed: everything runs; ``failure_threshold`` rate-limit failures within
+    ``failure_window`` seconds open the breaker.
+
+    Open: background work is shed outright. User-facing extractions trickle
+    through one at a time, spaced by ``trickle_interval`` which doubles on
+    every rate-limited trickle. After the cooldown (which doubles on every
+    consecutive trip up to ``max_cooldown``) the breaker half-opens.
+
+    Half-open: at most ``max_probes`` extractions run concurrently as probes;
+    ``probe_successes`` successes close the breaker, a rate-limited probe
+    opens it again.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 3,
+        failure_window: float = 60.0,
+        base_cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+        trickle_interval: float = 5.0,
+        max_probes: int = 1,
+        probe_successes: int = 2,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.failure_window = failure_window
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.base_trickle_interval = trickle_interval
+        self.max_probes = max_probes
+        self.probe_successes = probe_successes
+        self.clock = clock
+        self.state = CLOSED
+        self.recent_failures: deque[float] = deque()
+        self.trips = 0
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.trickle_interval = trickle_interval
+        self.next_trickle_at = 0.0
+        self.probes_in_flight = 0
+        self.successful_probes = 0
+        self.shed_count = 0
+
+    def transition(self, new_state: str):
+        """Move to a new state and log it for operators."""
+        if new_state == self.state:
+            return
+
+        logger.warning(
+            "Extraction circuit breaker %s -> %s (trips=%s, cooldown=%.0fs)",
+            self.state,
+            new_state,
+            self.trips,
+            self.cooldown,
+        )
+        self.state = new_state
+
+    def open(self):
+        """Open the breaker with an exponentially growing cooldown."""
+        self.trips += 1
+        self.cooldown = min(
+            self.base_cooldown * (2 ** (self.trips - 1)), self.max_cooldown
+        )
+        self.opened_at = self.clock()
+        self.trickle_interval = self.base_trickle_interval
+        self.next_trickle_at = self.opened_at + self.trickle_interval
+        self.successful_probes = 0
+        self.transition(OPEN)
+
+    def refresh(self):
+        """Half-open the breaker once its cooldown has elapsed."""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown:
+            self.successful_probes = 0
+            self.transition(HALF_OPEN)
+
+    def retry_after(self) -> float:
+        """Return the seconds until a user request may be attempted again."""
+        now = self.clock()
+        if self.state == OPEN:
+            return max(
+                0.0,
+                min(self.next_trickle_at, self.opened_at + self.cooldown) - now,
+            )
+        return 1.0
+
+    def acquire(self, *, background: bool = False) -> bool:
+        """Admit one extraction or raise BreakerOpenError.
+
+        Returns True when the extraction is a half-open probe, which the
+        caller must hand back to ``release()`` when it finishes.
+        """
+        self.refresh()
+        if self.state == CLOSED:
+            return False
+
+        if background:
+            self.shed("background")
+
+        if self.state == HALF_OPEN:
+            if self.probes_in_flight >= self.max_probes:
+                self.shed("interactive")
+            self.probes_in_flight += 1
+            return True
+
+        now = self.clock()
+        if now < self.next_trickle_at:
+            self.shed("interactive")
+
+        self.next_trickle_at = now + self.trickle_interval
+        return False
+
+    def shed(self, kind: str):
+        """Count a refused extraction and raise BreakerOpenError for it."""
+        self.shed_count += 1
+        breaker_shed.inc(kind)
+        raise BreakerOpenError(self.retry_after())
+
+    def release(self, is_probe: bool):
+        """Return a half-open probe slot."""
+        if is_probe and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def record_success(self):
+        """Count a successful extraction."""
+        if self.state == HALF_OPEN:
+            self.successful_probes += 1
+            if self.successful_probes >= self.probe_successes:
+                self.trips = 0
+                self.cooldown = 0.0
+                self.recent_failures.clear()
+                self.transition(CLOSED)
+        elif self.state == OPEN:
+            # A trickled request got through, so the block is lifting.
+            self.successful_probes = 0
+            self.transition(HALF_OPEN)
+
+    def record_failure(self, category: str):
+        """Count a failed extraction; only rate-limit failures affect state."""
+        if category != RATE_LIMITED:
+            return
+
+        now = self.clock()
+        if self.state == HALF_OPEN:
+            self.open()
+            return
+
+        if self.state == OPEN:
+            self.trickle_interval = min(self.trickle_interval * 2, self.max_cooldown)
+            self.next_trickle_at = now + self.trickle_interval
+            return
+
+        self.recent_failures.append(now)
+        while (
+            self.recent_failures and now - self.recent_failures[0] > self.failure_window
+        ):
+            self.recent_failures.popleft()
+        if len(self.recent_failures) >= self.failure_threshold:
+            self.recent_failures.clear()
+            self.open()
+
+    def allows_background(self) -> bool:
+        """Return True when background extractions would be admitted."""
+        self.refresh()
+        return self.state == CLOSED
+
+    def snapshot(self) -> dict:
+        """Return the breaker state for logs, commands, and metrics."""
+        self.refresh()
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "cooldown": self.cooldown,
+            "retry_after": self.retry_after() if self.state != CLOSED else 0.0,
+            "trickle_interval": self.trickle_interval,
+            "probes_in_flight": self.probes_in_flight,
+            "recent_failures": len(self.recent_failures),
+            "shed": self.shed_count,
+        }
@@ -0,0 +1,214 @@
+"""Bulk /add: queue many URLs from one command with parallel extraction."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import discord
+
+from music_audio import (
+    YTDLSource,
+    create_player_from_entry,
+    extract_info_async,
+    get_first_available_entry,
+)
+from music_history import is_url_like
+from music_metrics import first_audio_seconds, skipped_entries
+from music_scheduler import INTERACTIVE, NEXT_UP
+from music_tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTACHMENT_BYTES = 64 * 1024
+MAX_LISTED_FAILURES = 5
+
+
+class BulkRequestError(ValueError):
+    """A bulk /add request that cannot be processed; the message is for users."""
+
+
+def split_urls(text: str) -> list[str]:
+    """Return the URLs in ``text``, one per whitespace-separated token.
+
+    Blank lines and lines starting with ``#`` are skipped, so a saved list
+    can carry comments.
+    """
+    return [
+        token
+        for line in text.splitlines()
+        if not line.lstrip().startswith("#")
+        for token in line.split()
+    ]
+
+
+def build_bulk_summary(
+    queued_count: int, total: int, failures: list[tuple[str, str]], stop_reason=None
+) -> str:
+    """Build the one reply that answers a bulk /add."""
+    lines = [f"Added **{queued_count}** of {total} songs to the queue."]
+    if stop_reason == "full":
+        lines.append("The queue is full, so the rest were not added.")
+    elif stop_reason == "memory":
+        lines.append("The bot is low on memory, so the rest were not added.")
+    if failures:
+        lines.append(f"Skipped {len(failures)}:")
+        lines.extend(
+            f"- <{url}>: {reason}" for url, reason in failures[:MAX_LISTED_FAILURES]
+        )
+        if len(failures) > MAX_LISTED_FAILURES:
+            lines.append(f"- ...and {len(failures) - MAX_LISTED_FAILURES} more")
+    return "\n".join(lines)
+
+
+class BulkAdder:
+    """Queue many URLs at once, extracting them in parallel.
+
+    At most ``concurrency`` extractions of one request run at a time, so a
+    long list cannot take every ``extraction_scheduler`` slot from other
+    guilds. Only the first URL, the one that may start playback, extracts
+    at ``INTERACTIVE`` priority; the rest go ``NEXT_UP``. URLs beyond the
+    queue's free space are not extracted at all. Tracks are appended in the
+    order given, in one message to the guild's actor, whichever extraction
+    finished first.
+    """
+
+    def __init__(self, service, *, concurrency: int = 4, max_urls: int = 50):
+        self.service = service
+        self.state = service.state
+        self.actors = service.actors
+        self.concurrency = concurrency
+        self.max_urls = max_urls
+
+    async def collect_urls(
+        self, text: str, attachment: discord.Attachment | None = None
+    ) -> list[str]:
+        """Return the URLs of a request, raising BulkRequestError when invalid."""
+        urls = split_urls(text)
+        if attachment is not None:
+            if attachment.size > MAX_ATTACHMENT_BYTES:
+                raise BulkRequestError(
+                    f"The attached list is too large (max {MAX_ATTACHMENT_BYTES // 1024}"
+                    " KiB)."
+                )
+            data = await attachment.read()
+            urls += split_urls(data.decode("utf-8", errors="replace"))
+        if not urls:
+            raise BulkRequestError("Give at least one URL, or attach a list of URLs.")
+        if len(urls) > self.max_urls:
+            raise BulkRequestError(
+                f"Too many URLs ({len(urls)}); add at most {self.max_urls} at once."
+            )
+        not_urls = [url for url in urls if not is_url_like(url)]
+        if not_urls:
+            raise BulkRequestError(
+                f"Bulk add only takes URLs, but got `{not_urls[0][:100]}`."
+            )
+        return urls
+
+    @staticmethod
+    def is_bulk(text: str, attachment: discord.Attachment | None) -> bool:
+        """Return True when a /add request lists several URLs or attaches some."""
+        tokens = split_urls(text)
+        return attachment is not None or (
+            len(tokens) > 1 and all(is_url_like(token) for token in tokens)
+        )
+
+    async def load_player(
+        self, url: str, slots: asyncio.Semaphore, priority: int = INTERACTIVE
+    ) -> YTDLSource:
+        """Extract one URL's first track and wrap it in a lazy player.
+
+        The extraction fills ``extraction_cache``, so the lazy player resolves
+        without another extraction when it is played.
+        """
+        async with slots:
+            info = await extract_info_async(
+                url, priority=priority, noplaylist=True, playlist_items="1"
+            )
+        if "entries" in info:
+            info = get_first_available_entry(info)
+        return await create_player_from_entry(info, use_entry_method=True, lazy=True)
+
+    def append_players(
+        self, guild_id: int, players: list[YTDLSource]
+    ) -> tuple[int, str | None]:
+        """Append players in order; returns the count and why it stopped early."""
+        queue = self.state.get_queue(guild_id)
+        memory = self.service.memory
+        queued = 0
+        stop_reason = None
+        for player in players:
+            if len(queue) >= self.state.max_queue_size:
+                stop_reason = "full"
+                break
+            if memory is not None and not memory.admit(guild_id):
+                stop_reason = "memory"
+                break
+            queue.append(player)
+            queued += 1
+        if queued:
+            self.service.waits.wake_queue_wait(guild_id)
+        return queued, stop_reason
+
+    async def load_players(
+        self, urls: list[str]
+    ) -> tuple[list[YTDLSource], list[tuple[str, str]]]:
+        """Extract ``urls`` concurrently; returns the players and the failures."""
+        slots = asyncio.Semaphore(self.concurrency)
+        with tracer.span("bulk_extract", urls=len(urls)) as span:
+            results = await asyncio.gather(
+                *(
+                    self.load_player(url, slots, INTERACTIVE if index == 0 else NEXT_UP)
+                    for index, url in enumerate(urls)
+                ),
+                return_exceptions=True,
+            )
+            players = [result for result in results if isinstance(result, YTDLSource)]
+            failures = [
+                (url, str(result))
+                for url, result in zip(urls, results)
+                if isinstance(result, Exception)
+            ]
+            span.set(loaded=len(players), failed=len(failures))
+
+        for url, reason in failures:
+            skipped_entries.inc("failed")
+            logger.warning("Skipped %s in bulk add: %s", url, reason)
+        return players, failures
+
+    async def add_urls(self, interaction: discord.Interaction, urls: list[str]):
+        """Extract what fits in the queue, queue it in order, and reply once."""
+        requested_at = time.perf_counter()
+        guild_id = interaction.guild.id
+        text_channel_id = interaction.channel.id
+        self.state.remember_text_channel(guild_id, text_channel_id)
+        free = self.state.max_queue_size - len(self.state.get_queue(guild_id))
+        overflow = "full" if len(urls) > free else None
+
+        players, failures = await self.load_players(urls[: max(free, 0)])
+
+        queued_count, stop_reason = 0, overflow
+        if players:
+            queued_count, stop_reason = await self.actors.ask(
+                guild_id, "add", self.append_players, guild_id, players
+            )
+            stop_reason = stop_reason or overflow
+            if queued_count and await self.actors.ask(
+                guild_id,
+                "play",
+                self.service.start_if_idle,
+                interaction.guild,
+                text_channel_id,
+            ):
+                first_audio_seconds.observe(time.perf_counter() - requested_at)
+
+        logger.info(
+            "Bulk added %s of %s URLs in guild %s.", queued_count, len(urls), guild_id
+        )
+        with tracer.span("followup"):
+            await interaction.followup.send(
+                build_bulk_summary(queued_count, len(urls), failures, stop_reason),
+                ephemeral=True,
+            )
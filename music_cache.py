@@ -0,0 +1,319 @@
+"""In-process caches for yt-dlp extraction results."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlparse
+
+CACHED_INFO_KEYS = (
+    "id",
+    "title",
+    "webpage_url",
+    "original_url",
+    "url",
+    "http_headers",
+    "duration",
+    "uploader",
+)
+METADATA_KEYS = ("id", "title", "webpage_url", "duration", "uploader")
+
+PERMANENT = "permanent"
+TRANSIENT = "transient"
+RATE_LIMITED = "rate_limited"
+
+RATE_LIMIT_SIGNATURES = (
+    "http error 429",
+    "too many requests",
+    "confirm you're not a bot",
+    "confirm you\u2019re not a bot",
+    "rate-limited",
+    # "Video unavailable. This content isn't available, try again later." is
+    # YouTube throttling, not a removed video; these are checked first.
+    "content isn't available",
+    "content isn\u2019t available",
+    "try again later",
+)
+# Failures that no other YouTube client can work around.
+FINAL_UNAVAILABLE_SIGNATURES = (
+    "private video",
+    "video has been removed",
+    "video is no longer available",
+    "has been terminated",
+    "copyright claim",
+    "does not exist",
+)
+PERMANENT_SIGNATURES = FINAL_UNAVAILABLE_SIGNATURES + (
+    "video unavailable",
+    "sign in to confirm your age",
+    "age-restricted",
+    "inappropriate for some users",
+    "available in your country",
+    "blocked it in your country",
+    "geo restriction",
+    "members-only",
+    "join this channel",
+)
+UNAVAILABLE_FLAT_TITLES = frozenset({"[private video]", "[deleted video]"})
+UNAVAILABLE_AVAILABILITY = frozenset(
+    {"private", "needs_auth", "subscriber_only", "premium_only"}
+)
+
+
+def classify_extraction_error(message: str) -> str:
+    """Classify a yt-dlp error message as permanent, rate limited or transient."""
+    lowered = message.lower()
+    if any(signature in lowered for signature in RATE_LIMIT_SIGNATURES):
+        return RATE_LIMITED
+    if any(signature in lowered for signature in PERMANENT_SIGNATURES):
+        return PERMANENT
+    return TRANSIENT
+
+
+def is_final_unavailable_error(message: str) -> bool:
+    """Return True when retrying with another client cannot help."""
+    lowered = message.lower()
+    return any(signature in lowered for signature in FINAL_UNAVAILABLE_SIGNATURES)
+
+
+def describe_unavailable_flat_entry(entry: dict) -> str | None:
+    """Return why a flat playlist entry is known to be unplayable, if it is."""
+    title = (entry.get("title") or "").strip().lower()
+    if title in UNAVAILABLE_FLAT_TITLES:
+        return entry["title"].strip()
+
+    availability = entry.get("availability")
+    if availability in UNAVAILABLE_AVAILABILITY:
+        return f"availability: {availability}"
+    return None
+
+
+def get_stream_expiry(stream_url: str | None) -> float | None:
+    """Return the epoch expiry encoded in a YouTube stream URL, if present."""
+    if not stream_url:
+        return None
+
+    try:
+        expire = parse_qs(urlparse(stream_url).query).get("expire")
+        return float(expire[0]) if expire else None
+    except (ValueError, TypeError):
+        return None
+
+
+class ExtractionCache:  # pylint: disable=too-many-instance-attributes
+    """Two-layer LRU cache of extracted video info keyed by video ID.
+
+    The metadata layer keeps titles and page URLs for a long time. The stream
+    layer keeps playable stream URLs and headers only until shortly before
+    YouTube's signed ``expire`` timestamp, or ``stream_ttl`` when none is set.
+    Only a small whitelist of info keys is stored, never the full format list.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2000,
+        metadata_ttl: float = 24 * 3600,
+        stream_ttl: float = 4 * 3600,
+        expiry_margin: float = 300,
+        clock=time.time,
+    ):
+        self.max_entries = max_entries
+        self.metadata_ttl = metadata_ttl
+        self.stream_ttl = stream_ttl
+        self.expiry_margin = expiry_margin
+        self.clock = clock
+        self.metadata: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self.streams: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.warmed_keys: set[str] = set()
+        self.warm_hits = 0
+
+    @staticmethod
+    def lookup(layer: OrderedDict, key: str, now: float) -> dict | None:
+        """Return a fresh entry from one layer, evicting it when expired."""
+        cached = layer.get(key)
+        if cached is None:
+            return None
+
+        info, expires_at = cached
+        if now >= expires_at:
+            del layer[key]
+            return None
+
+        layer.move_to_end(key)
+        return info
+
+    def get_stream(self, video_id: str) -> dict | None:
+        """Return a copy of playable cached info and count the hit or miss."""
+        info = self.lookup(self.streams, video_id, self.clock())
+        if info is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if video_id in self.warmed_keys:
+            # Count each warmed entry once, so warm hits never exceed warms.
+            self.warmed_keys.discard(video_id)
+            self.warm_hits += 1
+        return dict(info)
+
+    def has_stream(self, video_id: str) -> bool:
+        """Return True when a fresh stream entry exists, without counting stats."""
+        return self.lookup(self.streams, video_id, self.clock()) is not None
+
+    def get_metadata(self, video_id: str) -> dict | None:
+        """Return a copy of cached metadata for a video, if still fresh."""
+        info = self.lookup(self.metadata, video_id, self.clock())
+        return dict(info) if info is not None else None
+
+    def store(self, video_id: str, info: dict):
+        """Cache one single-video extraction result in both layers."""
+        now = self.clock()
+        metadata = {key: info[key] for key in METADATA_KEYS if key in info}
+        self.put(self.metadata, video_id, metadata, now + self.metadata_ttl)
+
+        if info.get("url"):
+            expires_at = now + self.stream_ttl
+            signed_expiry = get_stream_expiry(info["url"])
+            if signed_expiry is not None:
+                expires_at = min(expires_at, signed_expiry - self.expiry_margin)
+            if expires_at > now:
+                trimmed = {key: info[key] for key in CACHED_INFO_KEYS if key in info}
+                self.put(self.streams, video_id, trimmed, expires_at)
+
+    def mark_warmed(self, video_id: str):
+        """Remember a stream entry the startup warmer filled, until its first hit."""
+        if video_id in self.streams:
+            self.warmed_keys.add(video_id)
+
+    def put(self, layer: OrderedDict, key: str, value: dict, expires_at: float):
+        """Insert into one layer and evict least recently used entries."""
+        layer[key] = (value, expires_at)
+        layer.move_to_end(key)
+        while len(layer) > self.max_entries:
+            evicted, _ = layer.popitem(last=False)
+            if layer is self.streams:
+                self.warmed_keys.discard(evicted)
+
+    def export_streams(self, video_ids) -> dict[str, dict]:
+        """Return fresh stream entries and their expiry for a session snapshot."""
+        now = self.clock()
+        streams = {}
+        for video_id in video_ids:
+            cached = self.streams.get(video_id)
+            if cached is not None and cached[1] > now:
+                info, expires_at = cached
+                streams[video_id] = {"info": info, "expires_at": expires_at}
+        return streams
+
+    def import_streams(self, streams: dict[str, dict]) -> int:
+        """Reload snapshot stream entries that have not expired since."""
+        now = self.clock()
+        imported = 0
+        for video_id, saved in streams.items():
+            if saved.get("expires_at", 0) > now and saved.get("info", {}).get("url"):
+                self.put(
+                    self.streams, video_id, dict(saved["info"]), saved["expires_at"]
+                )
+                imported += 1
+        return imported
+
+    def invalidate(self, video_id: str):
+        """Drop a cached stream, e.g. after FFmpeg failed to open it."""
+        self.streams.pop(video_id, None)
+        self.warmed_keys.discard(video_id)
+
+    def stats(self) -> dict:
+        """Return counters for logging and reporting."""
+        lookups = self.hits + self.misses
+        return {
+            "streams": len(self.streams),
+            "metadata": len(self.metadata),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "warmed": len(self.warmed_keys),
+            "warm_hits": self.warm_hits,
+        }
+
+
+@dataclass
+class NegativeEntry:
+    """Why and until when a video ID should not be extracted again."""
+
+    kind: str
+    reason: str
+    expires_at: float
+    failures: int = 1
+
+
+class NegativeCache:
+    """Remember videos that failed extraction so they are skipped instantly.
+
+    Permanent failures (private, deleted, age or region restricted) are kept
+    for ``permanent_ttl``. Transient failures back off exponentially from
+    ``transient_ttl`` up to ``max_transient_ttl`` on repeated failures.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        permanent_ttl: float = 24 * 3600,
+        transient_ttl: float = 60,
+        max_transient_ttl: float = 900,
+        max_entries: int = 5000,
+        clock=time.time,
+    ):
+        self.permanent_ttl = permanent_ttl
+        self.transient_ttl = transient_ttl
+        self.max_transient_ttl = max_transient_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.entries: OrderedDict[str, NegativeEntry] = OrderedDict()
+        self.skips = 0
+
+    def get(self, video_id: str) -> NegativeEntry | None:
+        """Return the live negative entry for a video, if any."""
+        entry = self.entries.get(video_id)
+        if entry is None or self.clock() < entry.expires_at:
+            return entry
+
+        # Expired transient entries stay behind so repeated failures keep
+        # backing off; expired permanent entries are simply forgotten.
+        if entry.kind == PERMANENT:
+            del self.entries[video_id]
+        return None
+
+    def record(self, video_id: str, kind: str, reason: str) -> NegativeEntry:
+        """Record one failed extraction for a video."""
+        previous = self.entries.pop(video_id, None)
+        if kind == PERMANENT:
+            entry = NegativeEntry(kind, reason, self.clock() + self.permanent_ttl)
+        else:
+            failures = previous.failures + 1 if previous is not None else 1
+            ttl = min(
+                self.transient_ttl * (2 ** (failures - 1)), self.max_transient_ttl
+            )
+            entry = NegativeEntry(kind, reason, self.clock() + ttl, failures)
+
+        self.entries[video_id] = entry
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def forget(self, video_id: str):
+        """Drop the negative entry after a successful extraction."""
+        self.entries.pop(video_id, None)
+
+    def stats(self) -> dict:
+        """Return counters for logging and reporting."""
+        permanent = sum(1 for entry in self.entries.values() if entry.kind == PERMANENT)
+        return {
+            "permanent": permanent,
+            "transient": len(self.entries) - permanent,
+            "skips": self.skips,
+        }
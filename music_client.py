@@ -0,0 +1,53 @@
+"""Discord client construction options, including a low-memory profile."""
+
+from __future__ import annotations
+
+import discord
+
+CLIENT_PROFILES = ("default", "lean")
+
+
+def build_intents(profile: str, *, message_events: bool = True) -> discord.Intents:
+    """Return the gateway intents for a client profile.
+
+    ``default`` keeps the historical intents. ``lean`` subscribes only to
+    what slash commands and voice need: guilds and voice states, plus guild
+    message events (without their content) when ``message_events`` is set
+    for the now-playing panel's scroll tracking.
+    """
+    if profile == "lean":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.voice_states = True
+        intents.guild_messages = message_events
+        return intents
+
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.voice_states = True
+    return intents
+
+
+def client_options(profile: str, *, message_events: bool = True) -> dict:
+    """Return keyword arguments for ``discord.Client`` under ``profile``.
+
+    The ``lean`` profile also disables the message cache, caches only
+    members who are in a voice channel (what ``is_bot_alone_in_channel``
+    reads), and never requests member chunks at startup.
+    """
+    if profile not in CLIENT_PROFILES:
+        raise ValueError(
+            f"Unknown client profile {profile!r}; expected one of "
+            f"{', '.join(CLIENT_PROFILES)}."
+        )
+
+    options = {"intents": build_intents(profile, message_events=message_events)}
+    if profile == "lean":
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        options.update(
+            max_messages=None,
+            member_cache_flags=member_cache_flags,
+            chunk_guilds_at_startup=False,
+        )
+    return options
@@ -0,0 +1,90 @@
+"""Queue and voice commands, each run as a message to the guild's actor."""
+
+from __future__ import annotations
+
+import random
+
+import discord
+
+from music_audio import YTDLSource
+from music_metrics import disconnects
+
+
+class QueueControls:
+    """Carry out the queue commands users issue against a guild.
+
+    Every command is told to the guild's actor, so it applies to the queue
+    and voice client exactly as the commands before it left them. Nothing
+    here waits for the actor: it may be busy extracting the next track for
+    longer than Discord's interaction deadline, so each method decides its
+    answer from the current state and returns at once.
+    """
+
+    def __init__(self, service):
+        self.state = service.state
+        self.actors = service.actors
+
+    def skip(self, guild: discord.Guild) -> bool:
+        """Stop the current track; its ``track_ended`` message plays the next."""
+        voice_client = guild.voice_client
+        if voice_client is None or not voice_client.is_playing():
+            return False
+
+        def stop_current():
+            if guild.voice_client is not None and guild.voice_client.is_playing():
+                guild.voice_client.stop()
+
+        self.actors.tell(guild.id, "skip", stop_current)
+        return True
+
+    def clear_queue(self, guild_id: int):
+        """Empty the queue and stop any background playlist loading."""
+
+        def clear():
+            self.state.get_queue(guild_id).clear()
+            self.state.stop_playlist_loading(guild_id)
+
+        self.actors.tell(guild_id, "clear", clear)
+
+    def shuffle_queue(self, guild_id: int) -> int:
+        """Shuffle the queue in place and return its current length."""
+
+        def shuffle():
+            random.shuffle(self.state.get_queue(guild_id))
+
+        self.actors.tell(guild_id, "shuffle", shuffle)
+        return len(self.state.get_queue(guild_id))
+
+    def remove_from_queue(self, guild_id: int, position: int) -> YTDLSource | None:
+        """Remove the track now at 1-based ``position``; None when out of range.
+
+        The actor removes that track wherever earlier commands moved it.
+        """
+        queue = self.state.get_queue(guild_id)
+        if not 1 <= position <= len(queue):
+            return None
+        player = queue[position - 1]
+
+        def remove():
+            queue = self.state.get_queue(guild_id)
+            for index, queued in enumerate(queue):
+                if queued is player:
+                    del queue[index]
+                    return
+
+        self.actors.tell(guild_id, "remove", remove)
+        return player
+
+    def leave(self, guild: discord.Guild) -> bool:
+        """Disconnect from voice on request; False when not connected."""
+        voice_client = guild.voice_client
+        if voice_client is None or not voice_client.is_connected():
+            return False
+
+        async def disconnect():
+            if guild.voice_client is not None and guild.voice_client.is_connected():
+                await guild.voice_client.disconnect()
+                disconnects.inc("command")
+
+        self.actors.tell(guild.id, "disconnect", disconnect)
+        return True
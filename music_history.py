@@ -0,0 +1,387 @@
+"""Play history with a local prefix/trigram index for search and autocomplete."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+NON_WORD_PATTERN = re.compile(r"[^\w]+")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS tracks (
+        video_id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL,
+        play_count INTEGER NOT NULL DEFAULT 0,
+        last_played REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS searches (
+        query TEXT PRIMARY KEY,
+        video_id TEXT NOT NULL,
+        created REAL NOT NULL
+    )
+    """,
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text and collapse punctuation into single spaces."""
+    return " ".join(NON_WORD_PATTERN.sub(" ", text.lower()).split())
+
+
+def iter_word_trigrams(text: str):
+    """Yield start-anchored trigrams for every word in normalized text."""
+    for word in text.split():
+        padded = f" {word}"
+        for start in range(len(padded) - 2):
+            yield padded[start : start + 3]
+
+
+def is_url_like(query: str) -> bool:
+    """Return True when a /play argument should be treated as a URL."""
+    stripped = query.strip().lower()
+    return stripped.startswith(("http://", "https://", "www."))
+
+
+@dataclass
+class TrackRecord:
+    """One previously played or searched track."""
+
+    video_id: str
+    title: str
+    url: str
+    play_count: int = 0
+    last_played: float = 0.0
+
+
+class TrackHistory:  # pylint: disable=too-many-instance-attributes
+    """Keep track history in SQLite and answer lookups from an in-memory index.
+
+    The database is only opened by ``load()``; until then the history works
+    purely in memory, which keeps imports and tests free of disk writes.
+    Changed rows are only marked dirty and written in one transaction by
+    ``flush()`` or ``run_flusher()``, so a play never commits on the loop.
+    Plays are written as increments rather than totals, so every cluster
+    can share one database without overwriting the others' counts.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        *,
+        search_ttl: float = 7 * 24 * 3600,
+        max_loaded_tracks: int = 10000,
+        clock=time.time,
+    ):
+        self.path = path
+        self.search_ttl = search_ttl
+        self.max_loaded_tracks = max_loaded_tracks
+        self.clock = clock
+        self.connection: sqlite3.Connection | None = None
+        self.tracks: dict[str, TrackRecord] = {}
+        self.normalized_titles: dict[str, str] = {}
+        self.trigrams: dict[str, set[str]] = defaultdict(set)
+        self.searches: dict[str, tuple[str, float]] = {}
+        self.dirty_tracks: set[str] = set()
+        self.dirty_searches: set[str] = set()
+        self.unflushed_plays: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Open the SQLite store and rebuild the in-memory index from it."""
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+
+        rows = self.connection.execute(
+            "SELECT video_id, title, url, play_count, last_played FROM tracks "
+            "ORDER BY play_count DESC, last_played DESC LIMIT ?",
+            (self.max_loaded_tracks,),
+        ).fetchall()
+        for row in rows:
+            self.index_track(TrackRecord(*row))
+
+        cutoff = self.clock() - self.search_ttl
+        for query, video_id, created in self.connection.execute(
+            "SELECT query, video_id, created FROM searches WHERE created >= ?",
+            (cutoff,),
+        ):
+            self.searches[query] = (video_id, created)
+
+        logger.info(
+            "Loaded %s tracks and %s cached searches from %s",
+            len(self.tracks),
+            len(self.searches),
+            self.path,
+        )
+
+    def close(self):
+        """Write pending rows and close the SQLite connection if it is open."""
+        if self.connection is not None:
+            self.flush()
+            with self.lock:
+                self.connection.close()
+                self.connection = None
+
+    def index_track(self, record: TrackRecord):
+        """Insert or refresh one track in the in-memory index."""
+        previous_title = self.normalized_titles.get(record.video_id)
+        normalized = normalize_text(record.title)
+        if previous_title is not None and previous_title != normalized:
+            for gram in iter_word_trigrams(previous_title):
+                self.trigrams[gram].discard(record.video_id)
+
+        self.tracks[record.video_id] = record
+        self.normalized_titles[record.video_id] = normalized
+        for gram in iter_word_trigrams(normalized):
+            self.trigrams[gram].add(record.video_id)
+
+    def persist_track(self, record: TrackRecord):
+        """Mark one track row for the next flush."""
+        if self.connection is not None:
+            self.dirty_tracks.add(record.video_id)
+
+    def pending_rows(self) -> tuple[list[tuple], list[tuple]]:
+        """Return the dirty track and search rows and clear the dirty sets.
+
+        Track rows carry the plays counted since the last flush, not the
+        total.
+        """
+        tracks = [
+            (
+                record.video_id,
+                record.title,
+                record.url,
+                self.unflushed_plays.get(record.video_id, 0),
+                record.last_played,
+            )
+            for record in map(self.tracks.get, self.dirty_tracks)
+            if record is not None
+        ]
+        searches = [
+            (query, *self.searches[query])
+            for query in self.dirty_searches
+            if query in self.searches
+        ]
+        self.dirty_tracks.clear()
+        self.dirty_searches.clear()
+        self.unflushed_plays.clear()
+        return tracks, searches
+
+    def write_rows(self, tracks: list[tuple], searches: list[tuple]) -> bool:
+        """Write rows in one transaction; returns False when it failed."""
+        with self.lock:
+            if self.connection is None:
+                return False
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT INTO tracks "
+                        "(video_id, title, url, play_count, last_played) "
+                        "VALUES (?, ?, ?, ?, ?) ON CONFLICT(video_id) DO UPDATE SET "
+                        "title=excluded.title, url=excluded.url, "
+                        "play_count=play_count + excluded.play_count, "
+                        "last_played=max(last_played, excluded.last_played)",
+                        tracks,
+                    )
+                    self.connection.executemany(
+                        "INSERT INTO searches (query, video_id, created) "
+                        "VALUES (?, ?, ?) ON CONFLICT(query) DO UPDATE SET "
+                        "video_id=excluded.video_id, created=excluded.created "
+                        "WHERE excluded.created >= searches.created",
+                        searches,
+                    )
+            except sqlite3.Error as exc:
+                logger.warning(
+                    "Failed to persist %s tracks and %s searches: %s",
+                    len(tracks),
+                    len(searches),
+                    exc,
+                )
+                return False
+        return True
+
+    def requeue_rows(self, tracks: list[tuple], searches: list[tuple]):
+        """Mark rows of a failed write so the next flush retries them."""
+        for video_id, _, _, plays, _ in tracks:
+            self.dirty_tracks.add(video_id)
+            if plays:
+                self.unflushed_plays[video_id] = (
+                    self.unflushed_plays.get(video_id, 0) + plays
+                )
+        self.dirty_searches.update(row[0] for row in searches)
+
+    def flush(self) -> int:
+        """Write pending rows synchronously and return how many were written."""
+        tracks, searches = self.pending_rows()
+        if not tracks and not searches:
+            return 0
+        if not self.write_rows(tracks, searches):
+            self.requeue_rows(tracks, searches)
+            return 0
+        return len(tracks) + len(searches)
+
+    async def run_flusher(self, interval: float):
+        """Write pending rows every ``interval`` seconds from a worker thread.
+
+        Like the state flusher, a cancelled flusher waits for the write in
+        flight so ``close()`` never writes alongside it.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            tracks, searches = self.pending_rows()
+            if not tracks and not searches:
+                continue
+            write = asyncio.ensure_future(
+                asyncio.to_thread(self.write_rows, tracks, searches)
+            )
+            try:
+                written = await asyncio.shield(write)
+            except asyncio.CancelledError:
+                if not await write:
+                    self.requeue_rows(tracks, searches)
+                raise
+            if not written:
+                self.requeue_rows(tracks, searches)
+
+    def remember_track(self, video_id: str, title: str, url: str) -> TrackRecord:
+        """Add a track to the index without counting a play."""
+        record = self.tracks.get(video_id)
+        if record is None:
+            record = TrackRecord(video_id=video_id, title=title, url=url)
+        else:
+            record.title = title
+            record.url = url
+        self.index_track(record)
+        self.persist_track(record)
+        return record
+
+    def record_play(self, video_id: str, title: str, url: str) -> TrackRecord:
+        """Count one play of a track and refresh its recency."""
+        record = self.tracks.get(video_id)
+        if record is None:
+            record = TrackRecord(video_id=video_id, title=title, url=url)
+        else:
+            record.title = title
+            record.url = url
+        record.play_count += 1
+        record.last_played = self.clock()
+        self.index_track(record)
+        if self.connection is not None:
+            self.unflushed_plays[video_id] = self.unflushed_plays.get(video_id, 0) + 1
+        self.persist_track(record)
+        return record
+
+    def find_candidates(self, normalized_query: str) -> set[str]:
+        """Return video IDs whose titles share every query trigram."""
+        grams = set(iter_word_trigrams(normalized_query))
+        if not grams:
+            return set(self.tracks)
+
+        postings = sorted((self.trigrams.get(gram, set()) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def matches(self, video_id: str, query_words: list[str]) -> bool:
+        """Return True when every query word prefixes some title word."""
+        title_words = self.normalized_titles[video_id].split()
+        return all(
+            any(title_word.startswith(word) for title_word in title_words)
+            for word in query_words
+        )
+
+    def suggest(self, query: str, limit: int = 25) -> list[TrackRecord]:
+        """Return the most played tracks matching a free-text prefix query."""
+        normalized = normalize_text(query)
+        if not normalized:
+            return sorted(
+                self.tracks.values(),
+                key=lambda record: (record.play_count, record.last_played),
+                reverse=True,
+            )[:limit]
+
+        query_words = normalized.split()
+        results = [
+            self.tracks[video_id]
+            for video_id in self.find_candidates(normalized)
+            if self.matches(video_id, query_words)
+        ]
+        results.sort(
+            key=lambda record: (
+                self.normalized_titles[record.video_id].startswith(normalized),
+                record.play_count,
+                record.last_played,
+            ),
+            reverse=True,
+        )
+        return results[:limit]
+
+    def lookup_search(self, query: str) -> TrackRecord | None:
+        """Return a cached ytsearch result for this exact query, if fresh."""
+        cached = self.searches.get(normalize_text(query))
+        if cached is None:
+            return None
+
+        video_id, created = cached
+        if self.clock() - created > self.search_ttl:
+            return None
+        return self.tracks.get(video_id)
+
+    def resolve(self, query: str) -> TrackRecord | None:
+        """Resolve free text to a known track from search cache or history.
+
+        Outside the search cache only an exact title match counts: a query
+        that merely prefixes a played title may mean a different song.
+        """
+        cached = self.lookup_search(query)
+        if cached is not None:
+            return cached
+
+        normalized = normalize_text(query)
+        if not normalized:
+            return None
+        matches = [
+            self.tracks[video_id]
+            for video_id in self.find_candidates(normalized)
+            if self.normalized_titles[video_id] == normalized
+        ]
+        return max(
+            matches,
+            key=lambda record: (record.play_count, record.last_played),
+            default=None,
+        )
+
+    def remember_search(self, query: str, record: TrackRecord):
+        """Cache the track a ytsearch query resolved to."""
+        normalized = normalize_text(query)
+        created = self.clock()
+        self.searches[normalized] = (record.video_id, created)
+        if self.connection is not None:
+            self.dirty_searches.add(normalized)
+
+    def top_tracks(self, limit: int) -> list[TrackRecord]:
+        """Return the most played tracks, most recent first on ties."""
+        ranked = sorted(
+            (record for record in self.tracks.values() if record.play_count > 0),
+            key=lambda record: (record.play_count, record.last_played),
+            reverse=True,
+        )
+        return ranked[:limit]
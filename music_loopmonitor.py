@@ -0,0 +1,188 @@
+"""Event-loop stall detection with stack samples of the blocking code."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+from music_admission import LoopLagSampler
+from music_metrics import loop_stall_seconds, slow_callbacks
+from music_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+ASYNCIO_PATH_MARKER = f"{os.sep}asyncio{os.sep}"
+
+
+@dataclass
+class SlowCallback:
+    """One loop step that held the event loop longer than the threshold."""
+
+    started_at: float
+    duration: float
+    callback: str = "unknown (finished before it could be sampled)"
+    stack: list[str] = field(default_factory=list)
+
+
+def describe_callback(frame) -> str:
+    """Name the callback or coroutine the loop was running on a stack.
+
+    That is the frame right above asyncio's ``Handle._run``, as opposed to
+    the innermost frame, which is usually deep inside a library.
+    """
+    frames = traceback.extract_stack(frame)
+    callback = frames[-1] if frames else None
+    for index, summary in enumerate(frames[:-1]):
+        if summary.name == "_run" and ASYNCIO_PATH_MARKER in summary.filename:
+            callback = frames[index + 1]
+    if callback is None:
+        return "unknown"
+    return f"{callback.name} ({callback.filename}:{callback.lineno})"
+
+
+class LoopMonitor(LoopLagSampler):  # pylint: disable=too-many-instance-attributes
+    """Sample loop lag and catch the code behind every long loop step.
+
+    The lag sampler runs on the loop and stamps a heartbeat every
+    ``interval``. A watchdog thread checks that heartbeat; once it is more
+    than ``slow_threshold`` late, the loop is stuck in one step, so the
+    watchdog grabs the loop thread's stack right then. When the loop comes
+    back, the measured lag closes the event. The most recent ``max_events``
+    stalls are rewritten to ``report_path`` every ``report_interval``
+    seconds.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        interval: float = 0.1,
+        slow_threshold: float = 0.25,
+        report_path: str | None = None,
+        report_interval: float = 60.0,
+        max_events: int = 100,
+        stack_limit: int = 25,
+        clock=time.monotonic,
+        supervisor: TaskSupervisor | None = None,
+    ):
+        super().__init__(interval=interval, supervisor=supervisor)
+        self.slow_threshold = slow_threshold
+        self.report_path = report_path
+        self.report_interval = report_interval
+        self.stack_limit = stack_limit
+        self.clock = clock
+        self.events: deque[SlowCallback] = deque(maxlen=max_events)
+        self.current_stall: SlowCallback | None = None
+        self.heartbeat = clock()
+        self.loop_thread_id: int | None = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.watchdog: threading.Thread | None = None
+
+    def record(self, lag: float):
+        """Fold in a lag sample and close any stall it ends."""
+        super().record(lag)
+        with self.lock:
+            self.heartbeat = self.clock()
+            if lag < self.slow_threshold:
+                self.current_stall = None
+                return
+
+            stall = self.current_stall or SlowCallback(
+                started_at=time.time() - lag, duration=lag
+            )
+            stall.duration = lag
+            self.current_stall = None
+            self.events.append(stall)
+
+        loop_stall_seconds.observe(lag)
+        slow_callbacks.inc()
+        logger.warning(
+            "Event loop blocked for %.3fs by %s", stall.duration, stall.callback
+        )
+
+    def check(self):
+        """Sample the loop thread's stack if the loop is stuck right now."""
+        with self.lock:
+            late_by = self.clock() - self.heartbeat - self.interval
+            if self.current_stall is not None or late_by < self.slow_threshold:
+                return
+
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self.loop_thread_id
+            )
+            if frame is None:
+                return
+
+            self.current_stall = SlowCallback(
+                started_at=time.time() - late_by,
+                duration=late_by,
+                callback=describe_callback(frame),
+                stack=traceback.format_stack(frame)[-self.stack_limit :],
+            )
+
+    def report(self) -> dict:
+        """Return the rolling report of recent stalls."""
+        with self.lock:
+            events = [asdict(event) for event in self.events]
+        return {
+            "generated_at": time.time(),
+            "slow_threshold": self.slow_threshold,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+            "slow_callbacks": events,
+        }
+
+    def write_report(self):
+        """Atomically replace the on-disk report."""
+        if not self.report_path:
+            return
+
+        temporary_path = f"{self.report_path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as report_file:
+                json.dump(self.report(), report_file, indent=2)
+            os.replace(temporary_path, self.report_path)
+        except OSError as exc:
+            logger.warning("Failed to write loop report %s: %s", self.report_path, exc)
+
+    def watch(self):
+        """Watchdog thread body."""
+        next_report = self.clock() + self.report_interval
+        while not self.stop_event.wait(self.interval):
+            self.check()
+            if self.clock() >= next_report:
+                next_report = self.clock() + self.report_interval
+                self.write_report()
+        self.write_report()
+
+    def start(self):
+        """Start the loop-side sampler and the watchdog thread once."""
+        task = super().start()
+        if self.watchdog is None:
+            self.loop_thread_id = threading.get_ident()
+            self.heartbeat = self.clock()
+            self.watchdog = threading.Thread(
+                target=self.watch, name="loop-watchdog", daemon=True
+            )
+            self.watchdog.start()
+        return task
+
+    def stop(self):
+        """Stop the watchdog and write a final report.
+
+        Joining the watchdog blocks, so callers on the loop should run this
+        in a worker thread; the sampler is cancelled on its own loop.
+        """
+        self.stop_event.set()
+        if self.task is not None:
+            self.task.get_loop().call_soon_threadsafe(self.task.cancel)
+        if self.watchdog is not None:
+            self.watchdog.join(timeout=1)
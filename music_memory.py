@@ -0,0 +1,260 @@
+"""Per-guild memory accounting, tracemalloc diffs, and a soft memory cap."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from music_state import MusicState
+
+logger = logging.getLogger(__name__)
+
+LAZY_ENTRY_KEYS = frozenset(
+    {"id", "title", "webpage_url", "original_url", "url", "duration"}
+)
+
+
+def deep_sizeof(value, *, max_depth: int = 6, seen: set[int] | None = None) -> int:
+    """Estimate the bytes held by plain containers and scalars."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if max_depth <= 0:
+        return size
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += deep_sizeof(key, max_depth=max_depth - 1, seen=seen)
+            size += deep_sizeof(item, max_depth=max_depth - 1, seen=seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += deep_sizeof(item, max_depth=max_depth - 1, seen=seen)
+    return size
+
+
+def estimate_player_bytes(player) -> int:
+    """Estimate one queued player's footprint, excluding the FFmpeg process."""
+    size = sys.getsizeof(player)
+    attributes = getattr(player, "__dict__", {})
+    for name in ("title", "url", "video_id", "lazy_entry"):
+        size += deep_sizeof(attributes.get(name))
+    return size
+
+
+def compact_lazy_entry(entry: dict) -> dict:
+    """Keep only the fields a lazy player needs to resolve and display."""
+    return {key: value for key, value in entry.items() if key in LAZY_ENTRY_KEYS}
+
+
+def read_rss_bytes() -> int | None:
+    """Return the process resident set size, where the platform exposes it."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def module_of(filename: str) -> str:
+    """Group a traced allocation's file under its top-level module name."""
+    parts = os.path.normpath(filename).split(os.sep)
+    if "site-packages" in parts:
+        return parts[parts.index("site-packages") + 1].removesuffix(".py")
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+class MemoryAccountant:  # pylint: disable=too-many-instance-attributes
+    """Estimate bytes held per guild and enforce a soft cap on queued state.
+
+    Each player's estimate is computed once and cached on the player, so a
+    guild's total is a cheap sum over its queue. Past ``soft_cap_bytes``
+    queued lazy entries are first compacted to the fields playback needs,
+    at most once every ``trim_interval`` seconds since each pass walks every
+    queue; if the total is still over the cap, new enqueues are refused.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        state: MusicState,
+        *,
+        soft_cap_bytes: int = 0,
+        total_ttl: float = 1.0,
+        trim_interval: float = 10.0,
+        clock=time.monotonic,
+    ):
+        self.state = state
+        self.soft_cap_bytes = soft_cap_bytes
+        self.total_ttl = total_ttl
+        self.trim_interval = trim_interval
+        self.clock = clock
+        self.cached_total = 0
+        self.cached_at = float("-inf")
+        self.trimmed_at = float("-inf")
+        self.trims = 0
+        self.refusals = 0
+        self.last_snapshot: tracemalloc.Snapshot | None = None
+
+    @staticmethod
+    def player_bytes(player) -> int:
+        """Return the cached size estimate of a player."""
+        estimate = getattr(player, "estimated_bytes", None)
+        if estimate is None:
+            estimate = estimate_player_bytes(player)
+            try:
+                player.estimated_bytes = estimate
+            except AttributeError:
+                pass
+        return estimate
+
+    def guild_bytes(self, guild_id: int) -> int:
+        """Estimate the bytes one guild holds in queued players."""
+        return sum(
+            self.player_bytes(player) for player in self.state.queues.get(guild_id, ())
+        )
+
+    def usage(self) -> dict[int, int]:
+        """Return estimated bytes per guild with a non-empty queue."""
+        return {
+            guild_id: self.guild_bytes(guild_id)
+            for guild_id, queue in list(self.state.queues.items())
+            if queue
+        }
+
+    def total_bytes(self, *, fresh: bool = False) -> int:
+        """Return the estimated total, recomputed at most every ``total_ttl``."""
+        now = self.clock()
+        if fresh or now - self.cached_at >= self.total_ttl:
+            self.cached_total = sum(self.usage().values())
+            self.cached_at = now
+        return self.cached_total
+
+    def top_guilds(self, limit: int = 10) -> list[tuple[int, int, int]]:
+        """Return (guild_id, bytes, queued tracks) for the largest guilds."""
+        usage = self.usage()
+        return [
+            (guild_id, size, len(self.state.queues[guild_id]))
+            for guild_id, size in Counter(usage).most_common(limit)
+        ]
+
+    def trim(self) -> int:
+        """Compact queued lazy entries and return the bytes saved."""
+        saved = 0
+        for queue in list(self.state.queues.values()):
+            for player in queue:
+                lazy_entry = getattr(player, "lazy_entry", None)
+                if not lazy_entry or set(lazy_entry) <= LAZY_ENTRY_KEYS:
+                    continue
+                before = self.player_bytes(player)
+                player.lazy_entry = compact_lazy_entry(lazy_entry)
+                player.estimated_bytes = estimate_player_bytes(player)
+                saved += before - player.estimated_bytes
+        self.trims += 1
+        logger.warning("Memory soft cap reached, compacted queued entries: %s B", saved)
+        return saved
+
+    def admit(self, guild_id: int) -> bool:
+        """Return False when a new enqueue would grow state past the soft cap."""
+        if self.soft_cap_bytes <= 0 or self.total_bytes() < self.soft_cap_bytes:
+            return True
+
+        now = self.clock()
+        if now - self.trimmed_at >= self.trim_interval:
+            self.trimmed_at = now
+            self.trim()
+            if self.total_bytes(fresh=True) < self.soft_cap_bytes:
+                return True
+
+        self.refusals += 1
+        logger.warning(
+            "Refusing enqueue in guild %s: estimated queue memory %s B is over "
+            "the %s B soft cap.",
+            guild_id,
+            self.cached_total,
+            self.soft_cap_bytes,
+        )
+        return False
+
+    @staticmethod
+    def start_tracing(frames: int = 1):
+        """Start tracemalloc, if it is not already running."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def snapshot_diff(self, limit: int = 10) -> list[tuple[str, int, int]] | None:
+        """Return (module, size delta, count delta) since the previous call.
+
+        Returns None when tracemalloc is not running. The first call diffs
+        against an empty baseline, so it reports everything allocated so far.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        if self.last_snapshot is None:
+            stats = [
+                (stat.traceback[0].filename, stat.size, stat.count)
+                for stat in snapshot.statistics("filename")
+            ]
+        else:
+            stats = [
+                (stat.traceback[0].filename, stat.size_diff, stat.count_diff)
+                for stat in snapshot.compare_to(self.last_snapshot, "filename")
+            ]
+        self.last_snapshot = snapshot
+
+        sizes: Counter[str] = Counter()
+        counts: Counter[str] = Counter()
+        for filename, size, count in stats:
+            module = module_of(filename)
+            sizes[module] += size
+            counts[module] += count
+        ranked = sorted(sizes, key=lambda module: abs(sizes[module]), reverse=True)
+        return [(module, sizes[module], counts[module]) for module in ranked[:limit]]
+
+    async def report(self) -> str:
+        """Render the admin memory report.
+
+        The tracemalloc snapshot and diff run in a worker thread, since they
+        walk every traced allocation.
+        """
+        rss = read_rss_bytes()
+        lines = [
+            f"Process RSS: {rss / 1048576:.1f} MiB" if rss else "Process RSS: n/a",
+            f"Queued state: {self.total_bytes(fresh=True) / 1024:.1f} KiB"
+            + (
+                f" (soft cap {self.soft_cap_bytes / 1024:.0f} KiB, "
+                f"{self.trims} trims, {self.refusals} refusals)"
+                if self.soft_cap_bytes
+                else ""
+            ),
+            "Top guilds:",
+        ]
+        top = self.top_guilds()
+        lines.extend(
+            f"  {guild_id}: {size / 1024:.1f} KiB in {tracks} tracks"
+            for guild_id, size, tracks in top
+        )
+        if not top:
+            lines.append("  (no queued tracks)")
+
+        diff = await asyncio.to_thread(self.snapshot_diff)
+        if diff is None:
+            lines.append("tracemalloc: off (set MEMORY_TRACEMALLOC=1)")
+        else:
+            lines.append("tracemalloc growth since last report, by module:")
+            lines.extend(
+                f"  {module}: {size / 1024:+.1f} KiB ({count:+d} blocks)"
+                for module, size, count in diff
+            )
+        return "\n".join(lines)
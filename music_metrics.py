@@ -0,0 +1,294 @@
+"""Dependency-free Prometheus metrics for playback internals."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0)
+TASK_BUCKETS = (0.1, 1.0, 10.0, 60.0, 300.0, 1800.0, 3600.0)
+
+
+def escape_label_value(value) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labelnames: tuple[str, ...], labels: tuple, extra: str = "") -> str:
+    """Render a Prometheus label set."""
+    pairs = [
+        f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(labelnames, labels)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    """Render a sample value the way Prometheus expects."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        """Add ``amount`` to the series for ``labels``."""
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        """Yield (suffix, labels, value) exposition samples."""
+        for labels, value in self.values.items():
+            yield "_total", format_labels(self.labelnames, labels), value
+
+
+class Gauge:  # pylint: disable=too-few-public-methods
+    """Gauge whose series are collected from a callback at scrape time.
+
+    Reading live state only when scraped keeps the playback paths free of
+    bookkeeping. The callback returns a number for an unlabelled gauge or a
+    mapping of label tuples to numbers.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect or (lambda: 0)
+
+    def samples(self):
+        """Yield (suffix, labels, value) exposition samples."""
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            yield "", format_labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels):
+        """Record one observation."""
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        """Yield (suffix, labels, value) exposition samples."""
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                le = 'le="' + ("+Inf" if math.isinf(bound) else repr(bound)) + '"'
+                yield "_bucket", format_labels(self.labelnames, labels, le), cumulative
+            yield "_count", format_labels(self.labelnames, labels), cumulative
+            yield "_sum", format_labels(self.labelnames, labels), series[-1]
+
+
+class MetricsRegistry:
+    """Hold metrics and render them in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric):
+        """Add a metric, replacing one registered under the same name."""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames=(), collect=None
+    ) -> Gauge:
+        """Create and register a callback gauge."""
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                samples = list(metric.samples())
+            except Exception as exc:
+                logger.warning("Failed to collect metric %s: %s", metric.name, exc)
+                continue
+
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{labels} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``GET /metrics`` from the bot's own event loop."""
+
+    def __init__(self, registry: MetricsRegistry, *, host: str, port: int):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server: asyncio.AbstractServer | None = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer one HTTP request and close the connection."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+                status = "200 OK"
+                body = self.registry.render().encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+                content_type = "text/plain; charset=utf-8"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except Exception as exc:
+            logger.debug("Metrics request failed: %s", exc)
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Start listening once."""
+        if self.server is None:
+            self.server = await asyncio.start_server(self.handle, self.host, self.port)
+            logger.info("Serving metrics on http://%s:%s/metrics", self.host, self.port)
+
+    async def close(self):
+        """Stop listening."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+metrics = MetricsRegistry()
+
+extraction_seconds = metrics.histogram(
+    "musicbot_extraction_seconds",
+    "yt-dlp extraction latency per fallback client attempt.",
+    ("client", "outcome"),
+)
+first_audio_seconds = metrics.histogram(
+    "musicbot_time_to_first_audio_seconds",
+    "Time from a /play or /add request to its first track starting playback.",
+)
+skipped_entries = metrics.counter(
+    "musicbot_skipped_entries",
+    "Queue entries skipped instead of played.",
+    ("reason",),
+)
+retries = metrics.counter(
+    "musicbot_retries",
+    "Retries of failed extractions and playback.",
+    ("kind",),
+)
+disconnects = metrics.counter(
+    "musicbot_voice_disconnects",
+    "Voice disconnects by reason.",
+    ("reason",),
+)
+loop_stall_seconds = metrics.histogram(
+    "musicbot_loop_stall_seconds",
+    "Event-loop steps that blocked the loop longer than the slow threshold.",
+)
+slow_callbacks = metrics.counter(
+    "musicbot_slow_callbacks",
+    "Event-loop steps slower than the slow threshold.",
+)
+outbox_notices = metrics.counter(
+    "musicbot_outbox_notices",
+    "Channel notices by what the outbox did with them.",
+    ("outcome",),
+)
+now_playing_updates = metrics.counter(
+    "musicbot_now_playing_updates",
+    "Now-playing panel updates by what was done with them.",
+    ("action",),
+)
+session_restores = metrics.counter(
+    "musicbot_session_restores",
+    "Saved voice sessions by what the startup restore did with them.",
+    ("outcome",),
+)
+actor_messages = metrics.counter(
+    "musicbot_actor_messages",
+    "Commands processed by guild playback actors.",
+    ("command",),
+)
+actor_events = metrics.counter(
+    "musicbot_actor_events",
+    "Guild actors started and hibernated.",
+    ("event",),
+)
+task_seconds = metrics.histogram(
+    "musicbot_task_seconds",
+    "Run time of supervised background tasks by kind and outcome.",
+    ("kind", "outcome"),
+    buckets=TASK_BUCKETS,
+)
+breaker_shed = metrics.counter(
+    "musicbot_breaker_shed",
+    "Extractions the circuit breaker refused, by whether they were background.",
+    ("kind",),
+)
+shard_events = metrics.counter(
+    "musicbot_shard_events",
+    "Gateway shard lifecycle events by shard.",
+    ("shard", "event"),
+)
@@ -0,0 +1,200 @@
+"""Live now-playing panel: one message per guild, edited on track change."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+
+from music_metrics import now_playing_updates
+from music_outbox import Outbox
+from music_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Panel:  # pylint: disable=too-many-instance-attributes
+    """The panel message of one guild and the update waiting for it."""
+
+    channel: object
+    message: object | None = None
+    content: str | None = None
+    pending: str | None = None
+    pending_since: float = 0.0
+    still_valid: Callable[[], bool] | None = None
+    messages_since: int = 0
+    updated_at: float = -math.inf
+    task: asyncio.Task | None = None
+
+
+class NowPlayingPanel:  # pylint: disable=too-many-instance-attributes
+    """Keep one now-playing message per guild and edit it in place.
+
+    Updates are debounced: the first update waits ``debounce`` seconds and
+    only the latest content is applied, so a burst of skips costs one edit.
+    Consecutive edits are at least ``min_interval`` seconds apart. The panel
+    is posted again when ``scroll_limit`` messages have arrived below it,
+    when it was deleted, or when an edit fails. Edits and reposts go through
+    ``outbox`` at low priority, keyed by the panel message, so notices are
+    sent first and an edit still waiting there is replaced by a newer one.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        debounce: float = 0.5,
+        min_interval: float = 2.0,
+        scroll_limit: int = 10,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+        supervisor: TaskSupervisor | None = None,
+        outbox: Outbox | None = None,
+    ):
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.scroll_limit = scroll_limit
+        self.clock = clock
+        self.sleep = sleep
+        self.supervisor = supervisor if supervisor is not None else TaskSupervisor()
+        # The panel debounces itself, so a private outbox need not batch.
+        self.outbox = (
+            outbox
+            if outbox is not None
+            else Outbox(
+                batch_window=0, clock=clock, sleep=sleep, supervisor=self.supervisor
+            )
+        )
+        self.panels: dict[int, Panel] = {}
+
+    def show(
+        self,
+        guild_id: int,
+        channel,
+        content: str,
+        *,
+        still_valid: Callable[[], bool] | None = None,
+    ):
+        """Request that the guild's panel shows ``content``."""
+        panel = self.panels.get(guild_id)
+        if panel is None or panel.channel.id != channel.id:
+            if panel is not None and panel.task is not None:
+                panel.task.cancel()
+            panel = self.panels[guild_id] = Panel(channel)
+        panel.channel = channel
+
+        if panel.pending is None:
+            panel.pending_since = self.clock()
+        else:
+            now_playing_updates.inc("debounced")
+        panel.pending = content
+        panel.still_valid = still_valid
+        if panel.task is None or panel.task.done():
+            panel.task = self.supervisor.spawn(
+                "now_playing", self.run(guild_id, panel), guild_id=guild_id
+            )
+
+    def is_current(
+        self, guild_id: int, panel: Panel, still_valid: Callable[[], bool] | None
+    ) -> bool:
+        """Return True while ``panel`` is still shown and its update is valid."""
+        if self.panels.get(guild_id) is not panel:
+            return False
+        return still_valid is None or still_valid()
+
+    async def run(self, guild_id: int, panel: Panel):
+        """Apply pending updates once the debounce and edit interval allow."""
+        while panel.pending is not None:
+            wait = (
+                max(
+                    panel.pending_since + self.debounce,
+                    panel.updated_at + self.min_interval,
+                )
+                - self.clock()
+            )
+            if wait > 0:
+                await self.sleep(wait)
+                continue
+
+            content, still_valid = panel.pending, panel.still_valid
+            panel.pending = None
+            if still_valid is not None and not still_valid():
+                now_playing_updates.inc("stale")
+                continue
+            if panel.message is not None and content == panel.content:
+                now_playing_updates.inc("unchanged")
+                continue
+            message_id = panel.message.id if panel.message is not None else None
+            self.outbox.submit(
+                panel.channel,
+                partial(self.apply, panel, content),
+                key=("now_playing_panel", panel.channel.id, message_id),
+                still_valid=partial(self.is_current, guild_id, panel, still_valid),
+                warning_context="Failed to update now playing panel",
+            )
+            panel.updated_at = self.clock()
+
+    async def apply(self, panel: Panel, content: str):
+        """Edit the panel in place, or post a new one when that is not possible."""
+        if panel.message is not None and panel.messages_since < self.scroll_limit:
+            try:
+                await panel.message.edit(content=content)
+                panel.content = content
+                now_playing_updates.inc("edited")
+                return
+            except Exception as exc:
+                logger.info("Now-playing panel edit failed, reposting: %s", exc)
+                now_playing_updates.inc("edit_failed")
+
+        previous = panel.message
+        try:
+            panel.message = await panel.channel.send(content)
+        except Exception as exc:
+            logger.warning("Failed to send now playing message: %s", exc)
+            now_playing_updates.inc("failed")
+            return
+        panel.content = content
+        panel.messages_since = 0
+        now_playing_updates.inc("posted")
+
+        if previous is not None:
+            try:
+                await previous.delete()
+            except Exception as exc:
+                logger.debug("Could not delete old now-playing panel: %s", exc)
+
+    def note_message(self, guild_id: int, channel_id: int, message_id: int):
+        """Count a message posted below the guild's panel."""
+        panel = self.panels.get(guild_id)
+        if (
+            panel is not None
+            and panel.message is not None
+            and panel.channel.id == channel_id
+            and panel.message.id != message_id
+        ):
+            panel.messages_since += 1
+
+    def forget_message(self, guild_id: int, message_id: int):
+        """Drop a deleted panel so the next update posts a new one."""
+        panel = self.panels.get(guild_id)
+        if panel is not None and panel.message is not None:
+            if panel.message.id == message_id:
+                panel.message = None
+                panel.content = None
+
+    def close(self, guild_id: int):
+        """Stop updating the guild's panel and forget it."""
+        panel = self.panels.pop(guild_id, None)
+        if panel is not None and panel.task is not None and not panel.task.done():
+            panel.task.cancel()
+
+    async def flush(self):
+        """Wait for every pending panel update to be applied."""
+        tasks = [panel.task for panel in self.panels.values() if panel.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.outbox.flush()
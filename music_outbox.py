@@ -0,0 +1,291 @@
+"""Per-channel outbox that batches, prioritizes, and rate limits notices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Awaitable, Callable
+
+from music_metrics import outbox_notices
+from music_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+HIGH = "high"
+LOW = "low"
+MAX_MESSAGE_LENGTH = 2000
+
+
+@dataclass
+class Notice:
+    """One message waiting to be sent to a channel."""
+
+    text: str
+    priority: str
+    posted_at: float
+    warning_context: str
+    key: tuple | None = None
+    still_valid: Callable[[], bool] | None = None
+    action: Callable[[], Awaitable[object]] | None = None
+
+    def is_stale(self, now: float, max_age: float) -> bool:
+        """Return True when the notice no longer describes current state."""
+        if self.priority == LOW and now - self.posted_at > max_age:
+            return True
+        return self.still_valid is not None and not self.still_valid()
+
+
+class TokenBucket:
+    """Allow ``rate`` sends per ``per`` seconds, waiting instead of hitting 429s."""
+
+    def __init__(self, rate: int, per: float, *, clock=time.monotonic):
+        self.capacity = rate
+        self.refill_rate = rate / per
+        self.tokens = float(rate)
+        self.clock = clock
+        self.updated_at = clock()
+
+    def refill(self):
+        """Add the tokens earned since the last update."""
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate
+        )
+        self.updated_at = now
+
+    def delay(self) -> float:
+        """Return how long until one token is available."""
+        self.refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+    async def acquire(self, sleep=asyncio.sleep):
+        """Wait for a token and take it."""
+        while (delay := self.delay()) > 0:
+            await sleep(delay)
+        self.tokens -= 1
+
+
+@dataclass
+class ChannelQueue:
+    """Pending notices and the send budget of one channel."""
+
+    channel: object
+    bucket: TokenBucket
+    high: deque[Notice] = field(default_factory=deque)
+    low: deque[Notice] = field(default_factory=deque)
+    task: asyncio.Task | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.high or self.low)
+
+
+def join_notices(texts: list[str], max_length: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """Pack notice lines into as few messages as fit Discord's length limit."""
+    messages: list[str] = []
+    current = ""
+    for text in texts:
+        text = text[:max_length]
+        candidate = f"{current}\n{text}" if current else text
+        if len(candidate) > max_length:
+            messages.append(current)
+            candidate = text
+        current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+
+class Outbox:  # pylint: disable=too-many-instance-attributes
+    """Send channel notices through one worker per channel.
+
+    ``HIGH`` notices (now playing, disconnects, refusals) go out first.
+    ``LOW`` notices ("Added to queue", skipped entries, playlist summaries)
+    wait ``batch_window`` seconds so a burst collapses into one message.
+    Sends are paced by a per-channel token bucket sized like Discord's
+    message bucket, so the bot waits instead of collecting 429s. A notice
+    posted with the same ``key`` as a pending one replaces it, and notices
+    that are older than ``max_age`` or whose ``still_valid`` check fails are
+    dropped at send time. ``submit()`` queues other calls, such as message
+    edits, under the same ordering and budget.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        batch_window: float = 1.0,
+        rate: int = 5,
+        per: float = 5.0,
+        max_age: float = 30.0,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+        supervisor: TaskSupervisor | None = None,
+    ):
+        self.batch_window = batch_window
+        self.rate = rate
+        self.per = per
+        self.max_age = max_age
+        self.clock = clock
+        self.sleep = sleep
+        self.supervisor = supervisor if supervisor is not None else TaskSupervisor()
+        self.channels: dict[int, ChannelQueue] = {}
+
+    def post(
+        self,
+        channel,
+        text: str,
+        *,
+        priority: str = LOW,
+        key: tuple | None = None,
+        still_valid: Callable[[], bool] | None = None,
+        warning_context: str = "Failed to send message",
+    ):
+        """Queue a notice for ``channel`` and make sure its worker runs."""
+        self.enqueue(
+            channel,
+            Notice(
+                text,
+                priority,
+                self.clock(),
+                warning_context,
+                key=key,
+                still_valid=still_valid,
+            ),
+        )
+
+    def submit(
+        self,
+        channel,
+        action: Callable[[], Awaitable[object]],
+        *,
+        priority: str = LOW,
+        key: tuple | None = None,
+        still_valid: Callable[[], bool] | None = None,
+        warning_context: str = "Failed to update message",
+    ):
+        """Queue a Discord call other than a plain send, such as an edit.
+
+        It waits its turn and is replaced by ``key`` like a notice, but is
+        never joined with other notices.
+        """
+        self.enqueue(
+            channel,
+            Notice(
+                "",
+                priority,
+                self.clock(),
+                warning_context,
+                key=key,
+                still_valid=still_valid,
+                action=action,
+            ),
+        )
+
+    def enqueue(self, channel, notice: Notice):
+        """Add ``notice`` to the channel's queue and make sure its worker runs."""
+        queue = self.channels.get(channel.id)
+        if queue is None:
+            queue = ChannelQueue(
+                channel, TokenBucket(self.rate, self.per, clock=self.clock)
+            )
+            self.channels[channel.id] = queue
+        queue.channel = channel
+
+        if notice.key is not None:
+            self.remove_key(queue, notice.key)
+        (queue.high if notice.priority == HIGH else queue.low).append(notice)
+        if queue.task is None or queue.task.done():
+            # Not tied to a guild: a disconnect notice must outlive the
+            # cleanup that cancels the guild's tasks.
+            queue.task = self.supervisor.spawn("outbox", self.run(channel.id))
+
+    @staticmethod
+    def remove_key(queue: ChannelQueue, key: tuple):
+        """Drop pending notices superseded by a newer one with ``key``."""
+        for pending in (queue.high, queue.low):
+            for notice in [notice for notice in pending if notice.key == key]:
+                pending.remove(notice)
+                outbox_notices.inc("replaced")
+
+    def take_valid(self, pending: deque[Notice]) -> Notice | None:
+        """Pop the oldest notice that is still worth sending."""
+        now = self.clock()
+        while pending:
+            notice = pending.popleft()
+            if not notice.is_stale(now, self.max_age):
+                return notice
+            outbox_notices.inc("stale")
+        return None
+
+    async def next_batch(self, queue: ChannelQueue) -> list[Notice]:
+        """Return the next notices to send together, highest priority first."""
+        notice = self.take_valid(queue.high)
+        if notice is not None:
+            return [notice]
+
+        notice = self.take_valid(queue.low)
+        if notice is None:
+            return []
+        wait = notice.posted_at + self.batch_window - self.clock()
+        if wait > 0:
+            await self.sleep(wait)
+        if queue.high or notice.is_stale(self.clock(), self.max_age):
+            # Recheck from the top: the wait may have let work jump ahead or
+            # made this notice stale.
+            queue.low.appendleft(notice)
+            return await self.next_batch(queue)
+
+        batch = [notice]
+        while (notice := self.take_valid(queue.low)) is not None:
+            batch.append(notice)
+        if len(batch) > 1:
+            outbox_notices.inc("coalesced", amount=len(batch) - 1)
+        return batch
+
+    async def run(self, channel_id: int):
+        """Drain one channel's notices, then exit until the next post."""
+        queue = self.channels[channel_id]
+        while queue:
+            batch = await self.next_batch(queue)
+            notices = [notice for notice in batch if notice.action is None]
+            for notice in batch:
+                if notice.action is not None:
+                    await self.deliver(queue, notice.action, notice.warning_context)
+            for message in join_notices([notice.text for notice in notices]):
+                await self.deliver(
+                    queue,
+                    partial(queue.channel.send, message),
+                    notices[0].warning_context,
+                )
+        if not queue and self.channels.get(channel_id) is queue:
+            del self.channels[channel_id]
+
+    async def deliver(
+        self,
+        queue: ChannelQueue,
+        call: Callable[[], Awaitable[object]],
+        warning_context: str,
+    ):
+        """Make one Discord call once the channel's bucket allows it."""
+        await queue.bucket.acquire(self.sleep)
+        try:
+            await call()
+            outbox_notices.inc("sent")
+        except Exception as exc:
+            outbox_notices.inc("failed")
+            logger.warning("%s: %s", warning_context, exc)
+
+    def pending(self) -> int:
+        """Return how many notices are waiting across all channels."""
+        return sum(len(queue.high) + len(queue.low) for queue in self.channels.values())
+
+    async def flush(self):
+        """Wait for every channel worker to drain."""
+        tasks = [queue.task for queue in self.channels.values() if queue.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,196 @@
+"""On-demand in-process sampling profiler for every thread in the bot."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+COLLAPSED = "collapsed"
+SPEEDSCOPE = "speedscope"
+PROFILE_FORMATS = (COLLAPSED, SPEEDSCOPE)
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profile capture is already running."""
+
+
+@dataclass
+class ProfileResult:
+    """Summary of one finished capture."""
+
+    path: str
+    samples: int
+    threads: int
+    duration: float
+    top_frames: list[tuple[str, int]]
+
+
+def describe_frame(frame) -> str:
+    """Return a stable label for one stack frame."""
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def sample_stack(frame, max_depth: int) -> tuple[str, ...]:
+    """Return a root-to-leaf stack of frame labels."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(describe_frame(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+class SamplingProfiler:
+    """Sample every thread's stack at a fixed interval for a bounded time.
+
+    Sampling runs on its own thread, so it sees the event loop, voice player
+    threads, and yt-dlp workers alike, and costs one ``sys._current_frames()``
+    walk per ``interval`` regardless of load. Only one capture may run at a
+    time, captures are capped at ``max_seconds``, and at most
+    ``max_stacks`` distinct stacks are kept.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        output_dir: str,
+        *,
+        interval: float = 0.01,
+        max_seconds: float = 60.0,
+        max_depth: int = 64,
+        max_stacks: int = 20000,
+    ):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        self.max_stacks = max_stacks
+        self.lock = threading.Lock()
+        self.running = False
+
+    def collect(self, seconds: float) -> tuple[Counter, int]:
+        """Sample all other threads for ``seconds``; return stack counts."""
+        own_thread_id = threading.get_ident()
+        stacks: Counter[tuple[str, ...]] = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            for thread_id, frame in frames.items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = (names.get(thread_id, f"thread-{thread_id}"),) + sample_stack(
+                    frame, self.max_depth
+                )
+                if stack in stacks or len(stacks) < self.max_stacks:
+                    stacks[stack] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return stacks, samples
+
+    @staticmethod
+    def render_collapsed(stacks: Counter) -> str:
+        """Render stacks in the folded format used by flamegraph tools."""
+        return "".join(
+            f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common()
+        )
+
+    def render_speedscope(self, stacks: Counter, duration: float) -> str:
+        """Render stacks as a speedscope sampled profile per thread."""
+        frame_index: dict[str, int] = {}
+        profiles: dict[str, dict] = {}
+        for stack, count in stacks.items():
+            thread_name, *labels = stack
+            profile = profiles.setdefault(
+                thread_name,
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": duration,
+                    "samples": [],
+                    "weights": [],
+                },
+            )
+            profile["samples"].append(
+                [frame_index.setdefault(label, len(frame_index)) for label in labels]
+            )
+            profile["weights"].append(count * self.interval)
+
+        return json.dumps(
+            {
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "shared": {"frames": [{"name": label} for label in frame_index]},
+                "profiles": list(profiles.values()),
+                "name": "discord-bot profile",
+                "exporter": "music_profiler",
+            }
+        )
+
+    def write(self, stacks: Counter, duration: float, profile_format: str) -> str:
+        """Write a capture to the output directory and return its path."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        if profile_format == SPEEDSCOPE:
+            path = os.path.join(self.output_dir, f"profile-{stamp}.speedscope.json")
+            content = self.render_speedscope(stacks, duration)
+        else:
+            path = os.path.join(self.output_dir, f"profile-{stamp}.collapsed")
+            content = self.render_collapsed(stacks)
+
+        with open(path, "w", encoding="utf-8") as profile_file:
+            profile_file.write(content)
+        return path
+
+    def capture(self, seconds: float, profile_format: str = COLLAPSED) -> ProfileResult:
+        """Run one blocking capture; raise ProfilerBusyError if one is running."""
+        if profile_format not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format: {profile_format}")
+
+        with self.lock:
+            if self.running:
+                raise ProfilerBusyError("A profile capture is already running.")
+            self.running = True
+
+        try:
+            seconds = max(0.1, min(seconds, self.max_seconds))
+            started = time.monotonic()
+            stacks, samples = self.collect(seconds)
+            duration = time.monotonic() - started
+            path = self.write(stacks, duration, profile_format)
+        finally:
+            with self.lock:
+                self.running = False
+
+        leaf_counts: Counter[str] = Counter()
+        for stack, count in stacks.items():
+            leaf_counts[stack[-1]] += count
+        logger.info("Wrote %s-sample profile to %s", samples, path)
+        return ProfileResult(
+            path=path,
+            samples=samples,
+            threads=len({stack[0] for stack in stacks}),
+            duration=duration,
+            top_frames=leaf_counts.most_common(5),
+        )
+
+    async def capture_async(
+        self, seconds: float, profile_format: str = COLLAPSED
+    ) -> ProfileResult:
+        """Run a capture on a dedicated thread without blocking the loop."""
+        if self.running:
+            raise ProfilerBusyError("A profile capture is already running.")
+        return await asyncio.to_thread(self.capture, seconds, profile_format)
@@ -0,0 +1,180 @@
+"""Priority scheduling of yt-dlp extractions onto a dedicated thread pool."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+NEXT_UP = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {
+    INTERACTIVE: "interactive",
+    NEXT_UP: "next_up",
+    BACKGROUND: "background",
+}
+
+
+class ExtractionScheduler:  # pylint: disable=too-many-instance-attributes
+    """Grant extraction slots by priority class instead of arrival order.
+
+    At most ``max_concurrent`` extractions run at once, on a pool of the same
+    size, so work never piles up in an executor queue where a user's first
+    track would wait behind another guild's playlist. Waiters are served
+    interactive first, then next-up, then background, FIFO within a class.
+    A background waiter older than ``starvation_timeout`` is served next
+    regardless, so bulk loading always makes some progress.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 4,
+        starvation_timeout: float = 10.0,
+        clock=time.monotonic,
+    ):
+        self.max_concurrent = max_concurrent
+        self.starvation_timeout = starvation_timeout
+        self.clock = clock
+        self.running = 0
+        self.waiters: list[tuple[int, int, float, asyncio.Future]] = []
+        self.queued_tasks: dict[asyncio.Task, asyncio.Future] = {}
+        self.sequence = itertools.count()
+        self.executor: ThreadPoolExecutor | None = None
+        self.granted: Counter[int] = Counter()
+        self.starvation_grants = 0
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """Return the extraction thread pool, creating it on first use."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent, thread_name_prefix="yt-dlp"
+            )
+        return self.executor
+
+    def waiting(self, max_priority: int = NEXT_UP) -> int:
+        """Return how many waiters have at least the given priority."""
+        return sum(
+            1
+            for priority, _, _, future in self.waiters
+            if priority <= max_priority and not future.done()
+        )
+
+    def load(self) -> int:
+        """Return running plus queued extractions of every priority."""
+        return self.running + self.waiting(BACKGROUND)
+
+    def pop_next_waiter(self) -> tuple[int, int, float, asyncio.Future]:
+        """Pick the next waiter, letting a starving background waiter jump ahead."""
+        now = self.clock()
+        starving = [
+            waiter
+            for waiter in self.waiters
+            if waiter[0] == BACKGROUND and now - waiter[2] >= self.starvation_timeout
+        ]
+        if starving and self.waiters[0][0] != BACKGROUND:
+            chosen = min(starving, key=lambda waiter: waiter[1])
+            self.waiters.remove(chosen)
+            heapq.heapify(self.waiters)
+            self.starvation_grants += 1
+            return chosen
+        return heapq.heappop(self.waiters)
+
+    def grant_waiters(self):
+        """Hand free slots to waiters in priority order."""
+        while self.running < self.max_concurrent and self.waiters:
+            priority, _, _, future = self.pop_next_waiter()
+            if future.done():
+                continue
+            self.running += 1
+            self.granted[priority] += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: int):
+        """Wait for an extraction slot."""
+        if self.running < self.max_concurrent and not self.waiters:
+            self.running += 1
+            self.granted[priority] += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self.waiters, (priority, next(self.sequence), self.clock(), future)
+        )
+        task = asyncio.current_task()
+        self.queued_tasks[task] = future
+        self.grant_waiters()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            self.queued_tasks.pop(task, None)
+
+    def promote(self, task: asyncio.Task, priority: int) -> bool:
+        """Move ``task``'s queued request up to ``priority``.
+
+        Returns False when the task is not waiting for a slot, either because
+        it has not asked for one yet or because it already holds one.
+        """
+        future = self.queued_tasks.get(task)
+        if future is None or future.done():
+            return False
+        for index, (queued_priority, sequence, enqueued, waiter) in enumerate(
+            self.waiters
+        ):
+            if waiter is future:
+                if priority < queued_priority:
+                    self.waiters[index] = (priority, sequence, enqueued, future)
+                    heapq.heapify(self.waiters)
+                return True
+        return False
+
+    def release(self):
+        """Return a slot and wake the next waiter."""
+        self.running = max(0, self.running - 1)
+        self.grant_waiters()
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Hold one extraction slot for the duration of the block."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def pause_for_foreground(self, max_wait: float | None = None):
+        """Let queued interactive and next-up work go before more background work."""
+        max_wait = self.starvation_timeout if max_wait is None else max_wait
+        deadline = self.clock() + max_wait
+        while self.waiting(NEXT_UP) and self.clock() < deadline:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0)
+
+    def snapshot(self) -> dict:
+        """Return scheduler occupancy for logs and metrics."""
+        queued = Counter(priority for priority, *_ in self.waiters)
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "queued": {
+                name: queued.get(priority, 0)
+                for priority, name in PRIORITY_NAMES.items()
+            },
+            "granted": {
+                name: self.granted.get(priority, 0)
+                for priority, name in PRIORITY_NAMES.items()
+            },
+            "starvation_grants": self.starvation_grants,
+        }
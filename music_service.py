@@ -4,29 +4,75 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
+import time
 
 import discord
 
+from music_actor import ActorRegistry
+from music_admission import AdmissionController
 from music_audio import (
+    BreakerOpenError,
     YTDLSource,
     build_playlist_summary,
     create_player_from_entry,
     extract_info_async,
+    extraction_cache,
+    extraction_scheduler,
     get_first_available_entry,
+    get_known_unavailable_reason,
     get_playlist_entries,
     get_playlist_entry_url,
+    get_youtube_video_id,
 )
+from music_controls import QueueControls
+from music_history import TrackHistory, is_url_like
+from music_memory import MemoryAccountant
+from music_metrics import disconnects, first_audio_seconds, retries, skipped_entries
+from music_nowplaying import NowPlayingPanel
+from music_outbox import HIGH, LOW, Outbox
+from music_scheduler import BACKGROUND
+from music_speculation import SpeculativeExtractor
 from music_state import MusicState
+from music_supervisor import TaskSupervisor
+from music_tracing import tracer
+from music_waits import PlaybackWaits
 
 logger = logging.getLogger(__name__)
 
+PLAYLIST_APPEND_BATCH = 25
 
-class MusicService:
+
+class MusicService:  # pylint: disable=too-many-public-methods,too-many-instance-attributes
     """Coordinate queue management, playback, and voice connections."""
 
-    def __init__(self, client: discord.Client, state: MusicState):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        client: discord.Client,
+        state: MusicState,
+        *,
+        speculator: SpeculativeExtractor | None = None,
+        history: TrackHistory | None = None,
+        admission: AdmissionController | None = None,
+        memory: MemoryAccountant | None = None,
+        outbox: Outbox | None = None,
+        now_playing: NowPlayingPanel | None = None,
+        actors: ActorRegistry | None = None,
+        supervisor: TaskSupervisor | None = None,
+    ):
         self.client = client
         self.state = state
+        self.speculator = speculator
+        self.history = history
+        self.admission = admission
+        self.memory = memory
+        self.outbox = outbox
+        self.now_playing = now_playing
+        self.actors = actors if actors is not None else ActorRegistry()
+        self.supervisor = supervisor if supervisor is not None else TaskSupervisor()
+        self.controls = QueueControls(self)
+        self.waits = PlaybackWaits(self)
 
     def get_guild_text_channel(self, guild_id: int) -> discord.TextChannel | None:
         """Return the remembered text channel for a guild, if still available."""
@@ -39,13 +85,36 @@ class MusicService:
             return channel
         return None
 
+    # pylint: disable=too-many-arguments
     async def send_channel_message(
-        self, channel, message: str, warning_context: str
+        self,
+        channel,
+        message: str,
+        warning_context: str,
+        *,
+        priority: str = LOW,
+        key: tuple | None = None,
+        still_valid=None,
     ) -> bool:
-        """Send a message and log a warning if Discord rejects it."""
+        """Send a message and log a warning if Discord rejects it.
+
+        With an outbox the message is queued instead; ``priority``, ``key``,
+        and ``still_valid`` then decide its order, replacement, and expiry.
+        """
         if channel is None:
             return False
 
+        if self.outbox is not None:
+            self.outbox.post(
+                channel,
+                message,
+                priority=priority,
+                key=key,
+                still_valid=still_valid,
+                warning_context=warning_context,
+            )
+            return True
+
         try:
             await channel.send(message)
             return True
@@ -54,13 +123,21 @@ class MusicService:
             return False
 
     async def send_guild_message(
-        self, guild_id: int, message: str, warning_context: str
+        self, guild_id: int, message: str, warning_context: str, **options
     ) -> bool:
         """Send a message to the guild's remembered text channel."""
         return await self.send_channel_message(
-            self.get_guild_text_channel(guild_id), message, warning_context
+            self.get_guild_text_channel(guild_id), message, warning_context, **options
         )
 
+    def is_current_player(self, guild_id: int, player: YTDLSource) -> bool:
+        """Return True while ``player`` is what the guild's voice client plays."""
+        guild = self.client.get_guild(guild_id)
+        voice_client = guild.voice_client if guild is not None else None
+        if voice_client is None:
+            return False
+        return getattr(voice_client, "source", player) is player
+
     @staticmethod
     def get_bot_voice_channel(guild: discord.Guild):
         """Return the bot's active voice or stage channel for a guild."""
@@ -75,8 +152,17 @@ class MusicService:
 
     @staticmethod
     def is_bot_alone_in_channel(channel) -> bool:
-        """Return True when no human members remain in the bot's current channel."""
-        return not any(not member.bot for member in channel.members)
+        """Return True when no human members remain in the bot's current channel.
+
+        ``channel.members`` only lists members found in the member cache. A
+        voice state whose member is not cached is counted as a listener, so
+        a trimmed cache can never make the bot leave an occupied channel.
+        """
+        members = channel.members
+        if any(not member.bot for member in members):
+            return False
+        voice_states = getattr(channel, "voice_states", None) or {}
+        return len(voice_states) <= len(members)
 
     # pylint: disable=too-many-arguments
     async def disconnect_guild_voice(
@@ -88,20 +174,37 @@ class MusicService:
         warning_context: str,
         already_disconnected_log: str,
         success_log: str,
+        reason: str = "other",
+        requester: asyncio.Task | None = None,
     ):
-        """Disconnect from voice once, send an optional text message, and clean up."""
+        """Disconnect from voice once, send an optional text message, and clean up.
+
+        ``requester`` is the task that asked for the disconnect; cleanup does
+        not cancel it, so it finishes with its own outcome.
+        """
         async with self.state.disconnect_locks[guild_id]:
             if guild.voice_client is None:
                 logger.info(already_disconnected_log)
                 return
 
             if message:
-                await self.send_guild_message(guild_id, message, warning_context)
+                await self.send_guild_message(
+                    guild_id, message, warning_context, priority=HIGH
+                )
 
             await guild.voice_client.disconnect(force=False)
+            disconnects.inc(reason)
             logger.info(success_log)
 
+        self.cleanup_guild(guild_id, spare=requester)
+
+    def cleanup_guild(self, guild_id: int, *, spare: asyncio.Task | None = None):
+        """Forget a guild's queue, background tasks, queue wait, and panel."""
         self.state.cleanup_guild(guild_id)
+        self.supervisor.cancel_guild(guild_id, spare=spare)
+        self.waits.cancel(guild_id)
+        if self.now_playing is not None:
+            self.now_playing.close(guild_id)
 
     @staticmethod
     def get_requester_voice_channel(interaction: discord.Interaction):
@@ -120,6 +223,7 @@ class MusicService:
 
         await interaction.response.send_message(message, ephemeral=ephemeral)
 
+    @tracer.traced("ensure_bot_connected")
     async def ensure_bot_connected(
         self, interaction: discord.Interaction
     ) -> str | None:
@@ -175,11 +279,13 @@ class MusicService:
                 entry, use_entry_method=use_entry_method, lazy=lazy
             )
         except Exception as exc:
+            skipped_entries.inc("failed")
             logger.error("Error enqueueing song: %s", exc, exc_info=True)
             await self.send_channel_message(
                 channel,
                 f"Skipped one item (error): {exc}",
                 "Failed to send enqueue error message",
+                priority=HIGH,
             )
             return False
 
@@ -190,74 +296,154 @@ class MusicService:
                     channel,
                     f"Queue is full (max {self.state.max_queue_size} songs)!",
                     "Failed to send queue full message",
+                    priority=HIGH,
                 )
             return False
 
+        if self.memory is not None and not self.memory.admit(guild_id):
+            await self.send_channel_message(
+                channel,
+                "The bot is low on memory right now, try adding songs later.",
+                "Failed to send memory limit message",
+                priority=HIGH,
+            )
+            return False
+
         queue.append(player)
+        self.waits.wake_queue_wait(guild_id)
         if announce:
             await self.send_channel_message(
                 channel,
                 f"Added to queue: **[{player.title}]({player.url})**",
                 "Failed to send queue addition message",
+                still_valid=lambda: player in self.state.queues.get(guild_id, ()),
             )
         return True
 
     async def enqueue_playlist_entries(
         self, guild_id: int, entries: list[dict], *, loader_generation: int
     ) -> tuple[int, int]:
-        """Enqueue playlist entries one by one, skipping failures without aborting."""
+        """Enqueue playlist entries one by one, skipping failures without aborting.
+
+        Entries become lazy players without an extraction, so nothing here
+        competes with other guilds for ``extraction_scheduler``. Players are
+        appended in batches of ``PLAYLIST_APPEND_BATCH``, each one message to
+        the guild's actor, which checks in the same step that this loader is
+        still current.
+        """
         queued_count = 0
         skipped_count = 0
+        batch: list[YTDLSource] = []
 
         for entry in entries:
-            if not self.state.is_current_playlist_loader(guild_id, loader_generation):
-                logger.info(
-                    "Playlist loader generation %s became stale in guild %s. "
-                    "Stopping background enqueue.",
-                    loader_generation,
-                    guild_id,
+            if len(batch) >= PLAYLIST_APPEND_BATCH:
+                queued, stopped = await self.append_playlist_batch(
+                    guild_id, batch, loader_generation
                 )
-                break
+                queued_count += queued
+                batch = []
+                if stopped:
+                    break
 
             try:
+                unavailable_reason = get_known_unavailable_reason(entry)
+                if unavailable_reason is not None:
+                    logger.info(
+                        "Skipped known unavailable video: %s - %s",
+                        entry.get("id", "unknown"),
+                        unavailable_reason,
+                    )
+                    skipped_entries.inc("unavailable")
+                    skipped_count += 1
+                    continue
+
                 video_url = get_playlist_entry_url(entry)
                 if not video_url:
                     logger.warning("Could not get URL for entry: %s", entry)
+                    skipped_entries.inc("no_url")
                     skipped_count += 1
                     continue
 
                 lazy_entry = dict(entry)
                 lazy_entry.setdefault("webpage_url", video_url)
-                player = await create_player_from_entry(
-                    lazy_entry,
-                    use_entry_method=True,
-                    lazy=True,
-                )
-                if not self.state.is_current_playlist_loader(
-                    guild_id, loader_generation
-                ):
-                    logger.info(
-                        "Playlist loader generation %s became stale in guild %s "
-                        "after extracting an entry. Stopping background enqueue.",
-                        loader_generation,
-                        guild_id,
+                if not lazy_entry.get("title") and entry.get("id"):
+                    metadata = extraction_cache.get_metadata(entry["id"]) or {}
+                    if metadata.get("title"):
+                        lazy_entry["title"] = metadata["title"]
+                batch.append(
+                    await create_player_from_entry(
+                        lazy_entry,
+                        use_entry_method=True,
+                        lazy=True,
                     )
-                    break
-
-                queue = self.state.get_queue(guild_id)
-                if len(queue) < self.state.max_queue_size:
-                    queue.append(player)
-                    queued_count += 1
+                )
             except Exception as exc:
                 logger.warning(
                     "Skipped unavailable/errored video: %s - %s",
                     entry.get("id", "unknown"),
                     exc,
                 )
+                skipped_entries.inc("failed")
                 skipped_count += 1
+        else:
+            if batch:
+                queued, _ = await self.append_playlist_batch(
+                    guild_id, batch, loader_generation
+                )
+                queued_count += queued
 
         return queued_count, skipped_count
 
+    async def append_playlist_batch(
+        self, guild_id: int, players: list[YTDLSource], loader_generation: int
+    ) -> tuple[int, bool]:
+        """Queue a loader's batch; returns the count and whether to stop loading."""
+        queued, stop_reason = await self.actors.ask(
+            guild_id,
+            "add",
+            self.append_loaded_players,
+            guild_id,
+            players,
+            loader_generation,
+        )
+        if stop_reason == "stale":
+            logger.info(
+                "Playlist loader generation %s became stale in guild %s. "
+                "Stopping background enqueue.",
+                loader_generation,
+                guild_id,
+            )
+        elif stop_reason == "memory":
+            logger.warning(
+                "Stopped playlist loading in guild %s at the memory soft cap.",
+                guild_id,
+            )
+        return queued, stop_reason is not None
+
+    def append_loaded_players(
+        self, guild_id: int, players: list[YTDLSource], loader_generation: int
+    ) -> tuple[int, str | None]:
+        """Append a playlist loader's tracks unless the loader went stale.
+
+        Returns how many were queued, and ``stale`` or ``memory`` when the
+        loader must stop.
+        """
+        if not self.state.is_current_playlist_loader(guild_id, loader_generation):
+            return 0, "stale"
+        queue = self.state.get_queue(guild_id)
+        queued = 0
+        stop_reason = None
+        for player in players:
+            if self.memory is not None and not self.memory.admit(guild_id):
+                stop_reason = "memory"
+                break
+            if len(queue) < self.state.max_queue_size:
+                queue.append(player)
+                queued += 1
+        if queued:
+            self.waits.wake_queue_wait(guild_id)
+        return queued, stop_reason
+
     async def on_voice_state_update(
         self,
         member: discord.Member,
@@ -271,7 +457,9 @@ class MusicService:
                 logger.info(
                     "Bot left voice channel in guild %s. Cleaning up.", guild_id
                 )
-                self.state.cleanup_guild(guild_id)
+                await self.actors.ask(
+                    guild_id, "left_voice", self.cleanup_guild, guild_id
+                )
             return
 
         guild = member.guild
@@ -279,7 +467,9 @@ class MusicService:
         if bot_channel is None:
             return
 
-        if not self.is_bot_alone_in_channel(bot_channel):
+        if not self.is_bot_alone_in_channel(bot_channel) or (
+            self.supervisor.is_running("alone_disconnect", guild.id)
+        ):
             return
 
         logger.info(
@@ -288,7 +478,15 @@ class MusicService:
             guild.id,
             self.state.alone_disconnect_delay,
         )
+        if self.state.alone_disconnect_delay > 0:
+            self.supervisor.spawn(
+                "alone_disconnect", self.disconnect_when_alone(guild), guild_id=guild.id
+            )
+        else:
+            await self.disconnect_when_alone(guild)
 
+    async def disconnect_when_alone(self, guild: discord.Guild):
+        """Leave after ``alone_disconnect_delay`` unless someone came back."""
         if self.state.alone_disconnect_delay > 0:
             await asyncio.sleep(self.state.alone_disconnect_delay)
             bot_channel = self.get_bot_voice_channel(guild)
@@ -301,10 +499,14 @@ class MusicService:
                 )
                 return
 
-        await self.disconnect_guild_voice(
+        await self.actors.ask(
+            guild.id,
+            "disconnect",
+            self.disconnect_guild_voice,
             guild,
             guild_id=guild.id,
             message="No one on the voice channel, disconnecting. See ya!",
+            reason="alone",
             warning_context="Failed to send alone disconnect message",
             already_disconnected_log=(
                 f"Bot already disconnected from guild {guild.id} by another event."
@@ -312,20 +514,107 @@ class MusicService:
             success_log=(
                 f"Disconnected from voice channel in guild {guild.id} (bot was alone)."
             ),
+            requester=asyncio.current_task(),
+        )
+
+    async def resolve_query(self, query: str) -> str:
+        """Turn free-text /play input into a video URL, preferring play history."""
+        if is_url_like(query):
+            return query
+
+        if self.history is not None:
+            record = self.history.resolve(query)
+            if record is not None:
+                logger.info("Resolved %r from play history: %s", query, record.url)
+                return record.url
+
+        search_info = await extract_info_async(
+            f"ytsearch1:{query}", extract_flat="in_playlist"
+        )
+        entries = get_playlist_entries(search_info)
+        video_url = get_playlist_entry_url(entries[0]) if entries else None
+        if not video_url:
+            raise RuntimeError(f"No results found for '{query}'.")
+
+        video_id = entries[0].get("id") or get_youtube_video_id(video_url)
+        if self.history is not None and video_id:
+            record = self.history.remember_track(
+                video_id, entries[0].get("title") or query, video_url
+            )
+            self.history.remember_search(query, record)
+        logger.info("Resolved %r with ytsearch: %s", query, video_url)
+        return video_url
+
+    def record_play(self, player: YTDLSource):
+        """Count a started track in the play history."""
+        if self.history is None:
+            return
+
+        video_id = get_youtube_video_id(player.url) or getattr(player, "video_id", None)
+        if not video_id:
+            return
+
+        try:
+            self.history.record_play(video_id, player.title, player.url)
+        except Exception as exc:
+            logger.warning("Failed to record play of '%s': %s", player.title, exc)
+
+    async def extract_first_info(
+        self, interaction: discord.Interaction, url: str
+    ) -> dict:
+        """Return the first-track info, reusing a speculative extraction if any."""
+        if self.speculator is not None:
+            speculation = self.speculator.claim(interaction.user.id, url)
+            if speculation is not None:
+                try:
+                    return await speculation
+                except BreakerOpenError:
+                    # Speculation is background work and was shed; the user
+                    # is waiting now, so retry as an interactive extraction.
+                    logger.info("Speculative extraction for %s was shed.", url)
+
+        return await extract_info_async(
+            url,
+            noplaylist=True,
+            playlist_items="1",
         )
 
+    async def admit_background_load(self, guild_id: int, url: str, channel) -> bool:
+        """Shed background playlist loading first when the node is overloaded."""
+        if self.admission is None:
+            return True
+
+        decision = self.admission.check(background=True)
+        if decision.admitted:
+            return True
+
+        logger.warning(
+            "Shed background loading of %s in guild %s: %s",
+            url,
+            guild_id,
+            decision.reason,
+        )
+        if "list=" in url:
+            await self.send_channel_message(
+                channel,
+                f"The bot is busy right now ({decision.reason}), so the rest of the "
+                "playlist was not loaded. Try adding it again in "
+                f"{math.ceil(decision.retry_after)} s.",
+                "Failed to send playlist shed message",
+                priority=HIGH,
+            )
+        return False
+
     async def handle_music_request(self, interaction: discord.Interaction, url: str):
         """Handle the shared flow for /play and /add."""
+        requested_at = time.perf_counter()
         text_channel_id = interaction.channel.id
         guild_id = interaction.guild.id
         self.state.remember_text_channel(guild_id, text_channel_id)
 
         try:
-            first_info = await extract_info_async(
-                url,
-                noplaylist=True,
-                playlist_items="1",
-            )
+            url = await self.resolve_query(url)
+            first_info = await self.extract_first_info(interaction, url)
             if "entries" in first_info:
                 first_info = get_first_available_entry(first_info)
         except Exception as exc:
@@ -334,7 +623,10 @@ class MusicService:
             )
             return
 
-        first_song_queued = await self.enqueue_entry(
+        first_song_queued = await self.actors.ask(
+            guild_id,
+            "add",
+            self.enqueue_entry,
             guild_id,
             interaction.channel,
             first_info,
@@ -344,72 +636,87 @@ class MusicService:
         if not first_song_queued:
             return
 
-        # Mark playlist loading as active before starting playback. If the
-        # first song's playback fails almost instantly, discord.py's "after"
-        # callback can race ahead of this coroutine (it resumes via
-        # run_coroutine_threadsafe from another thread) and call play_next()
-        # again while the queue is still empty. Without loading_playlists
-        # already set, that race hits the "not loading" branch of play_next
-        # and disconnects immediately instead of waiting for more songs.
+        # Mark playlist loading as active before starting playback, so that
+        # if the first song fails instantly, the "track_ended" message that
+        # follows parks the guild to wait for the loader instead of
+        # disconnecting on an empty queue.
         loader_generation = self.state.begin_playlist_loading(guild_id)
 
-        if not interaction.guild.voice_client.is_playing():
-            await self.play_next(guild_id, text_channel_id)
+        if await self.actors.ask(
+            guild_id, "play", self.start_if_idle, interaction.guild, text_channel_id
+        ):
+            first_audio_seconds.observe(time.perf_counter() - requested_at)
 
         async def fetch_and_enqueue_rest():
-            try:
-                playlist_info = await extract_info_async(
-                    url, extract_flat="in_playlist"
-                )
-                if not self.state.is_current_playlist_loader(
-                    guild_id, loader_generation
-                ):
-                    logger.info(
-                        "Playlist loader generation %s became stale in guild %s "
-                        "before queueing background entries.",
-                        loader_generation,
+            with tracer.span("background_loader", url=url) as span:
+                try:
+                    if not await self.admit_background_load(
+                        guild_id, url, interaction.channel
+                    ):
+                        return
+
+                    # Queued interactive and next-up extractions from any
+                    # guild go first, so the flat playlist extraction never
+                    # delays someone's audio.
+                    await extraction_scheduler.pause_for_foreground()
+                    playlist_info = await extract_info_async(
+                        url, priority=BACKGROUND, extract_flat="in_playlist"
+                    )
+                    entries = get_playlist_entries(playlist_info)
+                    if not entries:
+                        logger.info(
+                            "URL %s is not a playlist, skipping background queue.", url
+                        )
+                        return
+
+                    queued_count, skipped_count = await self.enqueue_playlist_entries(
                         guild_id,
+                        entries[1:],
+                        loader_generation=loader_generation,
                     )
-                    return
+                    span.set(queued=queued_count, skipped=skipped_count)
+                    if queued_count > 0 and self.state.is_current_playlist_loader(
+                        guild_id, loader_generation
+                    ):
+                        await self.send_channel_message(
+                            interaction.channel,
+                            build_playlist_summary(queued_count, skipped_count),
+                            "Failed to send playlist summary message",
+                        )
 
-                entries = get_playlist_entries(playlist_info)
-                if not entries:
                     logger.info(
-                        "URL %s is not a playlist, skipping background queue.", url
+                        "Finished queueing %s additional songs in guild %s "
+                        "(skipped %s).",
+                        queued_count,
+                        guild_id,
+                        skipped_count,
+                    )
+                except BreakerOpenError as exc:
+                    logger.warning(
+                        "Shed background playlist loading in guild %s: %s",
+                        guild_id,
+                        exc,
                     )
-                    return
-
-                queued_count, skipped_count = await self.enqueue_playlist_entries(
-                    guild_id,
-                    entries[1:],
-                    loader_generation=loader_generation,
-                )
-                if queued_count > 0 and self.state.is_current_playlist_loader(
-                    guild_id, loader_generation
-                ):
                     await self.send_channel_message(
                         interaction.channel,
-                        build_playlist_summary(queued_count, skipped_count),
-                        "Failed to send playlist summary message",
+                        "YouTube is rate limiting the bot, so the rest of the playlist "
+                        "was not loaded. Try adding it again later.",
+                        "Failed to send playlist shed message",
+                        priority=HIGH,
                     )
+                except Exception as exc:
+                    logger.error(
+                        "Error fetching full playlist in background: %s",
+                        exc,
+                        exc_info=True,
+                    )
+                finally:
+                    self.state.finish_playlist_loading(guild_id, loader_generation)
+                    self.waits.wake_queue_wait(guild_id)
 
-                logger.info(
-                    "Finished queueing %s additional songs in guild %s "
-                    "(skipped %s).",
-                    queued_count,
-                    guild_id,
-                    skipped_count,
-                )
-            except Exception as exc:
-                logger.error(
-                    "Error fetching full playlist in background: %s",
-                    exc,
-                    exc_info=True,
-                )
-            finally:
-                self.state.finish_playlist_loading(guild_id, loader_generation)
-
-        loading_task = asyncio.create_task(fetch_and_enqueue_rest())
+        loading_task = self.supervisor.spawn(
+            "playlist_load", fetch_and_enqueue_rest(), guild_id=guild_id
+        )
         self.state.register_playlist_loading_task(
             guild_id, loader_generation, loading_task
         )
@@ -419,13 +726,18 @@ class MusicService:
             "background...",
             guild_id,
         )
-        await interaction.followup.send(
-            "First song queued! Fetching rest of playlist in background...",
-            ephemeral=True,
-        )
+        with tracer.span("followup"):
+            await interaction.followup.send(
+                "First song queued! Fetching rest of playlist in background...",
+                ephemeral=True,
+            )
 
     async def get_next_ready_player(self, guild_id: int) -> YTDLSource | None:
-        """Pop players until one is ready to play or the queue runs empty."""
+        """Pop players until one is ready to play or the queue runs empty.
+
+        Raises BreakerOpenError, with the track back at the front of the
+        queue, while the extraction breaker sheds its extraction.
+        """
         queue = self.state.get_queue(guild_id)
         while queue:
             player = queue.pop(0)
@@ -434,7 +746,12 @@ class MusicService:
 
             try:
                 return await player.get_actual_source()
+            except BreakerOpenError:
+                # Keep the track: it is YouTube, not the video, that is failing.
+                queue.insert(0, player)
+                raise
             except Exception as exc:
+                skipped_entries.inc("failed")
                 logger.error("Failed to load lazy player '%s': %s", player.title, exc)
 
         return None
@@ -446,8 +763,13 @@ class MusicService:
         if player._retries != 0:
             return
 
+        video_id = get_youtube_video_id(player.url)
+        if video_id is not None:
+            extraction_cache.invalidate(video_id)
+
         try:
             player._retries = 1
+            retries.inc("playback")
             fresh_player = await YTDLSource.from_url(player.url)
             self.state.get_queue(guild_id).insert(0, fresh_player)
             logger.info("Retried failed song: %s", player.title)
@@ -457,60 +779,67 @@ class MusicService:
     def build_after_play_callback(
         self, player: YTDLSource, guild_id: int, text_channel_id: int
     ):
-        """Create the discord.py callback that advances playback after each track."""
+        """Create the discord.py callback that advances playback after each track.
 
-        def _after_play(err):
-            async def continue_playback():
-                if err:
-                    await self.retry_player_once(player, guild_id)
-                await self.play_next(guild_id, text_channel_id)
+        The callback runs on the voice player's thread; it only posts a
+        ``track_ended`` message to the guild's actor and returns at once.
+        """
 
-            future = asyncio.run_coroutine_threadsafe(
-                continue_playback(), self.client.loop
+        async def track_ended(err):
+            if err:
+                await self.retry_player_once(player, guild_id)
+            await self.play_next(guild_id, text_channel_id)
+
+        def _after_play(err):
+            self.actors.tell_threadsafe(
+                self.client.loop, guild_id, "track_ended", track_ended, err
             )
-            try:
-                future.result()
-            except Exception as exc:
-                logger.error("Error in after-play callback: %s", exc, exc_info=True)
 
         return _after_play
 
+    async def start_if_idle(self, guild, text_channel_id: int) -> bool:
+        """Start playback unless the guild is already playing.
+
+        Returns True when this call started audio.
+        """
+        if guild.voice_client is not None and guild.voice_client.is_playing():
+            return False
+        await self.play_next(guild.id, text_channel_id)
+        return guild.voice_client is not None and guild.voice_client.is_playing()
+
+    @tracer.traced("announce_now_playing")
     async def announce_now_playing(self, guild_id: int, player: YTDLSource):
-        """Send the now playing message once per track."""
+        """Announce a track once, on the guild's panel when one is configured."""
         if player.message_sent:
             return
 
+        content = f"Now playing: **[{player.title}]({player.url})**"
+        if self.now_playing is not None:
+            channel = self.get_guild_text_channel(guild_id)
+            if channel is None:
+                return
+            self.now_playing.show(
+                guild_id,
+                channel,
+                content,
+                still_valid=lambda: self.is_current_player(guild_id, player),
+            )
+            player.message_sent = True
+            logger.info("Now playing in guild %s: %s", guild_id, player.title)
+            return
+
         message_sent = await self.send_guild_message(
             guild_id,
-            f"Now playing: **[{player.title}]({player.url})**",
+            content,
             "Failed to send now playing message",
+            priority=HIGH,
+            key=("now_playing", guild_id),
+            still_valid=lambda: self.is_current_player(guild_id, player),
         )
         if message_sent:
             player.message_sent = True
             logger.info("Now playing in guild %s: %s", guild_id, player.title)
 
-    async def wait_for_queue_during_playlist_load(
-        self, guild_id: int, text_channel_id: int
-    ) -> bool:
-        """Wait for background playlist loading to add more songs.
-
-        Each playlist entry needs its own yt-dlp extraction (signature/JS
-        challenge solving included), which can take several seconds per
-        song. Keep polling as long as the loader is still active instead of
-        giving up after a fixed few seconds, but cap the wait so a stuck
-        loader can't block forever.
-        """
-        elapsed = 0
-        while elapsed < self.state.playlist_wait_timeout:
-            await asyncio.sleep(1)
-            elapsed += 1
-            if self.state.get_queue(guild_id):
-                await self.play_next(guild_id, text_channel_id)
-                return True
-            if not self.state.loading_playlists.get(guild_id, False):
-                return False
-        return False
-
     # pylint: disable=too-many-arguments
     async def disconnect_for_empty_queue(
         self,
@@ -520,35 +849,50 @@ class MusicService:
         success_log: str,
         already_disconnected_log: str,
         warning_context: str,
+        reason: str = "empty_queue",
     ):
         """Disconnect the bot when the queue stays empty."""
         await self.disconnect_guild_voice(
             guild,
             guild_id=guild_id,
             message="Queue is empty, disconnecting.",
+            reason=reason,
             warning_context=warning_context,
             already_disconnected_log=already_disconnected_log,
             success_log=success_log,
         )
 
-    async def play_next(  # pylint: disable=too-many-return-statements
-        self, guild_id: int, text_channel_id: int
-    ):
-        """Advance playback for the guild queue."""
+    async def play_next(self, guild_id: int, text_channel_id: int):
+        """Advance playback for the guild queue; runs inside the guild's actor."""
         self.state.remember_text_channel(guild_id, text_channel_id)
         guild = self.client.get_guild(guild_id)
         if guild is None or guild.voice_client is None:
             return
 
-        player = await self.get_next_ready_player(guild_id)
+        try:
+            player = await self.get_next_ready_player(guild_id)
+        except BreakerOpenError as exc:
+            if not self.waits.park_for_breaker(guild_id, text_channel_id, exc):
+                # The queue is intact; stay connected until YouTube recovers.
+                await self.send_guild_message(
+                    guild_id,
+                    "YouTube is rate limiting the bot, so playback is paused. "
+                    "Use `/play` or `/add` to try again in a few minutes.",
+                    "Failed to send rate limit pause message",
+                    priority=HIGH,
+                )
+            return
+        self.waits.reset_breaker_wait(guild_id)
+
         if player is not None:
             try:
-                guild.voice_client.play(
-                    player,
-                    after=self.build_after_play_callback(
-                        player, guild_id, text_channel_id
-                    ),
-                )
+                with tracer.span("voice_client.play", title=player.title):
+                    guild.voice_client.play(
+                        player,
+                        after=self.build_after_play_callback(
+                            player, guild_id, text_channel_id
+                        ),
+                    )
             except Exception as exc:
                 self.state.get_queue(guild_id).insert(0, player)
                 logger.error(
@@ -560,6 +904,7 @@ class MusicService:
                 )
                 return
 
+            self.record_play(player)
             try:
                 await self.announce_now_playing(guild_id, player)
             except Exception as exc:
@@ -574,44 +919,7 @@ class MusicService:
             return
 
         if self.state.loading_playlists[guild_id]:
-            try:
-                queued_song_arrived = await self.wait_for_queue_during_playlist_load(
-                    guild_id, text_channel_id
-                )
-            except Exception as exc:
-                logger.error(
-                    "Error while waiting for playlist loading in guild %s: %s",
-                    guild_id,
-                    exc,
-                    exc_info=True,
-                )
-                return
-
-            if queued_song_arrived:
-                return
-            if guild.voice_client is None:
-                return
-
-            try:
-                await self.disconnect_for_empty_queue(
-                    guild,
-                    guild_id=guild_id,
-                    success_log=(
-                        f"Playlist loading timeout in guild {guild_id}. Disconnected."
-                    ),
-                    already_disconnected_log=(
-                        "Bot already disconnected from guild "
-                        f"{guild_id}, skipping timeout disconnect."
-                    ),
-                    warning_context="Failed to send timeout disconnect message",
-                )
-            except Exception as exc:
-                logger.error(
-                    "Failed to disconnect after playlist timeout in guild %s: %s",
-                    guild_id,
-                    exc,
-                    exc_info=True,
-                )
+            self.waits.park_for_loader(guild_id, text_channel_id)
             return
 
         try:
@@ -0,0 +1,152 @@
+"""Voice session snapshots, and resuming them after a restart."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from music_audio import YTDLSource, extraction_cache
+from music_metrics import session_restores
+from music_store import QUEUE, SESSION
+
+logger = logging.getLogger(__name__)
+
+SESSION_STREAM_LOOKAHEAD = 5
+
+
+class SessionKeeper:
+    """Save each connected guild's session and resume it on the next start.
+
+    Snapshots go through ``MusicState`` into its durable store next to the
+    queues, so a restarted process finds the channel, the queue, the
+    position in the current track, and stream URLs it need not re-extract.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.client = service.client
+        self.state = service.state
+
+    def snapshot_session(self, voice_client) -> dict | None:
+        """Describe a guild's voice session so a restarted bot can resume it.
+
+        Saves where to reconnect, the current track and position, and the
+        still-valid stream URLs of the current and next few tracks.
+        """
+        guild_id = voice_client.guild.id
+        text_channel_id = self.state.text_channels.get(guild_id)
+        if voice_client.channel is None or text_channel_id is None:
+            return None
+
+        source = getattr(voice_client, "source", None)
+        current = source if isinstance(source, YTDLSource) else None
+        players = [current] if current is not None else []
+        players.extend(self.state.get_queue(guild_id)[:SESSION_STREAM_LOOKAHEAD])
+        video_ids = [player.video_id for player in players if player.video_id]
+        return {
+            "voice_channel_id": voice_client.channel.id,
+            "text_channel_id": text_channel_id,
+            "current": current.to_record() if current is not None else None,
+            "position": round(current.position, 2) if current is not None else 0.0,
+            "streams": extraction_cache.export_streams(video_ids),
+        }
+
+    def snapshot_sessions(self) -> int:
+        """Snapshot every connected guild's session into the state store."""
+        snapshots = 0
+        for voice_client in list(self.client.voice_clients):
+            snapshot = self.snapshot_session(voice_client)
+            if snapshot is not None:
+                self.state.remember_session(voice_client.guild.id, snapshot)
+                snapshots += 1
+        return snapshots
+
+    async def run_session_snapshots(self, interval: float):
+        """Snapshot sessions every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.snapshot_sessions()
+            except Exception as exc:
+                logger.warning("Failed to snapshot voice sessions: %s", exc)
+
+    async def restore_sessions(self, stored: dict, *, concurrency: int = 4) -> int:
+        """Resume the saved sessions of this process's guilds in parallel.
+
+        At most ``concurrency`` guilds connect at once, so a restart does not
+        burst voice connections and extractions. Returns the number resumed.
+        """
+        sessions = stored.get(SESSION, {})
+        queues = stored.get(QUEUE, {})
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def restore(guild_id: int, session: dict) -> bool:
+            async with semaphore:
+                try:
+                    return await self.restore_session(
+                        guild_id, session, queues.get(guild_id) or []
+                    )
+                except Exception as exc:
+                    session_restores.inc("failed")
+                    logger.warning(
+                        "Failed to restore session in guild %s: %s", guild_id, exc
+                    )
+                    return False
+
+        results = await asyncio.gather(
+            *(restore(guild_id, session) for guild_id, session in sessions.items())
+        )
+        restored = sum(results)
+        if sessions:
+            logger.info("Restored %s of %s saved sessions.", restored, len(sessions))
+        return restored
+
+    async def restore_session(
+        self, guild_id: int, session: dict, queue_records: list[dict]
+    ) -> bool:
+        """Reconnect one guild and continue its queue from the saved position."""
+        guild = self.client.get_guild(guild_id)
+        if guild is None:
+            # Another shard cluster owns this guild, or the bot left it.
+            return False
+        if guild.voice_client is not None:
+            session_restores.inc("superseded")
+            return False
+
+        channel = guild.get_channel(session.get("voice_channel_id"))
+        players = [YTDLSource.from_record(record) for record in queue_records]
+        current = session.get("current")
+        if current:
+            players.insert(
+                0,
+                YTDLSource.from_record(
+                    current, start_offset=session.get("position", 0.0)
+                ),
+            )
+        if (
+            channel is None
+            or not players
+            or self.service.is_bot_alone_in_channel(channel)
+        ):
+            self.state.forget_stored_guild(guild_id)
+            session_restores.inc("skipped")
+            return False
+
+        extraction_cache.import_streams(session.get("streams") or {})
+        await channel.connect()
+        text_channel_id = session["text_channel_id"]
+        self.state.remember_text_channel(guild_id, text_channel_id)
+        await self.service.actors.ask(
+            guild_id, "add", self.state.get_queue(guild_id).extend, players
+        )
+        session_restores.inc("restored")
+        logger.info("Restoring %s tracks in guild %s.", len(players), guild_id)
+        await self.service.send_guild_message(
+            guild_id,
+            f"Resuming playback after a restart ({len(players)} tracks).",
+            "Failed to send resume message",
+        )
+        await self.service.actors.ask(
+            guild_id, "play", self.service.start_if_idle, guild, text_channel_id
+        )
+        return True
@@ -0,0 +1,360 @@
+"""Shard configuration and a launcher that runs shard clusters as processes.
+
+One process runs one cluster: an ``AutoShardedClient`` for a contiguous
+range of shard IDs, with its own ``MusicState`` and ``MusicService``. The
+launcher splits the shards into clusters, starts ``main.py`` once per
+cluster with ``SHARD_COUNT``/``SHARD_IDS``/``CLUSTER_ID`` set, staggers the
+starts so identifies stay within Discord's limit, and restarts clusters
+that crash:
+
+    python music_sharding.py --clusters 4 --shard-count 16
+    python music_sharding.py --clusters 2 --shard-count auto
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+IDENTIFY_INTERVAL = 5.0
+PER_CLUSTER_FILES = ("LOOP_REPORT_FILE", "TRACE_FILE")
+
+
+def parse_shard_ids(value: str) -> tuple[int, ...]:
+    """Parse ``"0-3,8,10-11"`` into sorted, unique shard IDs."""
+    shard_ids: set[int] = set()
+    for part in value.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        first = int(start)
+        last = int(end) if end else first
+        if last < first:
+            raise ValueError(f"Invalid shard range {part!r}")
+        shard_ids.update(range(first, last + 1))
+    return tuple(sorted(shard_ids))
+
+
+def format_shard_ids(shard_ids: tuple[int, ...]) -> str:
+    """Render shard IDs compactly, collapsing consecutive runs into ranges."""
+    runs: list[str] = []
+    index = 0
+    while index < len(shard_ids):
+        end = index
+        while end + 1 < len(shard_ids) and shard_ids[end + 1] == shard_ids[end] + 1:
+            end += 1
+        first, last = shard_ids[index], shard_ids[end]
+        runs.append(str(first) if first == last else f"{first}-{last}")
+        index = end + 1
+    return ",".join(runs)
+
+
+def shard_id_for_guild(guild_id: int, shard_count: int) -> int:
+    """Return the shard Discord routes a guild's events through."""
+    return (guild_id >> 22) % shard_count
+
+
+def count_by_shard(guilds) -> dict[tuple[int], int]:
+    """Count guilds per shard, keyed for a labelled gauge."""
+    counts: dict[tuple[int], int] = {}
+    for guild in guilds:
+        key = (guild.shard_id,)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def split_shards(shard_count: int, clusters: int) -> list[tuple[int, ...]]:
+    """Split ``shard_count`` shards into ``clusters`` contiguous, even ranges."""
+    if clusters < 1 or clusters > shard_count:
+        raise ValueError(f"Cannot split {shard_count} shards into {clusters} clusters.")
+    base, extra = divmod(shard_count, clusters)
+    ranges = []
+    start = 0
+    for index in range(clusters):
+        size = base + (1 if index < extra else 0)
+        ranges.append(tuple(range(start, start + size)))
+        start += size
+    return ranges
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    """Which shards this process runs, read from the environment.
+
+    ``SHARD_COUNT`` unset means an unsharded ``discord.Client``.
+    ``SHARD_COUNT=auto`` lets discord.py use Discord's recommended count
+    for every shard in this process. With a number, ``SHARD_IDS`` picks
+    this cluster's shards (all of them when unset).
+    """
+
+    enabled: bool = False
+    shard_count: int | None = None
+    shard_ids: tuple[int, ...] | None = None
+    cluster_id: int = 0
+
+    @classmethod
+    def from_env(cls, environ=None) -> "ShardConfig":
+        """Build the config, raising ValueError on inconsistent settings."""
+        environ = os.environ if environ is None else environ
+        raw_count = environ.get("SHARD_COUNT", "").strip().lower()
+        cluster_id = int(environ.get("CLUSTER_ID", "") or 0)
+        if not raw_count:
+            return cls(cluster_id=cluster_id)
+        if raw_count == "auto":
+            return cls(enabled=True, cluster_id=cluster_id)
+
+        shard_count = int(raw_count)
+        if shard_count < 1:
+            raise ValueError(f"SHARD_COUNT must be positive, got {shard_count}")
+        raw_ids = environ.get("SHARD_IDS", "")
+        shard_ids = parse_shard_ids(raw_ids) if raw_ids.strip() else None
+        if shard_ids is not None and (not shard_ids or shard_ids[-1] >= shard_count):
+            raise ValueError(
+                f"SHARD_IDS={raw_ids!r} does not fit SHARD_COUNT={shard_count}"
+            )
+        return cls(True, shard_count, shard_ids, cluster_id)
+
+    @property
+    def syncs_commands(self) -> bool:
+        """Return True for the one process that syncs slash commands."""
+        return self.cluster_id == 0
+
+    def client_options(self) -> dict:
+        """Return ``AutoShardedClient`` keyword arguments, or none unsharded."""
+        if not self.enabled:
+            return {}
+        return {
+            "shard_count": self.shard_count,
+            "shard_ids": list(self.shard_ids) if self.shard_ids else None,
+        }
+
+    def log_label(self) -> str:
+        """Return the log-line prefix that tells clusters apart."""
+        if not self.enabled:
+            return ""
+        if self.shard_count is None:
+            return f" [cluster {self.cluster_id} shards auto]"
+        shard_ids = self.shard_ids or tuple(range(self.shard_count))
+        return (
+            f" [cluster {self.cluster_id} shards "
+            f"{format_shard_ids(shard_ids)}/{self.shard_count}]"
+        )
+
+
+def fetch_gateway_bot(token: str, *, timeout: float = 10.0) -> dict:
+    """Ask Discord for the recommended shard count and identify concurrency."""
+    request = urllib.request.Request(
+        GATEWAY_BOT_URL,
+        headers={
+            "Authorization": f"Bot {token}",
+            "User-Agent": "DiscordBot (discord-music-bot, 1.0)",
+        },
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+@dataclass
+class Cluster:
+    """One launched process and the shards it owns."""
+
+    index: int
+    shard_ids: tuple[int, ...]
+    process: asyncio.subprocess.Process | None = None
+    restarts: int = 0
+    exit_codes: list[int] = field(default_factory=list)
+
+
+class ClusterLauncher:  # pylint: disable=too-many-instance-attributes
+    """Run one bot process per cluster and restart the ones that crash.
+
+    Cluster ``i`` starts ``i * stagger`` seconds after the first so the
+    clusters' identifies don't compete for the same rate-limit window. A
+    process that exits with status 0 stays stopped; any other exit is
+    restarted after an exponential backoff that resets once a run lasted
+    ``stable_after`` seconds.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        command: list[str],
+        shard_count: int,
+        clusters: int,
+        *,
+        environ=None,
+        stagger: float = 0.0,
+        max_backoff: float = 60.0,
+        stable_after: float = 60.0,
+        max_restarts: int | None = None,
+        sleep=asyncio.sleep,
+    ):
+        self.command = command
+        self.shard_count = shard_count
+        self.clusters = [
+            Cluster(index, shard_ids)
+            for index, shard_ids in enumerate(split_shards(shard_count, clusters))
+        ]
+        self.environ = dict(os.environ if environ is None else environ)
+        self.stagger = stagger
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.max_restarts = max_restarts
+        self.sleep = sleep
+        self.stopping = False
+
+    def cluster_environment(self, cluster: Cluster) -> dict[str, str]:
+        """Return the environment for one cluster's process."""
+        environment = dict(self.environ)
+        environment.update(
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=format_shard_ids(cluster.shard_ids),
+            CLUSTER_ID=str(cluster.index),
+        )
+        metrics_port = int(environment.get("METRICS_PORT", "") or 0)
+        if metrics_port:
+            environment["METRICS_PORT"] = str(metrics_port + cluster.index)
+        for name in PER_CLUSTER_FILES:
+            path = environment.get(name)
+            if path:
+                root, extension = os.path.splitext(path)
+                environment[name] = f"{root}.cluster{cluster.index}{extension}"
+        return environment
+
+    async def supervise(self, cluster: Cluster):
+        """Start a cluster after its stagger delay and keep it running."""
+        await self.sleep(cluster.index * self.stagger)
+        backoff = 1.0
+        while not self.stopping:
+            started = time.monotonic()
+            cluster.process = await asyncio.create_subprocess_exec(
+                *self.command, env=self.cluster_environment(cluster)
+            )
+            logger.info(
+                "Started cluster %s (shards %s) as pid %s.",
+                cluster.index,
+                format_shard_ids(cluster.shard_ids),
+                cluster.process.pid,
+            )
+            code = await cluster.process.wait()
+            cluster.exit_codes.append(code)
+            if self.stopping or code == 0:
+                logger.info("Cluster %s exited with status %s.", cluster.index, code)
+                return
+            if self.max_restarts is not None and cluster.restarts >= self.max_restarts:
+                logger.error(
+                    "Cluster %s exited with status %s; restart limit reached.",
+                    cluster.index,
+                    code,
+                )
+                return
+
+            if time.monotonic() - started >= self.stable_after:
+                backoff = 1.0
+            logger.warning(
+                "Cluster %s exited with status %s; restarting in %.0fs.",
+                cluster.index,
+                code,
+                backoff,
+            )
+            cluster.restarts += 1
+            await self.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stop(self):
+        """Stop restarting clusters and terminate the running processes."""
+        self.stopping = True
+        for cluster in self.clusters:
+            process = cluster.process
+            if process is not None and process.returncode is None:
+                process.terminate()
+
+    async def run(self):
+        """Supervise every cluster until all have stopped for good."""
+        await asyncio.gather(*(self.supervise(cluster) for cluster in self.clusters))
+
+
+def parse_args(argv=None):
+    """Parse launcher options."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clusters", type=int, default=1)
+    parser.add_argument(
+        "--shard-count",
+        default="auto",
+        help="total shards, or 'auto' for Discord's recommendation",
+    )
+    parser.add_argument(
+        "--stagger",
+        type=float,
+        help="seconds between cluster starts (default: from identify limits)",
+    )
+    parser.add_argument(
+        "command",
+        nargs=argparse.REMAINDER,
+        help="command for one cluster (default: this Python running main.py)",
+    )
+    return parser.parse_args(argv)
+
+
+async def launch(options) -> int:
+    """Resolve the shard layout, then run clusters until they stop."""
+    max_concurrency = 1
+    if options.shard_count == "auto":
+        token = os.getenv("DISCORD_TOKEN")
+        if not token:
+            logger.error("--shard-count auto needs DISCORD_TOKEN.")
+            return 2
+        gateway = await asyncio.to_thread(fetch_gateway_bot, token)
+        shard_count = max(gateway["shards"], options.clusters)
+        max_concurrency = gateway.get("session_start_limit", {}).get(
+            "max_concurrency", 1
+        )
+    else:
+        shard_count = int(options.shard_count)
+
+    stagger = options.stagger
+    if stagger is None:
+        per_cluster = -(-shard_count // options.clusters)
+        stagger = per_cluster * IDENTIFY_INTERVAL / max_concurrency
+
+    command = options.command or [sys.executable, "main.py"]
+    launcher = ClusterLauncher(command, shard_count, options.clusters, stagger=stagger)
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, launcher.stop)
+    logger.info(
+        "Launching %s shards in %s clusters, %.0fs apart.",
+        shard_count,
+        options.clusters,
+        stagger,
+    )
+    await launcher.run()
+    return 0
+
+
+def main(argv=None) -> int:
+    """Run the cluster launcher."""
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] %(levelname)s [launcher] - %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    return asyncio.run(launch(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
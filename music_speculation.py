@@ -0,0 +1,169 @@
+"""Speculative first-track extraction started from slash-command autocomplete."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass
+
+from music_audio import (
+    extract_info_async,
+    extraction_scheduler,
+    get_youtube_video_id,
+)
+from music_scheduler import BACKGROUND, INTERACTIVE
+from music_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SpeculativeExtraction:
+    """One in-flight or finished speculative extraction for a user."""
+
+    video_id: str
+    url: str
+    task: asyncio.Task
+    started_at: float
+    claimed: asyncio.Event
+
+
+class SpeculativeExtractor:
+    """Start first-track extractions early while a user is still typing.
+
+    Autocomplete fires on every keystroke, so speculation is bounded on
+    several axes: each user may only own ``max_per_user`` speculations (older
+    ones are treated as abandoned and cancelled), the whole process may only
+    run ``max_total`` at once, nothing starts until the URL has been stable for
+    ``start_delay`` seconds, and unclaimed results are dropped after ``ttl``.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        *,
+        max_per_user: int = 1,
+        max_total: int = 8,
+        ttl: float = 30.0,
+        start_delay: float = 0.5,
+        clock=time.monotonic,
+        supervisor: TaskSupervisor | None = None,
+    ):
+        self.max_per_user = max_per_user
+        self.max_total = max_total
+        self.ttl = ttl
+        self.start_delay = start_delay
+        self.clock = clock
+        self.supervisor = supervisor if supervisor is not None else TaskSupervisor()
+        self.pending: dict[int, list[SpeculativeExtraction]] = {}
+
+    def total_pending(self) -> int:
+        """Return how many speculations are currently tracked."""
+        return sum(len(entries) for entries in self.pending.values())
+
+    def prune(self):
+        """Cancel and forget speculations that outlived their TTL."""
+        now = self.clock()
+        for user_id in list(self.pending):
+            fresh = []
+            for speculation in self.pending[user_id]:
+                if now - speculation.started_at < self.ttl:
+                    fresh.append(speculation)
+                else:
+                    self.discard(speculation)
+            if fresh:
+                self.pending[user_id] = fresh
+            else:
+                del self.pending[user_id]
+
+    @staticmethod
+    def discard(speculation: SpeculativeExtraction):
+        """Cancel a speculation that nobody is going to claim."""
+        if not speculation.task.done():
+            speculation.task.cancel()
+        elif not speculation.task.cancelled():
+            # Retrieve the exception so asyncio does not log it as unhandled.
+            speculation.task.exception()
+
+    async def run_extraction(self, url: str, claimed: asyncio.Event) -> dict:
+        """Wait out the start delay, then run the same extraction as /play.
+
+        A claim ends the delay early and makes the extraction interactive,
+        since a user is now waiting on it.
+        """
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(claimed.wait(), self.start_delay)
+        priority = INTERACTIVE if claimed.is_set() else BACKGROUND
+        return await extract_info_async(
+            url, priority=priority, noplaylist=True, playlist_items="1"
+        )
+
+    def maybe_start(self, user_id: int, url: str) -> bool:
+        """Start a speculative extraction when ``url`` is a complete video URL."""
+        self.prune()
+        video_id = get_youtube_video_id(url)
+        if video_id is None:
+            return False
+
+        user_entries = self.pending.setdefault(user_id, [])
+        if any(entry.video_id == video_id for entry in user_entries):
+            return True
+
+        while len(user_entries) >= self.max_per_user:
+            self.discard(user_entries.pop(0))
+
+        if self.total_pending() >= self.max_total:
+            if not user_entries:
+                del self.pending[user_id]
+            logger.debug("Speculation limit reached, not prefetching %s", url)
+            return False
+
+        # The command that claims the result reports a failed extraction.
+        claimed = asyncio.Event()
+        task = self.supervisor.spawn(
+            "speculation", self.run_extraction(url, claimed), log_errors=False
+        )
+        user_entries.append(
+            SpeculativeExtraction(
+                video_id=video_id,
+                url=url,
+                task=task,
+                started_at=self.clock(),
+                claimed=claimed,
+            )
+        )
+        return True
+
+    def claim(self, user_id: int, url: str) -> asyncio.Task | None:
+        """Hand a matching speculation to the submitted command, if one exists."""
+        self.prune()
+        video_id = get_youtube_video_id(url)
+        user_entries = self.pending.get(user_id)
+        if video_id is None or not user_entries:
+            return None
+
+        for index, speculation in enumerate(user_entries):
+            if speculation.video_id != video_id:
+                continue
+
+            del user_entries[index]
+            if not user_entries:
+                del self.pending[user_id]
+            if speculation.task.cancelled():
+                return None
+            # The submitter now waits on this, so it must not queue as background.
+            speculation.claimed.set()
+            extraction_scheduler.promote(speculation.task, INTERACTIVE)
+            logger.info("Using speculative extraction for %s", url)
+            return speculation.task
+
+        return None
+
+    def cancel_all(self):
+        """Cancel every tracked speculation."""
+        for user_entries in self.pending.values():
+            for speculation in user_entries:
+                self.discard(speculation)
+        self.pending.clear()
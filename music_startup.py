@@ -0,0 +1,165 @@
+"""Startup helpers: lazy imports, conditional command sync, and phase timing."""
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """Module proxy that imports its target on first attribute access.
+
+    Attributes set on the proxy (as ``unittest.mock.patch`` does) shadow the
+    real module's until they are deleted again.
+    """
+
+    def __init__(self, name: str, *, on_load=None):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_on_load"] = on_load
+        self.__dict__["_lock"] = threading.Lock()
+        self.__dict__["load_seconds"] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Return True once the target module has been imported."""
+        return self._module is not None
+
+    def load(self):
+        """Import the target module once, thread-safely, and return it."""
+        if self._module is not None:
+            return self._module
+        with self._lock:
+            if self._module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self._name)
+                if self._on_load is not None:
+                    self._on_load(module)
+                self.__dict__["load_seconds"] = time.perf_counter() - started
+                self.__dict__["_module"] = module
+                logger.info("Imported %s in %.2fs", self._name, self.load_seconds)
+        return self._module
+
+    def __getattr__(self, name: str):
+        return getattr(self.load(), name)
+
+    def __setattr__(self, name: str, value):
+        self.__dict__[name] = value
+
+    def __delattr__(self, name: str):
+        del self.__dict__[name]
+
+
+def process_uptime() -> float | None:
+    """Return seconds since this process started, where /proc exposes it."""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as stat_file:
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", encoding="ascii") as uptime_file:
+            uptime = float(uptime_file.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    """Record named startup phases and log them as one breakdown line.
+
+    The first phase, ``imports``, covers interpreter start up to the
+    timer's creation when the platform can tell us the process start time.
+    """
+
+    def __init__(self, *, clock=time.perf_counter, uptime=process_uptime):
+        self.clock = clock
+        self.phases: list[tuple[str, float]] = []
+        self.last = clock()
+        self.started = self.last
+        imports = uptime()
+        if imports is not None:
+            self.started -= imports
+            self.phases.append(("imports", imports))
+        self.reported = False
+
+    def mark(self, phase: str) -> float:
+        """Close the phase that ends now and return its duration."""
+        now = self.clock()
+        duration = now - self.last
+        self.phases.append((phase, duration))
+        self.last = now
+        return duration
+
+    def total(self) -> float:
+        """Return seconds from the first phase's start to the last mark."""
+        return self.last - self.started
+
+    def summary(self) -> str:
+        """Render the phases as ``name 0.12s`` pairs plus the total."""
+        phases = ", ".join(f"{name} {duration:.2f}s" for name, duration in self.phases)
+        return f"{phases} (total {self.total():.2f}s)"
+
+    def report(self, final_phase: str) -> bool:
+        """Mark ``final_phase`` and log the breakdown once per process."""
+        if self.reported:
+            return False
+        self.mark(final_phase)
+        self.reported = True
+        logger.info("Startup: %s", self.summary())
+        return True
+
+
+def command_tree_hash(tree, application_id: int | None = None) -> str:
+    """Hash the payload the command tree would upload on sync."""
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands()),
+        key=lambda command: (command.get("type", 1), command["name"]),
+    )
+    digest = hashlib.sha256()
+    digest.update(str(application_id).encode())
+    digest.update(json.dumps(payload, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def read_stored_hash(path: str) -> str | None:
+    """Return the hash saved by the last successful sync, if any."""
+    try:
+        with open(path, encoding="ascii") as hash_file:
+            return hash_file.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_stored_hash(path: str, value: str):
+    """Save a hash atomically so a crash never leaves a partial file."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="ascii") as hash_file:
+        hash_file.write(f"{value}\n")
+    os.replace(temporary_path, path)
+
+
+async def sync_command_tree_if_changed(
+    tree, path: str, *, application_id: int | None = None, force: bool = False
+) -> bool:
+    """Sync global commands only when their definition changed.
+
+    Returns True when a sync was sent. The hash is stored only after Discord
+    accepted the sync, so a failed sync is retried on the next start.
+    """
+    current = command_tree_hash(tree, application_id)
+    if not force and read_stored_hash(path) == current:
+        logger.info("Command tree unchanged (%s), skipping sync.", current[:12])
+        return False
+
+    await tree.sync(guild=None)
+    try:
+        write_stored_hash(path, current)
+    except OSError as exc:
+        logger.warning("Could not store command tree hash in %s: %s", path, exc)
+    logger.info("Synchronized command tree (%s).", current[:12])
+    return True
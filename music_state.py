@@ -3,13 +3,89 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
+
+from music_store import (
+    GENERATION,
+    NAMESPACES,
+    QUEUE,
+    SESSION,
+    TEXT_CHANNEL,
+    MemoryStore,
+)
 
 if TYPE_CHECKING:
     from music_audio import YTDLSource
 
+logger = logging.getLogger(__name__)
+
+QUEUE_MUTATORS = (
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+)
+
+
+class TrackedQueue(list):
+    """Guild queue list that reports every mutation to ``on_change``."""
+
+    __slots__ = ("guild_id", "on_change")
+
+    def __init__(self, items=(), *, guild_id: int, on_change: Callable[[int], None]):
+        super().__init__(items)
+        self.guild_id = guild_id
+        self.on_change = on_change
+
+
+def track_mutation(name: str):
+    """Wrap a list mutator so it marks the queue's guild as changed."""
+    mutate = getattr(list, name)
+
+    def tracked(self, *args, **kwargs):
+        result = mutate(self, *args, **kwargs)
+        self.on_change(self.guild_id)
+        return result
+
+    tracked.__name__ = name
+    return tracked
+
+
+for _name in QUEUE_MUTATORS:
+    setattr(TrackedQueue, _name, track_mutation(_name))
+
+
+class TrackedQueues(dict):
+    """Guild ID to queue mapping that creates tracked queues on demand."""
+
+    def __init__(self, queues, *, on_change: Callable[[int], None]):
+        super().__init__()
+        self.on_change = on_change
+        for guild_id, queue in queues.items():
+            self[guild_id] = queue
+
+    def __missing__(self, guild_id: int) -> TrackedQueue:
+        queue = TrackedQueue(guild_id=guild_id, on_change=self.on_change)
+        dict.__setitem__(self, guild_id, queue)
+        return queue
+
+    def __setitem__(self, guild_id: int, queue):
+        if not isinstance(queue, TrackedQueue):
+            queue = TrackedQueue(queue, guild_id=guild_id, on_change=self.on_change)
+        super().__setitem__(guild_id, queue)
+        self.on_change(guild_id)
+
 
 @dataclass
 class MusicState:  # pylint: disable=too-many-instance-attributes
@@ -29,9 +105,17 @@ class MusicState:  # pylint: disable=too-many-instance-attributes
     )
     loading_tasks: dict[int, asyncio.Task] = field(default_factory=dict)
     text_channels: dict[int, int] = field(default_factory=dict)
+    sessions: dict[int, dict] = field(default_factory=dict)
     disconnect_locks: dict[int, asyncio.Lock] = field(
         default_factory=lambda: defaultdict(asyncio.Lock)
     )
+    store: MemoryStore = field(default_factory=MemoryStore)
+    dirty: set[tuple[str, int]] = field(default_factory=set)
+
+    def __post_init__(self):
+        """Track queue mutations when the store persists them."""
+        if self.store.durable:
+            self.queues = TrackedQueues(self.queues, on_change=self.mark_queue_dirty)
 
     def get_queue(self, guild_id: int) -> list["YTDLSource"]:
         """Return the mutable queue list for one guild."""
@@ -43,7 +127,10 @@ class MusicState:  # pylint: disable=too-many-instance-attributes
             self.queues[guild_id].clear()
 
         self.stop_playlist_loading(guild_id)
-        self.text_channels.pop(guild_id, None)
+        if self.text_channels.pop(guild_id, None) is not None:
+            self.mark_dirty(TEXT_CHANNEL, guild_id)
+        if self.sessions.pop(guild_id, None) is not None:
+            self.mark_dirty(SESSION, guild_id)
 
     def begin_playlist_loading(self, guild_id: int) -> int:
         """Start a new owned playlist loader for one guild."""
@@ -53,6 +140,7 @@ class MusicState:  # pylint: disable=too-many-instance-attributes
 
         generation = self.playlist_load_generations[guild_id] + 1
         self.playlist_load_generations[guild_id] = generation
+        self.mark_dirty(GENERATION, guild_id)
         self.loading_playlists[guild_id] = True
         return generation
 
@@ -94,4 +182,84 @@ class MusicState:  # pylint: disable=too-many-instance-attributes
 
     def remember_text_channel(self, guild_id: int, channel_id: int):
         """Store the last text channel used by a guild command."""
-        self.text_channels[guild_id] = channel_id
+        if self.text_channels.get(guild_id) != channel_id:
+            self.text_channels[guild_id] = channel_id
+            self.mark_dirty(TEXT_CHANNEL, guild_id)
+
+    def mark_dirty(self, namespace: str, guild_id: int):
+        """Queue one guild value for the next store flush."""
+        if self.store.durable:
+            self.dirty.add((namespace, guild_id))
+
+    def remember_session(self, guild_id: int, snapshot: dict):
+        """Store the latest playback snapshot of an active voice session."""
+        self.sessions[guild_id] = snapshot
+        self.mark_dirty(SESSION, guild_id)
+
+    def forget_stored_guild(self, guild_id: int):
+        """Make the next flush replace every stored value with memory's."""
+        for namespace in NAMESPACES:
+            self.mark_dirty(namespace, guild_id)
+
+    def mark_queue_dirty(self, guild_id: int):
+        """Queue a guild's queue for the next store flush."""
+        self.dirty.add((QUEUE, guild_id))
+
+    def pending_changes(self) -> dict[tuple[str, int], object]:
+        """Serialize every dirty value and clear the dirty set."""
+        changes: dict[tuple[str, int], object] = {}
+        for namespace, guild_id in self.dirty:
+            if namespace == QUEUE:
+                queue = self.queues.get(guild_id)
+                value = [player.to_record() for player in queue] if queue else None
+            elif namespace == TEXT_CHANNEL:
+                value = self.text_channels.get(guild_id)
+            elif namespace == SESSION:
+                value = self.sessions.get(guild_id)
+            else:
+                value = self.playlist_load_generations.get(guild_id) or None
+            changes[(namespace, guild_id)] = value
+        self.dirty.clear()
+        return changes
+
+    def requeue_changes(self, changes: dict[tuple[str, int], object]):
+        """Mark a batch the store rejected so the next flush retries it."""
+        self.dirty.update(changes)
+
+    def flush_store(self) -> int:
+        """Write pending changes synchronously and return how many were written."""
+        changes = self.pending_changes()
+        if changes and not self.store.write(changes):
+            self.requeue_changes(changes)
+            return 0
+        return len(changes)
+
+    async def run_store_flusher(self, interval: float):
+        """Write batched changes every ``interval`` seconds from a worker thread.
+
+        Changes are serialized on the event loop, where the queues live, and
+        only the database transaction runs in the thread. Cancelling the
+        flusher waits for the batch in flight, so a final ``flush_store``
+        never writes alongside it and retries the batch if it failed.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            changes = self.pending_changes()
+            if not changes:
+                continue
+            write = asyncio.ensure_future(self.write_changes(changes))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                await write
+                raise
+
+    async def write_changes(self, changes: dict[tuple[str, int], object]):
+        """Write one batch from a worker thread, requeueing it on failure."""
+        try:
+            written = await asyncio.to_thread(self.store.write, changes)
+        except Exception as exc:
+            logger.warning("State flush failed: %s", exc)
+            written = False
+        if not written:
+            self.requeue_changes(changes)
@@ -0,0 +1,128 @@
+"""Storage backends that keep MusicState beyond one process's lifetime."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+QUEUE = "queue"
+TEXT_CHANNEL = "text_channel"
+GENERATION = "generation"
+SESSION = "session"
+NAMESPACES = (QUEUE, TEXT_CHANNEL, GENERATION, SESSION)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS guild_state (
+        namespace TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        value TEXT NOT NULL,
+        updated REAL NOT NULL,
+        PRIMARY KEY (namespace, guild_id)
+    )
+"""
+
+
+class MemoryStore:
+    """Keep state only in the process; the default backend.
+
+    ``MusicState`` is always the authoritative in-memory copy. A store only
+    receives batches of changed ``(namespace, guild_id)`` values, where
+    None means the entry was removed.
+    """
+
+    durable = False
+
+    def open(self):
+        """Prepare the backend; nothing to do in memory."""
+
+    def load(self) -> dict[str, dict[int, object]]:
+        """Return every stored value by namespace and guild."""
+        return {namespace: {} for namespace in NAMESPACES}
+
+    def write(  # pylint: disable=unused-argument
+        self, changes: dict[tuple[str, int], object]
+    ) -> bool:
+        """Apply a batch of changes; returns False when it must be retried."""
+        return True
+
+    def close(self):
+        """Release the backend."""
+
+
+class SQLiteStore(MemoryStore):
+    """Persist guild state in SQLite in WAL mode.
+
+    WAL lets shard clusters sharing one database file write concurrently
+    with readers, and ``busy_timeout`` makes a writer wait out another
+    process's transaction instead of failing. Each batch is one transaction.
+    """
+
+    durable = True
+
+    def __init__(self, path: str, *, busy_timeout_ms: int = 5000, clock=time.time):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.clock = clock
+        self.connection: sqlite3.Connection | None = None
+
+    def open(self):
+        """Open the database and create the table if needed."""
+        if self.connection is not None:
+            return
+        # Batches are written from a worker thread, one at a time.
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def load(self) -> dict[str, dict[int, object]]:
+        """Read every stored guild value."""
+        self.open()
+        stored = super().load()
+        for namespace, guild_id, value in self.connection.execute(
+            "SELECT namespace, guild_id, value FROM guild_state"
+        ):
+            if namespace in stored:
+                stored[namespace][guild_id] = json.loads(value)
+        return stored
+
+    def write(self, changes: dict[tuple[str, int], object]) -> bool:
+        """Upsert changed values and delete removed ones in one transaction."""
+        if not changes:
+            return True
+        self.open()
+        now = self.clock()
+        upserts = [
+            (namespace, guild_id, json.dumps(value, separators=(",", ":")), now)
+            for (namespace, guild_id), value in changes.items()
+            if value is not None
+        ]
+        deletes = [key for key, value in changes.items() if value is None]
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO guild_state (namespace, guild_id, value, updated) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(namespace, guild_id) DO UPDATE "
+                    "SET value=excluded.value, updated=excluded.updated",
+                    upserts,
+                )
+                self.connection.executemany(
+                    "DELETE FROM guild_state WHERE namespace = ? AND guild_id = ?",
+                    deletes,
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Failed to write %s state changes: %s", len(changes), exc)
+            return False
+        return True
+
+    def close(self):
+        """Close the database connection if it is open."""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
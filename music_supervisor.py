@@ -0,0 +1,172 @@
+"""Supervisor that owns the bot's background tasks by guild and kind."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+
+from music_metrics import task_seconds
+
+logger = logging.getLogger(__name__)
+
+# Shutdown cancels producers of new work first and the tasks that persist
+# state last; kinds not listed here go after all of these.
+DRAIN_ORDER = (
+    "session_restore",
+    "playlist_load",
+    "alone_disconnect",
+    "prewarm",
+    "cache_warm",
+    "speculation",
+    "session_snapshot",
+    "history_flush",
+    "state_flush",
+)
+
+
+@dataclass(slots=True)
+class SupervisedTask:
+    """Bookkeeping for one background task."""
+
+    kind: str
+    guild_id: int | None
+    coro: object
+    log_errors: bool = True
+    started: float | None = None
+
+
+def parse_limits(value: str) -> dict[str, int]:
+    """Parse ``"playlist_load=8,restore=2"`` into per-kind limits."""
+    limits: dict[str, int] = {}
+    for part in value.replace(" ", "").split(","):
+        if not part:
+            continue
+        kind, _, limit = part.partition("=")
+        if not kind or not limit.isdigit() or int(limit) < 1:
+            raise ValueError(f"Invalid task limit {part!r}")
+        limits[kind] = int(limit)
+    return limits
+
+
+class TaskSupervisor:
+    """Start, limit, account for and stop every background task.
+
+    Each task is spawned under a kind (``playlist_load``, ``state_flush``...)
+    and optionally a guild. Kinds listed in ``limits`` run at most that many
+    tasks at once; the rest wait for a slot inside their task, so callers
+    never block. Every finished task records its run time and outcome
+    (``ok``, ``error`` or ``cancelled``) in ``musicbot_task_seconds``, and
+    failures are logged since nobody may await them.
+    """
+
+    def __init__(self, *, limits: dict[str, int] | None = None, clock=time.monotonic):
+        self.clock = clock
+        self.limits = dict(limits or {})
+        self.slots = {
+            kind: asyncio.Semaphore(limit) for kind, limit in self.limits.items()
+        }
+        self.tasks: dict[asyncio.Task, SupervisedTask] = {}
+
+    def spawn(
+        self, kind: str, coro, *, guild_id: int | None = None, log_errors: bool = True
+    ) -> asyncio.Task:
+        """Run ``coro`` as a supervised task and return it.
+
+        Pass ``log_errors=False`` when whoever awaits the task reports its
+        failure.
+        """
+        entry = SupervisedTask(kind, guild_id, coro, log_errors)
+        task = asyncio.create_task(self.run(entry))
+        self.tasks[task] = entry
+        task.add_done_callback(self.finish)
+        return task
+
+    async def run(self, entry: SupervisedTask):
+        """Wait for a slot of the task's kind, then run its coroutine."""
+        slot = self.slots.get(entry.kind) or contextlib.nullcontext()
+        async with slot:
+            entry.started = self.clock()
+            return await entry.coro
+
+    def finish(self, task: asyncio.Task):
+        """Record a finished task's run time and outcome."""
+        entry = self.tasks.pop(task)
+        # A task cancelled while it waited for its first step never ran it.
+        entry.coro.close()
+        if task.cancelled():
+            outcome = "cancelled"
+        elif task.exception() is not None:
+            outcome = "error"
+            if entry.log_errors:
+                logger.error(
+                    "Background %s task failed in guild %s: %s",
+                    entry.kind,
+                    entry.guild_id,
+                    task.exception(),
+                    exc_info=task.exception(),
+                )
+        else:
+            outcome = "ok"
+        elapsed = 0.0 if entry.started is None else self.clock() - entry.started
+        task_seconds.observe(elapsed, entry.kind, outcome)
+
+    def is_running(self, kind: str, guild_id: int | None = None) -> bool:
+        """Return True while a task of ``kind`` for ``guild_id`` is unfinished."""
+        return any(
+            entry.kind == kind and entry.guild_id == guild_id and not task.done()
+            for task, entry in self.tasks.items()
+        )
+
+    def cancel_guild(self, guild_id: int, *, spare: asyncio.Task | None = None) -> int:
+        """Cancel a guild's tasks except the calling one and ``spare``.
+
+        ``spare`` is a task waiting on the caller, such as the one that asked
+        a guild actor to disconnect. Returns how many tasks were cancelled.
+        """
+        current = asyncio.current_task()
+        cancelled = 0
+        for task, entry in list(self.tasks.items()):
+            if (
+                entry.guild_id == guild_id
+                and task not in (current, spare)
+                and not task.done()
+            ):
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    def inventory(self) -> dict[tuple[str, str], int]:
+        """Count live tasks by kind and whether they run or wait for a slot."""
+        counts: dict[tuple[str, str], int] = {}
+        for entry in self.tasks.values():
+            key = (entry.kind, "waiting" if entry.started is None else "running")
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    async def drain(self, order: tuple[str, ...] = DRAIN_ORDER, *, timeout=5.0):
+        """Cancel every task, kind by kind in ``order``, then all the rest.
+
+        Each step waits up to ``timeout`` seconds for its tasks to finish
+        before the next kind is cancelled.
+        """
+        for kind in (*order, None):
+            tasks = [
+                task
+                for task, entry in self.tasks.items()
+                if kind is None or entry.kind == kind
+            ]
+            if not tasks:
+                continue
+            for task in tasks:
+                task.cancel()
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                entry = self.tasks.get(task)
+                logger.warning(
+                    "Background %s task did not stop within %.0fs.",
+                    entry.kind if entry else "unknown",
+                    timeout,
+                )
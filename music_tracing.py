@@ -0,0 +1,247 @@
+"""Lightweight per-interaction tracing with local exporters."""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:  # pylint: disable=too-many-instance-attributes
+    """One timed stage of a traced interaction."""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    start: float
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: str | None = None
+    thread: str = ""
+    attributes: dict = field(default_factory=dict)
+
+    def set(self, **attributes):
+        """Attach attributes discovered while the span is running."""
+        self.attributes.update(attributes)
+
+
+class RingBufferExporter:
+    """Keep the most recent finished spans in memory."""
+
+    def __init__(self, maxlen: int = 2000):
+        self.spans: deque[Span] = deque(maxlen=maxlen)
+
+    def export(self, span: Span):
+        """Store one finished span."""
+        self.spans.append(span)
+
+    def trace(self, trace_id: str) -> list[Span]:
+        """Return the buffered spans of one trace in start order."""
+        return sorted(
+            (span for span in self.spans if span.trace_id == trace_id),
+            key=lambda span: span.start,
+        )
+
+
+class JsonlExporter:
+    """Append finished spans as JSON lines to a local file.
+
+    ``export`` only buffers the span; a daemon thread serializes and appends
+    the buffer every ``flush_interval`` seconds, so spans finished on the
+    event loop never wait for the disk.
+    """
+
+    def __init__(self, path: str, *, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.pending: list[Span] = []
+        self.stop_event = threading.Event()
+        self.writer: threading.Thread | None = None
+
+    def export(self, span: Span):
+        """Buffer one finished span for the writer thread."""
+        with self.lock:
+            self.pending.append(span)
+            if self.writer is None:
+                self.writer = threading.Thread(
+                    target=self.run, name="trace-writer", daemon=True
+                )
+                self.writer.start()
+
+    def run(self):
+        """Writer thread body."""
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Append every buffered span to the file."""
+        with self.lock:
+            spans, self.pending = self.pending, []
+        if not spans:
+            return
+        lines = "".join(json.dumps(asdict(span), default=str) + "\n" for span in spans)
+        try:
+            with self.write_lock, open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(lines)
+        except OSError as exc:
+            logger.warning(
+                "Failed to write %s spans to %s: %s", len(spans), self.path, exc
+            )
+
+    def close(self):
+        """Stop the writer thread and write what is still buffered."""
+        self.stop_event.set()
+        if self.writer is not None:
+            self.writer.join(timeout=1)
+        self.flush()
+
+
+current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Tracer:
+    """Start one trace per interaction and time its stages as child spans.
+
+    The sampling decision is made once per trace; unsampled traces and code
+    running outside any trace get no-op spans, so instrumented paths cost a
+    context-variable lookup when tracing is off. The current span travels in
+    a ``ContextVar``, so tasks created inside a trace inherit it and executor
+    work joins it when run through ``contextvars.copy_context()``.
+    """
+
+    def __init__(self, *, sample_rate: float = 1.0, exporters=None):
+        self.sample_rate = sample_rate
+        self.exporters = list(exporters or [])
+
+    @staticmethod
+    def new_id(bits: int) -> str:
+        """Return a random hex identifier."""
+        return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+    def should_sample(self) -> bool:
+        """Decide whether a new trace is recorded."""
+        return bool(self.exporters) and random.random() < self.sample_rate
+
+    def finish(self, span: Span, started: float):
+        """Close a span and hand it to every exporter."""
+        span.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as exc:
+                logger.warning("Span exporter %r failed: %s", exporter, exc)
+
+    @contextmanager
+    def run_span(self, span: Span):
+        """Make ``span`` current for the block, timing and exporting it."""
+        token = current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            current_span.reset(token)
+            self.finish(span, started)
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes):
+        """Open a sampled root span, or a no-op one when not sampled."""
+        if not self.should_sample():
+            token = current_span.set(None)
+            try:
+                yield NOOP_SPAN
+            finally:
+                current_span.reset(token)
+            return
+
+        span = Span(
+            trace_id=self.new_id(128),
+            span_id=self.new_id(64),
+            parent_id=None,
+            name=name,
+            start=time.time(),
+            thread=threading.current_thread().name,
+            attributes=attributes,
+        )
+        with self.run_span(span):
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Open a child span of the current span, if there is a sampled one."""
+        parent = current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+
+        span = Span(
+            trace_id=parent.trace_id,
+            span_id=self.new_id(64),
+            parent_id=parent.span_id,
+            name=name,
+            start=time.time(),
+            thread=threading.current_thread().name,
+            attributes=attributes,
+        )
+        with self.run_span(span):
+            yield span
+
+    def traced(self, name: str):
+        """Decorate a coroutine function so each call runs in a child span."""
+
+        def decorator(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return await function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def configure(self, *, sample_rate: float, path: str | None = None):
+        """Apply settings from the environment to the process-wide tracer."""
+        self.sample_rate = sample_rate
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.exporters.append(JsonlExporter(path))
+
+    def close(self):
+        """Write out spans that exporters still buffer."""
+        for exporter in self.exporters:
+            close = getattr(exporter, "close", None)
+            if close is not None:
+                close()
+
+
+class NoopSpan:  # pylint: disable=too-few-public-methods
+    """Span stand-in used when the current trace is not sampled."""
+
+    def set(self, **attributes):
+        """Ignore attributes."""
+
+
+NOOP_SPAN = NoopSpan()
+recent_spans = RingBufferExporter()
+tracer = Tracer(exporters=[recent_spans])
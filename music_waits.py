@@ -0,0 +1,142 @@
+"""Timers that park a guild's playback without holding its actor."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from music_audio import BreakerOpenError
+from music_metrics import retries
+
+logger = logging.getLogger(__name__)
+
+
+class PlaybackWaits:
+    """Park a guild with nothing to play yet and resume it later.
+
+    Two things leave a guild waiting: a playlist loader that has not added
+    the next song, and the extraction breaker shedding the next lazy track.
+    Either way the guild parks on a timer and a later message to its actor
+    resumes playback, so commands such as /skip never queue behind a wait.
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.state = service.state
+        self.actors = service.actors
+        self.queue_waits: dict[int, tuple[int, asyncio.TimerHandle]] = {}
+        self.breaker_waits: dict[int, tuple[float, asyncio.TimerHandle]] = {}
+
+    def park_for_loader(self, guild_id: int, text_channel_id: int):
+        """Park playback until the playlist loader adds a song or gives up.
+
+        Each playlist entry needs its own yt-dlp extraction, which can take
+        several seconds per song. The loader's next append, or its end, wakes
+        the guild with a ``queue_ready`` message, and a ``queue_wait_expired``
+        message after ``playlist_wait_timeout`` seconds disconnects a stuck
+        guild.
+        """
+        if guild_id in self.queue_waits:
+            return
+        timer = asyncio.get_running_loop().call_later(
+            self.state.playlist_wait_timeout,
+            self.actors.tell,
+            guild_id,
+            "queue_wait_expired",
+            self.expire_queue_wait,
+            guild_id,
+        )
+        self.queue_waits[guild_id] = (text_channel_id, timer)
+
+    def wake_queue_wait(self, guild_id: int):
+        """Resume a parked guild once its queue has a song or its loader ended."""
+        wait = self.queue_waits.pop(guild_id, None)
+        if wait is None:
+            return
+        text_channel_id, timer = wait
+        timer.cancel()
+        self.actors.tell(
+            guild_id, "queue_ready", self.service.play_next, guild_id, text_channel_id
+        )
+
+    async def expire_queue_wait(self, guild_id: int):
+        """Disconnect a guild whose playlist loader added nothing in time."""
+        if self.queue_waits.pop(guild_id, None) is None:
+            return
+        guild = self.service.client.get_guild(guild_id)
+        if guild is None or guild.voice_client is None:
+            return
+
+        try:
+            await self.service.disconnect_for_empty_queue(
+                guild,
+                guild_id=guild_id,
+                success_log=(
+                    f"Playlist loading timeout in guild {guild_id}. Disconnected."
+                ),
+                already_disconnected_log=(
+                    "Bot already disconnected from guild "
+                    f"{guild_id}, skipping timeout disconnect."
+                ),
+                warning_context="Failed to send timeout disconnect message",
+                reason="playlist_timeout",
+            )
+        except Exception as exc:
+            logger.error(
+                "Failed to disconnect after playlist timeout in guild %s: %s",
+                guild_id,
+                exc,
+                exc_info=True,
+            )
+
+    def park_for_breaker(
+        self, guild_id: int, text_channel_id: int, exc: BreakerOpenError
+    ) -> bool:
+        """Retry the next track once the extraction breaker may admit it.
+
+        A ``breaker_retry`` message after ``retry_after`` seconds plays the
+        track, still at the front of the queue, again. Returns False once the
+        guild has waited ``playlist_wait_timeout`` seconds in a row.
+        """
+        waited, timer = self.breaker_waits.pop(guild_id, (0.0, None))
+        if timer is not None:
+            timer.cancel()
+        if waited >= self.state.playlist_wait_timeout:
+            logger.error(
+                "Gave up waiting for the extraction breaker in guild %s: %s",
+                guild_id,
+                exc,
+            )
+            return False
+
+        retries.inc("breaker_wait")
+        delay = max(exc.retry_after, 1.0)
+        logger.warning(
+            "Extraction breaker open in guild %s, retrying the next track in %.0fs",
+            guild_id,
+            delay,
+        )
+        timer = asyncio.get_running_loop().call_later(
+            delay,
+            self.actors.tell,
+            guild_id,
+            "breaker_retry",
+            self.service.play_next,
+            guild_id,
+            text_channel_id,
+        )
+        self.breaker_waits[guild_id] = (waited + delay, timer)
+        return True
+
+    def reset_breaker_wait(self, guild_id: int):
+        """Forget a guild's breaker wait once extraction works again."""
+        wait = self.breaker_waits.pop(guild_id, None)
+        if wait is not None:
+            wait[1].cancel()
+
+    def cancel(self, guild_id: int):
+        """Drop every wait of a guild that is being cleaned up."""
+        wait = self.queue_waits.pop(guild_id, None)
+        if wait is not None:
+            wait[1].cancel()
+        self.reset_breaker_wait(guild_id)
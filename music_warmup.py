@@ -0,0 +1,138 @@
+"""Background cache warming for the most played tracks after startup."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from music_audio import (
+    extract_info_async,
+    extraction_activity,
+    extraction_breaker,
+    extraction_cache,
+    get_youtube_video_id,
+)
+from music_history import TrackHistory
+from music_scheduler import BACKGROUND
+from music_supervisor import TaskSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:  # pylint: disable=too-many-instance-attributes
+    """Pre-extract the top played tracks so the first requests hit the cache.
+
+    Warming runs one extraction at a time with ``interval`` seconds between
+    them so it never looks like a burst to YouTube, and it pauses whenever a
+    user-facing extraction is in flight so real traffic keeps the capacity.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        history: TrackHistory,
+        *,
+        top_k: int = 25,
+        interval: float = 3.0,
+        busy_poll: float = 1.0,
+        activity=extraction_activity,
+        cache=extraction_cache,
+        breaker=extraction_breaker,
+        supervisor: TaskSupervisor | None = None,
+    ):
+        self.history = history
+        self.top_k = top_k
+        self.interval = interval
+        self.busy_poll = busy_poll
+        self.activity = activity
+        self.cache = cache
+        self.breaker = breaker
+        self.supervisor = supervisor if supervisor is not None else TaskSupervisor()
+        self.planned = 0
+        self.warmed = 0
+        self.already_warm = 0
+        self.failed = 0
+        self.yields = 0
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> asyncio.Task | None:
+        """Start warming in the background once per process."""
+        if self.top_k <= 0 or self.task is not None:
+            return self.task
+
+        self.task = self.supervisor.spawn("cache_warm", self.run())
+        return self.task
+
+    async def wait_for_idle_capacity(self):
+        """Sleep while users wait on extractions or YouTube is limiting us."""
+        while self.activity.interactive > 0 or not self.breaker.allows_background():
+            self.yields += 1
+            await asyncio.sleep(self.busy_poll)
+
+    async def warm_one(self, url: str, video_id: str):
+        """Extract one track into the cache, counting the outcome."""
+        if self.cache.has_stream(video_id):
+            self.already_warm += 1
+            return
+
+        try:
+            await extract_info_async(
+                url, priority=BACKGROUND, noplaylist=True, playlist_items="1"
+            )
+        except Exception as exc:
+            self.failed += 1
+            logger.info("Cache warming skipped %s: %s", url, exc)
+            return
+
+        self.cache.mark_warmed(video_id)
+        self.warmed += 1
+
+    async def run(self):
+        """Warm the metadata and stream layers for the top played tracks."""
+        records = self.history.top_tracks(self.top_k)
+        self.planned = len(records)
+        logger.info("Cache warming started for %s tracks.", self.planned)
+
+        try:
+            for index, record in enumerate(records, 1):
+                video_id = get_youtube_video_id(record.url) or record.video_id
+                await self.wait_for_idle_capacity()
+                await self.warm_one(record.url, video_id)
+                if index % 10 == 0 or index == self.planned:
+                    logger.info("Cache warming progress: %s", self.format_report())
+                if index < self.planned:
+                    await asyncio.sleep(self.interval)
+        except asyncio.CancelledError:
+            logger.info("Cache warming cancelled: %s", self.format_report())
+            raise
+
+        logger.info("Cache warming finished: %s", self.format_report())
+
+    def report(self) -> dict:
+        """Return warming progress and how often warmed entries were used."""
+        done = self.warmed + self.already_warm + self.failed
+        cache_stats = self.cache.stats()
+        return {
+            "planned": self.planned,
+            "done": done,
+            "warmed": self.warmed,
+            "already_warm": self.already_warm,
+            "failed": self.failed,
+            "yields": self.yields,
+            "warm_hits": cache_stats["warm_hits"],
+            "warm_hit_rate": (
+                cache_stats["warm_hits"] / self.warmed if self.warmed else 0.0
+            ),
+            "cache_hit_rate": cache_stats["hit_rate"],
+        }
+
+    def format_report(self) -> str:
+        """Render the warming report as a compact log line."""
+        report = self.report()
+        return (
+            f"{report['done']}/{report['planned']} done "
+            f"({report['warmed']} warmed, {report['already_warm']} already warm, "
+            f"{report['failed']} failed, {report['yields']} yields to users); "
+            f"{report['warm_hits']} warm hits, "
+            f"cache hit rate {report['cache_hit_rate']:.0%}"
+        )
@@ -27,6 +27,9 @@ def install_test_stubs():
                 self.volume = 0.5
                 self._volume = 0.5
 
+            def read(self):
+                return self.original.read()
+
         class Client:
             def __init__(self, *args, **kwargs):
                 self.user = None
@@ -39,6 +42,12 @@ def install_test_stubs():
             def run(token):
                 return None
 
+        class AutoShardedClient(Client):
+            def __init__(self, *args, shard_count=None, shard_ids=None, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.shard_count = shard_count
+                self.shard_ids = shard_ids
+
         class Intents:
             @staticmethod
             def default():
@@ -47,6 +56,20 @@ def install_test_stubs():
                     voice_states=False,
                 )
 
+            @staticmethod
+            def none():
+                return types.SimpleNamespace(
+                    guilds=False,
+                    guild_messages=False,
+                    message_content=False,
+                    voice_states=False,
+                )
+
+        class MemberCacheFlags:
+            @staticmethod
+            def none():
+                return types.SimpleNamespace(voice=False, joined=False)
+
         class TextChannel:
             pass
 
@@ -67,16 +90,30 @@ def install_test_stubs():
         class VoiceState:
             pass
 
+        class Message:
+            pass
+
+        class RawMessageDeleteEvent:
+            pass
+
+        class Attachment:
+            pass
+
         discord.FFmpegPCMAudio = FFmpegPCMAudio
         discord.PCMVolumeTransformer = PCMVolumeTransformer
         discord.Client = Client
+        discord.AutoShardedClient = AutoShardedClient
         discord.Intents = Intents
+        discord.MemberCacheFlags = MemberCacheFlags
         discord.TextChannel = TextChannel
         discord.VoiceChannel = VoiceChannel
         discord.StageChannel = StageChannel
         discord.Interaction = Interaction
         discord.Member = Member
         discord.VoiceState = VoiceState
+        discord.Message = Message
+        discord.RawMessageDeleteEvent = RawMessageDeleteEvent
+        discord.Attachment = Attachment
 
         app_commands = types.ModuleType("discord.app_commands")
 
@@ -100,6 +137,21 @@ def install_test_stubs():
 
             return decorator
 
+        def autocomplete(**kwargs):
+            def decorator(callback):
+                callback.__discord_app_commands_test_autocomplete__ = kwargs
+                return callback
+
+            return decorator
+
+        class Choice:
+            def __init__(self, *, name, value):
+                self.name = name
+                self.value = value
+
+            def __class_getitem__(cls, item):
+                return cls
+
         def guild_only(callback=None):
             def decorator(command_callback):
                 command_callback.__discord_app_commands_guild_only__ = True
@@ -130,6 +182,8 @@ def install_test_stubs():
 
         app_commands.CommandTree = CommandTree
         app_commands.describe = describe
+        app_commands.autocomplete = autocomplete
+        app_commands.Choice = Choice
         app_commands.guild_only = guild_only
         app_commands.checks = Checks()
         discord.app_commands = app_commands
@@ -0,0 +1,89 @@
+import asyncio
+import math
+import unittest
+
+from benchmarks.bench_service import compare, parse_args, percentile, run_suite
+
+
+class BenchServiceTests(unittest.TestCase):
+    def test_percentile_uses_nearest_rank(self):
+        self.assertEqual(percentile([3, 1, 2, 4], 0.5), 2)
+        self.assertEqual(percentile([3, 1, 2, 4], 0.95), 4)
+        self.assertTrue(math.isnan(percentile([], 0.5)))
+
+    def test_compare_flags_latency_growth_and_throughput_drop(self):
+        baseline = {
+            "time_to_first_audio_p50_ms": 20.0,
+            "playlist_load_entries_per_s": 1000.0,
+            "tracks_played": 30,
+        }
+        results = {
+            "time_to_first_audio_p50_ms": 30.0,
+            "playlist_load_entries_per_s": 500.0,
+            "tracks_played": 3,
+        }
+
+        regressions = compare(results, baseline, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("time_to_first_audio_p50_ms"))
+        self.assertTrue(regressions[1].startswith("playlist_load_entries_per_s"))
+
+    def test_throughput_is_held_to_its_own_wider_tolerance(self):
+        baseline = {
+            "time_to_first_audio_p50_ms": 20.0,
+            "voice_state_events_per_s": 1000.0,
+        }
+        results = {
+            "time_to_first_audio_p50_ms": 30.0,
+            "voice_state_events_per_s": 500.0,
+        }
+
+        regressions = compare(
+            results, baseline, tolerance=0.25, throughput_tolerance=0.6
+        )
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("time_to_first_audio_p50_ms"))
+
+    def test_compare_accepts_improvements(self):
+        baseline = {
+            "time_to_first_audio_p50_ms": 20.0,
+            "playlist_load_entries_per_s": 1000.0,
+        }
+        results = {
+            "time_to_first_audio_p50_ms": 5.0,
+            "playlist_load_entries_per_s": 5000.0,
+        }
+
+        self.assertEqual(compare(results, baseline, tolerance=0.25), [])
+
+    def test_suite_runs_every_scenario_offline(self):
+        options = parse_args(
+            [
+                "--runs",
+                "2",
+                "--tracks",
+                "3",
+                "--entries",
+                "20",
+                "--events",
+                "50",
+                "--extract-median",
+                "0.001",
+                "--repeat",
+                "1",
+            ]
+        )
+
+        results = asyncio.run(run_suite(options))
+
+        self.assertEqual(results["tracks_played"], 3)
+        self.assertGreater(results["playlist_load_entries_per_s"], 0)
+        self.assertGreater(results["voice_state_events_per_s"], 0)
+        self.assertFalse(math.isnan(results["time_to_first_audio_p50_ms"]))
+        self.assertIn("inter_track_gap_peak_kib", results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from benchmarks.load_harness import parse_args, parse_ramp, run_harness
+
+with patch.dict(os.environ, {"DISCORD_TOKEN": "offline-test-token"}):
+    import main as bot_main
+
+
+class LoadHarnessTests(unittest.TestCase):
+    def test_parse_ramp_sorts_and_deduplicates(self):
+        self.assertEqual(parse_ramp("100, 20,100"), [20, 100])
+
+    def test_small_ramp_drives_main_handlers_offline(self):
+        options = parse_args(
+            [
+                "--ramp",
+                "2,4",
+                "--stage-seconds",
+                "0.6",
+                "--track-seconds",
+                "0.2",
+                "--extract-median",
+                "0.005",
+                "--failure-rate",
+                "0",
+                "--commands-per-guild-minute",
+                "300",
+            ]
+        )
+
+        with patch("builtins.print"):
+            stages = asyncio.run(run_harness(options))
+
+        self.assertEqual([stage.guilds for stage in stages], [2, 4])
+        self.assertGreater(stages[0].commands, 0)
+        self.assertGreater(stages[-1].threads, 1)
+        self.assertIn("/play", stages[0].latencies)
+        self.assertIsNone(bot_main.history.connection)
+        self.assertNotEqual(type(bot_main.music_service.client).__name__, "FakeGateway")
+
+
+if __name__ == "__main__":
+    unittest.main()
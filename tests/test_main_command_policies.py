@@ -1,6 +1,8 @@
+import asyncio
 import os
 import unittest
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
 
 from tests.module_stubs import install_test_stubs
 
@@ -42,3 +44,62 @@ class MainCommandPolicyTests(unittest.TestCase):
                 self.assertEqual(len(cooldowns), 1)
                 self.assertEqual((cooldowns[0]["rate"], cooldowns[0]["per"]), expected)
                 self.assertEqual(cooldowns[0]["key"], "user")
+
+    def test_url_commands_use_speculative_autocomplete(self):
+        for command in (bot_main.play, bot_main.add):
+            with self.subTest(command=command.__name__):
+                self.assertEqual(
+                    command.__discord_app_commands_test_autocomplete__,
+                    {"url": bot_main.url_autocomplete},
+                )
+
+    def test_play_answers_busy_before_deferring_when_overloaded(self):
+        interaction = SimpleNamespace(
+            guild=SimpleNamespace(voice_client=None),
+            response=SimpleNamespace(send_message=AsyncMock(), defer=AsyncMock()),
+        )
+        refusal = bot_main.AdmissionController(
+            extraction_load=lambda: 99, max_extraction_load=1
+        ).check()
+
+        with patch.object(bot_main.admission, "check", Mock(return_value=refusal)):
+            asyncio.run(bot_main.play(interaction, "https://example.com"))
+
+        interaction.response.defer.assert_not_awaited()
+        interaction.response.send_message.assert_awaited_once_with(
+            refusal.busy_message(), ephemeral=True
+        )
+
+    def test_add_sends_url_lists_to_the_bulk_adder(self):
+        interaction = SimpleNamespace(
+            guild=SimpleNamespace(id=1, voice_client=object()),
+            response=SimpleNamespace(defer=AsyncMock()),
+            followup=SimpleNamespace(send=AsyncMock()),
+        )
+
+        with patch.object(
+            bot_main.bulk, "add_urls", AsyncMock()
+        ) as add_urls, patch.object(
+            bot_main.music_service, "handle_music_request", AsyncMock()
+        ) as handle_music_request:
+            asyncio.run(bot_main.add(interaction, "https://a https://b"))
+            asyncio.run(bot_main.add(interaction, "some search text"))
+
+        add_urls.assert_awaited_once_with(interaction, ["https://a", "https://b"])
+        handle_music_request.assert_awaited_once_with(interaction, "some search text")
+
+    def test_profile_command_is_owner_only(self):
+        interaction = SimpleNamespace(
+            user=SimpleNamespace(id=5),
+            response=SimpleNamespace(send_message=AsyncMock(), defer=AsyncMock()),
+        )
+
+        with patch.object(bot_main, "owner_ids", {1}), patch.object(
+            bot_main.profiler, "capture_async", AsyncMock()
+        ) as capture:
+            asyncio.run(bot_main.capture_profile(interaction, 5))
+
+        capture.assert_not_awaited()
+        interaction.response.send_message.assert_awaited_once_with(
+            "Only the bot owner can capture profiles.", ephemeral=True
+        )
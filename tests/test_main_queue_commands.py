@@ -19,6 +19,9 @@ class LazyQueueCommandTests(unittest.IsolatedAsyncioTestCase):
         bot_main.state = MusicState()
         self.guild_id = 42
         self.service = MusicService(bot_main.client, bot_main.state)
+        patcher = patch.object(bot_main, "music_service", self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.interaction = SimpleNamespace(
             guild=SimpleNamespace(id=self.guild_id),
             response=SimpleNamespace(send_message=AsyncMock()),
@@ -34,11 +37,15 @@ class LazyQueueCommandTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual((queued_count, skipped_count), (1, 0))
         return bot_main.state.get_queue(self.guild_id)[0]
 
+    async def asyncTearDown(self):
+        await self.service.actors.close()
+
     async def test_clearqueue_discards_lazy_track_without_starting_ffmpeg(self):
         with patch("music_audio.create_ffmpeg_source") as create_ffmpeg_source:
             queued_track = await self.enqueue_lazy_track()
 
             await bot_main.clearqueue(self.interaction)
+            await self.service.actors.ask(self.guild_id, "sync", lambda: None)
 
         self.assertTrue(queued_track.is_lazy)
         self.assertEqual(bot_main.state.get_queue(self.guild_id), [])
@@ -52,6 +59,7 @@ class LazyQueueCommandTests(unittest.IsolatedAsyncioTestCase):
             queued_track = await self.enqueue_lazy_track()
 
             await bot_main.remove(self.interaction, 1)
+            await self.service.actors.ask(self.guild_id, "sync", lambda: None)
 
         self.assertTrue(queued_track.is_lazy)
         self.assertEqual(bot_main.state.get_queue(self.guild_id), [])
@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+
+from music_actor import ActorRegistry
+from music_tracing import RingBufferExporter, Tracer
+
+
+class ActorRegistryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.actors = ActorRegistry(idle_timeout=0.05)
+        self.events = []
+
+    async def asyncTearDown(self):
+        await self.actors.close()
+
+    async def record(self, name, delay=0.0):
+        self.events.append(f"start {name}")
+        await asyncio.sleep(delay)
+        self.events.append(f"end {name}")
+        return name
+
+    async def test_commands_for_one_guild_never_interleave(self):
+        results = await asyncio.gather(
+            self.actors.ask(1, "play", self.record, "play", 0.02),
+            self.actors.ask(1, "skip", self.record, "skip"),
+            self.actors.ask(1, "remove", self.record, "remove"),
+        )
+
+        self.assertEqual(results, ["play", "skip", "remove"])
+        self.assertEqual(
+            self.events,
+            ["start play", "end play", "start skip", "end skip"]
+            + ["start remove", "end remove"],
+        )
+
+    async def test_guilds_run_concurrently(self):
+        await asyncio.gather(
+            self.actors.ask(1, "play", self.record, "a", 0.02),
+            self.actors.ask(2, "play", self.record, "b", 0.02),
+        )
+
+        self.assertEqual(self.events[:2], ["start a", "start b"])
+
+    async def test_failures_reach_the_asker_and_the_actor_keeps_running(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            await self.actors.ask(1, "fail", fail)
+
+        self.assertEqual(await self.actors.ask(1, "sync", lambda: "alive"), "alive")
+
+    async def test_told_failure_is_logged(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        with self.assertLogs("music_actor", level="ERROR"):
+            self.actors.tell(1, "fail", fail)
+            await self.actors.ask(1, "sync", lambda: None)
+
+    async def test_handler_asking_its_own_guild_runs_inline(self):
+        async def outer():
+            return await self.actors.ask(1, "inner", lambda: "inner")
+
+        self.assertEqual(await self.actors.ask(1, "outer", outer), "inner")
+
+    async def test_idle_actor_hibernates_and_wakes_on_next_message(self):
+        await self.actors.ask(1, "sync", lambda: None)
+        first = self.actors.actors[1]
+
+        await asyncio.sleep(0.1)
+
+        self.assertNotIn(1, self.actors.actors)
+        self.assertTrue(first.task.done())
+        self.assertEqual(await self.actors.ask(1, "sync", lambda: "awake"), "awake")
+        self.assertIsNot(self.actors.actors[1], first)
+
+    async def test_tell_threadsafe_delivers_from_another_thread(self):
+        loop = asyncio.get_running_loop()
+
+        await asyncio.to_thread(
+            self.actors.tell_threadsafe, loop, 1, "track_ended", self.record, "end"
+        )
+        await self.actors.ask(1, "sync", lambda: None)
+
+        self.assertEqual(self.events, ["start end", "end end"])
+
+    async def test_handlers_join_the_trace_of_their_sender(self):
+        buffer = RingBufferExporter()
+        tracer = Tracer(exporters=[buffer])
+        release = asyncio.Event()
+
+        async def play(name):
+            with tracer.span(f"{name}.voice_client.play"):
+                await release.wait()
+
+        async def command(name):
+            with tracer.start_trace(name):
+                self.actors.tell(1, "play", play, name)
+                await self.actors.ask(1, "sync", lambda: None)
+
+        first = asyncio.ensure_future(command("/play one"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(command("/play two"))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, second)
+
+        spans = {span.name: span for span in buffer.spans}
+        for name in ("/play one", "/play two"):
+            root = spans[name]
+            child = spans[f"{name}.voice_client.play"]
+            self.assertEqual(child.trace_id, root.trace_id)
+            self.assertEqual(child.parent_id, root.span_id)
+        self.assertNotEqual(spans["/play one"].trace_id, spans["/play two"].trace_id)
+
+    async def test_close_cancels_queued_commands(self):
+        running = asyncio.ensure_future(
+            self.actors.ask(1, "play", self.record, "play", 1.0)
+        )
+        queued = asyncio.ensure_future(self.actors.ask(1, "skip", self.record, "skip"))
+        await asyncio.sleep(0)
+
+        await self.actors.close()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await running
+        with self.assertRaises(asyncio.CancelledError):
+            await queued
+        self.assertEqual(self.actors.actors, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+from music_admission import AdmissionController, LoopLagSampler
+
+
+class AdmissionControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.load = 0
+        self.streams = 0
+        self.controller = AdmissionController(
+            extraction_load=lambda: self.load,
+            stream_count=lambda: self.streams,
+            max_extraction_load=10,
+            max_streams=4,
+            max_loop_lag=0.5,
+            background_fraction=0.5,
+            base_retry_after=5,
+        )
+
+    def test_admits_everything_under_limits(self):
+        self.load = 4
+        self.streams = 1
+
+        self.assertTrue(self.controller.check().admitted)
+        self.assertTrue(self.controller.check(background=True).admitted)
+        self.assertTrue(self.controller.check(new_stream=True).admitted)
+
+    def test_background_work_is_shed_before_user_requests(self):
+        self.load = 6
+
+        background = self.controller.check(background=True)
+        interactive = self.controller.check()
+
+        self.assertFalse(background.admitted)
+        self.assertEqual(background.reason, "too many extractions")
+        self.assertTrue(interactive.admitted)
+        self.assertEqual(self.controller.rejected, {"interactive": 0, "background": 1})
+
+    def test_refuses_user_requests_at_the_extraction_limit_with_retry_hint(self):
+        self.load = 20
+
+        decision = self.controller.check()
+
+        self.assertFalse(decision.admitted)
+        self.assertEqual(decision.retry_after, 10)
+        self.assertEqual(
+            decision.busy_message(),
+            "The bot is busy right now (too many extractions), try again in 10 s.",
+        )
+
+    def test_stream_limit_only_applies_to_new_streams(self):
+        self.streams = 4
+
+        self.assertTrue(self.controller.check().admitted)
+        decision = self.controller.check(new_stream=True)
+        self.assertFalse(decision.admitted)
+        self.assertEqual(decision.reason, "too many streams")
+
+    def test_loop_lag_refuses_requests(self):
+        self.controller.lag_sampler.lag = 0.8
+
+        decision = self.controller.check()
+
+        self.assertFalse(decision.admitted)
+        self.assertEqual(decision.reason, "event loop overloaded")
+
+    def test_zero_limit_disables_a_check(self):
+        self.controller.max_extraction_load = 0
+        self.load = 1000
+
+        self.assertTrue(self.controller.check().admitted)
+
+
+class LoopLagSamplerTests(unittest.IsolatedAsyncioTestCase):
+    def test_record_smooths_samples_and_tracks_maximum(self):
+        sampler = LoopLagSampler(smoothing=0.5)
+
+        sampler.record(1.0)
+        sampler.record(0.0)
+
+        self.assertEqual(sampler.lag, 0.25)
+        self.assertEqual(sampler.max_lag, 1.0)
+
+    async def test_start_runs_a_single_sampling_task(self):
+        sampler = LoopLagSampler(interval=0.01)
+
+        task = sampler.start()
+        self.assertIs(sampler.start(), task)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        self.assertGreater(sampler.max_lag, 0.0)
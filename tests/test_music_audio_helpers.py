@@ -7,13 +7,27 @@ from tests.module_stubs import install_test_stubs
 install_test_stubs()
 
 from music_audio import (
+    BreakerOpenError,
+    ExtractionError,
+    UnavailableVideoError,
+    YTDLSource,
     build_playlist_summary,
     build_queue_page_message,
+    create_ffmpeg_source,
     create_player_from_entry,
+    extract_info_async,
+    extract_info_with_fallback,
+    extraction_breaker,
+    extraction_cache,
     get_first_available_entry,
     get_playlist_entry_url,
+    get_youtube_video_id,
+    negative_cache,
+    prewarm_youtube_dl,
     require_stream_url,
+    youtube_dl,
 )
+from music_scheduler import BACKGROUND, NEXT_UP
 
 
 class MusicAudioLazySourceTests(unittest.IsolatedAsyncioTestCase):
@@ -50,12 +64,200 @@ class MusicAudioLazySourceTests(unittest.IsolatedAsyncioTestCase):
         self.assertIs(resolved_player, player)
         self.assertFalse(player.is_lazy)
         self.assertIs(player.source, ffmpeg_source)
-        extract_info.assert_awaited_once_with(entry["webpage_url"])
+        extract_info.assert_awaited_once_with(entry["webpage_url"], priority=NEXT_UP)
         create_ffmpeg_source.assert_called_once_with(
             extracted_data["url"],
             None,
         )
 
+    async def test_lazy_player_record_keeps_only_identity_fields(self):
+        entry = {
+            "id": "abc",
+            "title": "Queued track",
+            "url": "https://www.youtube.com/watch?v=abc",
+            "thumbnails": [{"url": "https://i.ytimg.com/abc.jpg"}],
+        }
+
+        player = await create_player_from_entry(entry, use_entry_method=True, lazy=True)
+
+        self.assertEqual(
+            player.to_record(),
+            {
+                "id": "abc",
+                "title": "Queued track",
+                "url": "https://www.youtube.com/watch?v=abc",
+            },
+        )
+
+    async def test_restored_record_resumes_at_its_saved_offset(self):
+        player = YTDLSource.from_record(
+            {"id": "abc", "title": "Saved", "url": "https://youtu.be/abc"},
+            start_offset=61.5,
+        )
+        data = {"title": "Saved", "url": "https://example.com/stream"}
+
+        with patch(
+            "music_audio.extract_info_async", AsyncMock(return_value=data)
+        ) as extract_info:
+            await player.get_actual_source()
+
+        extract_info.assert_awaited_once_with("https://youtu.be/abc", priority=NEXT_UP)
+        self.assertTrue(player.source.kwargs["before_options"].startswith("-ss 61.50 "))
+        player.source.read = Mock(return_value=b"frame")
+        for _ in range(50):
+            player.read()
+        self.assertAlmostEqual(player.position, 62.5)
+
+    def test_ffmpeg_source_without_offset_does_not_seek(self):
+        source = create_ffmpeg_source("https://example.com/stream")
+
+        self.assertNotIn("-ss", source.kwargs["before_options"])
+
+
+class MusicAudioExtractionCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncTearDown(self):
+        extraction_cache.streams.clear()
+        extraction_cache.metadata.clear()
+        negative_cache.entries.clear()
+        extraction_breaker.__init__()
+
+    async def test_open_breaker_sheds_background_extraction_before_yt_dlp(self):
+        extraction_breaker.open()
+
+        with patch("music_audio.extract_info_with_fallback") as extract:
+            with self.assertRaises(BreakerOpenError):
+                await extract_info_async(
+                    "https://example.com/list", priority=BACKGROUND
+                )
+
+        extract.assert_not_called()
+
+    async def test_rate_limit_failures_open_breaker(self):
+        error = ExtractionError("HTTP Error 429", category="rate_limited")
+
+        with patch("music_audio.extract_info_with_fallback", side_effect=error):
+            for _ in range(extraction_breaker.failure_threshold):
+                with self.assertRaises(ExtractionError):
+                    await extract_info_async("https://example.com/video")
+
+        self.assertEqual(extraction_breaker.state, "open")
+
+    async def test_permanent_failure_is_negative_cached_and_skipped_instantly(self):
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        error = ExtractionError("Private video", category="permanent")
+
+        with patch(
+            "music_audio.extract_info_with_fallback", side_effect=error
+        ) as extract:
+            with self.assertRaises(ExtractionError):
+                await extract_info_async(url)
+            with self.assertRaisesRegex(UnavailableVideoError, "Private video"):
+                await extract_info_async(url, noplaylist=True)
+
+        extract.assert_called_once()
+        self.assertEqual(negative_cache.get("dQw4w9WgXcQ").kind, "permanent")
+
+    async def test_interactive_request_retries_a_transient_failure(self):
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        negative_cache.record("dQw4w9WgXcQ", "transient", "Read timed out")
+        info = {"id": "dQw4w9WgXcQ", "title": "Back", "url": "https://stream"}
+
+        with patch(
+            "music_audio.extract_info_with_fallback", return_value=info
+        ) as extract:
+            with self.assertRaisesRegex(UnavailableVideoError, "timed out"):
+                await extract_info_async(url, priority=NEXT_UP)
+            self.assertEqual(await extract_info_async(url), info)
+
+        extract.assert_called_once()
+
+    async def test_rate_limit_failure_is_not_negative_cached(self):
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        error = ExtractionError("HTTP Error 429", category="rate_limited")
+
+        with patch("music_audio.extract_info_with_fallback", side_effect=error):
+            with self.assertRaises(ExtractionError):
+                await extract_info_async(url)
+
+        self.assertIsNone(negative_cache.get("dQw4w9WgXcQ"))
+
+    async def test_single_video_extraction_is_served_from_cache(self):
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        info = {"id": "dQw4w9WgXcQ", "title": "Cached", "url": "https://stream"}
+
+        with patch(
+            "music_audio.extract_info_with_fallback", return_value=info
+        ) as extract:
+            first = await extract_info_async(url, noplaylist=True, playlist_items="1")
+            second = await extract_info_async(url)
+
+        extract.assert_called_once_with(url, noplaylist=True, playlist_items="1")
+        self.assertEqual(first, info)
+        self.assertEqual(second["url"], "https://stream")
+
+    async def test_playlist_and_flat_extractions_bypass_cache(self):
+        info = {"id": "dQw4w9WgXcQ", "title": "Cached", "url": "https://stream"}
+
+        with patch(
+            "music_audio.extract_info_with_fallback", return_value=info
+        ) as extract:
+            for _ in range(2):
+                await extract_info_async(
+                    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1"
+                )
+                await extract_info_async(
+                    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                    extract_flat="in_playlist",
+                )
+
+        self.assertEqual(extract.call_count, 4)
+
+
+class MusicAudioPrewarmTests(unittest.IsolatedAsyncioTestCase):
+    async def test_prewarm_loads_yt_dlp_off_the_event_loop(self):
+        with patch.object(youtube_dl, "load") as load:
+            await prewarm_youtube_dl()
+
+        load.assert_called_once_with()
+
+    async def test_prewarm_failure_is_logged_not_raised(self):
+        with patch.object(youtube_dl, "load", side_effect=ImportError("broken")):
+            with self.assertLogs("music_audio", level="WARNING"):
+                await prewarm_youtube_dl()
+
+
+class MusicAudioFallbackTests(unittest.TestCase):
+    def test_fallback_stops_early_for_private_video_and_classifies_error(self):
+        with patch("music_audio.youtube_dl.YoutubeDL") as youtube_dl:
+            youtube_dl.return_value.extract_info.side_effect = RuntimeError(
+                "ERROR: Private video. Sign in if you've been granted access"
+            )
+            with self.assertRaises(ExtractionError) as raised:
+                extract_info_with_fallback("https://www.youtube.com/watch?v=x")
+
+        self.assertEqual(youtube_dl.call_count, 1)
+        self.assertEqual(raised.exception.category, "permanent")
+
+    def test_fallback_stops_early_when_rate_limited(self):
+        with patch("music_audio.youtube_dl.YoutubeDL") as youtube_dl:
+            youtube_dl.return_value.extract_info.side_effect = RuntimeError(
+                "HTTP Error 429: Too Many Requests"
+            )
+            with self.assertRaises(ExtractionError) as raised:
+                extract_info_with_fallback("https://www.youtube.com/watch?v=x")
+
+        self.assertEqual(youtube_dl.call_count, 1)
+        self.assertEqual(raised.exception.category, "rate_limited")
+
+    def test_fallback_tries_every_client_for_transient_errors(self):
+        with patch("music_audio.youtube_dl.YoutubeDL") as youtube_dl:
+            youtube_dl.return_value.extract_info.side_effect = RuntimeError("timeout")
+            with self.assertRaises(ExtractionError) as raised:
+                extract_info_with_fallback("https://www.youtube.com/watch?v=x")
+
+        self.assertEqual(youtube_dl.call_count, 4)
+        self.assertEqual(raised.exception.category, "transient")
+
 
 class MusicAudioHelperTests(unittest.TestCase):
     def test_get_playlist_entry_url_prefers_direct_url(self):
@@ -75,6 +277,26 @@ class MusicAudioHelperTests(unittest.TestCase):
             "https://www.youtube.com/watch?v=abc123",
         )
 
+    def test_get_youtube_video_id_accepts_complete_video_urls_only(self):
+        for url in (
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://youtube.com/watch?v=dQw4w9WgXcQ&list=PL123",
+            "https://youtu.be/dQw4w9WgXcQ?t=5",
+            "https://music.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(get_youtube_video_id(url), "dQw4w9WgXcQ")
+
+        for url in (
+            "https://www.youtube.com/watch?v=dQw4w9",
+            "https://www.youtube.com/playlist?list=PL123",
+            "https://example.com/watch?v=dQw4w9WgXcQ",
+            "dQw4w9WgXcQ",
+        ):
+            with self.subTest(url=url):
+                self.assertIsNone(get_youtube_video_id(url))
+
     def test_get_first_available_entry_returns_first_non_empty_entry(self):
         playlist_info = {"entries": [None, {"title": "Track 1"}, {"title": "Track 2"}]}
 
@@ -0,0 +1,129 @@
+import unittest
+
+from music_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerOpenError,
+    ExtractionCircuitBreaker,
+)
+from music_metrics import breaker_shed
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ExtractionCircuitBreakerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = ExtractionCircuitBreaker(
+            failure_threshold=2,
+            failure_window=10,
+            base_cooldown=30,
+            max_cooldown=100,
+            trickle_interval=5,
+            max_probes=1,
+            probe_successes=2,
+            clock=self.clock,
+        )
+
+    def trip(self):
+        self.breaker.record_failure("rate_limited")
+        self.breaker.record_failure("rate_limited")
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_only_rate_limit_failures_within_window_open_the_breaker(self):
+        self.breaker.record_failure("permanent")
+        self.breaker.record_failure("transient")
+        self.breaker.record_failure("rate_limited")
+        self.clock.now += 11
+        self.breaker.record_failure("rate_limited")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record_failure("rate_limited")
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_open_breaker_sheds_background_and_trickles_interactive(self):
+        self.trip()
+
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire(background=True)
+        with self.assertRaises(BreakerOpenError) as raised:
+            self.breaker.acquire()
+        self.assertEqual(raised.exception.retry_after, 5)
+
+        self.clock.now += 5
+        self.assertFalse(self.breaker.acquire())
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire()
+        self.assertEqual(self.breaker.snapshot()["shed"], 3)
+
+    def test_shed_extractions_are_counted_by_kind(self):
+        breaker_shed.values.clear()
+        self.trip()
+
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire(background=True)
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire()
+
+        self.assertEqual(breaker_shed.values, {("background",): 1, ("interactive",): 1})
+
+    def test_rate_limited_trickle_doubles_trickle_interval(self):
+        self.trip()
+        self.clock.now += 5
+        self.breaker.acquire()
+
+        self.breaker.record_failure("rate_limited")
+
+        self.assertEqual(self.breaker.trickle_interval, 10)
+        self.clock.now += 9
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire()
+
+    def test_half_open_limits_probes_and_closes_after_successes(self):
+        self.trip()
+        self.clock.now += 30
+
+        self.assertTrue(self.breaker.acquire())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire()
+        with self.assertRaises(BreakerOpenError):
+            self.breaker.acquire(background=True)
+
+        self.breaker.release(True)
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.acquire())
+        self.breaker.release(True)
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertFalse(self.breaker.acquire(background=True))
+
+    def test_failed_probe_reopens_with_doubled_cooldown(self):
+        self.trip()
+        self.clock.now += 30
+        self.breaker.acquire()
+
+        self.breaker.record_failure("rate_limited")
+
+        snapshot = self.breaker.snapshot()
+        self.assertEqual(snapshot["state"], OPEN)
+        self.assertEqual((snapshot["trips"], snapshot["cooldown"]), (2, 60))
+        self.clock.now += 59
+        self.assertFalse(self.breaker.allows_background())
+
+    def test_successful_trickle_half_opens(self):
+        self.trip()
+        self.clock.now += 5
+        self.breaker.acquire()
+
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
@@ -0,0 +1,149 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_bulk import BulkAdder, BulkRequestError, build_bulk_summary, split_urls
+from music_scheduler import INTERACTIVE, NEXT_UP
+from music_service import MusicService
+from music_state import MusicState
+
+
+class FakeAttachment:
+    def __init__(self, text, size=None):
+        self.data = text.encode()
+        self.size = len(self.data) if size is None else size
+
+    async def read(self):
+        return self.data
+
+
+class BulkHelperTests(unittest.TestCase):
+    def test_split_urls_skips_blank_and_comment_lines(self):
+        text = "# party\nhttps://a  https://b\n\n  # later\nhttps://c\n"
+
+        self.assertEqual(split_urls(text), ["https://a", "https://b", "https://c"])
+
+    def test_search_text_is_not_bulk(self):
+        self.assertFalse(BulkAdder.is_bulk("never gonna give you up", None))
+        self.assertFalse(BulkAdder.is_bulk("https://a", None))
+        self.assertTrue(BulkAdder.is_bulk("https://a https://b", None))
+        self.assertTrue(BulkAdder.is_bulk("", FakeAttachment("https://a")))
+
+    def test_summary_lists_a_few_failures(self):
+        failures = [(f"https://{index}", "private") for index in range(7)]
+
+        summary = build_bulk_summary(3, 10, failures, "full")
+
+        self.assertIn("Added **3** of 10 songs", summary)
+        self.assertIn("The queue is full", summary)
+        self.assertIn("- <https://0>: private", summary)
+        self.assertNotIn("https://5", summary)
+        self.assertIn("...and 2 more", summary)
+
+
+class BulkAdderTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = SimpleNamespace(
+            loop=asyncio.get_running_loop(),
+            get_channel=Mock(return_value=None),
+            get_guild=Mock(),
+        )
+        self.state = MusicState()
+        self.service = MusicService(self.client, self.state)
+        self.service.start_if_idle = AsyncMock(return_value=True)
+        self.bulk = BulkAdder(self.service, concurrency=2, max_urls=5)
+        self.guild_id = 42
+        self.interaction = SimpleNamespace(
+            guild=SimpleNamespace(id=self.guild_id),
+            channel=SimpleNamespace(id=77),
+            followup=SimpleNamespace(send=AsyncMock()),
+        )
+
+    async def asyncTearDown(self):
+        await self.service.actors.close()
+
+    async def test_collect_urls_merges_text_and_attachment(self):
+        urls = await self.bulk.collect_urls(
+            "https://a", FakeAttachment("https://b\nhttps://c")
+        )
+
+        self.assertEqual(urls, ["https://a", "https://b", "https://c"])
+
+    async def test_collect_urls_rejects_bad_requests(self):
+        cases = {
+            "too large": ("", FakeAttachment("https://a", size=10**6)),
+            "at most 5": (" ".join(f"https://{n}" for n in range(6)), None),
+            "only takes URLs": ("", FakeAttachment("https://a\nsome song")),
+            "at least one URL": ("", FakeAttachment("# nothing")),
+        }
+        for message, (text, attachment) in cases.items():
+            with self.subTest(message=message):
+                with self.assertRaisesRegex(BulkRequestError, message):
+                    await self.bulk.collect_urls(text, attachment)
+
+    async def test_extracts_in_parallel_and_queues_in_the_given_order(self):
+        active = 0
+        peak = 0
+
+        async def fake_extract(url, **_):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Later URLs finish first.
+            await asyncio.sleep(0.01 * (5 - int(url[-1])))
+            active -= 1
+            if url.endswith("3"):
+                raise RuntimeError("Private video")
+            return {"id": url[-1], "title": f"Song {url[-1]}", "url": url}
+
+        urls = [f"https://y.test/{index}" for index in range(1, 5)]
+        with patch(
+            "music_bulk.extract_info_async", new=AsyncMock(side_effect=fake_extract)
+        ) as extract:
+            await self.bulk.add_urls(self.interaction, urls)
+
+        queue = self.state.get_queue(self.guild_id)
+        self.assertEqual(
+            [player.title for player in queue], ["Song 1", "Song 2", "Song 4"]
+        )
+        self.assertTrue(all(player.is_lazy for player in queue))
+        self.assertEqual(peak, 2)
+        self.assertEqual(
+            [call.kwargs["priority"] for call in extract.await_args_list],
+            [INTERACTIVE, NEXT_UP, NEXT_UP, NEXT_UP],
+        )
+        self.service.start_if_idle.assert_awaited_once_with(self.interaction.guild, 77)
+        summary = self.interaction.followup.send.await_args.args[0]
+        self.assertIn("Added **3** of 4 songs", summary)
+        self.assertIn("<https://y.test/3>: Private video", summary)
+        self.interaction.followup.send.assert_awaited_once()
+
+    async def test_only_extracts_what_fits_in_the_queue(self):
+        self.state.max_queue_size = 2
+        self.state.get_queue(self.guild_id).append(SimpleNamespace(title="Old"))
+
+        async def fake_extract(url, **_):
+            return {"id": url[-1], "title": url[-1], "url": url}
+
+        with patch(
+            "music_bulk.extract_info_async", new=AsyncMock(side_effect=fake_extract)
+        ) as extract:
+            await self.bulk.add_urls(self.interaction, ["https://a/1", "https://a/2"])
+
+        self.assertEqual(extract.await_count, 1)
+        self.assertEqual(
+            [player.title for player in self.state.get_queue(self.guild_id)],
+            ["Old", "1"],
+        )
+        summary = self.interaction.followup.send.await_args.args[0]
+        self.assertIn("Added **1** of 2 songs", summary)
+        self.assertIn("The queue is full", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
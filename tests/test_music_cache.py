@@ -0,0 +1,164 @@
+import unittest
+
+from music_cache import (
+    PERMANENT,
+    RATE_LIMITED,
+    TRANSIENT,
+    ExtractionCache,
+    NegativeCache,
+    classify_extraction_error,
+    describe_unavailable_flat_entry,
+    get_stream_expiry,
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ExtractionCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ExtractionCache(
+            max_entries=2, stream_ttl=100, expiry_margin=10, clock=self.clock
+        )
+
+    def test_get_stream_expiry_reads_signed_expire_parameter(self):
+        self.assertEqual(get_stream_expiry("https://r.test/v?expire=1500&x=1"), 1500)
+        self.assertIsNone(get_stream_expiry("https://r.test/v?expire=soon"))
+        self.assertIsNone(get_stream_expiry(None))
+
+    def test_store_trims_info_and_returns_copies(self):
+        self.cache.store(
+            "abc",
+            {"id": "abc", "title": "T", "url": "https://s", "formats": [1, 2, 3]},
+        )
+
+        cached = self.cache.get_stream("abc")
+        cached["title"] = "mutated"
+
+        self.assertNotIn("formats", cached)
+        self.assertEqual(self.cache.get_stream("abc")["title"], "T")
+        self.assertEqual(self.cache.get_metadata("abc"), {"id": "abc", "title": "T"})
+
+    def test_stream_layer_expires_before_signed_expiry(self):
+        self.cache.store("abc", {"title": "T", "url": "https://s?expire=1050"})
+
+        self.clock.now = 1039
+        self.assertIsNotNone(self.cache.get_stream("abc"))
+        self.clock.now = 1040
+        self.assertIsNone(self.cache.get_stream("abc"))
+        self.assertIsNotNone(self.cache.get_metadata("abc"))
+
+    def test_exported_streams_import_until_they_expire(self):
+        self.cache.store("abc", {"title": "T", "url": "https://s?expire=1050"})
+        self.cache.store("def", {"title": "U", "url": "https://s?expire=1005"})
+
+        exported = self.cache.export_streams(["abc", "def", "missing"])
+        restarted = ExtractionCache(clock=self.clock)
+        self.clock.now = 1020
+
+        self.assertEqual(list(exported), ["abc"])
+        self.assertEqual(exported["abc"]["expires_at"], 1040)
+        self.assertEqual(restarted.import_streams(exported), 1)
+        self.assertEqual(restarted.get_stream("abc")["url"], "https://s?expire=1050")
+        self.clock.now = 1040
+        self.assertEqual(ExtractionCache(clock=self.clock).import_streams(exported), 0)
+
+    def test_already_expired_stream_is_not_cached(self):
+        self.cache.store("abc", {"title": "T", "url": "https://s?expire=1005"})
+
+        self.assertFalse(self.cache.has_stream("abc"))
+        self.assertIsNotNone(self.cache.get_metadata("abc"))
+
+    def test_lru_eviction_and_invalidate(self):
+        for video_id in ("a", "b", "c"):
+            self.cache.store(video_id, {"title": video_id, "url": "https://s"})
+
+        self.assertFalse(self.cache.has_stream("a"))
+        self.assertTrue(self.cache.has_stream("c"))
+        self.cache.invalidate("c")
+        self.assertFalse(self.cache.has_stream("c"))
+
+    def test_stats_count_hits_misses_and_warm_hits(self):
+        self.cache.store("abc", {"title": "T", "url": "https://s"})
+        self.cache.mark_warmed("abc")
+        self.cache.mark_warmed("missing")
+
+        self.cache.get_stream("abc")
+        self.cache.get_stream("abc")
+        self.cache.get_stream("missing")
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertEqual(stats["hit_rate"], 2 / 3)
+        self.assertEqual((stats["warmed"], stats["warm_hits"]), (0, 1))
+
+
+class ExtractionErrorClassificationTests(unittest.TestCase):
+    def test_classify_extraction_error(self):
+        cases = {
+            "ERROR: [youtube] abc: Private video. Sign in if you've been granted access": PERMANENT,
+            "ERROR: [youtube] abc: Video unavailable. This video has been removed": PERMANENT,
+            "Sign in to confirm your age. This video may be inappropriate": PERMANENT,
+            "The uploader has not made this video available in your country": PERMANENT,
+            "HTTP Error 429: Too Many Requests": RATE_LIMITED,
+            "Sign in to confirm you\u2019re not a bot": RATE_LIMITED,
+            "ERROR: [youtube] abc: Video unavailable. This content isn't available,"
+            " try again later.": RATE_LIMITED,
+            "Read timed out": TRANSIENT,
+        }
+        for message, expected in cases.items():
+            with self.subTest(message=message):
+                self.assertEqual(classify_extraction_error(message), expected)
+
+    def test_describe_unavailable_flat_entry(self):
+        self.assertEqual(
+            describe_unavailable_flat_entry({"title": "[Private video]"}),
+            "[Private video]",
+        )
+        self.assertEqual(
+            describe_unavailable_flat_entry({"availability": "needs_auth"}),
+            "availability: needs_auth",
+        )
+        self.assertIsNone(describe_unavailable_flat_entry({"title": "Song"}))
+
+
+class NegativeCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = NegativeCache(
+            permanent_ttl=1000, transient_ttl=10, max_transient_ttl=30, clock=self.clock
+        )
+
+    def test_permanent_entry_lives_for_permanent_ttl(self):
+        self.cache.record("abc", PERMANENT, "Private video")
+
+        self.clock.now += 999
+        self.assertEqual(self.cache.get("abc").reason, "Private video")
+        self.clock.now += 1
+        self.assertIsNone(self.cache.get("abc"))
+        self.assertNotIn("abc", self.cache.entries)
+
+    def test_transient_entries_back_off_exponentially_up_to_cap(self):
+        ttls = []
+        for _ in range(4):
+            entry = self.cache.record("abc", TRANSIENT, "timeout")
+            ttls.append(entry.expires_at - self.clock.now)
+            self.clock.now = entry.expires_at
+            self.assertIsNone(self.cache.get("abc"))
+
+        self.assertEqual(ttls, [10, 20, 30, 30])
+
+    def test_forget_resets_backoff(self):
+        self.cache.record("abc", TRANSIENT, "timeout")
+        self.cache.forget("abc")
+
+        entry = self.cache.record("abc", TRANSIENT, "timeout")
+
+        self.assertEqual(entry.failures, 1)
+        self.assertEqual(self.cache.stats()["transient"], 1)
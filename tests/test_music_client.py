@@ -0,0 +1,40 @@
+import unittest
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_client import build_intents, client_options
+
+
+class ClientOptionsTests(unittest.TestCase):
+    def test_default_profile_keeps_historical_intents_and_caches(self):
+        options = client_options("default")
+
+        self.assertEqual(set(options), {"intents"})
+        self.assertTrue(options["intents"].message_content)
+        self.assertTrue(options["intents"].voice_states)
+
+    def test_lean_profile_drops_caches_and_unused_intents(self):
+        options = client_options("lean")
+
+        intents = options["intents"]
+        self.assertTrue(intents.guilds)
+        self.assertTrue(intents.voice_states)
+        self.assertTrue(intents.guild_messages)
+        self.assertFalse(intents.message_content)
+        self.assertIsNone(options["max_messages"])
+        self.assertTrue(options["member_cache_flags"].voice)
+        self.assertFalse(options["member_cache_flags"].joined)
+        self.assertFalse(options["chunk_guilds_at_startup"])
+
+    def test_lean_profile_skips_message_events_without_the_panel(self):
+        self.assertFalse(build_intents("lean", message_events=False).guild_messages)
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            client_options("tiny")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_actor import ActorRegistry
+from music_controls import QueueControls
+from music_state import MusicState
+
+
+class QueueControlsTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.state = MusicState()
+        self.actors = ActorRegistry()
+        self.controls = QueueControls(
+            SimpleNamespace(state=self.state, actors=self.actors)
+        )
+        self.guild_id = 42
+
+    async def asyncTearDown(self):
+        await self.actors.close()
+
+    def make_guild(self, *, playing=False, connected=True):
+        voice_client = SimpleNamespace(
+            stop=Mock(),
+            disconnect=AsyncMock(),
+            is_playing=Mock(return_value=playing),
+            is_connected=Mock(return_value=connected),
+        )
+        return SimpleNamespace(id=self.guild_id, voice_client=voice_client)
+
+    async def sync(self):
+        await self.actors.ask(self.guild_id, "sync", lambda: None)
+
+    async def test_skip_stops_only_a_playing_track(self):
+        idle = self.make_guild()
+        playing = self.make_guild(playing=True)
+
+        self.assertFalse(self.controls.skip(idle))
+        self.assertTrue(self.controls.skip(playing))
+        await self.sync()
+
+        idle.voice_client.stop.assert_not_called()
+        playing.voice_client.stop.assert_called_once_with()
+
+    async def test_commands_answer_while_the_actor_is_busy(self):
+        release = asyncio.Event()
+        busy = asyncio.ensure_future(
+            self.actors.ask(self.guild_id, "play", release.wait)
+        )
+        await asyncio.sleep(0)
+        self.state.get_queue(self.guild_id).extend(["a", "b"])
+
+        self.assertTrue(self.controls.skip(self.make_guild(playing=True)))
+        self.assertEqual(self.controls.shuffle_queue(self.guild_id), 2)
+        self.assertEqual(self.controls.remove_from_queue(self.guild_id, 1), "a")
+        self.assertEqual(self.state.get_queue(self.guild_id), ["a", "b"])
+
+        release.set()
+        await busy
+        await self.sync()
+        self.assertEqual(self.state.get_queue(self.guild_id), ["b"])
+
+    async def test_remove_takes_out_the_track_the_user_saw(self):
+        first, second = SimpleNamespace(title="a"), SimpleNamespace(title="b")
+        queue = self.state.get_queue(self.guild_id)
+        queue.extend([first, second])
+        started = asyncio.Event()
+
+        async def slow_play():
+            started.set()
+            await asyncio.sleep(0.01)
+            queue.pop(0)
+
+        play = asyncio.ensure_future(self.actors.ask(self.guild_id, "play", slow_play))
+        await started.wait()
+        removed = self.controls.remove_from_queue(self.guild_id, 2)
+        await play
+        await self.sync()
+
+        self.assertIs(removed, second)
+        self.assertEqual(queue, [])
+        self.assertIsNone(self.controls.remove_from_queue(self.guild_id, 1))
+
+    async def test_shuffle_keeps_every_track(self):
+        self.state.get_queue(self.guild_id).extend(range(10))
+
+        self.assertEqual(self.controls.shuffle_queue(self.guild_id), 10)
+        await self.sync()
+        self.assertEqual(sorted(self.state.get_queue(self.guild_id)), list(range(10)))
+
+    async def test_leave_reports_whether_it_was_connected(self):
+        connected = self.make_guild()
+        disconnected = self.make_guild(connected=False)
+
+        self.assertTrue(self.controls.leave(connected))
+        self.assertFalse(self.controls.leave(disconnected))
+        await self.sync()
+
+        connected.voice_client.disconnect.assert_awaited_once_with()
+        disconnected.voice_client.disconnect.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
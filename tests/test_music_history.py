@@ -0,0 +1,162 @@
+import os
+import tempfile
+import unittest
+
+from music_history import TrackHistory, is_url_like, normalize_text
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TrackHistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.history = TrackHistory(clock=self.clock)
+
+    def test_normalize_text_and_url_detection(self):
+        self.assertEqual(
+            normalize_text("  Daft Punk - One More Time! "), "daft punk one more time"
+        )
+        self.assertTrue(is_url_like("https://youtu.be/abc"))
+        self.assertFalse(is_url_like("daft punk"))
+
+    def test_suggest_matches_word_prefixes_ranked_by_play_count(self):
+        self.history.record_play("a", "Daft Punk - One More Time", "https://y/a")
+        self.history.record_play("b", "Punk Rock Mix", "https://y/b")
+        self.history.record_play("b", "Punk Rock Mix", "https://y/b")
+        self.history.record_play("c", "Lofi Beats", "https://y/c")
+
+        self.assertEqual(
+            [record.video_id for record in self.history.suggest("pun")], ["b", "a"]
+        )
+        self.assertEqual(
+            [record.video_id for record in self.history.suggest("daft on")], ["a"]
+        )
+        self.assertEqual(self.history.suggest("unk"), [])
+
+    def test_suggest_with_empty_query_returns_most_played(self):
+        self.history.record_play("a", "First", "https://y/a")
+        self.history.record_play("b", "Second", "https://y/b")
+        self.history.record_play("b", "Second", "https://y/b")
+
+        self.assertEqual([r.video_id for r in self.history.suggest("", limit=1)], ["b"])
+
+    def test_retitled_track_drops_old_trigrams(self):
+        self.history.record_play("a", "Old Name", "https://y/a")
+        self.history.remember_track("a", "New Name", "https://y/a")
+
+        self.assertEqual(self.history.suggest("old"), [])
+        self.assertEqual(self.history.suggest("new")[0].video_id, "a")
+
+    def test_resolve_prefers_cached_search_then_index(self):
+        searched = self.history.remember_track("s", "Search Hit", "https://y/s")
+        self.history.remember_search("Exact Query", searched)
+        self.history.record_play("h", "History Hit", "https://y/h")
+
+        self.assertEqual(self.history.resolve("exact  query").video_id, "s")
+        self.assertEqual(self.history.resolve("History - hit!").video_id, "h")
+        self.assertIsNone(self.history.resolve("history"))
+        self.assertIsNone(self.history.resolve("nothing here"))
+
+    def test_cached_search_expires(self):
+        record = self.history.remember_track("s", "Search Hit", "https://y/s")
+        self.history.remember_search("query", record)
+        self.clock.now += self.history.search_ttl + 1
+
+        self.assertIsNone(self.history.lookup_search("query"))
+
+    def test_top_tracks_skips_unplayed_and_orders_by_count_then_recency(self):
+        self.history.record_play("a", "A", "https://y/a")
+        self.clock.now += 1
+        self.history.record_play("b", "B", "https://y/b")
+        self.history.remember_track("c", "C", "https://y/c")
+
+        self.assertEqual([r.video_id for r in self.history.top_tracks(5)], ["b", "a"])
+
+    def test_plays_are_written_in_one_batch_on_flush(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.sqlite3")
+            history = TrackHistory(path, clock=self.clock)
+            history.load()
+            try:
+                for _ in range(3):
+                    history.record_play("a", "Song", "https://y/a")
+                history.record_play("b", "Other", "https://y/b")
+                stored = history.connection.execute("SELECT COUNT(*) FROM tracks")
+                self.assertEqual(stored.fetchone()[0], 0)
+
+                self.assertEqual(history.flush(), 2)
+                self.assertEqual(history.flush(), 0)
+                stored = history.connection.execute(
+                    "SELECT play_count FROM tracks WHERE video_id = 'a'"
+                )
+                self.assertEqual(stored.fetchone()[0], 3)
+            finally:
+                history.close()
+
+    def test_clusters_sharing_one_database_add_up_their_plays(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.sqlite3")
+            first = TrackHistory(path, clock=self.clock)
+            second = TrackHistory(path, clock=FakeClock(now=500.0))
+            first.load()
+            second.load()
+            try:
+                for _ in range(3):
+                    first.record_play("a", "Song", "https://y/a")
+                first.flush()
+                second.record_play("a", "Song", "https://y/a")
+                second.record_play("a", "Song", "https://y/a")
+                second.flush()
+                first.record_play("a", "Song", "https://y/a")
+                first.flush()
+
+                stored = first.connection.execute(
+                    "SELECT play_count, last_played FROM tracks WHERE video_id = 'a'"
+                )
+                self.assertEqual(stored.fetchone(), (6, 1000.0))
+            finally:
+                first.close()
+                second.close()
+
+    def test_failed_write_keeps_its_plays_for_the_retry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.sqlite3")
+            history = TrackHistory(path, clock=self.clock)
+            history.load()
+            try:
+                history.record_play("a", "Song", "https://y/a")
+                tracks, searches = history.pending_rows()
+                history.requeue_rows(tracks, searches)
+                history.record_play("a", "Song", "https://y/a")
+
+                self.assertEqual(history.flush(), 1)
+                stored = history.connection.execute(
+                    "SELECT play_count FROM tracks WHERE video_id = 'a'"
+                )
+                self.assertEqual(stored.fetchone()[0], 2)
+            finally:
+                history.close()
+
+    def test_history_persists_to_sqlite_and_reloads(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "history.sqlite3")
+            history = TrackHistory(path, clock=self.clock)
+            history.load()
+            history.record_play("a", "Persisted Song", "https://y/a")
+            history.remember_search("persisted", history.tracks["a"])
+            history.close()
+
+            reloaded = TrackHistory(path, clock=self.clock)
+            reloaded.load()
+            try:
+                self.assertEqual(reloaded.tracks["a"].play_count, 1)
+                self.assertEqual(reloaded.suggest("pers")[0].title, "Persisted Song")
+                self.assertEqual(reloaded.lookup_search("persisted").video_id, "a")
+            finally:
+                reloaded.close()
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from music_loopmonitor import LoopMonitor, SlowCallback
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LoopMonitorTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.monitor = LoopMonitor(interval=0.1, slow_threshold=0.25, clock=self.clock)
+        self.monitor.loop_thread_id = threading.get_ident()
+
+    def test_fast_steps_are_not_recorded(self):
+        self.monitor.record(0.01)
+        self.clock.now += 0.2
+        self.monitor.check()
+
+        self.assertIsNone(self.monitor.current_stall)
+        self.assertEqual(len(self.monitor.events), 0)
+
+    def test_watchdog_samples_stack_and_lag_sample_closes_the_stall(self):
+        self.monitor.record(0.0)
+        self.clock.now += 0.5
+        self.monitor.check()
+
+        stall = self.monitor.current_stall
+        self.assertIsNotNone(stall)
+        self.assertTrue(stall.stack)
+        self.assertIn(
+            "test_watchdog_samples_stack_and_lag_sample_closes_the_stall",
+            "".join(stall.stack),
+        )
+
+        self.monitor.record(0.6)
+
+        self.assertIsNone(self.monitor.current_stall)
+        self.assertEqual(list(self.monitor.events), [stall])
+        self.assertEqual(stall.duration, 0.6)
+
+    def test_unsampled_slow_step_is_still_recorded(self):
+        self.monitor.record(0.4)
+
+        self.assertEqual(len(self.monitor.events), 1)
+        self.assertEqual(
+            self.monitor.events[0].callback,
+            "unknown (finished before it could be sampled)",
+        )
+
+    def test_write_report_replaces_file_with_recent_events(self):
+        self.monitor.events.append(
+            SlowCallback(started_at=1.0, duration=0.5, callback="shuffle")
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            self.monitor.report_path = os.path.join(directory, "loop.json")
+            self.monitor.write_report()
+            with open(self.monitor.report_path, encoding="utf-8") as report_file:
+                report = json.load(report_file)
+            leftovers = os.listdir(directory)
+
+        self.assertEqual(report["slow_callbacks"][0]["callback"], "shuffle")
+        self.assertEqual(leftovers, ["loop.json"])
+
+
+class LoopMonitorIntegrationTests(unittest.IsolatedAsyncioTestCase):
+    async def test_blocking_coroutine_is_named_in_the_slow_callback_record(self):
+        monitor = LoopMonitor(interval=0.02, slow_threshold=0.1)
+        monitor.start()
+
+        async def blocking_handler():
+            time.sleep(0.4)
+
+        try:
+            await asyncio.sleep(0.05)
+            await asyncio.create_task(blocking_handler())
+            await asyncio.sleep(0.1)
+        finally:
+            await asyncio.to_thread(monitor.stop)
+
+        self.assertTrue(monitor.events)
+        self.assertIn("blocking_handler", monitor.events[-1].callback)
+        self.assertGreaterEqual(monitor.events[-1].duration, 0.1)
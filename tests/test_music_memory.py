@@ -0,0 +1,126 @@
+import tracemalloc
+import unittest
+from types import SimpleNamespace
+
+from music_memory import (
+    LAZY_ENTRY_KEYS,
+    MemoryAccountant,
+    compact_lazy_entry,
+    deep_sizeof,
+    module_of,
+)
+from music_state import MusicState
+
+
+def make_player(title="Song", extra_fields=0):
+    entry = {"id": "abc", "title": title, "webpage_url": "https://example.com/abc"}
+    entry.update({f"thumbnail_{index}": "x" * 200 for index in range(extra_fields)})
+    return SimpleNamespace(
+        title=title, url=entry["webpage_url"], video_id="abc", lazy_entry=entry
+    )
+
+
+class MemoryAccountantTests(unittest.TestCase):
+    def setUp(self):
+        self.state = MusicState()
+        self.accountant = MemoryAccountant(self.state, total_ttl=0)
+
+    def test_deep_sizeof_counts_nested_containers_once(self):
+        shared = ["x" * 1000]
+        value = {"a": shared, "b": shared}
+
+        self.assertGreater(deep_sizeof(value), 1000)
+        self.assertLess(deep_sizeof(value), 2000)
+
+    def test_top_guilds_are_ranked_by_estimated_bytes(self):
+        self.state.get_queue(1).append(make_player())
+        self.state.get_queue(2).extend(make_player(extra_fields=10) for _ in range(3))
+        self.state.get_queue(3)
+
+        top = self.accountant.top_guilds()
+
+        self.assertEqual([guild_id for guild_id, _, _ in top], [2, 1])
+        self.assertEqual(top[0][2], 3)
+        self.assertEqual(self.accountant.total_bytes(), sum(size for _, size, _ in top))
+
+    def test_admit_compacts_lazy_entries_before_refusing(self):
+        self.state.get_queue(1).extend(make_player(extra_fields=20) for _ in range(5))
+        bloated = self.accountant.total_bytes()
+        self.accountant.soft_cap_bytes = bloated - 1
+
+        self.assertTrue(self.accountant.admit(1))
+
+        self.assertEqual(self.accountant.trims, 1)
+        self.assertLess(self.accountant.total_bytes(), bloated // 2)
+        for player in self.state.get_queue(1):
+            self.assertLessEqual(set(player.lazy_entry), LAZY_ENTRY_KEYS)
+
+    def test_admit_trims_at_most_once_per_interval(self):
+        clock = SimpleNamespace(now=0.0)
+        self.accountant = MemoryAccountant(
+            self.state, soft_cap_bytes=1, total_ttl=0, clock=lambda: clock.now
+        )
+        self.state.get_queue(1).append(make_player(extra_fields=5))
+
+        with self.assertLogs("music_memory", level="WARNING") as logs:
+            for _ in range(50):
+                self.assertFalse(self.accountant.admit(1))
+            clock.now = self.accountant.trim_interval
+            self.assertFalse(self.accountant.admit(1))
+
+        self.assertEqual(self.accountant.trims, 2)
+        self.assertEqual(self.accountant.refusals, 51)
+        self.assertEqual(
+            sum("compacted queued entries" in line for line in logs.output), 2
+        )
+
+    def test_admit_refuses_when_trimming_is_not_enough(self):
+        self.state.get_queue(1).append(make_player())
+        self.accountant.soft_cap_bytes = 1
+
+        self.assertFalse(self.accountant.admit(1))
+        self.assertEqual(self.accountant.refusals, 1)
+
+    def test_zero_soft_cap_admits_everything(self):
+        self.state.get_queue(1).append(make_player(extra_fields=50))
+
+        self.assertTrue(self.accountant.admit(1))
+        self.assertEqual(self.accountant.trims, 0)
+
+    def test_compact_lazy_entry_keeps_resolution_fields(self):
+        entry = {"id": "a", "title": "T", "url": "u", "thumbnails": [1, 2]}
+
+        self.assertEqual(
+            compact_lazy_entry(entry), {"id": "a", "title": "T", "url": "u"}
+        )
+
+    def test_module_of_groups_site_packages_by_top_level_package(self):
+        self.assertEqual(
+            module_of("/venv/lib/python3.11/site-packages/yt_dlp/extractor/common.py"),
+            "yt_dlp",
+        )
+        self.assertEqual(module_of("/app/music_service.py"), "music_service")
+
+
+class MemoryReportTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.state = MusicState()
+        self.accountant = MemoryAccountant(self.state, total_ttl=0)
+
+    async def test_report_includes_top_guilds_and_tracemalloc_diff(self):
+        self.state.get_queue(7).append(make_player())
+        self.assertIn("tracemalloc: off", await self.accountant.report())
+
+        self.accountant.start_tracing()
+        try:
+            await self.accountant.report()
+            self.state.get_queue(8).extend(
+                make_player(extra_fields=5) for _ in range(50)
+            )
+            report = await self.accountant.report()
+        finally:
+            tracemalloc.stop()
+
+        self.assertIn("  7: ", report)
+        self.assertIn("tracemalloc growth since last report, by module:", report)
+        self.assertIn("test_music_memory", report)
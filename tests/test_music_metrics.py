@@ -0,0 +1,122 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_audio import ExtractionError, extract_info_with_fallback
+from music_metrics import (
+    MetricsRegistry,
+    MetricsServer,
+    extraction_seconds,
+    retries,
+)
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_renders_total_per_label_set(self):
+        counter = self.registry.counter("skips", "Skipped entries.", ("reason",))
+        counter.inc("failed")
+        counter.inc("failed")
+        counter.inc('say "hi"')
+
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP skips Skipped entries.\n"
+            "# TYPE skips counter\n"
+            'skips_total{reason="failed"} 2.0\n'
+            'skips_total{reason="say \\"hi\\""} 1.0\n',
+        )
+
+    def test_histogram_renders_cumulative_buckets_count_and_sum(self):
+        histogram = self.registry.histogram("latency", "Latency.", buckets=(1, 5))
+        for value in (0.5, 1.0, 3.0, 9.0):
+            histogram.observe(value)
+
+        lines = self.registry.render().splitlines()
+
+        self.assertEqual(
+            lines[2:],
+            [
+                'latency_bucket{le="1"} 2.0',
+                'latency_bucket{le="5"} 3.0',
+                'latency_bucket{le="+Inf"} 4.0',
+                "latency_count 4.0",
+                "latency_sum 13.5",
+            ],
+        )
+
+    def test_gauge_reads_state_at_scrape_time(self):
+        queues = {1: [1, 2], 2: []}
+        self.registry.gauge(
+            "depth",
+            "Queue depth.",
+            ("guild_id",),
+            collect=lambda: {(guild,): len(queue) for guild, queue in queues.items()},
+        )
+        self.registry.gauge("sessions", "Sessions.", collect=lambda: len(queues))
+        queues[3] = [1]
+
+        rendered = self.registry.render()
+
+        self.assertIn('depth{guild_id="3"} 1.0', rendered)
+        self.assertIn("sessions 3.0", rendered)
+
+    def test_failing_collector_does_not_break_the_scrape(self):
+        self.registry.gauge("broken", "Broken.", collect=lambda: 1 / 0)
+        self.registry.counter("ok", "Ok.").inc()
+
+        self.assertEqual(
+            self.registry.render(), "# HELP ok Ok.\n# TYPE ok counter\nok_total 1.0\n"
+        )
+
+
+class MetricsServerTests(unittest.IsolatedAsyncioTestCase):
+    async def fetch(self, port: int, path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def test_serves_metrics_and_404s_other_paths(self):
+        registry = MetricsRegistry()
+        registry.counter("requests", "Requests.").inc()
+        server = MetricsServer(registry, host="127.0.0.1", port=0)
+        await server.start()
+        port = server.server.sockets[0].getsockname()[1]
+
+        try:
+            metrics_response = await self.fetch(port, "/metrics")
+            missing_response = await self.fetch(port, "/")
+        finally:
+            await server.close()
+
+        self.assertTrue(metrics_response.startswith(b"HTTP/1.1 200 OK"))
+        self.assertIn(b"requests_total 1.0", metrics_response)
+        self.assertTrue(missing_response.startswith(b"HTTP/1.1 404"))
+
+
+class ExtractionInstrumentationTests(unittest.TestCase):
+    def test_each_fallback_attempt_is_timed_per_client(self):
+        extraction_seconds.series.clear()
+        retries.values.clear()
+
+        with patch("music_audio.youtube_dl.YoutubeDL") as youtube_dl:
+            youtube_dl.return_value.extract_info.side_effect = RuntimeError("timeout")
+            with self.assertRaises(ExtractionError):
+                extract_info_with_fallback("https://www.youtube.com/watch?v=x")
+
+        failed_clients = {
+            client
+            for client, outcome in extraction_seconds.series
+            if outcome == "failure"
+        }
+        self.assertEqual(len(failed_clients), 4)
+        self.assertEqual(retries.values[("fallback_client",)], 3)
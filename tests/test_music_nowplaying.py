@@ -0,0 +1,164 @@
+import asyncio
+import unittest
+from itertools import count
+
+from music_nowplaying import NowPlayingPanel
+from music_outbox import HIGH, Outbox
+
+message_ids = count(1)
+
+
+class FakeMessage:
+    def __init__(self, channel, content):
+        self.id = next(message_ids)
+        self.channel = channel
+        self.content = content
+        self.fail_edit = False
+        self.deleted = False
+
+    async def edit(self, content):
+        if self.fail_edit:
+            raise RuntimeError("404 Unknown Message")
+        self.channel.edits.append((self.channel.test.now, content))
+        self.channel.calls.append(("edit", content))
+        self.content = content
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeChannel:
+    def __init__(self, panel_test, channel_id=1):
+        self.id = channel_id
+        self.test = panel_test
+        self.posts = []
+        self.edits = []
+        self.calls = []
+
+    async def send(self, content):
+        self.calls.append(("send", content))
+        message = FakeMessage(self, content)
+        self.posts.append(message)
+        return message
+
+
+class NowPlayingPanelTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.panel = NowPlayingPanel(
+            debounce=0.5,
+            min_interval=2.0,
+            scroll_limit=3,
+            clock=lambda: self.now,
+            sleep=self.sleep,
+        )
+        self.channel = FakeChannel(self)
+
+    async def sleep(self, delay):
+        self.now += delay
+        await asyncio.sleep(0)
+
+    async def show(self, content, channel=None, **options):
+        self.panel.show(7, channel or self.channel, content, **options)
+        await self.panel.flush()
+
+    async def test_track_changes_edit_one_message(self):
+        await self.show("Now playing: a")
+        await self.show("Now playing: b")
+        await self.show("Now playing: c")
+
+        self.assertEqual(len(self.channel.posts), 1)
+        self.assertEqual(self.channel.posts[0].content, "Now playing: c")
+        self.assertEqual(
+            [content for _, content in self.channel.edits],
+            ["Now playing: b", "Now playing: c"],
+        )
+
+    async def test_burst_of_updates_is_debounced_and_rate_capped(self):
+        await self.show("Now playing: a")
+        for name in "bcd":
+            self.panel.show(7, self.channel, f"Now playing: {name}")
+        await self.panel.flush()
+
+        self.assertEqual(self.channel.edits, [(2.5, "Now playing: d")])
+
+    async def test_panel_is_reposted_after_scrolling_out_of_view(self):
+        await self.show("Now playing: a")
+        first = self.channel.posts[0]
+        for message_id in range(100, 103):
+            self.panel.note_message(7, self.channel.id, message_id)
+
+        await self.show("Now playing: b")
+
+        self.assertEqual(len(self.channel.posts), 2)
+        self.assertTrue(first.deleted)
+        self.assertEqual(self.channel.edits, [])
+
+    async def test_deleted_panel_is_posted_again(self):
+        await self.show("Now playing: a")
+        self.panel.forget_message(7, self.channel.posts[0].id)
+
+        await self.show("Now playing: b")
+
+        self.assertEqual(
+            [message.content for message in self.channel.posts],
+            ["Now playing: a", "Now playing: b"],
+        )
+
+    async def test_failed_edit_falls_back_to_new_post(self):
+        await self.show("Now playing: a")
+        self.channel.posts[0].fail_edit = True
+
+        with self.assertLogs("music_nowplaying", level="INFO"):
+            await self.show("Now playing: b")
+
+        self.assertEqual(self.channel.posts[1].content, "Now playing: b")
+
+    async def test_stale_update_is_dropped(self):
+        await self.show("Now playing: a", still_valid=lambda: False)
+
+        self.assertEqual(self.channel.posts, [])
+
+    async def test_panel_edits_queue_behind_notices_in_a_shared_outbox(self):
+        outbox = Outbox(batch_window=1.0, clock=lambda: self.now, sleep=self.sleep)
+        self.panel.outbox = outbox
+        await self.show("Now playing: a")
+
+        self.panel.show(7, self.channel, "Now playing: b")
+        await self.panel.panels[7].task
+        outbox.post(self.channel, "Disconnected", priority=HIGH)
+        await self.panel.flush()
+
+        self.assertEqual(
+            self.channel.calls,
+            [
+                ("send", "Now playing: a"),
+                ("send", "Disconnected"),
+                ("edit", "Now playing: b"),
+            ],
+        )
+
+    async def test_update_waiting_in_the_outbox_is_dropped_on_close(self):
+        outbox = Outbox(batch_window=1.0, clock=lambda: self.now, sleep=self.sleep)
+        self.panel.outbox = outbox
+        self.panel.show(7, self.channel, "Now playing: a")
+        await self.panel.panels[7].task
+
+        self.panel.close(7)
+        await outbox.flush()
+
+        self.assertEqual(self.channel.posts, [])
+
+    async def test_close_cancels_pending_update(self):
+        self.panel.show(7, self.channel, "Now playing: a")
+        task = self.panel.panels[7].task
+
+        self.panel.close(7)
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertTrue(task.cancelled())
+        self.assertEqual(self.channel.posts, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
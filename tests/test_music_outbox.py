@@ -0,0 +1,151 @@
+import asyncio
+import unittest
+
+from music_outbox import HIGH, LOW, Outbox, TokenBucket, join_notices
+
+
+class FakeChannel:
+    def __init__(self, outbox_test, channel_id=1, fail=False):
+        self.id = channel_id
+        self.test = outbox_test
+        self.fail = fail
+        self.sent = []
+
+    async def send(self, message):
+        if self.fail:
+            raise RuntimeError("403 Forbidden")
+        self.sent.append((self.test.now, message))
+
+
+class OutboxTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.outbox = Outbox(batch_window=1.0, clock=lambda: self.now, sleep=self.sleep)
+        self.channel = FakeChannel(self)
+
+    async def sleep(self, delay):
+        self.now += delay
+        await asyncio.sleep(0)
+
+    async def test_burst_of_low_notices_is_sent_as_one_message(self):
+        for index in range(3):
+            self.outbox.post(self.channel, f"Added to queue: {index}")
+
+        await self.outbox.flush()
+
+        self.assertEqual(
+            self.channel.sent,
+            [(1.0, "Added to queue: 0\nAdded to queue: 1\nAdded to queue: 2")],
+        )
+        self.assertEqual(self.outbox.channels, {})
+
+    async def test_high_priority_notice_goes_before_waiting_low_notices(self):
+        self.outbox.post(self.channel, "Added to queue: a", priority=LOW)
+        self.outbox.post(self.channel, "Now playing: b", priority=HIGH)
+
+        await self.outbox.flush()
+
+        self.assertEqual(
+            [message for _, message in self.channel.sent],
+            ["Now playing: b", "Added to queue: a"],
+        )
+        self.assertEqual(self.channel.sent[0][0], 0.0)
+
+    async def test_newer_notice_with_same_key_replaces_pending_one(self):
+        self.outbox.post(self.channel, "Added to queue: a")
+        self.outbox.post(
+            self.channel, "Now playing: a", priority=HIGH, key=("now_playing", 1)
+        )
+        self.outbox.post(
+            self.channel, "Now playing: b", priority=HIGH, key=("now_playing", 1)
+        )
+
+        await self.outbox.flush()
+
+        self.assertEqual(
+            [message for _, message in self.channel.sent],
+            ["Now playing: b", "Added to queue: a"],
+        )
+
+    async def test_submitted_edits_wait_behind_notices_and_coalesce_by_key(self):
+        calls = []
+
+        async def edit(content):
+            calls.append((self.now, content))
+
+        self.outbox.post(self.channel, "Added to queue: a")
+        for content in ("panel: a", "panel: b"):
+            self.outbox.submit(
+                self.channel, lambda content=content: edit(content), key=("panel", 9)
+            )
+        self.outbox.post(self.channel, "Now playing: b", priority=HIGH)
+
+        await self.outbox.flush()
+
+        self.assertEqual(
+            [message for _, message in self.channel.sent],
+            ["Now playing: b", "Added to queue: a"],
+        )
+        self.assertEqual(calls, [(1.0, "panel: b")])
+
+    async def test_stale_notices_are_dropped(self):
+        self.outbox.post(self.channel, "Added to queue: a", still_valid=lambda: False)
+        self.outbox.post(self.channel, "Added to queue: b")
+        self.outbox.post(
+            self.channel, "Now playing: c", priority=HIGH, still_valid=lambda: False
+        )
+
+        await self.outbox.flush()
+
+        self.assertEqual(self.channel.sent, [(1.0, "Added to queue: b")])
+
+    async def test_low_notices_older_than_max_age_are_dropped(self):
+        self.outbox.max_age = 0.5
+        self.outbox.post(self.channel, "Skipped one item (error): boom")
+        self.now = 1.0
+
+        await self.outbox.flush()
+
+        self.assertEqual(self.channel.sent, [])
+
+    async def test_sends_are_paced_by_the_channel_bucket(self):
+        for index in range(7):
+            self.outbox.post(self.channel, f"Now playing: {index}", priority=HIGH)
+
+        await self.outbox.flush()
+
+        times = [sent_at for sent_at, _ in self.channel.sent]
+        self.assertEqual(times[:5], [0.0] * 5)
+        self.assertAlmostEqual(times[5], 1.0)
+        self.assertAlmostEqual(times[6], 2.0)
+
+    async def test_failed_send_is_logged_and_worker_continues(self):
+        channel = FakeChannel(self, fail=True)
+        self.outbox.post(channel, "Now playing: a", priority=HIGH)
+        self.outbox.post(channel, "Now playing: b", priority=HIGH)
+
+        with self.assertLogs("music_outbox", level="WARNING") as logs:
+            await self.outbox.flush()
+
+        self.assertEqual(len(logs.output), 2)
+        self.assertEqual(self.outbox.pending(), 0)
+
+
+class OutboxHelperTests(unittest.TestCase):
+    def test_join_notices_splits_at_discord_message_limit(self):
+        messages = join_notices(["a" * 1500, "b" * 400, "c" * 200])
+
+        self.assertEqual(messages, ["a" * 1500 + "\n" + "b" * 400, "c" * 200])
+
+    def test_token_bucket_refills_over_time(self):
+        now = [0.0]
+        bucket = TokenBucket(2, 2.0, clock=lambda: now[0])
+        bucket.tokens = 0
+
+        self.assertAlmostEqual(bucket.delay(), 1.0)
+        now[0] = 1.0
+        self.assertEqual(bucket.delay(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from music_profiler import (
+    COLLAPSED,
+    SPEEDSCOPE,
+    ProfilerBusyError,
+    SamplingProfiler,
+)
+
+
+def spin_until(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class SamplingProfilerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.profiler = SamplingProfiler(self.directory.name, interval=0.005)
+        self.stop_event = threading.Event()
+        self.worker = threading.Thread(
+            target=spin_until, args=(self.stop_event,), name="yt-dlp_0"
+        )
+        self.worker.start()
+
+    def tearDown(self):
+        self.stop_event.set()
+        self.worker.join()
+        self.directory.cleanup()
+
+    def test_collapsed_capture_includes_worker_thread_stacks(self):
+        result = self.profiler.capture(0.2, COLLAPSED)
+
+        with open(result.path, encoding="utf-8") as profile_file:
+            lines = profile_file.read().splitlines()
+
+        self.assertTrue(result.path.endswith(".collapsed"))
+        self.assertGreater(result.samples, 5)
+        worker_lines = [line for line in lines if line.startswith("yt-dlp_0;")]
+        self.assertTrue(worker_lines)
+        self.assertTrue(any("spin_until" in line for line in worker_lines))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertFalse(self.profiler.running)
+
+    def test_speedscope_capture_has_one_profile_per_thread(self):
+        result = self.profiler.capture(0.1, SPEEDSCOPE)
+
+        with open(result.path, encoding="utf-8") as profile_file:
+            document = json.load(profile_file)
+
+        names = [profile["name"] for profile in document["profiles"]]
+        self.assertIn("yt-dlp_0", names)
+        self.assertEqual(len(names), len(set(names)))
+        frame_count = len(document["shared"]["frames"])
+        for profile in document["profiles"]:
+            self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+            for sample in profile["samples"]:
+                self.assertTrue(all(index < frame_count for index in sample))
+
+    def test_refuses_a_second_capture_while_one_is_running(self):
+        started = threading.Event()
+        original_collect = self.profiler.collect
+
+        def slow_collect(seconds):
+            started.set()
+            return original_collect(seconds)
+
+        self.profiler.collect = slow_collect
+        capture = threading.Thread(target=self.profiler.capture, args=(0.3,))
+        capture.start()
+        started.wait()
+
+        with self.assertRaises(ProfilerBusyError):
+            self.profiler.capture(0.1)
+
+        capture.join()
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+
+    def test_duration_is_capped(self):
+        self.profiler.max_seconds = 0.05
+        started = time.monotonic()
+
+        self.profiler.capture(30)
+
+        self.assertLess(time.monotonic() - started, 1.0)
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from music_scheduler import BACKGROUND, INTERACTIVE, NEXT_UP, ExtractionScheduler
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ExtractionSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.scheduler = ExtractionScheduler(
+            max_concurrent=1, starvation_timeout=10, clock=self.clock
+        )
+        self.order = []
+
+    async def run_job(self, name, priority):
+        async with self.scheduler.slot(priority):
+            self.order.append(name)
+
+    async def settle(self):
+        for _ in range(5):
+            await asyncio.sleep(0)
+
+    async def test_waiters_are_served_by_priority_then_arrival(self):
+        await self.scheduler.acquire(BACKGROUND)
+        tasks = [
+            asyncio.create_task(self.run_job("bg-1", BACKGROUND)),
+            asyncio.create_task(self.run_job("next", NEXT_UP)),
+            asyncio.create_task(self.run_job("bg-2", BACKGROUND)),
+            asyncio.create_task(self.run_job("user", INTERACTIVE)),
+        ]
+        await self.settle()
+        self.assertEqual(self.scheduler.waiting(), 2)
+
+        self.scheduler.release()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(self.order, ["user", "next", "bg-1", "bg-2"])
+        self.assertEqual(self.scheduler.snapshot()["granted"]["background"], 3)
+
+    async def test_starving_background_waiter_jumps_ahead(self):
+        await self.scheduler.acquire(INTERACTIVE)
+        background = asyncio.create_task(self.run_job("bg", BACKGROUND))
+        await self.settle()
+        self.clock.now = 11
+        user = asyncio.create_task(self.run_job("user", INTERACTIVE))
+        await self.settle()
+
+        self.scheduler.release()
+        await asyncio.gather(background, user)
+
+        self.assertEqual(self.order, ["bg", "user"])
+        self.assertEqual(self.scheduler.starvation_grants, 1)
+
+    async def test_cancelled_waiter_does_not_leak_a_slot(self):
+        await self.scheduler.acquire(INTERACTIVE)
+        waiter = asyncio.create_task(self.run_job("cancelled", NEXT_UP))
+        await self.settle()
+        waiter.cancel()
+        await self.settle()
+
+        self.scheduler.release()
+        await self.run_job("later", BACKGROUND)
+
+        self.assertEqual(self.order, ["later"])
+        self.assertEqual(self.scheduler.running, 0)
+
+    async def test_promoted_waiter_is_served_ahead_of_its_old_class(self):
+        await self.scheduler.acquire(INTERACTIVE)
+        background = asyncio.create_task(self.run_job("bg", BACKGROUND))
+        next_up = asyncio.create_task(self.run_job("next", NEXT_UP))
+        await self.settle()
+
+        self.assertTrue(self.scheduler.promote(background, INTERACTIVE))
+        self.assertFalse(self.scheduler.promote(asyncio.current_task(), INTERACTIVE))
+        self.scheduler.release()
+        await asyncio.gather(background, next_up)
+
+        self.assertEqual(self.order, ["bg", "next"])
+        self.assertEqual(self.scheduler.queued_tasks, {})
+
+    async def test_pause_for_foreground_waits_until_foreground_queue_drains(self):
+        await self.scheduler.acquire(BACKGROUND)
+        user = asyncio.create_task(self.run_job("user", INTERACTIVE))
+        await self.settle()
+        pause = asyncio.create_task(self.scheduler.pause_for_foreground())
+        await self.settle()
+        self.assertFalse(pause.done())
+
+        self.scheduler.release()
+        await asyncio.gather(user, pause)
+
+        self.assertEqual(self.order, ["user"])
@@ -7,7 +7,12 @@ from tests.module_stubs import install_test_stubs
 
 install_test_stubs()
 
-from music_audio import create_player_from_entry
+from music_admission import AdmissionController
+from music_audio import BreakerOpenError, create_player_from_entry, negative_cache
+from music_history import TrackHistory
+from music_nowplaying import NowPlayingPanel
+from music_outbox import HIGH, Outbox
+from music_scheduler import NEXT_UP
 from music_service import MusicService
 from music_state import MusicState
 
@@ -70,6 +75,22 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             ),
         )
 
+    def test_bot_is_alone_with_only_bots_in_channel(self):
+        channel = SimpleNamespace(
+            members=[SimpleNamespace(bot=True), SimpleNamespace(bot=True)],
+            voice_states={1: None, 2: None},
+        )
+
+        self.assertTrue(self.service.is_bot_alone_in_channel(channel))
+
+    def test_uncached_voice_member_counts_as_listener(self):
+        channel = SimpleNamespace(
+            members=[SimpleNamespace(bot=True)],
+            voice_states={999: None, 5: None},
+        )
+
+        self.assertFalse(self.service.is_bot_alone_in_channel(channel))
+
     async def test_ensure_bot_connected_requires_requester_voice_channel(self):
         interaction = self.make_interaction(user=SimpleNamespace(voice=None))
 
@@ -182,7 +203,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         )
 
         self.service.send_guild_message.assert_awaited_once_with(
-            self.guild_id, "Disconnecting now", "warning"
+            self.guild_id, "Disconnecting now", "warning", priority=HIGH
         )
         voice_client.disconnect.assert_awaited_once_with(force=False)
         self.state.cleanup_guild.assert_called_once_with(self.guild_id)
@@ -267,7 +288,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         )
 
         self.service.send_guild_message.assert_awaited_once_with(
-            self.guild_id, "Disconnecting now", "warning"
+            self.guild_id, "Disconnecting now", "warning", priority=HIGH
         )
         voice_client.disconnect.assert_awaited_once_with(force=False)
         self.state.cleanup_guild.assert_called_once_with(self.guild_id)
@@ -292,6 +313,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             unittest.mock.ANY,
             "Added to queue: **[Demo](https://example.com/demo)**",
             "Failed to send queue addition message",
+            still_valid=unittest.mock.ANY,
         )
 
     async def test_enqueue_entry_respects_queue_limit(self):
@@ -318,6 +340,29 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             unittest.mock.ANY,
             "Queue is full (max 1 songs)!",
             "Failed to send queue full message",
+            priority=HIGH,
+        )
+
+    async def test_enqueue_entry_refuses_over_memory_soft_cap(self):
+        channel = FakeTextChannel()
+        self.service.memory = Mock(admit=Mock(return_value=False))
+        self.service.send_channel_message = AsyncMock(return_value=True)
+
+        with patch(
+            "music_service.create_player_from_entry",
+            new=AsyncMock(return_value=SimpleNamespace(title="Song", url="u")),
+        ):
+            queued = await self.service.enqueue_entry(
+                self.guild_id, channel, {"title": "Song"}, announce=False
+            )
+
+        self.assertFalse(queued)
+        self.assertEqual(self.state.get_queue(self.guild_id), [])
+        self.service.send_channel_message.assert_awaited_once_with(
+            channel,
+            "The bot is low on memory right now, try adding songs later.",
+            "Failed to send memory limit message",
+            priority=HIGH,
         )
 
     async def test_enqueue_entry_reports_player_creation_error(self):
@@ -338,6 +383,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             unittest.mock.ANY,
             "Skipped one item (error): boom",
             "Failed to send enqueue error message",
+            priority=HIGH,
         )
 
     async def test_handle_music_request_queues_first_song_and_cleans_loading_state(
@@ -460,6 +506,78 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         self.assertFalse(self.state.loading_playlists.get(self.guild_id, False))
         self.assertNotIn(self.guild_id, self.state.loading_tasks)
 
+    async def test_handle_music_request_reuses_speculative_first_extraction(self):
+        interaction = self.make_interaction(user=SimpleNamespace(id=7, voice=None))
+        first_info = {"title": "First", "url": "stream"}
+        speculation = asyncio.get_running_loop().create_future()
+        speculation.set_result(first_info)
+        self.service.speculator = Mock()
+        self.service.speculator.claim.return_value = speculation
+        self.service.enqueue_entry = AsyncMock(return_value=False)
+
+        with patch("music_service.extract_info_async", new=AsyncMock()) as extract_info:
+            await self.service.handle_music_request(interaction, "https://video")
+
+        self.service.speculator.claim.assert_called_once_with(7, "https://video")
+        extract_info.assert_not_awaited()
+        self.service.enqueue_entry.assert_awaited_once_with(
+            self.guild_id,
+            interaction.channel,
+            first_info,
+            announce=False,
+            use_entry_method=True,
+        )
+
+    async def test_resolve_query_passes_urls_through(self):
+        with patch("music_service.extract_info_async", new=AsyncMock()) as extract:
+            url = await self.service.resolve_query("https://www.youtube.com/watch")
+
+        self.assertEqual(url, "https://www.youtube.com/watch")
+        extract.assert_not_awaited()
+
+    async def test_resolve_query_answers_from_history_without_extraction(self):
+        self.service.history = TrackHistory()
+        self.service.history.record_play("abc", "Lofi Beats", "https://y/abc")
+
+        with patch("music_service.extract_info_async", new=AsyncMock()) as extract:
+            url = await self.service.resolve_query("lofi beats")
+
+        self.assertEqual(url, "https://y/abc")
+        extract.assert_not_awaited()
+
+    async def test_resolve_query_searches_on_index_miss_and_caches_result(self):
+        self.service.history = TrackHistory()
+        search_info = {
+            "entries": [
+                {
+                    "id": "xyz",
+                    "title": "Found Song",
+                    "url": "https://www.youtube.com/watch?v=xyz",
+                }
+            ]
+        }
+
+        with patch(
+            "music_service.extract_info_async",
+            new=AsyncMock(return_value=search_info),
+        ) as extract:
+            first = await self.service.resolve_query("found song remix")
+            second = await self.service.resolve_query("found song remix")
+
+        self.assertEqual(first, "https://www.youtube.com/watch?v=xyz")
+        self.assertEqual(second, first)
+        extract.assert_awaited_once_with(
+            "ytsearch1:found song remix", extract_flat="in_playlist"
+        )
+
+    async def test_resolve_query_raises_when_search_finds_nothing(self):
+        with patch(
+            "music_service.extract_info_async",
+            new=AsyncMock(return_value={"entries": []}),
+        ):
+            with self.assertRaisesRegex(RuntimeError, "No results found"):
+                await self.service.resolve_query("nothing")
+
     async def test_handle_music_request_stops_when_first_song_is_not_enqueued(self):
         voice_client = FakeVoiceClient()
         voice_client.is_playing.return_value = False
@@ -533,6 +651,42 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             ephemeral=True,
         )
 
+    async def test_handle_music_request_sheds_background_playlist_load_when_busy(self):
+        voice_client = FakeVoiceClient()
+        interaction = self.make_interaction(guild=self.make_guild(voice_client))
+        first_info = {"title": "First", "url": "stream", "webpage_url": "https://first"}
+        created = {}
+        real_create_task = asyncio.create_task
+
+        def create_task_wrapper(coro):
+            task = real_create_task(coro)
+            created["task"] = task
+            return task
+
+        self.service.admission = AdmissionController(
+            extraction_load=lambda: 10, max_extraction_load=10
+        )
+        self.service.enqueue_entry = AsyncMock(return_value=True)
+        self.service.play_next = AsyncMock()
+        self.service.send_channel_message = AsyncMock(return_value=True)
+        extract = AsyncMock(return_value=first_info)
+
+        with patch("music_service.extract_info_async", new=extract), patch(
+            "music_service.asyncio.create_task", side_effect=create_task_wrapper
+        ):
+            await self.service.handle_music_request(
+                interaction, "https://www.youtube.com/watch?v=abc&list=PL1"
+            )
+            await created["task"]
+
+        extract.assert_awaited_once()
+        self.service.send_channel_message.assert_awaited_once()
+        self.assertIn(
+            "rest of the playlist was not loaded",
+            self.service.send_channel_message.await_args.args[1],
+        )
+        self.assertFalse(self.state.loading_playlists.get(self.guild_id, False))
+
     async def test_handle_music_request_skips_summary_for_non_playlist_response(self):
         voice_client = FakeVoiceClient()
         voice_client.is_playing.return_value = False
@@ -591,7 +745,11 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         with patch(
             "music_service.extract_info_async",
             new=AsyncMock(side_effect=[first_info, playlist_info]),
-        ), patch("music_service.asyncio.create_task", side_effect=create_task_wrapper):
+        ), patch(
+            "music_service.asyncio.create_task", side_effect=create_task_wrapper
+        ), patch(
+            "music_service.extraction_scheduler.pause_for_foreground", new=AsyncMock()
+        ) as pause:
             await self.service.handle_music_request(interaction, "https://playlist")
             await created["task"]
 
@@ -600,6 +758,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             playlist_info["entries"][1:],
             loader_generation=unittest.mock.ANY,
         )
+        pause.assert_awaited_once_with()
         self.service.send_channel_message.assert_not_awaited()
         self.assertFalse(self.state.loading_playlists.get(self.guild_id, False))
         self.assertNotIn(self.guild_id, self.state.loading_tasks)
@@ -874,7 +1033,9 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
     async def test_enqueue_playlist_entries_counts_queued_and_skipped_items(self):
         loader_generation = self.state.begin_playlist_loading(self.guild_id)
 
-        with patch("music_audio.create_ffmpeg_source") as create_ffmpeg_source:
+        with patch("music_audio.create_ffmpeg_source") as create_ffmpeg_source, patch(
+            "music_service.extraction_scheduler.pause_for_foreground", new=AsyncMock()
+        ) as pause:
             queued_count, skipped_count = await self.service.enqueue_playlist_entries(
                 self.guild_id,
                 [
@@ -895,6 +1056,31 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         )
         self.assertTrue(all(player.is_lazy for player in queued_players))
         create_ffmpeg_source.assert_not_called()
+        pause.assert_not_awaited()
+
+    async def test_enqueue_playlist_entries_skips_known_unavailable_videos(self):
+        loader_generation = self.state.begin_playlist_loading(self.guild_id)
+        negative_cache.record("dead", "permanent", "Video unavailable")
+        negative_cache.record("flaky", "transient", "timeout")
+        self.addCleanup(negative_cache.entries.clear)
+
+        queued_count, skipped_count = await self.service.enqueue_playlist_entries(
+            self.guild_id,
+            [
+                {"id": "dead", "title": "Dead"},
+                {"id": "private", "title": "[Private video]"},
+                {"id": "flaky", "title": "Flaky"},
+                {"id": "alive", "title": "Alive"},
+            ],
+            loader_generation=loader_generation,
+        )
+
+        self.assertEqual((queued_count, skipped_count), (2, 2))
+        self.assertEqual(
+            [player.title for player in self.state.get_queue(self.guild_id)],
+            ["Flaky", "Alive"],
+        )
+        self.assertEqual(negative_cache.get("private").kind, "permanent")
 
     async def test_get_next_ready_player_resolves_lazy_player(self):
         resolved_player = SimpleNamespace(title="Resolved")
@@ -926,6 +1112,87 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         broken_lazy.get_actual_source.assert_awaited_once_with()
         self.assertEqual(queue, [])
 
+    async def test_get_next_ready_player_keeps_track_while_breaker_is_open(self):
+        player = SimpleNamespace(
+            is_lazy=True,
+            title="Next",
+            get_actual_source=AsyncMock(side_effect=BreakerOpenError(2)),
+        )
+        self.state.get_queue(self.guild_id).append(player)
+
+        with self.assertRaises(BreakerOpenError):
+            await self.service.get_next_ready_player(self.guild_id)
+
+        self.assertEqual(self.state.get_queue(self.guild_id), [player])
+
+    def break_next_track(self):
+        voice_client = FakeVoiceClient()
+        self.client.get_guild.return_value = self.make_guild(voice_client)
+        self.service.get_next_ready_player = AsyncMock(
+            side_effect=[BreakerOpenError(2), "ready-player"]
+        )
+        self.service.build_after_play_callback = Mock(return_value="callback")
+        self.service.announce_now_playing = AsyncMock()
+        self.service.disconnect_for_empty_queue = AsyncMock()
+        return voice_client
+
+    async def test_play_next_parks_on_a_timer_while_breaker_is_open(self):
+        voice_client = self.break_next_track()
+
+        await self.service.play_next(self.guild_id, 777)
+
+        waited, timer = self.service.waits.breaker_waits[self.guild_id]
+        self.assertEqual(waited, 2)
+        self.assertGreater(timer.when(), self.loop.time() + 1)
+        voice_client.play.assert_not_called()
+        self.service.disconnect_for_empty_queue.assert_not_awaited()
+
+        # The timer's breaker_retry message runs play_next again.
+        await self.service.play_next(self.guild_id, 777)
+
+        voice_client.play.assert_called_once_with("ready-player", after="callback")
+        self.assertNotIn(self.guild_id, self.service.waits.breaker_waits)
+        self.assertTrue(timer.cancelled())
+
+    async def test_play_next_stops_parking_once_breaker_wait_runs_out(self):
+        self.state.playlist_wait_timeout = 0
+        voice_client = self.break_next_track()
+
+        await self.service.play_next(self.guild_id, 777)
+
+        self.assertNotIn(self.guild_id, self.service.waits.breaker_waits)
+        voice_client.play.assert_not_called()
+
+    async def test_play_next_pauses_without_disconnecting_when_rate_limited(self):
+        self.state.playlist_wait_timeout = 0
+        self.break_next_track()
+        self.state.get_queue(self.guild_id).append("kept")
+        self.service.send_guild_message = AsyncMock()
+        self.service.disconnect_guild_voice = AsyncMock()
+
+        await self.service.play_next(self.guild_id, 777)
+
+        self.service.disconnect_for_empty_queue.assert_not_awaited()
+        self.service.disconnect_guild_voice.assert_not_awaited()
+        self.assertEqual(self.state.get_queue(self.guild_id), ["kept"])
+        message = self.service.send_guild_message.await_args.args[1]
+        self.assertIn("rate limiting", message)
+        self.assertEqual(
+            self.service.send_guild_message.await_args.kwargs, {"priority": HIGH}
+        )
+
+    async def test_commands_run_while_breaker_wait_is_parked(self):
+        self.break_next_track()
+        await self.service.play_next(self.guild_id, 777)
+
+        ran = await asyncio.wait_for(
+            self.service.actors.ask(self.guild_id, "sync", lambda: True), 0.5
+        )
+
+        self.assertTrue(ran)
+        self.service.cleanup_guild(self.guild_id)
+        self.assertEqual(self.service.waits.breaker_waits, {})
+
     async def test_retry_player_once_retries_only_a_single_time(self):
         player = SimpleNamespace(_retries=0, url="https://retry", title="Retry me")
         fresh_player = SimpleNamespace(title="Fresh")
@@ -941,31 +1208,14 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(self.state.get_queue(self.guild_id), [fresh_player])
         from_url.assert_awaited_once_with("https://retry")
 
-    async def test_build_after_play_callback_retries_and_advances_on_error(self):
-        captured = {}
+    async def test_after_play_callback_posts_track_end_to_guild_actor(self):
         player = SimpleNamespace(title="Demo")
         self.service.retry_player_once = AsyncMock()
         self.service.play_next = AsyncMock()
 
-        def fake_run_coroutine_threadsafe(coro, loop):
-            captured["coro"] = coro
-
-            class DoneFuture:
-                def result(self_inner):
-                    return None
-
-            return DoneFuture()
-
-        with patch(
-            "music_service.asyncio.run_coroutine_threadsafe",
-            side_effect=fake_run_coroutine_threadsafe,
-        ):
-            callback = self.service.build_after_play_callback(
-                player, self.guild_id, 555
-            )
-            callback(RuntimeError("stream error"))
-
-        await captured["coro"]
+        callback = self.service.build_after_play_callback(player, self.guild_id, 555)
+        await asyncio.to_thread(callback, RuntimeError("stream error"))
+        await self.service.actors.ask(self.guild_id, "sync", lambda: None)
 
         self.service.retry_player_once.assert_awaited_once_with(player, self.guild_id)
         self.service.play_next.assert_awaited_once_with(self.guild_id, 555)
@@ -987,6 +1237,67 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         )
         self.assertEqual(self.state.text_channels[self.guild_id], 777)
 
+    async def test_now_playing_goes_through_outbox_and_replaces_stale_notice(self):
+        outbox = Outbox(batch_window=0)
+        self.service.outbox = outbox
+        channel = FakeTextChannel(456)
+        self.service.get_guild_text_channel = Mock(return_value=channel)
+        first = SimpleNamespace(title="A", url="https://a", message_sent=False)
+        second = SimpleNamespace(title="B", url="https://b", message_sent=False)
+        voice_client = FakeVoiceClient()
+        self.client.get_guild.return_value = self.make_guild(voice_client)
+
+        voice_client.source = first
+        await self.service.announce_now_playing(self.guild_id, first)
+        voice_client.source = second
+        await self.service.announce_now_playing(self.guild_id, second)
+        await outbox.flush()
+
+        channel.send.assert_awaited_once_with("Now playing: **[B](https://b)**")
+        self.assertTrue(first.message_sent)
+
+    async def test_outbox_drops_now_playing_after_bot_left_voice(self):
+        outbox = Outbox(batch_window=0)
+        self.service.outbox = outbox
+        channel = FakeTextChannel(456)
+        self.service.get_guild_text_channel = Mock(return_value=channel)
+        player = SimpleNamespace(title="A", url="https://a", message_sent=False)
+        guild = self.make_guild(FakeVoiceClient())
+        self.client.get_guild.return_value = guild
+
+        await self.service.announce_now_playing(self.guild_id, player)
+        guild.voice_client = None
+        await outbox.flush()
+
+        channel.send.assert_not_awaited()
+
+    async def test_now_playing_panel_is_edited_for_the_next_track(self):
+        panel = NowPlayingPanel(debounce=0, min_interval=0)
+        self.service.now_playing = panel
+        channel = FakeTextChannel(456)
+        message = SimpleNamespace(id=1, edit=AsyncMock())
+        channel.send.return_value = message
+        self.service.get_guild_text_channel = Mock(return_value=channel)
+        voice_client = FakeVoiceClient()
+        self.client.get_guild.return_value = self.make_guild(voice_client)
+
+        for title in ("A", "B"):
+            player = SimpleNamespace(title=title, url="https://x", message_sent=False)
+            voice_client.source = player
+            await self.service.announce_now_playing(self.guild_id, player)
+            await panel.flush()
+
+        channel.send.assert_awaited_once_with("Now playing: **[A](https://x)**")
+        message.edit.assert_awaited_once_with(content="Now playing: **[B](https://x)**")
+        self.assertTrue(player.message_sent)
+
+    async def test_cleanup_guild_closes_now_playing_panel(self):
+        self.service.now_playing = Mock()
+
+        self.service.cleanup_guild(self.guild_id)
+
+        self.service.now_playing.close.assert_called_once_with(self.guild_id)
+
     async def test_play_next_resolves_lazy_track_and_creates_ffmpeg_once(self):
         voice_client = FakeVoiceClient()
         guild = self.make_guild(voice_client)
@@ -1020,7 +1331,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             await self.service.play_next(self.guild_id, 780)
 
         self.assertFalse(lazy_player.is_lazy)
-        extract_info.assert_awaited_once_with(entry["webpage_url"])
+        extract_info.assert_awaited_once_with(entry["webpage_url"], priority=NEXT_UP)
         create_ffmpeg_source.assert_called_once_with(extracted_data["url"], None)
         voice_client.play.assert_called_once_with(lazy_player, after="callback")
         self.service.announce_now_playing.assert_awaited_once_with(
@@ -1106,20 +1417,41 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
         self.service.disconnect_for_empty_queue.assert_not_awaited()
         self.assertEqual(self.state.text_channels[self.guild_id], 902)
 
-    async def test_play_next_waits_for_playlist_loading_before_disconnecting(self):
-        voice_client = FakeVoiceClient()
-        guild = self.make_guild(voice_client)
+    async def park_while_loading(self):
+        guild = self.make_guild(FakeVoiceClient())
         self.client.get_guild.return_value = guild
         self.state.loading_playlists[self.guild_id] = True
         self.service.get_next_ready_player = AsyncMock(return_value=None)
-        self.service.wait_for_queue_during_playlist_load = AsyncMock(return_value=False)
         self.service.disconnect_for_empty_queue = AsyncMock()
-
         await self.service.play_next(self.guild_id, 999)
+        return guild
+
+    async def test_play_next_parks_guild_while_playlist_loads(self):
+        await self.park_while_loading()
+
+        self.assertIn(self.guild_id, self.service.waits.queue_waits)
+        self.service.disconnect_for_empty_queue.assert_not_awaited()
+
+    async def test_loader_append_wakes_parked_guild(self):
+        await self.park_while_loading()
+        self.service.play_next = AsyncMock()
+        generation = self.state.begin_playlist_loading(self.guild_id)
 
-        self.service.wait_for_queue_during_playlist_load.assert_awaited_once_with(
-            self.guild_id, 999
+        outcome = self.service.append_loaded_players(
+            self.guild_id, [SimpleNamespace(title="Next")], generation
         )
+        await self.service.actors.ask(self.guild_id, "sync", lambda: None)
+
+        self.assertEqual(outcome, (1, None))
+        self.assertNotIn(self.guild_id, self.service.waits.queue_waits)
+        self.service.play_next.assert_awaited_once_with(self.guild_id, 999)
+
+    async def test_parked_guild_disconnects_when_playlist_wait_expires(self):
+        self.state.playlist_wait_timeout = 0.01
+        guild = await self.park_while_loading()
+
+        await asyncio.sleep(0.05)
+
         self.service.disconnect_for_empty_queue.assert_awaited_once_with(
             guild,
             guild_id=self.guild_id,
@@ -1131,60 +1463,25 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
                 f"{self.guild_id}, skipping timeout disconnect."
             ),
             warning_context="Failed to send timeout disconnect message",
+            reason="playlist_timeout",
         )
 
-    async def test_play_next_does_not_disconnect_when_song_appears_during_loading(self):
-        voice_client = FakeVoiceClient()
-        guild = self.make_guild(voice_client)
-        self.client.get_guild.return_value = guild
-        self.state.loading_playlists[self.guild_id] = True
-        self.service.get_next_ready_player = AsyncMock(return_value=None)
-        self.service.wait_for_queue_during_playlist_load = AsyncMock(return_value=True)
-        self.service.disconnect_for_empty_queue = AsyncMock()
+    async def test_expired_wait_skips_disconnect_if_voice_client_disappears(self):
+        guild = await self.park_while_loading()
+        guild.voice_client = None
 
-        await self.service.play_next(self.guild_id, 1000)
+        await self.service.waits.expire_queue_wait(self.guild_id)
 
         self.service.disconnect_for_empty_queue.assert_not_awaited()
 
-    async def test_play_next_skips_disconnect_if_voice_client_disappears(
-        self,
-    ):
-        voice_client = FakeVoiceClient()
-        guild = self.make_guild(voice_client)
-        self.client.get_guild.return_value = guild
-        self.state.loading_playlists[self.guild_id] = True
-        self.service.get_next_ready_player = AsyncMock(return_value=None)
-        self.service.disconnect_for_empty_queue = AsyncMock()
-
-        async def wait_for_queue(guild_id, text_channel_id):
-            guild.voice_client = None
-            return False
-
-        self.service.wait_for_queue_during_playlist_load = AsyncMock(
-            side_effect=wait_for_queue
-        )
-
-        await self.service.play_next(self.guild_id, 1001)
+    async def test_cleanup_guild_cancels_queue_wait(self):
+        await self.park_while_loading()
+        timer = self.service.waits.queue_waits[self.guild_id][1]
 
-        self.service.wait_for_queue_during_playlist_load.assert_awaited_once_with(
-            self.guild_id, 1001
-        )
-        self.service.disconnect_for_empty_queue.assert_not_awaited()
+        self.service.cleanup_guild(self.guild_id)
 
-    async def test_play_next_returns_when_playlist_wait_raises(self):
-        voice_client = FakeVoiceClient()
-        guild = self.make_guild(voice_client)
-        self.client.get_guild.return_value = guild
-        self.state.loading_playlists[self.guild_id] = True
-        self.service.get_next_ready_player = AsyncMock(return_value=None)
-        self.service.wait_for_queue_during_playlist_load = AsyncMock(
-            side_effect=RuntimeError("wait failed")
-        )
-        self.service.disconnect_for_empty_queue = AsyncMock()
-
-        await self.service.play_next(self.guild_id, 1002)
-
-        self.service.disconnect_for_empty_queue.assert_not_awaited()
+        self.assertNotIn(self.guild_id, self.service.waits.queue_waits)
+        self.assertTrue(timer.cancelled())
 
     async def test_play_next_returns_when_empty_queue_disconnect_raises(self):
         voice_client = FakeVoiceClient()
@@ -1251,6 +1548,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             guild,
             guild_id=guild.id,
             message="No one on the voice channel, disconnecting. See ya!",
+            reason="alone",
             warning_context="Failed to send alone disconnect message",
             already_disconnected_log=(
                 f"Bot already disconnected from guild {guild.id} by another event."
@@ -1258,6 +1556,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
             success_log=(
                 f"Disconnected from voice channel in guild {guild.id} (bot was alone)."
             ),
+            requester=asyncio.current_task(),
         )
 
     async def test_on_voice_state_update_stays_connected_if_someone_rejoins(self):
@@ -1272,10 +1571,50 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
 
         with patch("music_service.asyncio.sleep", new=AsyncMock()) as sleep_mock:
             await self.service.on_voice_state_update(member, before, after)
+            await asyncio.gather(*self.service.supervisor.tasks)
 
         sleep_mock.assert_awaited_once_with(5)
         self.service.disconnect_guild_voice.assert_not_awaited()
 
+    async def test_alone_delay_runs_once_in_a_task_that_cleanup_cancels(self):
+        guild = self.make_guild(FakeVoiceClient())
+        member = SimpleNamespace(id=123, guild=guild)
+        before = SimpleNamespace(channel=None)
+        after = SimpleNamespace(channel=None)
+        self.state.alone_disconnect_delay = 60
+        self.service.get_bot_voice_channel = Mock(return_value=object())
+        self.service.is_bot_alone_in_channel = Mock(return_value=True)
+        self.service.disconnect_guild_voice = AsyncMock()
+
+        await self.service.on_voice_state_update(member, before, after)
+        await self.service.on_voice_state_update(member, before, after)
+        (task,) = self.service.supervisor.tasks
+        self.service.cleanup_guild(self.guild_id)
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.service.disconnect_guild_voice.assert_not_awaited()
+
+    async def test_delayed_alone_disconnect_is_not_cancelled_by_its_own_cleanup(self):
+        voice_client = FakeVoiceClient()
+        guild = self.make_guild(voice_client)
+        member = SimpleNamespace(id=123, guild=guild)
+        before = SimpleNamespace(channel=None)
+        after = SimpleNamespace(channel=None)
+        self.state.alone_disconnect_delay = 5
+        self.service.get_bot_voice_channel = Mock(return_value=object())
+        self.service.is_bot_alone_in_channel = Mock(return_value=True)
+        self.service.send_guild_message = AsyncMock()
+
+        with patch("music_service.asyncio.sleep", new=AsyncMock()):
+            await self.service.on_voice_state_update(member, before, after)
+            (task,) = self.service.supervisor.tasks
+            await task
+
+        voice_client.disconnect.assert_awaited_once_with(force=False)
+        self.assertFalse(task.cancelled())
+        self.assertEqual(self.service.supervisor.tasks, {})
+
     async def test_on_voice_state_update_returns_when_channel_disappears_during_delay(
         self,
     ):
@@ -1290,6 +1629,7 @@ class MusicServiceTests(unittest.IsolatedAsyncioTestCase):
 
         with patch("music_service.asyncio.sleep", new=AsyncMock()) as sleep_mock:
             await self.service.on_voice_state_update(member, before, after)
+            await asyncio.gather(*self.service.supervisor.tasks)
 
         sleep_mock.assert_awaited_once_with(5)
         self.service.disconnect_guild_voice.assert_not_awaited()
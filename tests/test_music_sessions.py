@@ -0,0 +1,172 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_audio import YTDLSource, extraction_cache
+from music_service import MusicService
+from music_sessions import SessionKeeper
+from music_state import MusicState
+from music_store import QUEUE, SESSION, SQLiteStore
+
+
+class FakeVoiceChannel:
+    def __init__(self, channel_id=500, listeners=1):
+        self.id = channel_id
+        self.members = [SimpleNamespace(bot=False) for _ in range(listeners)]
+        self.connect = AsyncMock()
+
+
+class SessionKeeperTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(os.path.join(self.directory.name, "state.sqlite3"))
+        self.guilds = {}
+        self.client = SimpleNamespace(
+            loop=asyncio.get_running_loop(),
+            voice_clients=[],
+            get_channel=Mock(return_value=None),
+            get_guild=self.guilds.get,
+        )
+        self.state = MusicState(store=self.store)
+        self.service = MusicService(self.client, self.state)
+        self.sessions = SessionKeeper(self.service)
+
+    async def asyncTearDown(self):
+        extraction_cache.streams.clear()
+        extraction_cache.metadata.clear()
+        self.store.close()
+        self.directory.cleanup()
+
+    def add_guild(self, guild_id, channel):
+        guild = SimpleNamespace(
+            id=guild_id,
+            voice_client=None,
+            get_channel=lambda channel_id: (
+                channel if channel_id == channel.id else None
+            ),
+        )
+        self.guilds[guild_id] = guild
+        return guild
+
+    def playing_voice_client(self, guild_id):
+        current = YTDLSource(
+            SimpleNamespace(),
+            data={"id": "now", "title": "Now", "webpage_url": "https://y.test/now"},
+        )
+        current.frames_read = 1500
+        extraction_cache.store(
+            "now", {"id": "now", "title": "Now", "url": "https://s.test/now"}
+        )
+        extraction_cache.store(
+            "next", {"id": "next", "title": "Next", "url": "https://s.test/next"}
+        )
+        self.state.get_queue(guild_id).append(
+            YTDLSource.from_record(
+                {"id": "next", "title": "Next", "url": "https://y.test/next"}
+            )
+        )
+        self.state.remember_text_channel(guild_id, 77)
+        return SimpleNamespace(
+            guild=SimpleNamespace(id=guild_id),
+            channel=SimpleNamespace(id=500),
+            source=current,
+        )
+
+    async def test_snapshot_saves_position_and_fresh_stream_urls(self):
+        self.client.voice_clients = [self.playing_voice_client(1)]
+
+        self.assertEqual(self.sessions.snapshot_sessions(), 1)
+
+        session = self.state.sessions[1]
+        self.assertEqual(session["voice_channel_id"], 500)
+        self.assertEqual(session["text_channel_id"], 77)
+        self.assertEqual(session["current"]["id"], "now")
+        self.assertEqual(session["position"], 30.0)
+        self.assertEqual(sorted(session["streams"]), ["next", "now"])
+        self.assertIn((SESSION, 1), self.state.dirty)
+
+    async def test_restart_restores_queue_position_and_reuses_stream_urls(self):
+        self.client.voice_clients = [self.playing_voice_client(1)]
+        self.sessions.snapshot_sessions()
+        self.state.flush_store()
+        self.store.close()
+        extraction_cache.streams.clear()
+
+        restarted = MusicState(store=self.store)
+        service = MusicService(self.client, restarted)
+        channel = FakeVoiceChannel()
+        self.add_guild(1, channel)
+        with (
+            patch.object(service, "send_guild_message", AsyncMock()),
+            patch.object(service, "play_next", AsyncMock()) as play_next,
+        ):
+            restored = await SessionKeeper(service).restore_sessions(self.store.load())
+
+        queue = restarted.get_queue(1)
+        self.assertEqual(restored, 1)
+        channel.connect.assert_awaited_once()
+        play_next.assert_awaited_once_with(1, 77)
+        self.assertEqual([player.title for player in queue], ["Now", "Next"])
+        self.assertEqual(queue[0].start_offset, 30.0)
+        self.assertTrue(extraction_cache.has_stream("now"))
+        self.assertTrue(extraction_cache.has_stream("next"))
+
+    async def test_other_shards_guilds_are_left_alone(self):
+        stored = {SESSION: {2: {"voice_channel_id": 500, "current": None}}}
+
+        self.assertEqual(await self.sessions.restore_sessions(stored), 0)
+        self.assertEqual(self.state.dirty, set())
+
+    async def test_empty_channel_is_not_rejoined_and_its_rows_are_dropped(self):
+        channel = FakeVoiceChannel(listeners=0)
+        self.add_guild(3, channel)
+        stored = {
+            SESSION: {3: {"voice_channel_id": 500, "text_channel_id": 77}},
+            QUEUE: {3: [{"id": "a", "title": "A", "url": "https://y.test/a"}]},
+        }
+
+        self.assertEqual(await self.sessions.restore_sessions(stored), 0)
+
+        channel.connect.assert_not_awaited()
+        changes = self.state.pending_changes()
+        self.assertIsNone(changes[(SESSION, 3)])
+        self.assertIsNone(changes[(QUEUE, 3)])
+
+    async def test_restores_run_with_bounded_concurrency(self):
+        active = 0
+        peak = 0
+
+        async def slow_connect():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        stored = {SESSION: {}, QUEUE: {}}
+        for guild_id in range(10):
+            channel = FakeVoiceChannel()
+            channel.connect = slow_connect
+            self.add_guild(guild_id, channel)
+            stored[SESSION][guild_id] = {"voice_channel_id": 500, "text_channel_id": 7}
+            stored[QUEUE][guild_id] = [{"id": "a", "title": "A", "url": "https://a"}]
+
+        with (
+            patch.object(self.service, "send_guild_message", AsyncMock()),
+            patch.object(self.service, "play_next", AsyncMock()),
+        ):
+            restored = await self.sessions.restore_sessions(stored, concurrency=3)
+
+        self.assertEqual(restored, 10)
+        self.assertEqual(peak, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
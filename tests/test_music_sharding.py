@@ -0,0 +1,238 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_sharding import (
+    ClusterLauncher,
+    ShardConfig,
+    count_by_shard,
+    format_shard_ids,
+    parse_shard_ids,
+    shard_id_for_guild,
+    split_shards,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One cluster process: import the real main.py offline with the Discord
+# stubs, play a fake gateway's shard lifecycle through its event handlers,
+# and report which shards its client and service were built for along with
+# the per-shard metrics it ends up exporting.
+CLUSTER_SCRIPT = """
+import asyncio, json, logging, os, sys
+from types import SimpleNamespace
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+from tests.module_stubs import install_test_stubs
+install_test_stubs()
+import main
+
+client = main.client
+first_shard = client.shard_ids[0]
+client.latencies = [(shard, 0.25 * (shard + 1)) for shard in client.shard_ids]
+client.guilds = [
+    SimpleNamespace(shard_id=shard)
+    for shard in client.shard_ids
+    for _ in range(shard + 1)
+]
+client.voice_clients = [
+    SimpleNamespace(guild=client.guilds[0], is_playing=lambda: True)
+]
+
+async def fake_gateway():
+    for shard in client.shard_ids:
+        await main.on_shard_connect(shard)
+        await main.on_shard_ready(shard)
+    await main.on_shard_disconnect(first_shard)
+    await main.on_shard_connect(first_shard)
+    await main.on_shard_resumed(first_shard)
+
+asyncio.run(fake_gateway())
+with open(os.path.join({output!r}, "cluster%s.json" % main.shards.cluster_id), "w") as f:
+    json.dump({{
+        "shard_metrics": sorted(
+            line
+            for line in main.metrics.render().splitlines()
+            if line.startswith("musicbot_shard")
+        ),
+        "client": type(main.client).__mro__[1].__name__,
+        "shard_count": main.client.shard_count,
+        "shard_ids": main.client.shard_ids,
+        "label": main.shards.log_label(),
+        "syncs_commands": main.shards.syncs_commands,
+        "metrics_port": os.environ["METRICS_PORT"],
+        "own_state": main.music_service.state is main.state,
+    }}, f)
+"""
+
+
+async def no_sleep(delay):
+    await asyncio.sleep(0)
+
+
+class ShardConfigTests(unittest.TestCase):
+    def test_shard_ids_round_trip_through_compact_ranges(self):
+        shard_ids = parse_shard_ids("8, 0-3,10-11,2")
+
+        self.assertEqual(shard_ids, (0, 1, 2, 3, 8, 10, 11))
+        self.assertEqual(format_shard_ids(shard_ids), "0-3,8,10-11")
+
+    def test_split_shards_into_even_contiguous_clusters(self):
+        self.assertEqual(split_shards(10, 3), [(0, 1, 2, 3), (4, 5, 6), (7, 8, 9)])
+        with self.assertRaises(ValueError):
+            split_shards(2, 3)
+
+    def test_unsharded_by_default(self):
+        config = ShardConfig.from_env({})
+
+        self.assertFalse(config.enabled)
+        self.assertEqual(config.client_options(), {})
+        self.assertEqual(config.log_label(), "")
+        self.assertTrue(config.syncs_commands)
+
+    def test_cluster_config_from_environment(self):
+        config = ShardConfig.from_env(
+            {"SHARD_COUNT": "16", "SHARD_IDS": "4-7", "CLUSTER_ID": "1"}
+        )
+
+        self.assertEqual(
+            config.client_options(), {"shard_count": 16, "shard_ids": [4, 5, 6, 7]}
+        )
+        self.assertEqual(config.log_label(), " [cluster 1 shards 4-7/16]")
+        self.assertFalse(config.syncs_commands)
+
+    def test_auto_shard_count_lets_discord_choose(self):
+        config = ShardConfig.from_env({"SHARD_COUNT": "auto"})
+
+        self.assertEqual(
+            config.client_options(), {"shard_count": None, "shard_ids": None}
+        )
+
+    def test_shard_ids_outside_shard_count_are_rejected(self):
+        with self.assertRaises(ValueError):
+            ShardConfig.from_env({"SHARD_COUNT": "4", "SHARD_IDS": "3-4"})
+
+    def test_guilds_are_counted_per_shard(self):
+        guild_ids = [81384788765712384, 41771983423143937, 175928847299117063]
+        guilds = [
+            SimpleNamespace(shard_id=shard_id_for_guild(guild_id, 4))
+            for guild_id in guild_ids
+        ]
+
+        self.assertEqual(sum(count_by_shard(guilds).values()), 3)
+        self.assertEqual(shard_id_for_guild(41771983423143937, 1), 0)
+
+
+class ClusterLauncherTests(unittest.IsolatedAsyncioTestCase):
+    def test_cluster_environment_offsets_ports_and_files(self):
+        launcher = ClusterLauncher(
+            ["bot"],
+            8,
+            2,
+            environ={"METRICS_PORT": "9100", "LOOP_REPORT_FILE": "loop_report.json"},
+        )
+
+        environment = launcher.cluster_environment(launcher.clusters[1])
+
+        self.assertEqual(environment["SHARD_COUNT"], "8")
+        self.assertEqual(environment["SHARD_IDS"], "4-7")
+        self.assertEqual(environment["CLUSTER_ID"], "1")
+        self.assertEqual(environment["METRICS_PORT"], "9101")
+        self.assertEqual(environment["LOOP_REPORT_FILE"], "loop_report.cluster1.json")
+
+    async def test_crashed_cluster_is_restarted_until_the_limit(self):
+        launcher = ClusterLauncher(
+            [sys.executable, "-c", "import sys; sys.exit(3)"],
+            2,
+            1,
+            max_restarts=2,
+            sleep=no_sleep,
+        )
+
+        with self.assertLogs("music_sharding", level="WARNING"):
+            await launcher.run()
+
+        self.assertEqual(launcher.clusters[0].exit_codes, [3, 3, 3])
+        self.assertEqual(launcher.clusters[0].restarts, 2)
+
+    async def test_clusters_run_main_with_their_own_shards(self):
+        with tempfile.TemporaryDirectory() as output:
+            script = CLUSTER_SCRIPT.format(root=ROOT, output=output)
+            launcher = ClusterLauncher(
+                [sys.executable, "-c", script],
+                4,
+                2,
+                environ={
+                    **os.environ,
+                    "DISCORD_TOKEN": "offline-shard-test",
+                    "LOOP_REPORT_FILE": "",
+                    "METRICS_PORT": "9100",
+                    "MUSIC_HISTORY_DB": os.path.join(output, "history.sqlite3"),
+                },
+                max_restarts=0,
+                sleep=no_sleep,
+            )
+
+            await launcher.run()
+
+            reports = []
+            for index in range(2):
+                with open(
+                    os.path.join(output, f"cluster{index}.json"), encoding="utf-8"
+                ) as report_file:
+                    reports.append(json.load(report_file))
+
+        self.assertEqual(
+            [cluster.exit_codes for cluster in launcher.clusters], [[0], [0]]
+        )
+        self.assertEqual(
+            [(report["shard_ids"], report["shard_count"]) for report in reports],
+            [([0, 1], 4), ([2, 3], 4)],
+        )
+        self.assertEqual(
+            {report["client"] for report in reports}, {"AutoShardedClient"}
+        )
+        self.assertEqual(
+            [report["label"] for report in reports],
+            [" [cluster 0 shards 0-1/4]", " [cluster 1 shards 2-3/4]"],
+        )
+        self.assertEqual(
+            [report["syncs_commands"] for report in reports], [True, False]
+        )
+        self.assertEqual(
+            [report["metrics_port"] for report in reports], ["9100", "9101"]
+        )
+        self.assertTrue(all(report["own_state"] for report in reports))
+        self.assertEqual(
+            reports[1]["shard_metrics"],
+            [
+                'musicbot_shard_events_total{shard="2",event="connect"} 2.0',
+                'musicbot_shard_events_total{shard="2",event="disconnect"} 1.0',
+                'musicbot_shard_events_total{shard="2",event="ready"} 1.0',
+                'musicbot_shard_events_total{shard="2",event="resume"} 1.0',
+                'musicbot_shard_events_total{shard="3",event="connect"} 1.0',
+                'musicbot_shard_events_total{shard="3",event="ready"} 1.0',
+                'musicbot_shard_guilds{shard="2"} 3.0',
+                'musicbot_shard_guilds{shard="3"} 4.0',
+                'musicbot_shard_latency_seconds{shard="2"} 0.75',
+                'musicbot_shard_latency_seconds{shard="3"} 1.0',
+                'musicbot_shard_voice_sessions{shard="2"} 1.0',
+            ],
+        )
+        self.assertIn(
+            'musicbot_shard_events_total{shard="0",event="resume"} 1.0',
+            reports[0]["shard_metrics"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_scheduler import BACKGROUND, INTERACTIVE, NEXT_UP, ExtractionScheduler
+from music_speculation import SpeculativeExtractor
+from music_supervisor import TaskSupervisor
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+OTHER_VIDEO_URL = "https://youtu.be/9bZkp7q19f0"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SpeculativeExtractorTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clock = FakeClock()
+        self.supervisor = TaskSupervisor()
+        self.speculator = SpeculativeExtractor(
+            max_per_user=1,
+            max_total=2,
+            ttl=10.0,
+            start_delay=0,
+            clock=self.clock,
+            supervisor=self.supervisor,
+        )
+
+    async def asyncTearDown(self):
+        self.speculator.cancel_all()
+
+    async def test_ignores_incomplete_or_non_youtube_urls(self):
+        with patch("music_speculation.extract_info_async", new=AsyncMock()):
+            self.assertFalse(self.speculator.maybe_start(1, "https://www.youtu"))
+            self.assertFalse(
+                self.speculator.maybe_start(1, "https://www.youtube.com/watch?v=abc")
+            )
+            self.assertFalse(self.speculator.maybe_start(1, "lofi beats"))
+
+        self.assertEqual(self.speculator.total_pending(), 0)
+
+    async def test_claim_returns_finished_first_track_extraction(self):
+        info = {"title": "Speculated", "url": "stream"}
+        with patch(
+            "music_speculation.extract_info_async",
+            new=AsyncMock(return_value=info),
+        ) as extract_info:
+            self.assertTrue(self.speculator.maybe_start(1, VIDEO_URL))
+            await self.speculator.pending[1][0].task
+            task = self.speculator.claim(1, VIDEO_URL + "&list=PL123")
+            self.assertIsNotNone(task)
+            self.assertEqual(await task, info)
+
+        extract_info.assert_awaited_once_with(
+            VIDEO_URL, priority=BACKGROUND, noplaylist=True, playlist_items="1"
+        )
+        self.assertIsNone(self.speculator.claim(1, VIDEO_URL))
+
+    async def test_speculation_runs_under_the_supervisor(self):
+        with patch(
+            "music_speculation.extract_info_async",
+            new=AsyncMock(side_effect=RuntimeError("Private video")),
+        ):
+            self.assertTrue(self.speculator.maybe_start(1, VIDEO_URL))
+            self.assertEqual(
+                [entry.kind for entry in self.supervisor.tasks.values()],
+                ["speculation"],
+            )
+            task = self.speculator.claim(1, VIDEO_URL)
+            with self.assertRaises(RuntimeError):
+                await task
+
+        self.assertEqual(self.supervisor.tasks, {})
+
+    async def test_claim_is_scoped_to_the_requesting_user(self):
+        with patch("music_speculation.extract_info_async", new=AsyncMock()):
+            self.speculator.maybe_start(1, VIDEO_URL)
+
+            self.assertIsNone(self.speculator.claim(2, VIDEO_URL))
+            self.assertIsNotNone(self.speculator.claim(1, VIDEO_URL))
+
+    async def test_new_url_cancels_users_abandoned_speculation(self):
+        release = asyncio.Event()
+
+        async def slow_extract(*args, **kwargs):
+            await release.wait()
+            return {}
+
+        with patch("music_speculation.extract_info_async", new=slow_extract):
+            self.speculator.maybe_start(1, VIDEO_URL)
+            first_task = self.speculator.pending[1][0].task
+            self.speculator.maybe_start(1, OTHER_VIDEO_URL)
+            await asyncio.sleep(0)
+
+        self.assertTrue(first_task.cancelled())
+        self.assertIsNone(self.speculator.claim(1, VIDEO_URL))
+        self.assertEqual(self.speculator.total_pending(), 1)
+
+    async def test_global_cap_rejects_extra_speculation(self):
+        with patch("music_speculation.extract_info_async", new=AsyncMock()):
+            self.assertTrue(self.speculator.maybe_start(1, VIDEO_URL))
+            self.assertTrue(self.speculator.maybe_start(2, VIDEO_URL))
+            self.assertFalse(self.speculator.maybe_start(3, OTHER_VIDEO_URL))
+
+        self.assertNotIn(3, self.speculator.pending)
+
+    async def test_expired_speculation_is_cancelled_and_not_claimed(self):
+        release = asyncio.Event()
+
+        async def slow_extract(*args, **kwargs):
+            await release.wait()
+            return {}
+
+        with patch("music_speculation.extract_info_async", new=slow_extract):
+            self.speculator.maybe_start(1, VIDEO_URL)
+            task = self.speculator.pending[1][0].task
+            self.clock.now = 11.0
+
+            self.assertIsNone(self.speculator.claim(1, VIDEO_URL))
+            await asyncio.sleep(0)
+
+        self.assertTrue(task.cancelled())
+        self.assertEqual(self.speculator.total_pending(), 0)
+
+    async def test_claim_skips_the_remaining_start_delay(self):
+        self.speculator.start_delay = 60
+        with patch(
+            "music_speculation.extract_info_async", new=AsyncMock(return_value={})
+        ) as extract_info:
+            self.speculator.maybe_start(1, VIDEO_URL)
+            await asyncio.sleep(0)
+            task = self.speculator.claim(1, VIDEO_URL)
+            await asyncio.wait_for(task, 1)
+
+        extract_info.assert_awaited_once_with(
+            VIDEO_URL, priority=INTERACTIVE, noplaylist=True, playlist_items="1"
+        )
+
+    async def test_claimed_queued_speculation_is_served_at_interactive_priority(self):
+        scheduler = ExtractionScheduler(max_concurrent=1)
+        order = []
+
+        async def scheduled_extract(url, *, priority, **kwargs):
+            async with scheduler.slot(priority):
+                order.append(url)
+            return {}
+
+        await scheduler.acquire(INTERACTIVE)
+        with patch(
+            "music_speculation.extract_info_async", new=scheduled_extract
+        ), patch("music_speculation.extraction_scheduler", new=scheduler):
+            self.speculator.maybe_start(1, VIDEO_URL)
+            next_up = asyncio.create_task(
+                scheduled_extract(OTHER_VIDEO_URL, priority=NEXT_UP)
+            )
+            for _ in range(5):
+                await asyncio.sleep(0)
+            self.assertEqual(scheduler.waiting(BACKGROUND), 2)
+
+            task = self.speculator.claim(1, VIDEO_URL)
+            scheduler.release()
+            await asyncio.gather(task, next_up)
+
+        self.assertEqual(order, [VIDEO_URL, OTHER_VIDEO_URL])
+        self.assertEqual(scheduler.snapshot()["granted"]["interactive"], 2)
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from music_startup import (
+    LazyModule,
+    StartupTimer,
+    command_tree_hash,
+    read_stored_hash,
+    sync_command_tree_if_changed,
+)
+
+
+class FakeCommand:
+    def __init__(self, name, description="desc"):
+        self.name = name
+        self.description = description
+
+    def to_dict(self, tree):
+        return {"name": self.name, "description": self.description, "type": 1}
+
+
+class FakeTree:
+    def __init__(self, *commands):
+        self.commands = list(commands)
+        self.sync = AsyncMock()
+
+    def get_commands(self):
+        return self.commands
+
+
+class LazyModuleTests(unittest.TestCase):
+    def setUp(self):
+        self.module = types.ModuleType("lazy_target_for_tests")
+        self.module.value = 42
+        sys.modules["lazy_target_for_tests"] = self.module
+        self.addCleanup(sys.modules.pop, "lazy_target_for_tests", None)
+
+    def test_imports_on_first_attribute_access(self):
+        loaded = []
+        proxy = LazyModule("lazy_target_for_tests", on_load=loaded.append)
+
+        self.assertFalse(proxy.loaded)
+        self.assertEqual(proxy.value, 42)
+        self.assertTrue(proxy.loaded)
+        self.assertEqual(proxy.value, 42)
+        self.assertEqual(loaded, [self.module])
+        self.assertIsNotNone(proxy.load_seconds)
+
+    def test_patched_attributes_shadow_the_module_until_restored(self):
+        proxy = LazyModule("lazy_target_for_tests")
+
+        with patch.object(proxy, "value", 7):
+            self.assertEqual(proxy.value, 7)
+
+        self.assertEqual(proxy.value, 42)
+
+
+class StartupTimerTests(unittest.TestCase):
+    def test_breakdown_includes_imports_and_marked_phases(self):
+        ticks = iter([10.0, 10.5, 12.0])
+        timer = StartupTimer(clock=lambda: next(ticks), uptime=lambda: 1.25)
+
+        timer.mark("configure")
+        with self.assertLogs("music_startup", level="INFO") as logs:
+            self.assertTrue(timer.report("gateway"))
+
+        self.assertEqual(
+            timer.phases, [("imports", 1.25), ("configure", 0.5), ("gateway", 1.5)]
+        )
+        self.assertAlmostEqual(timer.total(), 3.25)
+        self.assertIn("imports 1.25s, configure 0.50s, gateway 1.50s", logs.output[0])
+        self.assertFalse(timer.report("gateway"))
+
+    def test_imports_phase_is_skipped_without_process_start_time(self):
+        timer = StartupTimer(clock=lambda: 5.0, uptime=lambda: None)
+
+        self.assertEqual(timer.phases, [])
+
+
+class CommandSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "command_tree.sha256")
+
+    def test_hash_ignores_order_but_not_definitions_or_application(self):
+        first = command_tree_hash(FakeTree(FakeCommand("a"), FakeCommand("b")), 1)
+
+        self.assertEqual(
+            first, command_tree_hash(FakeTree(FakeCommand("b"), FakeCommand("a")), 1)
+        )
+        self.assertNotEqual(
+            first,
+            command_tree_hash(FakeTree(FakeCommand("a", "new"), FakeCommand("b")), 1),
+        )
+        self.assertNotEqual(
+            first, command_tree_hash(FakeTree(FakeCommand("a"), FakeCommand("b")), 2)
+        )
+
+    def test_syncs_once_then_skips_until_the_tree_changes(self):
+        tree = FakeTree(FakeCommand("play"))
+
+        self.assertTrue(asyncio.run(sync_command_tree_if_changed(tree, self.path)))
+        self.assertFalse(asyncio.run(sync_command_tree_if_changed(tree, self.path)))
+        tree.commands.append(FakeCommand("skip"))
+        self.assertTrue(asyncio.run(sync_command_tree_if_changed(tree, self.path)))
+
+        self.assertEqual(tree.sync.await_count, 2)
+        self.assertEqual(read_stored_hash(self.path), command_tree_hash(tree))
+
+    def test_force_syncs_an_unchanged_tree(self):
+        tree = FakeTree(FakeCommand("play"))
+        asyncio.run(sync_command_tree_if_changed(tree, self.path))
+
+        self.assertTrue(
+            asyncio.run(sync_command_tree_if_changed(tree, self.path, force=True))
+        )
+        self.assertEqual(tree.sync.await_count, 2)
+
+    def test_failed_sync_does_not_store_the_hash(self):
+        tree = FakeTree(FakeCommand("play"))
+        tree.sync.side_effect = RuntimeError("429")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(sync_command_tree_if_changed(tree, self.path))
+
+        self.assertIsNone(read_stored_hash(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
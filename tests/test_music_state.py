@@ -1,8 +1,29 @@
 import asyncio
+import threading
 import unittest
+from types import SimpleNamespace
 from unittest.mock import Mock
 
 from music_state import MusicState
+from music_store import GENERATION, QUEUE, TEXT_CHANNEL, MemoryStore
+
+
+class RecordingStore(MemoryStore):
+    durable = True
+
+    def __init__(self, *, accept=True):
+        self.accept = accept
+        self.batches = []
+
+    def write(self, changes):
+        self.batches.append(dict(changes))
+        return self.accept
+
+
+def make_track(name):
+    return SimpleNamespace(
+        to_record=lambda: {"id": name, "title": name, "url": f"https://x/{name}"}
+    )
 
 
 class MusicStateTests(unittest.TestCase):
@@ -160,7 +181,99 @@ class MusicStateTests(unittest.TestCase):
         self.assertEqual(state.text_channels[11], 99)
 
 
+class MusicStateStoreTests(unittest.TestCase):
+    def test_memory_store_keeps_plain_lists_and_tracks_nothing(self):
+        state = MusicState()
+
+        state.get_queue(1).append(make_track("a"))
+        state.remember_text_channel(1, 5)
+
+        self.assertIs(type(state.get_queue(1)), list)
+        self.assertEqual(state.dirty, set())
+
+    def test_queue_mutations_are_batched_into_one_write(self):
+        store = RecordingStore()
+        state = MusicState(store=store)
+
+        queue = state.get_queue(1)
+        queue.extend([make_track("a"), make_track("b")])
+        queue.pop(0)
+        state.remember_text_channel(1, 5)
+        state.remember_text_channel(1, 5)
+
+        self.assertEqual(state.flush_store(), 2)
+        self.assertEqual(
+            store.batches,
+            [
+                {
+                    (QUEUE, 1): [{"id": "b", "title": "b", "url": "https://x/b"}],
+                    (TEXT_CHANNEL, 1): 5,
+                }
+            ],
+        )
+        self.assertEqual(state.flush_store(), 0)
+
+    def test_cleanup_deletes_stored_guild_values(self):
+        store = RecordingStore()
+        state = MusicState(store=store)
+        state.get_queue(1).append(make_track("a"))
+        state.remember_text_channel(1, 5)
+        state.flush_store()
+
+        state.cleanup_guild(1)
+        state.flush_store()
+
+        self.assertIsNone(store.batches[-1][(QUEUE, 1)])
+        self.assertIsNone(store.batches[-1][(TEXT_CHANNEL, 1)])
+
+    def test_playlist_loader_generation_is_stored(self):
+        store = RecordingStore()
+        state = MusicState(store=store)
+
+        state.begin_playlist_loading(1)
+        state.flush_store()
+
+        self.assertEqual(store.batches, [{(GENERATION, 1): 1}])
+
+    def test_rejected_batch_is_retried_on_next_flush(self):
+        store = RecordingStore(accept=False)
+        state = MusicState(store=store)
+        state.get_queue(1).append(make_track("a"))
+
+        self.assertEqual(state.flush_store(), 0)
+        store.accept = True
+        self.assertEqual(state.flush_store(), 1)
+        self.assertEqual(store.batches[0], store.batches[1])
+
+
 class MusicStateAsyncTests(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_flusher_finishes_its_write_and_requeues_failures(self):
+        store = RecordingStore(accept=False)
+        started = threading.Event()
+        release = threading.Event()
+        record = store.write
+
+        def slow_write(changes):
+            started.set()
+            release.wait(5)
+            return record(changes)
+
+        store.write = slow_write
+        state = MusicState(store=store)
+        state.get_queue(1).append(make_track("a"))
+        flusher = asyncio.create_task(state.run_store_flusher(0))
+        await asyncio.to_thread(started.wait, 5)
+
+        flusher.cancel()
+        await asyncio.sleep(0.01)
+        self.assertFalse(flusher.done())
+        release.set()
+        with self.assertRaises(asyncio.CancelledError):
+            await flusher
+
+        self.assertEqual(len(store.batches), 1)
+        self.assertEqual(state.dirty, {(QUEUE, 1)})
+
     async def test_stop_playlist_loading_prevents_late_queue_append(self):
         state = MusicState()
         guild_id = 123
@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from music_store import GENERATION, QUEUE, TEXT_CHANNEL, MemoryStore, SQLiteStore
+
+
+class SQLiteStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "state.sqlite3")
+
+    def open_store(self):
+        store = SQLiteStore(self.path, clock=lambda: 100.0)
+        self.addCleanup(store.close)
+        return store
+
+    def test_batch_round_trips_through_a_new_connection(self):
+        store = self.open_store()
+        record = {"id": "abc", "title": "Song", "url": "https://youtu.be/abc"}
+
+        self.assertTrue(
+            store.write(
+                {
+                    (QUEUE, 1): [record],
+                    (TEXT_CHANNEL, 1): 55,
+                    (GENERATION, 2): 3,
+                }
+            )
+        )
+        store.close()
+
+        stored = self.open_store().load()
+        self.assertEqual(stored[QUEUE], {1: [record]})
+        self.assertEqual(stored[TEXT_CHANNEL], {1: 55})
+        self.assertEqual(stored[GENERATION], {2: 3})
+
+    def test_none_deletes_and_later_values_replace(self):
+        store = self.open_store()
+        store.write({(TEXT_CHANNEL, 1): 55, (TEXT_CHANNEL, 2): 66})
+
+        store.write({(TEXT_CHANNEL, 1): None, (TEXT_CHANNEL, 2): 77})
+
+        self.assertEqual(store.load()[TEXT_CHANNEL], {2: 77})
+
+    def test_database_uses_write_ahead_logging(self):
+        self.open_store().open()
+
+        with sqlite3.connect(self.path) as connection:
+            mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_failed_write_is_reported_for_retry(self):
+        store = self.open_store()
+        store.open()
+        store.connection.execute("DROP TABLE guild_state")
+
+        with self.assertLogs("music_store", level="WARNING"):
+            self.assertFalse(store.write({(TEXT_CHANNEL, 1): 55}))
+
+
+class MemoryStoreTests(unittest.TestCase):
+    def test_memory_store_keeps_nothing(self):
+        store = MemoryStore()
+
+        self.assertTrue(store.write({(TEXT_CHANNEL, 1): 55}))
+        self.assertEqual(store.load()[TEXT_CHANNEL], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+
+from music_metrics import task_seconds
+from music_supervisor import TaskSupervisor, parse_limits
+
+
+def finished(kind, outcome):
+    series = task_seconds.series.get((kind, outcome))
+    return 0 if series is None else sum(series[:-1])
+
+
+class TaskSupervisorTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.supervisor = TaskSupervisor(limits={"load": 2})
+        self.events = []
+
+    async def asyncTearDown(self):
+        await self.supervisor.drain()
+
+    async def work(self, name, delay=0.0):
+        self.events.append(f"start {name}")
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.events.append(f"stop {name}")
+        return name
+
+    def test_parse_limits(self):
+        self.assertEqual(
+            parse_limits("playlist_load=8, restore=2,"),
+            {"playlist_load": 8, "restore": 2},
+        )
+        with self.assertRaises(ValueError):
+            parse_limits("playlist_load=0")
+        with self.assertRaises(ValueError):
+            parse_limits("playlist_load")
+
+    async def test_kind_limit_makes_extra_tasks_wait_for_a_slot(self):
+        tasks = [self.supervisor.spawn("load", self.work(name, 0.02)) for name in "abc"]
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(
+            self.supervisor.inventory(),
+            {("load", "running"): 2, ("load", "waiting"): 1},
+        )
+        self.assertEqual(await asyncio.gather(*tasks), ["a", "b", "c"])
+        self.assertEqual(self.events[:2], ["start a", "start b"])
+        self.assertEqual(self.supervisor.tasks, {})
+
+    async def test_outcomes_are_recorded_and_failures_logged(self):
+        async def fail():
+            raise RuntimeError("boom")
+
+        ok_before = finished("probe", "ok")
+        error_before = finished("probe", "error")
+        cancelled_before = finished("probe", "cancelled")
+
+        await self.supervisor.spawn("probe", self.work("ok"))
+        with self.assertLogs("music_supervisor", level="ERROR"):
+            failing = self.supervisor.spawn("probe", fail())
+            with self.assertRaises(RuntimeError):
+                await failing
+        cancelled = self.supervisor.spawn("probe", self.work("slow", 10))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await cancelled
+
+        self.assertEqual(finished("probe", "ok"), ok_before + 1)
+        self.assertEqual(finished("probe", "error"), error_before + 1)
+        self.assertEqual(finished("probe", "cancelled"), cancelled_before + 1)
+
+    async def test_failures_awaited_elsewhere_are_not_logged(self):
+        async def fail():
+            raise RuntimeError("boom")
+
+        error_before = finished("quiet", "error")
+        with self.assertNoLogs("music_supervisor", level="ERROR"):
+            failing = self.supervisor.spawn("quiet", fail(), log_errors=False)
+            with self.assertRaises(RuntimeError):
+                await failing
+
+        self.assertEqual(finished("quiet", "error"), error_before + 1)
+
+    async def test_cancel_guild_spares_other_guilds_and_the_caller(self):
+        async def cleanup():
+            return self.supervisor.cancel_guild(1)
+
+        mine = self.supervisor.spawn("load", self.work("mine", 10), guild_id=1)
+        other = self.supervisor.spawn("load", self.work("other", 10), guild_id=2)
+        caller = self.supervisor.spawn("cleanup", cleanup(), guild_id=1)
+
+        self.assertEqual(await caller, 1)
+        with self.assertRaises(asyncio.CancelledError):
+            await mine
+        self.assertFalse(other.done())
+        self.assertTrue(self.supervisor.is_running("load", 2))
+        self.assertFalse(self.supervisor.is_running("load", 1))
+
+    async def test_task_cancelled_before_it_started_closes_its_coroutine(self):
+        coro = self.work("never")
+        task = self.supervisor.spawn("load", coro)
+        task.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertIsNone(coro.cr_frame)
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.supervisor.tasks, {})
+
+    async def test_drain_stops_kinds_in_order(self):
+        self.supervisor.spawn("flush", self.work("flush", 10))
+        self.supervisor.spawn("other", self.work("other", 10))
+        self.supervisor.spawn("load", self.work("load", 10))
+        await asyncio.sleep(0)
+
+        await self.supervisor.drain(("load", "flush"))
+
+        self.assertEqual(
+            [event for event in self.events if event.startswith("stop")],
+            ["stop load", "stop flush", "stop other"],
+        )
+        self.assertEqual(self.supervisor.tasks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
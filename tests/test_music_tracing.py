@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_audio import extract_info_async
+from music_tracing import NOOP_SPAN, JsonlExporter, RingBufferExporter, Tracer, tracer
+
+
+class TracerTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.buffer = RingBufferExporter()
+        self.tracer = Tracer(exporters=[self.buffer])
+
+    def test_spans_nest_under_the_interaction_trace(self):
+        with self.tracer.start_trace("/play", guild_id=1) as root:
+            with self.tracer.span("ensure_bot_connected") as child:
+                with self.tracer.span("inner"):
+                    pass
+
+        spans = {span.name: span for span in self.buffer.trace(root.trace_id)}
+        self.assertEqual(set(spans), {"/play", "ensure_bot_connected", "inner"})
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertEqual(spans["inner"].parent_id, child.span_id)
+        self.assertEqual(root.attributes, {"guild_id": 1})
+
+    def test_exception_marks_span_as_error_and_propagates(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.start_trace("/play"):
+                with self.tracer.span("create_ffmpeg_source"):
+                    raise ValueError("ffmpeg missing")
+
+        failed = [span for span in self.buffer.spans if span.status == "error"]
+        self.assertEqual(len(failed), 2)
+        self.assertEqual(failed[0].error, "ValueError: ffmpeg missing")
+
+    def test_unsampled_traces_and_untraced_code_record_nothing(self):
+        self.tracer.sample_rate = 0.0
+
+        with self.tracer.start_trace("/play") as root:
+            with self.tracer.span("ensure_bot_connected") as child:
+                pass
+        with self.tracer.span("outside"):
+            pass
+
+        self.assertIs(root, NOOP_SPAN)
+        self.assertIs(child, NOOP_SPAN)
+        self.assertEqual(len(self.buffer.spans), 0)
+
+    async def test_traced_decorator_wraps_coroutines(self):
+        @self.tracer.traced("announce_now_playing")
+        async def announce(value):
+            return value * 2
+
+        with self.tracer.start_trace("/play"):
+            result = await announce(21)
+
+        self.assertEqual(result, 42)
+        self.assertEqual(
+            [span.name for span in self.buffer.spans],
+            ["announce_now_playing", "/play"],
+        )
+
+    def test_jsonl_exporter_appends_one_line_per_span(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            exporter = JsonlExporter(path, flush_interval=60)
+            self.tracer.exporters.append(exporter)
+
+            with self.tracer.start_trace("/add"):
+                with self.tracer.span("followup"):
+                    pass
+
+            self.assertFalse(os.path.exists(path))
+            self.tracer.close()
+            self.assertFalse(exporter.writer.is_alive())
+            with open(path, encoding="utf-8") as trace_file:
+                records = [json.loads(line) for line in trace_file]
+
+        self.assertEqual([record["name"] for record in records], ["followup", "/add"])
+        self.assertEqual(records[0]["parent_id"], records[1]["span_id"])
+
+    def test_jsonl_writer_thread_flushes_on_its_interval(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            exporter = JsonlExporter(path, flush_interval=0.01)
+            self.tracer.exporters.append(exporter)
+
+            with self.tracer.start_trace("/skip"):
+                pass
+            deadline = time.monotonic() + 2
+            while not os.path.exists(path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            exporter.close()
+
+            with open(path, encoding="utf-8") as trace_file:
+                self.assertEqual(json.loads(trace_file.read())["name"], "/skip")
+
+
+class ExtractionTracingTests(unittest.IsolatedAsyncioTestCase):
+    async def test_extraction_attempts_in_worker_threads_join_the_trace(self):
+        buffer = RingBufferExporter()
+
+        with patch.object(tracer, "exporters", [buffer]), patch(
+            "music_audio.youtube_dl.YoutubeDL"
+        ) as youtube_dl:
+            youtube_dl.return_value.extract_info.return_value = {"title": "Song"}
+            with tracer.start_trace("/play") as root:
+                await extract_info_async("https://example.com/video")
+
+        spans = {span.name: span for span in buffer.trace(root.trace_id)}
+        self.assertEqual(
+            spans["extraction_attempt"].parent_id, spans["extract_info"].span_id
+        )
+        self.assertTrue(spans["extraction_attempt"].thread.startswith("yt-dlp"))
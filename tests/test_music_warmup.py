@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from tests.module_stubs import install_test_stubs
+
+install_test_stubs()
+
+from music_audio import ExtractionActivity
+from music_cache import ExtractionCache
+from music_history import TrackHistory
+from music_scheduler import BACKGROUND
+from music_warmup import CacheWarmer
+
+
+def watch_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+class CacheWarmerTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.history = TrackHistory()
+        for video_id, plays in (
+            ("aaaaaaaaaaa", 3),
+            ("bbbbbbbbbbb", 2),
+            ("ccccccccccc", 1),
+        ):
+            for _ in range(plays):
+                self.history.record_play(video_id, video_id, watch_url(video_id))
+        self.cache = ExtractionCache()
+        self.activity = ExtractionActivity()
+        self.warmer = CacheWarmer(
+            self.history,
+            top_k=2,
+            interval=0,
+            busy_poll=0,
+            activity=self.activity,
+            cache=self.cache,
+        )
+
+    async def test_run_warms_top_k_tracks_in_play_count_order(self):
+        async def fake_extract(url, **kwargs):
+            self.cache.store(url[-11:], {"title": url, "url": "https://stream"})
+            return {}
+
+        with patch(
+            "music_warmup.extract_info_async", new=AsyncMock(side_effect=fake_extract)
+        ) as extract:
+            await self.warmer.run()
+
+        self.assertEqual(
+            [call.args[0] for call in extract.await_args_list],
+            [watch_url("aaaaaaaaaaa"), watch_url("bbbbbbbbbbb")],
+        )
+        extract.assert_awaited_with(
+            watch_url("bbbbbbbbbbb"),
+            priority=BACKGROUND,
+            noplaylist=True,
+            playlist_items="1",
+        )
+        for _ in range(3):
+            self.cache.get_stream("aaaaaaaaaaa")
+        report = self.warmer.report()
+        self.assertEqual((report["planned"], report["warmed"]), (2, 2))
+        self.assertEqual(report["warm_hits"], 1)
+        self.assertEqual(report["warm_hit_rate"], 0.5)
+
+    async def test_run_skips_cached_and_counts_failures(self):
+        self.cache.store("aaaaaaaaaaa", {"title": "A", "url": "https://stream"})
+
+        with patch(
+            "music_warmup.extract_info_async",
+            new=AsyncMock(side_effect=RuntimeError("blocked")),
+        ) as extract:
+            await self.warmer.run()
+
+        extract.assert_awaited_once()
+        report = self.warmer.report()
+        self.assertEqual((report["already_warm"], report["failed"]), (1, 1))
+
+    async def test_run_yields_while_interactive_extraction_is_in_flight(self):
+        self.warmer.top_k = 1
+        extract = AsyncMock(return_value={})
+
+        with patch("music_warmup.extract_info_async", new=extract):
+            with self.activity.track():
+                task = asyncio.create_task(self.warmer.run())
+                for _ in range(5):
+                    await asyncio.sleep(0)
+                extract.assert_not_awaited()
+            await task
+
+        extract.assert_awaited_once()
+        self.assertGreater(self.warmer.report()["yields"], 0)
+
+    async def test_start_is_idempotent_and_disabled_for_zero_top_k(self):
+        with patch("music_warmup.extract_info_async", new=AsyncMock(return_value={})):
+            first = self.warmer.start()
+            self.assertIs(self.warmer.start(), first)
+            await first
+
+        self.assertIsNone(CacheWarmer(self.history, top_k=0).start())